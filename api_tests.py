@@ -52,6 +52,52 @@ def teste_api_endpoint(endpoint, erwartete_keys=None):
     except AssertionError as e:
         print(f"  FEHLER: Assertion Fehler: {e}")
 
+def teste_stream_endpoint(endpoint, timeout=30):
+    """
+    Testet den Server-Sent-Events-Stream: Content-Type text/event-stream und mindestens ein Frame
+    (Ereignis oder Heartbeat) innerhalb von timeout Sekunden.
+    """
+    url = BASE_URL + endpoint
+    print(f"Teste Stream-Endpoint: {url}")
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            if not response.headers['Content-Type'].startswith('text/event-stream'):
+                raise AssertionError(f"Ungültiger Content-Type: {response.headers['Content-Type']}. Erwartet wurde 'text/event-stream'.")
+            zeilen = []
+            for zeile in response.iter_lines(decode_unicode=True):
+                zeilen.append(zeile)
+                if zeile.startswith("event: ") or zeile == ": heartbeat":
+                    break
+            print("  Empfangene Zeilen:", zeilen)
+            if not any(zeile.startswith("retry: ") for zeile in zeilen):
+                raise AssertionError("Reconnect-Intervall (retry) fehlt am Stream-Anfang")
+        print("  Stream Test erfolgreich abgeschlossen.\n")
+    except requests.exceptions.RequestException as e:
+        print(f"  FEHLER beim Zugriff auf Endpoint {endpoint}: {e}")
+    except AssertionError as e:
+        print(f"  FEHLER: Assertion Fehler: {e}")
+
+def teste_metrics_endpoint(endpoint, erwartete_metriken):
+    """Testet den Prometheus-Export: Content-Type text/plain und eine TYPE-Zeile für jede erwartete Metrik."""
+    url = BASE_URL + endpoint
+    print(f"Teste Metrics-Endpoint: {url}")
+    try:
+        response = requests.get(url)
+        response.raise_for_status()
+        if not response.headers['Content-Type'].startswith('text/plain'):
+            raise AssertionError(f"Ungültiger Content-Type: {response.headers['Content-Type']}. Erwartet wurde 'text/plain'.")
+        typen = {zeile.split()[2] for zeile in response.text.splitlines() if zeile.startswith("# TYPE ")}
+        for metrik in erwartete_metriken:
+            if metrik not in typen:
+                raise AssertionError(f"Erwartete Metrik '{metrik}' fehlt in {endpoint}")
+            print(f"    - Metrik '{metrik}' vorhanden: OK")
+        print("  Metrics Test erfolgreich abgeschlossen.\n")
+    except requests.exceptions.RequestException as e:
+        print(f"  FEHLER beim Zugriff auf Endpoint {endpoint}: {e}")
+    except AssertionError as e:
+        print(f"  FEHLER: Assertion Fehler: {e}")
+
 if __name__ == "__main__":
     print("Starte API Tests für Visionären Virenschutz Web-UI (JSON APIs)\n")
     print(f"Basis URL für Tests: {BASE_URL}\n")
@@ -68,6 +114,8 @@ if __name__ == "__main__":
             "anzahl_bedrohungen",
             "blockchain_aktiviert",
             "ki_aktiviert", # ki_aktiviert hinzugefügt
+            "ki_statistik",
+            "metriken",
             "virenschutz_version",
             "aktualisierungs_intervall"
         ]
@@ -79,9 +127,83 @@ if __name__ == "__main__":
         '/api/log_daten', # Korrektur: Teste API Endpoint
         erwartete_keys=[
             "log_eintraege",
+            "cursor_aelter",
+            "cursor_neuer",
             "aktualisierungs_intervall"
         ]
     )
+    teste_api_endpoint(
+        '/api/log_daten?limit=20&level=WARNING', # Gefilterte Seite (Mindeststufe)
+        erwartete_keys=[
+            "log_eintraege",
+            "cursor_aelter",
+            "cursor_neuer"
+        ]
+    )
+
+    # --- Test für /api/metrics/history (Metrik-Verlauf) ---
+    print("--- Testgruppe: Metrik-Verlauf API ---")
+    teste_api_endpoint(
+        '/api/metrics/history?metrics=system_cpu_prozent,prozess_rss_bytes&max_points=60',
+        erwartete_keys=[
+            "zeit",
+            "system_cpu_prozent",
+            "prozess_rss_bytes",
+            "aufloesung",
+            "intervall_sekunden"
+        ]
+    )
+
+    # --- Test für /api/scan_berichte (Scan-Berichte) ---
+    print("--- Testgruppe: Scan-Berichte API ---")
+    teste_api_endpoint('/api/scan_berichte?limit=5', erwartete_keys=["berichte"])
+    teste_api_endpoint(
+        '/api/scan_berichte/letzter', # Erst nach mindestens einer abgeschlossenen Systemprüfung vorhanden
+        erwartete_keys=[
+            "id",
+            "dauer_sekunden",
+            "ergebnis",
+            "bytes_gelesen",
+            "stufen",
+            "langsamste_dateien",
+            "regeln",
+            "uebersprungen"
+        ]
+    )
+
+    # --- Test für /api/scan_jobs (Prüfaufträge des Scan-Schedulers) ---
+    print("--- Testgruppe: Scan-Jobs API ---")
+    teste_api_endpoint('/api/scan_jobs', erwartete_keys=["offen", "beendet", "planung", "drosselung"])
+
+    # --- Test für /api/quarantaene (Quarantäne-Speicher) ---
+    print("--- Testgruppe: Quarantäne API ---")
+    teste_api_endpoint('/api/quarantaene', erwartete_keys=["eintraege", "cursor"])
+    teste_api_endpoint('/api/quarantaene?limit=5&pfad_praefix=/tmp/', erwartete_keys=["eintraege", "cursor"])
+    teste_api_endpoint('/api/quarantaene/statistik', erwartete_keys=["eintraege", "objekte", "bytes_original", "bytes_gespeichert", "uebertragungen", "ausstehende_transfers"])
+
+    # --- Test für /api/stream (Server-Sent Events) ---
+    print("--- Testgruppe: Stream API ---")
+    teste_stream_endpoint('/api/stream')
+    teste_stream_endpoint('/api/stream?last_event_id=0') # Fortsetzen ab dem ältesten gepufferten Ereignis
+
+    # --- Test für /metrics (Prometheus-Textformat) ---
+    print("--- Testgruppe: Prometheus-Metriken ---")
+    teste_metrics_endpoint(
+        '/metrics',
+        erwartete_metriken=[
+            "virenschutz_dateien_geprueft_total",
+            "virenschutz_bytes_gehasht_total",
+            "virenschutz_scan_cache_treffer_total",
+            "virenschutz_erkennungen_total",
+            "virenschutz_quarantaene_aktionen_total",
+            "virenschutz_hash_dauer_sekunden",
+            "virenschutz_regel_auswertung_dauer_sekunden",
+            "virenschutz_reputation_abfrage_dauer_sekunden",
+            "virenschutz_ki_anfrage_dauer_sekunden",
+            "virenschutz_quanten_analyse_dauer_sekunden",
+            "virenschutz_echtzeit_tick_dauer_sekunden"
+        ]
+    )
 
     # --- Test für /config (Konfiguration) ---
     print("--- Testgruppe: Konfigurations API ---")
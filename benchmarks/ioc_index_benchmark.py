@@ -0,0 +1,68 @@
+"""
+Benchmark: IOC-Index (Bloom-Filter + per mmap eingeblendetes, sortiertes Digest-Array).
+
+Misst Aufbau des Snapshots, Ladezeit beim Start, residenten Speicher und die Kosten einer
+Abfrage pro Datei-Hash (negativ und positiv).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.ioc_index_benchmark [--anzahl 1000000] [--abfragen 200000]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import psutil
+
+from ioc_index import IOCIndex, DIGEST_LAENGE
+
+def miss_abfragen(index, hashes):
+    """Gibt die mittleren Kosten pro Abfrage in Nanosekunden und die Anzahl Treffer zurück."""
+    enthaelt = index.enthaelt
+    start = time.perf_counter()
+    treffer = 0
+    for datei_hash in hashes:
+        if enthaelt(datei_hash):
+            treffer += 1
+    return (time.perf_counter() - start) / len(hashes) * 1e9, treffer
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des IOC-Index.")
+    parser.add_argument("--anzahl", type=int, default=1_000_000, help="Anzahl SHA-256-Indikatoren")
+    parser.add_argument("--abfragen", type=int, default=200_000, help="Anzahl Abfragen je Messung")
+    args = parser.parse_args()
+
+    prozess = psutil.Process()
+    verzeichnis = tempfile.mkdtemp(prefix="ioc_benchmark_")
+    try:
+        snapshot = os.path.join(verzeichnis, "ioc_index.bin")
+        rohdaten = os.urandom(args.anzahl * DIGEST_LAENGE)
+        indikatoren = [rohdaten[i:i + DIGEST_LAENGE].hex() for i in range(0, len(rohdaten), DIGEST_LAENGE)]
+
+        start = time.perf_counter()
+        IOCIndex(snapshot).baue_neu(indikatoren, "benchmark")
+        aufbau_s = time.perf_counter() - start
+        positive = indikatoren[:args.abfragen]
+        del indikatoren, rohdaten
+
+        rss_vorher = prozess.memory_info().rss
+        start = time.perf_counter()
+        index = IOCIndex(snapshot)
+        laden_ms = (time.perf_counter() - start) * 1000
+        negative = [os.urandom(DIGEST_LAENGE).hex() for _ in range(args.abfragen)]
+        negativ_ns, falsch_positiv = miss_abfragen(index, negative)
+        positiv_ns, gefunden = miss_abfragen(index, positive)
+        rss_nachher = prozess.memory_info().rss
+
+        print(f"Indikatoren: {index.anzahl}, Snapshot: {os.path.getsize(snapshot) / 1e6:.1f} MB, Bloom-Filter: {len(index.bloom) / 1e6:.1f} MB")
+        print(f"Aufbau: {aufbau_s:.1f} s, Laden beim Start: {laden_ms:.1f} ms")
+        print(f"Resident nach Laden und Abfragen: +{(rss_nachher - rss_vorher) / 1e6:.1f} MB (inkl. Testdaten)")
+        print(f"Abfrage negativ: {negativ_ns:.0f} ns ({falsch_positiv} Falsch-Positive)")
+        print(f"Abfrage positiv: {positiv_ns:.0f} ns ({gefunden}/{len(positive)} gefunden)")
+        index.schliesse()
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
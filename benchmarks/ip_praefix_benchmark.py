@@ -0,0 +1,75 @@
+"""
+Micro-Benchmark: Abgleich von Remote-Adressen mit gesperrten IP-Netzen (IPPraefixBaum aus regel_engine.py).
+
+Erzeugt zufällige IPv4- und IPv6-Netze (Präfixlängen 8-32 bzw. 16-128), baut den Präfixbaum und misst
+die Kosten pro Suche für wachsende Netzanzahlen, verglichen mit einer linearen Prüfung über
+ipaddress-Objekte. Ein Teil der Suchergebnisse wird gegen die lineare Prüfung verifiziert.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.ip_praefix_benchmark [--netze 1000,10000,100000,300000] [--suchen 20000]
+"""
+import argparse
+import ipaddress
+import random
+import time
+
+from regel_engine import IPPraefixBaum, parse_ip_netz
+
+def erzeuge_netze(anzahl, zufall):
+    netze = []
+    for _ in range(anzahl):
+        if zufall.random() < 0.8:
+            laenge = zufall.choice((8, 12, 16, 20, 22, 24, 24, 24, 28, 32))
+            netze.append(str(ipaddress.ip_network((zufall.getrandbits(32), laenge), strict=False)))
+        else:
+            laenge = zufall.choice((16, 32, 48, 48, 56, 64, 128))
+            netze.append(str(ipaddress.ip_network((zufall.getrandbits(128), laenge), strict=False)))
+    return netze
+
+def erzeuge_adressen(anzahl, netze, zufall):
+    """Hälfte Adressen innerhalb zufälliger Netze, Hälfte zufällige Adressen."""
+    adressen = []
+    for i in range(anzahl):
+        if i % 2:
+            netz = ipaddress.ip_network(zufall.choice(netze))
+            adressen.append(str(netz.network_address + zufall.randrange(netz.num_addresses)))
+        elif zufall.random() < 0.8:
+            adressen.append(str(ipaddress.IPv4Address(zufall.getrandbits(32))))
+        else:
+            adressen.append(str(ipaddress.IPv6Address(zufall.getrandbits(128))))
+    return adressen
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-Benchmark des IP-Präfixbaums.")
+    parser.add_argument("--netze", default="1000,10000,100000,300000", help="Kommagetrennte Netzanzahlen")
+    parser.add_argument("--suchen", type=int, default=20000, help="Suchen pro Messung")
+    parser.add_argument("--linear-max", type=int, default=10000, help="Lineare Prüfung nur bis zu dieser Netzanzahl messen")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    zufall = random.Random(args.seed)
+    print(f"{'Netze':>8}{'Aufbau [s]':>12}{'Baum [µs]':>12}{'linear [µs]':>14}{'Treffer':>10}{'Abweichungen':>14}")
+    for anzahl in (int(wert) for wert in args.netze.split(",")):
+        netze = erzeuge_netze(anzahl, zufall)
+        adressen = erzeuge_adressen(args.suchen, netze, zufall)
+
+        start = time.perf_counter()
+        baum = IPPraefixBaum((parse_ip_netz(netz), netz) for netz in netze)
+        aufbau_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ergebnisse = [baum.finde(adresse) for adresse in adressen]
+        baum_us = (time.perf_counter() - start) / len(adressen) * 1e6
+        treffer = sum(1 for ergebnis in ergebnisse if ergebnis)
+
+        # Verifikation gegen die lineare Prüfung (Stichprobe bei großen Netzanzahlen)
+        netz_objekte = [ipaddress.ip_network(netz) for netz in netze]
+        stichprobe = adressen[:args.suchen if anzahl <= args.linear_max else 20]
+        start = time.perf_counter()
+        erwartet = [{str(netz) for netz in netz_objekte if ipaddress.ip_address(adresse) in netz} for adresse in stichprobe]
+        linear_us = (time.perf_counter() - start) / len(stichprobe) * 1e6
+        abweichungen = sum(1 for ergebnis, soll in zip(ergebnisse, erwartet) if set(ergebnis) != soll)
+        print(f"{anzahl:>8}{aufbau_s:>12.2f}{baum_us:>12.2f}{linear_us:>14.1f}{treffer:>10}{abweichungen:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Deterministischer Testkorpus für Scan-Benchmarks (synthetisches Dateisystem).
+
+Erzeugt aus einem Seed immer denselben Verzeichnisbaum: Tiefe und Verzweigung, Dateien pro Verzeichnis,
+log-normal verteilte Dateigrößen, eine gewichtete Mischung von Dateiendungen sowie gezielt platzierte
+Regeltreffer (Dateien mit einer Byte-Signatur an zufälligem Offset und Dateien mit einer Treffer-Endung).
+Neben dem Baum liegt manifest.json mit Parametern, Anzahl, Gesamtgröße und den platzierten Treffern;
+ein vorhandener Korpus mit gleichen Parametern wird wiederverwendet.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.korpus --ziel /tmp/korpus [--tiefe 3] [--verzweigung 4] [--dateien-pro-verzeichnis 20] [--seed 42]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+from dataclasses import asdict, dataclass, field
+
+# Gewichte der Dateiendungen (ungefähr wie ein Benutzerprofil mit Dokumenten, Medien und Programmen)
+STANDARD_ENDUNGEN = {".txt": 20, ".log": 8, ".pdf": 10, ".docx": 8, ".jpg": 15, ".png": 8, ".zip": 4,
+                     ".dll": 8, ".exe": 4, ".py": 6, ".json": 5, ".tmp": 4}
+TREFFER_ENDUNG = ".bmkx" # Endung der platzierten Endungs-Treffer (kommt sonst nicht vor)
+TREFFER_MARKIERUNG = b"VVS-BENCHMARK-SIGNATUR\x00\x7f" # Byte-Folge der platzierten Signatur-Treffer
+INHALT_POOL_GROESSE = 4 * 2**20 # Dateiinhalte sind Ausschnitte aus einem festen Zufallspuffer
+
+@dataclass
+class KorpusParameter:
+    """Parameter des Testkorpus; gleiche Parameter erzeugen byteweise denselben Baum."""
+    seed: int = 42
+    tiefe: int = 3 # Verzeichnisebenen unterhalb der Wurzel
+    verzweigung: int = 4 # Unterverzeichnisse pro Verzeichnis
+    dateien_pro_verzeichnis: int = 20
+    groesse_median_bytes: int = 16 * 1024
+    groesse_sigma: float = 1.5 # Streuung der Log-Normalverteilung
+    groesse_max_bytes: int = 64 * 2**20
+    endungen: dict = field(default_factory=lambda: dict(STANDARD_ENDUNGEN))
+    treffer_signatur: int = 20 # Dateien mit TREFFER_MARKIERUNG im Inhalt
+    treffer_endung: int = 20 # Dateien mit TREFFER_ENDUNG
+
+def plane_dateien(parameter):
+    """Gibt die geplanten Dateien als Liste von [relativer_pfad, groesse, markierung_offset] zurück (ohne zu schreiben)."""
+    zufall = random.Random(parameter.seed)
+    endungen = list(parameter.endungen)
+    gewichte = [parameter.endungen[endung] for endung in endungen]
+    verzeichnisse = [""]
+    ebene = [""]
+    for _ in range(parameter.tiefe):
+        ebene = [os.path.join(eltern, f"ordner{nummer}") for eltern in ebene for nummer in range(parameter.verzweigung)]
+        verzeichnisse.extend(ebene)
+    dateien = []
+    for verzeichnis in verzeichnisse:
+        for nummer in range(parameter.dateien_pro_verzeichnis):
+            groesse = min(parameter.groesse_max_bytes, int(zufall.lognormvariate(math.log(parameter.groesse_median_bytes), parameter.groesse_sigma)))
+            endung = zufall.choices(endungen, gewichte)[0]
+            dateien.append([os.path.join(verzeichnis, f"datei{nummer}{endung}"), groesse, None])
+
+    anzahl_treffer = min(len(dateien), parameter.treffer_signatur + parameter.treffer_endung)
+    treffer_indizes = zufall.sample(range(len(dateien)), anzahl_treffer)
+    for position, index in enumerate(treffer_indizes):
+        pfad, groesse, _ = dateien[index]
+        if position < parameter.treffer_signatur:
+            groesse = max(groesse, len(TREFFER_MARKIERUNG))
+            dateien[index] = [pfad, groesse, zufall.randrange(groesse - len(TREFFER_MARKIERUNG) + 1)]
+        else:
+            dateien[index] = [os.path.splitext(pfad)[0] + TREFFER_ENDUNG, groesse, None]
+    return dateien
+
+def _schreibe_datei(pfad, groesse, markierung_offset, pool, start):
+    with open(pfad, "wb") as datei:
+        geschrieben = 0
+        while geschrieben < groesse:
+            stueck = pool[start:start + groesse - geschrieben]
+            datei.write(stueck)
+            geschrieben += len(stueck)
+            start = 0
+        if markierung_offset is not None:
+            datei.seek(markierung_offset)
+            datei.write(TREFFER_MARKIERUNG)
+
+def erzeuge_korpus(ziel, parameter, neu=False):
+    """
+    Erzeugt den Korpus unter ziel/baum (bzw. verwendet einen vorhandenen mit gleichen Parametern wieder)
+    und gibt das Manifest zurück: parameter, wurzel, dateien, bytes, treffer (relative Pfade).
+    """
+    manifest_pfad = os.path.join(ziel, "manifest.json")
+    wurzel = os.path.join(ziel, "baum")
+    if not neu and os.path.exists(manifest_pfad):
+        with open(manifest_pfad, "r", encoding="utf-8") as datei:
+            manifest = json.load(datei)
+        if manifest.get("parameter") == asdict(parameter) and os.path.isdir(wurzel):
+            return manifest
+    shutil.rmtree(wurzel, ignore_errors=True)
+
+    dateien = plane_dateien(parameter)
+    pool = random.Random(parameter.seed).randbytes(INHALT_POOL_GROESSE)
+    start_zufall = random.Random(parameter.seed + 1)
+    for relativer_pfad, groesse, markierung_offset in dateien:
+        pfad = os.path.join(wurzel, relativer_pfad)
+        os.makedirs(os.path.dirname(pfad), exist_ok=True)
+        _schreibe_datei(pfad, groesse, markierung_offset, pool, start_zufall.randrange(INHALT_POOL_GROESSE))
+
+    manifest = {
+        "parameter": asdict(parameter),
+        "wurzel": wurzel,
+        "dateien": len(dateien),
+        "bytes": sum(groesse for _, groesse, _ in dateien),
+        "treffer": sorted(pfad for pfad, _, offset in dateien if offset is not None or pfad.endswith(TREFFER_ENDUNG))
+    }
+    with open(manifest_pfad, "w", encoding="utf-8") as datei:
+        json.dump(manifest, datei, ensure_ascii=False, indent=2)
+    return manifest
+
+def regelsatz(wurzel):
+    """Regelsatz (Format von virenschutz_regeln.json), der genau die platzierten Treffer erkennt."""
+    return {
+        "prozesse": {"regeln": []},
+        "dateien": {"regeln": [
+            {"name": "Benchmark: Signatur", "muster": [], "pfade": [wurzel], "aktiviert": True, "aktion": "datei_quarantaene",
+             "signaturen": [{"id": "benchmark_markierung", "muster": TREFFER_MARKIERUNG.hex().upper()}]},
+            {"name": "Benchmark: Endung", "muster": [TREFFER_ENDUNG], "pfade": [wurzel], "aktiviert": True, "aktion": "datei_quarantaene"}
+        ]},
+        "netzwerk": {"regeln": []},
+        "ki_analyse": {"regeln": []},
+        "quanten_analyse": {"regeln": []}
+    }
+
+def parameter_argumente(parser):
+    """Fügt die Korpus-Parameter als Optionen hinzu (auch von scan_benchmark verwendet)."""
+    standard = KorpusParameter()
+    parser.add_argument("--seed", type=int, default=standard.seed)
+    parser.add_argument("--tiefe", type=int, default=standard.tiefe, help="Verzeichnisebenen unterhalb der Wurzel")
+    parser.add_argument("--verzweigung", type=int, default=standard.verzweigung, help="Unterverzeichnisse pro Verzeichnis")
+    parser.add_argument("--dateien-pro-verzeichnis", type=int, default=standard.dateien_pro_verzeichnis)
+    parser.add_argument("--groesse-median", type=int, default=standard.groesse_median_bytes, help="Median der Dateigröße in Bytes")
+    parser.add_argument("--groesse-sigma", type=float, default=standard.groesse_sigma, help="Streuung der Log-Normalverteilung")
+    parser.add_argument("--groesse-max", type=int, default=standard.groesse_max_bytes, help="Maximale Dateigröße in Bytes")
+    parser.add_argument("--endungen", default=None, help="Endungsmischung als JSON, z.B. '{\".txt\": 3, \".exe\": 1}'")
+    parser.add_argument("--treffer-signatur", type=int, default=standard.treffer_signatur, help="Platzierte Signatur-Treffer")
+    parser.add_argument("--treffer-endung", type=int, default=standard.treffer_endung, help="Platzierte Endungs-Treffer")
+
+def parameter_aus_argumenten(args):
+    return KorpusParameter(seed=args.seed, tiefe=args.tiefe, verzweigung=args.verzweigung, dateien_pro_verzeichnis=args.dateien_pro_verzeichnis,
+                           groesse_median_bytes=args.groesse_median, groesse_sigma=args.groesse_sigma, groesse_max_bytes=args.groesse_max,
+                           endungen=json.loads(args.endungen) if args.endungen else dict(STANDARD_ENDUNGEN),
+                           treffer_signatur=args.treffer_signatur, treffer_endung=args.treffer_endung)
+
+def main():
+    parser = argparse.ArgumentParser(description="Erzeugt einen deterministischen Testkorpus für Scan-Benchmarks.")
+    parser.add_argument("--ziel", required=True, help="Verzeichnis für Manifest und Baum")
+    parser.add_argument("--neu", action="store_true", help="Korpus auch bei gleichen Parametern neu erzeugen")
+    parameter_argumente(parser)
+    args = parser.parse_args()
+    manifest = erzeuge_korpus(args.ziel, parameter_aus_argumenten(args), args.neu)
+    print(f"{manifest['dateien']} Dateien, {manifest['bytes'] / 2**20:.1f} MiB, {len(manifest['treffer'])} platzierte Treffer unter '{manifest['wurzel']}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: Registrierung von Log-Hashes über gebündelte Merkle-Wurzeln.
+
+Als Ledger dient die simulierte Blockchain-Transaktion des BlockchainManager mit konfigurierbarer
+Latenz pro Transaktion. Gemessen werden der Durchsatz der Registrierung (Einreihen und Ende-zu-Ende
+bis zur geschriebenen Beweisdatei), die Anzahl Threads während der Last, die Größe der Beweisdatei
+und das Lesen der letzten Einträge.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.log_anker_benchmark [--meldungen 200000] [--latenz-ms 500] [--batch 16384]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from blockchain_manager import BlockchainManager
+from merkle_anker import verifiziere_merkle_beweis
+
+class BenchmarkKonfiguration:
+    """Minimaler Ersatz für KonfigurationManager (nur get_konfiguration)."""
+    def __init__(self, blockchain_konfig):
+        self.konfiguration = {"blockchain": blockchain_konfig}
+
+    def get_konfiguration(self):
+        return self.konfiguration
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Merkle-Verankerung von Log-Hashes.")
+    parser.add_argument("--meldungen", type=int, default=200_000, help="Anzahl Log-Meldungen")
+    parser.add_argument("--latenz-ms", type=float, default=500, help="Simulierte Latenz pro Ledger-Transaktion")
+    parser.add_argument("--batch", type=int, default=16384, help="Log-Hashes pro Merkle-Wurzel")
+    args = parser.parse_args()
+
+    verzeichnis = tempfile.mkdtemp(prefix="log_anker_benchmark_")
+    try:
+        beweis_datei = os.path.join(verzeichnis, "log_merkle_beweise.jsonl")
+        manager = BlockchainManager(BenchmarkKonfiguration({
+            "aktiviert": True,
+            "log_registrierung_aktiviert": True,
+            "reputation_cache_datei": os.path.join(verzeichnis, "reputation_cache.db"),
+            "log_beweis_datei": beweis_datei,
+            "log_batch_groesse": args.batch,
+            "log_batch_wartezeit_sekunden": 1,
+            "log_warteschlange_max": args.meldungen, # Für die Messung nichts verwerfen
+            "log_anker_latenz_ms": args.latenz_ms,
+        }))
+        meldungen = [f"2025-01-01 12:00:00 - INFO - Datei '/daten/ordner{i % 100}/datei{i}.exe' geprüft." for i in range(args.meldungen)]
+        threads_vorher = threading.active_count()
+
+        with contextlib.redirect_stdout(io.StringIO()): # "SIMULIERE ..."-Ausgaben unterdrücken
+            start = time.perf_counter()
+            for meldung in meldungen:
+                manager.registriere_log_hash_blockchain(meldung)
+            einreihen_s = time.perf_counter() - start
+            threads_last = threading.active_count()
+            manager.beende()
+            gesamt_s = time.perf_counter() - start
+
+        statistik = manager.log_anker.get_statistik()
+        print(f"Meldungen: {args.meldungen}, Batches: {statistik['verankerte_batches']}, verworfen: {statistik['verworfen']}")
+        print(f"Einreihen: {args.meldungen / einreihen_s:,.0f} Meldungen/s, Ende-zu-Ende: {statistik['registriert'] / gesamt_s:,.0f} Meldungen/s")
+        print(f"Threads: {threads_vorher} vorher, {threads_last} unter Last")
+        print(f"Beweisdatei: {os.path.getsize(beweis_datei) / 1e6:.1f} MB ({os.path.getsize(beweis_datei) / max(1, statistik['registriert']):.0f} Bytes pro Eintrag)")
+
+        start = time.perf_counter()
+        letzte = manager.log_anker.lese_letzte_eintraege(100)
+        lesen_ms = (time.perf_counter() - start) * 1000
+        gueltig = all(verifiziere_merkle_beweis(eintrag["hash"], eintrag["beweis"], eintrag["merkle_wurzel"]) for eintrag in letzte)
+        print(f"Letzte 100 Einträge lesen: {lesen_ms:.2f} ms, Beweise gültig: {gueltig}")
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: Antwortzeit der Log-Anzeige bei wachsender Log-Datei (LogIndex aus log_index.py).
+
+Erzeugt JSON-Lines-Log-Dateien wie der LogSchreiber (überwiegend DEBUG, wenige Warnungen/Fehler) und misst
+für jede Größe: das bisherige readlines()[-100:], den ersten Indexaufbau, das Laden des gespeicherten Index,
+die letzten 100 Einträge, eine Seite mit Mindeststufe ERROR, eine Zeitbereichsabfrage sowie das
+Nachlesen nach dem Anhängen neuer Zeilen.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.log_index_benchmark [--groessen-mib 16,128,1024] [--wiederholungen 20]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from log_index import LogIndex
+
+STUFEN = ["DEBUG"] * 90 + ["INFO"] * 8 + ["WARNING"] + ["ERROR"]
+
+def schreibe_log(pfad, ziel_bytes, start_zeit, zufall):
+    """Schreibt JSON-Lines-Datensätze (ein Datensatz pro Millisekunde) bis zur Zielgröße. Gibt die Endzeit zurück."""
+    zeit = start_zeit
+    geschrieben = 0
+    with open(pfad, "a", encoding="utf-8") as datei:
+        while geschrieben < ziel_bytes:
+            zeilen = []
+            for _ in range(10000):
+                zeit += 0.001
+                stufe = zufall.choice(STUFEN)
+                zeitstempel = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(zeit)) + f".{int(zeit * 1000) % 1000:03d}"
+                zeilen.append(json.dumps({"zeit": zeitstempel, "stufe": stufe, "typ": "debug", "meldung": f"Prüfe Datei: '/daten/ordner{zufall.randrange(1000)}/datei{zufall.randrange(10**6)}.bin'",
+                                          "thread": "MainThread", "art": "datei_geprueft", "daten": {"datei_pfad": "/daten/..."}}, ensure_ascii=False))
+            text = "\n".join(zeilen) + "\n"
+            datei.write(text)
+            geschrieben += len(text.encode())
+    return zeit
+
+def messe(funktion, wiederholungen):
+    """Gibt den Median der Laufzeit in Millisekunden und das letzte Ergebnis zurück."""
+    zeiten = []
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        ergebnis = funktion()
+        zeiten.append((time.perf_counter() - start) * 1000)
+    zeiten.sort()
+    return zeiten[len(zeiten) // 2], ergebnis
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der indizierten Log-Anzeige.")
+    parser.add_argument("--groessen-mib", default="16,128,1024", help="Kommagetrennte Größen der Log-Datei in MiB")
+    parser.add_argument("--wiederholungen", type=int, default=20, help="Wiederholungen pro Abfrage (Median)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    zufall = random.Random(args.seed)
+    verzeichnis = tempfile.mkdtemp(prefix="log_index_benchmark_")
+    try:
+        pfad = os.path.join(verzeichnis, "virenschutz.log")
+        start_zeit = time.time() - 86400
+        zeit = start_zeit
+        print(f"{'Größe [MiB]':>12}{'readlines [ms]':>16}{'Aufbau [s]':>12}{'Laden [ms]':>12}{'letzte 100 [ms]':>17}"
+              f"{'ERROR [ms]':>12}{'seit [ms]':>11}{'Nachlesen [ms]':>16}")
+        for groesse_mib in (int(wert) for wert in args.groessen_mib.split(",")):
+            fehlend = groesse_mib * 2**20 - (os.path.getsize(pfad) if os.path.exists(pfad) else 0)
+            if fehlend > 0:
+                zeit = schreibe_log(pfad, fehlend, zeit, zufall)
+            if os.path.exists(pfad + ".idx"):
+                os.remove(pfad + ".idx")
+
+            def readlines_bisher():
+                with open(pfad, "r", encoding="utf-8", errors="ignore") as datei:
+                    return datei.readlines()[-100:]
+            readlines_ms, _ = messe(readlines_bisher, 1 if groesse_mib > 256 else 3)
+
+            start = time.perf_counter()
+            index = LogIndex(pfad)
+            index.aktualisiere()
+            aufbau_s = time.perf_counter() - start
+            laden_ms, _ = messe(lambda: LogIndex(pfad).aktualisiere(), 3)
+
+            letzte_ms, _ = messe(lambda: index.hole_eintraege(anzahl=100), args.wiederholungen)
+            fehler_ms, _ = messe(lambda: index.hole_eintraege(anzahl=100, stufe="ERROR"), args.wiederholungen)
+            seit = zeit - 60 # Letzte Minute
+            seit_ms, _ = messe(lambda: index.hole_eintraege(anzahl=100, richtung="neuer", seit=seit), args.wiederholungen)
+
+            zeit = schreibe_log(pfad, 64 * 1024, zeit, zufall) # Neue Zeilen wie zwischen zwei Aktualisierungen der Web-UI
+            nachlesen_ms, _ = messe(lambda: index.hole_eintraege(anzahl=100), 1)
+            print(f"{groesse_mib:>12}{readlines_ms:>16.1f}{aufbau_s:>12.2f}{laden_ms:>12.1f}{letzte_ms:>17.2f}"
+                  f"{fehler_ms:>12.2f}{seit_ms:>11.2f}{nachlesen_ms:>16.2f}")
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
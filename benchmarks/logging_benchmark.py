@@ -0,0 +1,115 @@
+"""
+Benchmark: Scan-Durchsatz mit und ohne Debug-Logging.
+
+Erzeugt einen Testkorpus kleiner Dateien und durchläuft ihn wie die Systemprüfung (DateiWalker, SHA-256
+pro Datei, Debug-Ereignisse pro Datei und pro Regeltreffer). Verglichen werden das bisherige synchrone
+Logging über das logging-Modul (f-Strings, Schreiben im Scan-Thread) und der LogSchreiber aus
+logging_utils.py (JSON-Lines, synchron bzw. im Hintergrund, mit und ohne Drosselung sowie mit Stufe INFO).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.logging_benchmark [--dateien 20000] [--groesse 1024] [--durchlaeufe 3]
+"""
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import logging_utils
+from datei_walker import DateiWalker
+from logging_utils import protokolliere_ereignis_global
+
+REGEL_NAME = "Ausführbare Dateien"
+REGEL_MUSTER = frozenset({".exe", ".dll", ".scr"})
+
+def erzeuge_korpus(verzeichnis, anzahl, groesse):
+    inhalt = os.urandom(groesse)
+    for i in range(anzahl):
+        unterverzeichnis = os.path.join(verzeichnis, f"ordner{i // 500}")
+        os.makedirs(unterverzeichnis, exist_ok=True)
+        with open(os.path.join(unterverzeichnis, f"datei{i}{'.exe' if i % 10 == 0 else '.txt'}"), "wb") as datei:
+            datei.write(inhalt)
+
+def hashe(pfad):
+    with open(pfad, "rb") as datei:
+        return hashlib.sha256(datei.read()).hexdigest()
+
+def scanne_bisher(walker, verzeichnis, logger):
+    """Bisheriges Muster: f-Strings werden immer formatiert, das logging-Modul schreibt im Scan-Thread."""
+    for eintrag in walker.durchlaufe(verzeichnis):
+        logger.debug(f"Prüfe Datei: '{eintrag.pfad}'", extra={})
+        datei_hash = hashe(eintrag.pfad)
+        if eintrag.name.endswith(".exe"):
+            logger.debug(f"Datei '{eintrag.pfad}' matched Regel '{REGEL_NAME}' (Muster: {list(REGEL_MUSTER)}). Hash: {datei_hash}", extra={})
+
+def scanne(walker, verzeichnis):
+    """Neues Muster: Vorlagen mit Feldern, Formatierung und I/O im LogSchreiber."""
+    for eintrag in walker.durchlaufe(verzeichnis):
+        protokolliere_ereignis_global("debug", "Prüfe Datei: '{datei_pfad}'", art="datei_geprueft", datei_pfad=eintrag.pfad)
+        datei_hash = hashe(eintrag.pfad)
+        if eintrag.name.endswith(".exe"):
+            protokolliere_ereignis_global("debug", "Datei '{datei_pfad}' matched Regel '{regel_name}' (Muster: {muster}). Hash: {datei_hash}", art="datei_regel_treffer",
+                                          datei_pfad=eintrag.pfad, regel_name=REGEL_NAME, muster=REGEL_MUSTER, datei_hash=datei_hash)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des Scan-Durchsatzes mit und ohne Debug-Logging.")
+    parser.add_argument("--dateien", type=int, default=20000, help="Anzahl Dateien im Testkorpus")
+    parser.add_argument("--groesse", type=int, default=1024, help="Dateigröße in Bytes")
+    parser.add_argument("--durchlaeufe", type=int, default=3, help="Durchläufe pro Variante (bester zählt)")
+    args = parser.parse_args()
+
+    verzeichnis = tempfile.mkdtemp(prefix="logging_benchmark_")
+    try:
+        korpus = os.path.join(verzeichnis, "korpus")
+        erzeuge_korpus(korpus, args.dateien, args.groesse)
+        walker = DateiWalker([], [])
+        scanne(walker, korpus) # Page-Cache aufwärmen (noch ohne Logging-Initialisierung: Debug ist deaktiviert)
+
+        varianten = [
+            ("bisher (logging, DEBUG)", None),
+            ("jsonl synchron, DEBUG", {"log_level_str": "DEBUG", "asynchron": False}),
+            ("jsonl asynchron, DEBUG", {"log_level_str": "DEBUG", "asynchron": True}),
+            ("jsonl asynchron, DEBUG, gedrosselt", {"log_level_str": "DEBUG", "asynchron": True,
+                                                   "drosselung": {"datei_geprueft": {"max_pro_sekunde": 100}, "datei_regel_treffer": {"anteil": 0.1}}}),
+            ("jsonl asynchron, INFO", {"log_level_str": "INFO", "asynchron": True}),
+        ]
+        print(f"{'Variante':<38}{'Scan [s]':>10}{'Dateien/s':>12}{'bis geschrieben [s]':>21}{'Log-Zeilen':>12}{'Log [MiB]':>11}")
+        for name, optionen in varianten:
+            bester = None
+            for durchlauf in range(args.durchlaeufe):
+                log_datei = os.path.join(verzeichnis, f"benchmark_{len(name)}_{durchlauf}.log")
+                if optionen is None:
+                    logger = logging.getLogger("benchmark_bisher")
+                    logger.propagate = False
+                    logger.setLevel(logging.DEBUG)
+                    handler = logging.FileHandler(log_datei, encoding="utf-8")
+                    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+                    logger.addHandler(handler)
+                    start = time.perf_counter()
+                    scanne_bisher(walker, korpus, logger)
+                    scan_s = time.perf_counter() - start
+                    logger.removeHandler(handler)
+                    handler.close()
+                    gesamt_s = time.perf_counter() - start
+                else:
+                    logging_utils.initialisiere_logging(log_datei_pfad=log_datei, **optionen)
+                    start = time.perf_counter()
+                    scanne(walker, korpus)
+                    scan_s = time.perf_counter() - start
+                    logging_utils.beende_logging() # Wartet, bis alle Ereignisse geschrieben sind
+                    gesamt_s = time.perf_counter() - start
+                with open(log_datei, "rb") as datei:
+                    zeilen = datei.read().count(b"\n")
+                ergebnis = (scan_s, gesamt_s, zeilen, os.path.getsize(log_datei))
+                if bester is None or ergebnis[0] < bester[0]:
+                    bester = ergebnis
+                os.remove(log_datei)
+            scan_s, gesamt_s, zeilen, groesse = bester
+            print(f"{name:<38}{scan_s:>10.2f}{args.dateien / scan_s:>12.0f}{gesamt_s:>21.2f}{zeilen:>12}{groesse / 2**20:>11.1f}")
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
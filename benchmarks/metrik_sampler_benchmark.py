@@ -0,0 +1,62 @@
+"""
+Benchmark: Dashboard-Metriken aus dem Metrik-Sampler (metrik_sampler.py) statt blockierender psutil-Abfragen.
+
+Misst die bisherige Abfrage pro Anfrage (psutil.cpu_percent(interval=1) plus virtual_memory), die Kosten
+einer Hintergrundmessung, das Lesen des letzten Messwerts und eines vollständigen Verlaufs sowie den
+Speicherbedarf der Ringpuffer nach sehr vielen Messpunkten (er muss konstant bleiben).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.metrik_sampler_benchmark [--punkte 1000000] [--wiederholungen 1000]
+"""
+import argparse
+import time
+import tracemalloc
+
+import psutil
+
+from metrik_sampler import METRIKEN, MetrikSampler
+
+def messe_us(funktion, wiederholungen):
+    start = time.perf_counter()
+    for _ in range(wiederholungen):
+        funktion()
+    return (time.perf_counter() - start) / wiederholungen * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des Metrik-Samplers.")
+    parser.add_argument("--punkte", type=int, default=1_000_000, help="Simulierte Messpunkte für die Speicherprüfung")
+    parser.add_argument("--wiederholungen", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    psutil.cpu_percent(interval=1)
+    psutil.virtual_memory()
+    bisher_ms = (time.perf_counter() - start) * 1000
+
+    sampler = MetrikSampler()
+    sampler.messe()
+    messung_us = messe_us(sampler.messe, min(args.wiederholungen, 200))
+    aktuell_us = messe_us(sampler.aktuell, args.wiederholungen)
+
+    # Ringpuffer vollständig füllen und den Speicherbedarf über sehr viele weitere Punkte beobachten
+    werte = dict.fromkeys(METRIKEN, 1.0)
+    tracemalloc.start()
+    speicher = []
+    for i in range(args.punkte):
+        sampler.fein.fuege_hinzu(float(i), werte)
+        if i % (args.punkte // 4) == 0:
+            speicher.append(tracemalloc.get_traced_memory()[0])
+    tracemalloc.stop()
+    verlauf_ms = messe_us(sampler.verlauf, 20) / 1000
+    verlauf_300_ms = messe_us(lambda: sampler.verlauf(max_punkte=300), 20) / 1000
+
+    print(f"Bisher pro Dashboard-Anfrage (cpu_percent(interval=1)): {bisher_ms:10.1f} ms")
+    print(f"Hintergrundmessung (alle {sampler.intervall_sekunden} s):          {messung_us:10.1f} µs")
+    print(f"Dashboard-Anfrage (letzter Messwert):              {aktuell_us:10.3f} µs")
+    print(f"Verlauf {sampler.fein.kapazitaet} Punkte x {len(METRIKEN)} Metriken:             {verlauf_ms:10.2f} ms")
+    print(f"Verlauf ausgedünnt auf 300 Punkte:                 {verlauf_300_ms:10.2f} ms")
+    print(f"Ringpuffer (fein + grob):                          {sampler.get_statistik()['puffer_bytes'] / 1024:10.1f} KiB")
+    print(f"Zusätzlicher Speicher nach 0/25/50/75 % von {args.punkte} Punkten: {', '.join(f'{wert} B' for wert in speicher)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: Netzwerküberwachung (net_connections() pro Prozess vs. ein systemweiter Schnappschuss mit Diff).
+
+Öffnet eine konfigurierbare Anzahl TCP-Verbindungen über Loopback und startet optional zusätzliche
+Prozesse. Gemessen wird die Dauer eines Ticks für das bisherige Verfahren (psutil.net_connections()
+für jeden Prozess) und für NetzwerkManager.überwache_netzwerk_verbindungen (ein Aufruf von
+psutil.net_connections('inet') plus Diff), außerdem die Diff-Ereignisse nach dem Schließen eines Teils
+der Verbindungen.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.netzwerk_schnappschuss_benchmark [--verbindungen 5000] [--prozesse 200] [--ticks 3]
+"""
+import argparse
+import socket
+import subprocess
+import sys
+import time
+
+import psutil
+
+from netzwerk_manager import NetzwerkManager
+
+def bisheriger_tick():
+    anzahl = 0
+    for proc in psutil.process_iter(['pid', 'name']):
+        try:
+            anzahl += len(psutil.Process(proc.info['pid']).net_connections())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return anzahl
+
+def messe(funktion, ticks):
+    start = time.perf_counter()
+    for _ in range(ticks):
+        funktion()
+    return (time.perf_counter() - start) / ticks
+
+def oeffne_verbindungen(anzahl):
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1024)
+    sockets = [server]
+    for _ in range(anzahl):
+        client = socket.create_connection(server.getsockname())
+        verbunden, _ = server.accept()
+        sockets += [client, verbunden]
+    return sockets
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Netzwerküberwachung.")
+    parser.add_argument("--verbindungen", type=int, default=5000, help="TCP-Verbindungen über Loopback (je zwei Sockets)")
+    parser.add_argument("--prozesse", type=int, default=200, help="Zusätzliche schlafende Kindprozesse")
+    parser.add_argument("--ticks", type=int, default=3, help="Gemessene Ticks pro Verfahren")
+    args = parser.parse_args()
+
+    kinder = [subprocess.Popen(["sleep", "600"]) for _ in range(args.prozesse)] if args.prozesse and sys.platform != "win32" else []
+    sockets = oeffne_verbindungen(args.verbindungen)
+    try:
+        print(f"Prozesse: {len(psutil.pids())}, Sockets: {len(sockets)}")
+        print(f"Bisher (net_connections pro Prozess): {messe(bisheriger_tick, args.ticks) * 1000:9.1f} ms pro Tick")
+
+        manager = NetzwerkManager()
+        manager.überwache_netzwerk_verbindungen() # Erster Schnappschuss als Ausgangsbasis
+        print(f"Schnappschuss + Diff:                 {messe(manager.überwache_netzwerk_verbindungen, args.ticks) * 1000:9.1f} ms pro Tick")
+
+        schliessen = sockets[1:1 + len(sockets) // 10]
+        for sock in schliessen:
+            sock.close()
+        del sockets[1:1 + len(schliessen)]
+        time.sleep(0.1)
+        geoeffnet, geschlossen = manager.überwache_netzwerk_verbindungen()
+        print(f"Nach dem Schließen von {len(schliessen)} Sockets: {len(geoeffnet)} geöffnet, {len(geschlossen)} geschlossen "
+              f"(Verbindungen in TIME_WAIT bleiben bis zu ihrem Ablauf offen)")
+        print(f"Statistik: {manager.get_statistik()}")
+    finally:
+        for sock in sockets:
+            sock.close()
+        for kind in kinder:
+            kind.kill()
+        for kind in kinder:
+            kind.wait()
+
+if __name__ == "__main__":
+    main()
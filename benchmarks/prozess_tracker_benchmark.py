@@ -0,0 +1,67 @@
+"""
+Benchmark: Echtzeit-Prozessüberprüfung (vollständiger Durchlauf pro Tick vs. inkrementeller ProzessTracker).
+
+Startet optional zusätzliche schlafende Kindprozesse, um einen Host mit vielen Prozessen nachzubilden.
+Gemessen wird die CPU-Zeit pro Tick für das bisherige Verfahren (psutil.process_iter mit Name, Pfad
+und Kommandozeile plus net_connections() je Prozess) und für den ProzessTracker (/proc-Pfad und
+psutil-Fallback), jeweils im eingeschwungenen Zustand ohne neue Prozesse.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.prozess_tracker_benchmark [--prozesse 1000] [--ticks 5]
+"""
+import argparse
+import subprocess
+import sys
+import time
+
+import psutil
+
+from prozess_tracker import ProzessTracker
+
+def bisheriger_tick():
+    prozess_infos = []
+    for prozess in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']):
+        try:
+            prozess_info = prozess.info
+            prozess_info['connections'] = psutil.Process(prozess_info['pid']).net_connections()
+            prozess_infos.append(prozess_info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+    return prozess_infos
+
+def messe_cpu(funktion, ticks):
+    start = time.process_time()
+    for _ in range(ticks):
+        funktion()
+    return (time.process_time() - start) / ticks
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Echtzeit-Prozessüberprüfung.")
+    parser.add_argument("--prozesse", type=int, default=1000, help="Zusätzliche schlafende Kindprozesse")
+    parser.add_argument("--ticks", type=int, default=5, help="Gemessene Ticks pro Verfahren")
+    args = parser.parse_args()
+
+    kinder = [subprocess.Popen(["sleep", "600"]) for _ in range(args.prozesse)] if args.prozesse and sys.platform != "win32" else []
+    try:
+        print(f"Prozesse: {len(psutil.pids())}")
+        print(f"Bisher (process_iter + net_connections): {messe_cpu(bisheriger_tick, args.ticks) * 1000:8.1f} ms CPU pro Tick")
+
+        tracker = ProzessTracker()
+        start = time.process_time()
+        erster_tick = len(tracker.aktualisiere())
+        print(f"ProzessTracker ({tracker.get_statistik()['quelle']}), erster Tick:    {(time.process_time() - start) * 1000:8.1f} ms CPU ({erster_tick} neue Prozesse)")
+        print(f"ProzessTracker ({tracker.get_statistik()['quelle']}), weitere Ticks:  {messe_cpu(tracker.aktualisiere, args.ticks) * 1000:8.1f} ms CPU pro Tick")
+
+        if tracker.proc_aktiv:
+            tracker = ProzessTracker()
+            tracker.proc_aktiv = False
+            tracker.aktualisiere()
+            print(f"ProzessTracker (psutil), weitere Ticks:  {messe_cpu(tracker.aktualisiere, args.ticks) * 1000:8.1f} ms CPU pro Tick")
+    finally:
+        for kind in kinder:
+            kind.kill()
+        for kind in kinder:
+            kind.wait()
+
+if __name__ == "__main__":
+    main()
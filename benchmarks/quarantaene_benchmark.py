@@ -0,0 +1,152 @@
+"""
+Benchmark: Quarantäne-Speicher (inhaltsadressiert, SQLite-Metadatenindex) gegenüber der bisherigen flachen Quarantäne.
+
+Legt --anzahl Dateien an (--anteil-duplikate davon mit identischem Inhalt) und verschiebt sie in Stapeln
+von --stapel Dateien per quarantaenisiere_mehrere in den Speicher. Gemessen werden der Durchsatz beim
+Quarantänisieren und die Latenz von Liste (erste und tiefe Seite per Cursor), Suche (Pfadpräfix,
+Teilzeichenfolge, Regel, Hash), Statistik, Wiederherstellen und Löschen. Zum Vergleich: Auflisten der bisherigen
+flachen Quarantäne (os.scandir und stat aller <name>.quarantäne-Dateien).
+
+Zusätzlich wird eine große Datei (--gross-mb) auf drei Wegen quarantänisiert: kodiert (komprimiert und
+neutralisiert, erneutes Lesen), als Roh-Objekt per Hardlink (gleiches Dateisystem) und als Roh-Objekt per Kopie
+im Kernel mit Hash-Vergleich (Quelldatei in --fremdes-dateisystem, z.B. /dev/shm; ohne Angabe entfällt der Fall).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.quarantaene_benchmark [--anzahl 100000] [--stapel 1000] [--anteil-duplikate 0.5] [--wiederholungen 20]
+                                               [--gross-mb 256] [--fremdes-dateisystem /dev/shm]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from quarantaene_speicher import QuarantaeneSpeicher
+
+def miss(funktion, wiederholungen):
+    """Gibt den Median der Laufzeit in Millisekunden und das letzte Ergebnis zurück."""
+    zeiten = []
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        ergebnis = funktion()
+        zeiten.append((time.perf_counter() - start) * 1000)
+    return statistics.median(zeiten), ergebnis
+
+def erzeuge_dateien(verzeichnis, anzahl, start, anteil_duplikate):
+    """Legt Dateien in 100 Unterverzeichnissen an; Duplikate haben einen von 16 gemeinsamen Inhalten."""
+    pfade = []
+    for nummer in range(start, start + anzahl):
+        unterverzeichnis = os.path.join(verzeichnis, f"benutzer{nummer % 100:02d}", "Downloads")
+        os.makedirs(unterverzeichnis, exist_ok=True)
+        pfad = os.path.join(unterverzeichnis, f"datei{nummer}.exe")
+        inhalt = f"duplikat {nummer % 16}" if (nummer % 1000) < anteil_duplikate * 1000 else f"einzeln {nummer} " * 20
+        with open(pfad, "w") as datei:
+            datei.write(inhalt)
+        pfade.append(pfad)
+    return pfade
+
+def miss_grosse_datei(verzeichnis, quell_verzeichnis, groesse, name, **speicher_optionen):
+    """Quarantänisiert eine große Datei mit Hash und stat aus der "Prüfung"; gibt Sekunden und Übertragungsart zurück."""
+    speicher = QuarantaeneSpeicher(os.path.join(verzeichnis, f"quarantaene_{name}"), **speicher_optionen)
+    pfad = os.path.join(quell_verzeichnis, f"gross_{name}.exe")
+    block = os.urandom(1024 * 1024)
+    hasher = hashlib.sha256()
+    with open(pfad, "wb") as datei:
+        for _ in range(groesse // len(block)):
+            datei.write(block)
+            hasher.update(block)
+    beginn = time.perf_counter()
+    speicher.quarantaenisiere_mehrere([(pfad, "Regel gross", hasher.hexdigest(), os.stat(pfad))])
+    dauer = time.perf_counter() - beginn
+    art = [art for art, anzahl in speicher.uebertragungen.items() if anzahl][0]
+    speicher.schliesse()
+    return dauer, art
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des Quarantäne-Speichers.")
+    parser.add_argument("--anzahl", type=int, default=100_000, help="Anzahl quarantänisierter Dateien")
+    parser.add_argument("--stapel", type=int, default=1000, help="Dateien pro quarantaenisiere_mehrere-Aufruf")
+    parser.add_argument("--anteil-duplikate", type=float, default=0.5, help="Anteil der Dateien mit identischem Inhalt")
+    parser.add_argument("--wiederholungen", type=int, default=20, help="Wiederholungen je Abfrage (Median)")
+    parser.add_argument("--gross-mb", type=int, default=256, help="Größe der Datei für den Vergleich der Übertragungswege (0: aus)")
+    parser.add_argument("--fremdes-dateisystem", help="Verzeichnis auf einem anderen Dateisystem für die Kopie im Kernel")
+    args = parser.parse_args()
+
+    verzeichnis = tempfile.mkdtemp(prefix="quarantaene_benchmark_")
+    try:
+        quellen = os.path.join(verzeichnis, "quellen")
+        speicher = QuarantaeneSpeicher(os.path.join(verzeichnis, "quarantaene"))
+        erzeugen_sekunden = quarantaene_sekunden = 0.0
+        letzter_eintrag = None
+        for start in range(0, args.anzahl, args.stapel):
+            beginn = time.perf_counter()
+            pfade = erzeuge_dateien(quellen, min(args.stapel, args.anzahl - start), start, args.anteil_duplikate)
+            erzeugen_sekunden += time.perf_counter() - beginn
+            beginn = time.perf_counter()
+            ergebnisse = speicher.quarantaenisiere_mehrere([(pfad, f"Regel {nummer % 7}") for nummer, pfad in enumerate(pfade, start)])
+            quarantaene_sekunden += time.perf_counter() - beginn
+            letzter_eintrag = ergebnisse[-1]
+        statistik = speicher.get_statistik()
+        print(f"Quarantänisiert: {args.anzahl} Dateien in {quarantaene_sekunden:.1f} s ({args.anzahl / quarantaene_sekunden:.0f} Dateien/s, "
+              f"Stapel {args.stapel}; Anlegen der Quelldateien {erzeugen_sekunden:.1f} s)")
+        print(f"Speicher: {statistik['eintraege']} Einträge, {statistik['objekte']} Objekte, {statistik['bytes_original'] / 1e6:.1f} MB Original, "
+              f"{statistik['bytes_gespeichert'] / 1e6:.1f} MB gespeichert")
+
+        tiefer_cursor = speicher.liste(limit=args.anzahl // 2)["cursor"]
+        praefix = os.path.join(quellen, "benutzer42", "")
+        abfragen = [
+            ("liste (erste Seite, 100)", lambda: speicher.liste(limit=100)),
+            ("liste (Seite in der Mitte)", lambda: speicher.liste(limit=100, cursor=tiefer_cursor)),
+            ("suche pfad_praefix", lambda: speicher.liste(limit=100, pfad_praefix=praefix)),
+            ("suche pfad (Teilzeichenfolge)", lambda: speicher.liste(limit=100, pfad="datei4242")),
+            ("suche regel_name", lambda: speicher.liste(limit=100, regel_name="Regel 3")),
+            ("suche datei_hash", lambda: speicher.liste(limit=100, datei_hash=letzter_eintrag["datei_hash"])),
+            ("statistik", speicher.get_statistik),
+        ]
+        print(f"{'Vorgang':>32}{'Median [ms]':>14}{'Treffer':>10}")
+        for name, funktion in abfragen:
+            dauer, ergebnis = miss(funktion, args.wiederholungen)
+            treffer = len(ergebnis["eintraege"]) if "eintraege" in ergebnis and isinstance(ergebnis["eintraege"], list) else "-"
+            print(f"{name:>32}{dauer:>14.3f}{treffer:>10}")
+
+        eintraege = speicher.liste(limit=args.wiederholungen)["eintraege"]
+        beginn = time.perf_counter()
+        for eintrag in eintraege:
+            speicher.stelle_wieder_her(eintrag["id"])
+        print(f"{'wiederherstellen (pro Datei)':>32}{(time.perf_counter() - beginn) / len(eintraege) * 1000:>14.3f}")
+        ids = [eintrag["id"] for eintrag in speicher.liste(limit=1000)["eintraege"]]
+        beginn = time.perf_counter()
+        speicher.loesche(ids)
+        print(f"{'löschen (1000 Einträge)':>32}{(time.perf_counter() - beginn) * 1000:>14.3f}")
+        speicher.schliesse()
+
+        # Bisherige flache Quarantäne: Auflisten heißt alle Dateien des Ordners lesen
+        flach = os.path.join(verzeichnis, "flach")
+        os.makedirs(flach)
+        for nummer in range(args.anzahl):
+            with open(os.path.join(flach, f"datei{nummer}.exe.quarantäne"), "w") as datei:
+                datei.write("x")
+        dauer, anzahl = miss(lambda: len([(eintrag.name, eintrag.stat().st_mtime) for eintrag in os.scandir(flach)]), max(1, args.wiederholungen // 4))
+        print(f"{'flache Quarantäne auflisten':>32}{dauer:>14.3f}{anzahl:>10}")
+
+        if args.gross_mb:
+            groesse = args.gross_mb * 1024 * 1024
+            faelle = [("kodiert", verzeichnis, {}), ("roh", verzeichnis, {"roh_ab_bytes": 1})]
+            if args.fremdes_dateisystem:
+                fremd = tempfile.mkdtemp(prefix="quarantaene_benchmark_", dir=args.fremdes_dateisystem)
+                faelle.append(("roh_fremd", fremd, {"roh_ab_bytes": 1}))
+            print(f"{'Große Datei (' + str(args.gross_mb) + ' MB)':>32}{'Sekunden':>14}{'MB/s':>10}  Übertragung")
+            for name, quell_verzeichnis, optionen in faelle:
+                try:
+                    dauer, art = miss_grosse_datei(verzeichnis, quell_verzeichnis, groesse, name, **optionen)
+                finally:
+                    if quell_verzeichnis != verzeichnis:
+                        shutil.rmtree(quell_verzeichnis, ignore_errors=True)
+                print(f"{name:>32}{dauer:>14.3f}{args.gross_mb / dauer:>10.0f}  {art}")
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Micro-Benchmark: Kosten der Regelauswertung pro Objekt (Datei, Prozess, Verbindung).
+
+Vergleicht die bisherige lineare Auswertung (Schleife über alle Regeln, Muster bei jedem Aufruf
+kleinschreiben, Pfade bei jedem Aufruf mit os.path.expandvars erweitern) mit dem kompilierten
+Regelsatz aus regel_engine.py. Gemessen wird nur die Kandidatensuche, ohne Folgeanalysen.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.regel_engine_benchmark [--regeln 200] [--objekte 20000]
+"""
+import argparse
+import os
+import random
+import time
+
+from regel_engine import KompilierteRegeln
+
+ENDUNGEN = [".exe", ".dll", ".bat", ".ps1", ".vbs", ".js", ".msi", ".txt", ".pdf", ".jpg", ".docx", ".zip", ".py", ".log"]
+
+def erzeuge_regeln(anzahl, zufall):
+    """Erzeugt einen synthetischen Regelsatz mit `anzahl` Regeln pro Kategorie."""
+    dateiregeln, prozessregeln, netzwerkregeln = [], [], []
+    for i in range(anzahl):
+        dateiregeln.append({
+            "name": f"Dateiregel {i}",
+            "muster": zufall.sample(ENDUNGEN, 3) + [f".x{i:03d}"],
+            "pfade": [os.path.join(os.sep, "daten", f"ordner{i % 50}")] if i % 2 else [],
+            "aktiviert": True,
+            "aktion": "warnung",
+        })
+        prozessregeln.append({
+            "name": f"Prozessregel {i}",
+            "muster": [f"boese{i}.exe", f"tool_{i}"],
+            "aktiviert": True,
+            "aktion": "warnung",
+        })
+        netzwerkregeln.append({
+            "name": f"Netzwerkregel {i}",
+            "muster": [zufall.randrange(1024, 65536) for _ in range(3)],
+            "aktiviert": True,
+            "aktion": "warnung",
+        })
+    return {"dateien": {"regeln": dateiregeln}, "prozesse": {"regeln": prozessregeln}, "netzwerk": {"regeln": netzwerkregeln}}
+
+# --- Bisherige lineare Auswertung (entspricht der Logik vor der Kompilierung) ---
+def linear_datei(regeln, datei_pfad):
+    for regel in regeln.get("dateien", {}).get("regeln", []):
+        if regel.get("aktiviert"):
+            datei_name_lower = os.path.basename(datei_pfad).lower()
+            datei_pfad_lower = datei_pfad.lower()
+            pfad_liste = regel.get("pfade", [])
+            if pfad_liste and not any(os.path.expandvars(p).lower() in datei_pfad_lower for p in pfad_liste):
+                continue
+            if any(datei_name_lower.endswith(m.lower()) for m in regel.get("muster", [])):
+                return regel.get("name")
+    return None
+
+def linear_prozess(regeln, prozess_name):
+    for regel in regeln.get("prozesse", {}).get("regeln", []):
+        if regel.get("aktiviert"):
+            prozess_name_lower = prozess_name.lower()
+            if any(m.lower() in prozess_name_lower for m in regel.get("muster", [])):
+                return regel.get("name")
+    return None
+
+def linear_netzwerk(regeln, remote_port):
+    for regel in regeln.get("netzwerk", {}).get("regeln", []):
+        if regel.get("aktiviert") and remote_port in regel.get("muster", []):
+            return regel.get("name")
+    return None
+
+# --- Kompilierte Auswertung ---
+def kompiliert_datei(kompiliert, datei_pfad):
+    regel = next(kompiliert.finde_dateiregeln(datei_pfad), None)
+    return regel.name if regel else None
+
+def kompiliert_prozess(kompiliert, prozess_name):
+    treffer = kompiliert.finde_prozessregeln(prozess_name)
+    return treffer[0].name if treffer else None
+
+def kompiliert_netzwerk(kompiliert, remote_port):
+    treffer = kompiliert.finde_netzwerkregeln(remote_port)
+    return treffer[0].name if treffer else None
+
+def miss(funktion, regelsatz, objekte):
+    """Gibt die mittleren Kosten pro Objekt in Mikrosekunden zurück."""
+    start = time.perf_counter()
+    for objekt in objekte:
+        funktion(regelsatz, objekt)
+    return (time.perf_counter() - start) / len(objekte) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-Benchmark der Regelauswertung (linear vs. kompiliert).")
+    parser.add_argument("--regeln", type=int, default=200, help="Anzahl Regeln pro Kategorie")
+    parser.add_argument("--objekte", type=int, default=20000, help="Anzahl ausgewerteter Objekte pro Kategorie")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    zufall = random.Random(args.seed)
+    regeln = erzeuge_regeln(args.regeln, zufall)
+    start = time.perf_counter()
+    kompiliert = KompilierteRegeln(regeln)
+    kompilierzeit_ms = (time.perf_counter() - start) * 1000
+
+    dateien = [os.path.join(os.sep, "daten", f"ordner{zufall.randrange(100)}", f"datei{i}{zufall.choice(ENDUNGEN)}") for i in range(args.objekte)]
+    prozesse = [zufall.choice([f"boese{zufall.randrange(args.regeln * 2)}.exe", "svchost.exe", "python.exe", "explorer.exe"]) for _ in range(args.objekte)]
+    ports = [zufall.randrange(65536) for _ in range(args.objekte)]
+
+    print(f"Regeln pro Kategorie: {args.regeln}, Objekte pro Kategorie: {args.objekte}, Kompilierung: {kompilierzeit_ms:.1f} ms")
+    print(f"{'Kategorie':<12}{'linear [µs]':>14}{'kompiliert [µs]':>18}{'Faktor':>10}")
+    for kategorie, linear, schnell, objekte in (
+        ("Dateien", linear_datei, kompiliert_datei, dateien),
+        ("Prozesse", linear_prozess, kompiliert_prozess, prozesse),
+        ("Netzwerk", linear_netzwerk, kompiliert_netzwerk, ports),
+    ):
+        vorher = miss(linear, regeln, objekte)
+        nachher = miss(schnell, kompiliert, objekte)
+        print(f"{kategorie:<12}{vorher:>14.2f}{nachher:>18.2f}{vorher / nachher:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
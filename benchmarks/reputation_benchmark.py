@@ -0,0 +1,91 @@
+"""
+Benchmark: Datei-Reputationsprüfung (Batch-API, Single-Flight, persistenter LRU-Cache).
+
+Als Backend dient die simulierte Blockchain-Abfrage des BlockchainManager mit konfigurierbarer
+Latenz pro Round Trip. Verglichen werden Einzelabfragen (bisheriges Verhalten: ein Round Trip
+pro Datei), die Batch-API, asynchrone Anforderungen aus mehreren Threads mit doppelten Hashes
+sowie Cache-Treffer im Speicher und nach einem Neustart (SQLite).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.reputation_benchmark [--hashes 2000] [--latenz-ms 20] [--threads 8]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from blockchain_manager import BlockchainManager
+
+class BenchmarkKonfiguration:
+    """Minimaler Ersatz für KonfigurationManager (nur get_konfiguration)."""
+    def __init__(self, blockchain_konfig):
+        self.konfiguration = {"blockchain": blockchain_konfig}
+
+    def get_konfiguration(self):
+        return self.konfiguration
+
+def erzeuge_manager(cache_datei, latenz_ms):
+    return BlockchainManager(BenchmarkKonfiguration({
+        "aktiviert": True,
+        "threat_intelligence_aktiviert": True,
+        "reputation_cache_datei": cache_datei,
+        "reputation_latenz_ms": latenz_ms,
+    }))
+
+def messe(funktion):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): # "SIMULIERE ..."-Ausgaben unterdrücken
+        funktion()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Datei-Reputationsprüfung.")
+    parser.add_argument("--hashes", type=int, default=2000, help="Anzahl verschiedener Datei-Hashes")
+    parser.add_argument("--latenz-ms", type=float, default=20, help="Simulierte Latenz pro Backend-Round-Trip")
+    parser.add_argument("--threads", type=int, default=8, help="Threads für asynchrone Anforderungen")
+    parser.add_argument("--einzeln", type=int, default=100, help="Anzahl Hashes für die Messung der Einzelabfragen")
+    args = parser.parse_args()
+
+    verzeichnis = tempfile.mkdtemp(prefix="reputation_benchmark_")
+    try:
+        hashes = [os.urandom(32).hex() for _ in range(args.hashes)]
+
+        manager = erzeuge_manager(os.path.join(verzeichnis, "einzeln.db"), args.latenz_ms)
+        dauer = messe(lambda: [manager.pruefe_datei_reputation_blockchain(datei_hash) for datei_hash in hashes[:args.einzeln]])
+        print(f"Einzeln:    {args.einzeln} Hashes, {manager.reputation_abfragen} Round Trips, {dauer:.2f} s "
+              f"(hochgerechnet auf {args.hashes}: {dauer / args.einzeln * args.hashes:.1f} s)")
+
+        cache_datei = os.path.join(verzeichnis, "reputation_cache.db")
+        manager = erzeuge_manager(cache_datei, args.latenz_ms)
+        dauer = messe(lambda: manager.pruefe_datei_reputationen_blockchain(hashes))
+        print(f"Batch-API:  {args.hashes} Hashes, {manager.reputation_abfragen} Round Trips, {dauer:.2f} s")
+
+        # Jeder Thread fordert alle Hashes an (viele gleichzeitige Duplikate); Single-Flight teilt die Abfragen
+        manager = erzeuge_manager(os.path.join(verzeichnis, "async.db"), args.latenz_ms)
+        def anfordern():
+            futures = [manager.fordere_datei_reputation_an(datei_hash) for datei_hash in hashes]
+            for future in futures:
+                future.result()
+        def async_lauf():
+            threads = [threading.Thread(target=anfordern) for _ in range(args.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        dauer = messe(async_lauf)
+        print(f"Asynchron:  {args.threads} Threads x {args.hashes} Hashes, {manager.reputation_abfragen} Round Trips, {dauer:.2f} s")
+
+        manager = erzeuge_manager(cache_datei, args.latenz_ms)
+        dauer = messe(lambda: manager.pruefe_datei_reputationen_blockchain(hashes))
+        print(f"Neustart:   {args.hashes} Hashes aus SQLite, {manager.reputation_abfragen} Round Trips, {dauer * 1000:.1f} ms")
+        dauer = messe(lambda: [manager.pruefe_datei_reputation_blockchain(datei_hash) for datei_hash in hashes])
+        print(f"Speicher:   {dauer / args.hashes * 1e6:.1f} µs pro Einzelabfrage (Cache-Treffer)")
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Benchmark: vollständige Systemprüfung (SystemÜberprüfungsManager) über einen synthetischen Testkorpus.
+
+Erzeugt (bzw. verwendet) einen deterministischen Korpus (benchmarks/korpus.py) und führt für jedes
+Konfigurationsprofil eine kalte Prüfung (leerer Scan-Cache) und eine warme Prüfung (gefüllter Cache) aus.
+Jedes Profil läuft in einem eigenen Prozess mit eigenem Arbeitsverzeichnis (Scan-Cache, IOC-Index, Log).
+Gemessen werden Dateien/s, MB/s, p50/p99 der Latenz pro Datei (Beginn der Hash-Stufe bis Ende der
+Urteils-Stufe), gehashte Bytes, der Spitzen-RSS und die Zeit pro Stufe aus dem Scan-Bericht; die Erkennungen
+werden mit den platzierten Treffern verglichen. Analysen laufen offline: Blockchain und KI deaktiviert, Quarantäne und Warnungen ersetzt
+(Dateien werden nicht verschoben). Nur unter Linux/Unix (resource, fork).
+
+Eigene Profile: JSON-Datei {"profilname": {"systempruefung": {...}, ...}}, die Werte überschreiben die
+Standardkonfiguration. Mit --ausgabe werden die Ergebnisse als JSON gespeichert; --basis vergleicht mit
+einem gespeicherten Lauf und endet mit Exit-Code 1 bei Regressionen über --toleranz.
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.scan_benchmark [--korpus /tmp/scan_korpus] [--profile sequentiell,pipeline] [--konfiguration profile.json]
+                                        [--ausgabe lauf.json] [--basis basis.json] [--toleranz 0.1] [--tiefe 3] [--verzweigung 4] ...
+    python -m benchmarks.scan_benchmark --vergleiche basis.json lauf.json [--toleranz 0.1]
+"""
+import argparse
+import copy
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.korpus import erzeuge_korpus, parameter_argumente, parameter_aus_argumenten, regelsatz
+
+# Überschreibungen der Standardkonfiguration pro Profil
+STANDARD_PROFILE = {
+    "sequentiell": {"systempruefung": {"pipeline_aktiviert": False}},
+    "pipeline": {"systempruefung": {"pipeline_aktiviert": True, "hash_worker_modus": "threads"}},
+    "pipeline_prozesse": {"systempruefung": {"pipeline_aktiviert": True, "hash_worker_modus": "prozesse"}},
+    "ohne_cache": {"systempruefung": {"scan_cache_aktiviert": False}},
+    "ohne_checkpoint": {"systempruefung": {"pipeline_aktiviert": True, "scan_checkpoint_aktiviert": False}},
+    "checkpoint_haeufig": {"systempruefung": {"pipeline_aktiviert": True, "scan_checkpoint_intervall_sekunden": 0.2}},
+    "gedrosselt": {"systempruefung": {"pipeline_aktiviert": True, "scan_drosselung": {"aktiviert": True, "bytes_pro_sekunde": 20_000_000,
+                                                                                      "max_systemlast": 0, "max_io_wartezeit_prozent": 0}}},
+}
+# Kennzahl -> True, falls größere Werte besser sind
+KENNZAHLEN = {"dateien_pro_sekunde": True, "mb_pro_sekunde": True, "latenz_p50_ms": False, "latenz_p99_ms": False, "spitzen_rss_mib": False}
+
+class BenchmarkKonfiguration:
+    """Ersatz für KonfigurationManager: Standardkonfiguration mit Überschreibungen, ohne Konfigurationsdatei."""
+    def __init__(self, konfiguration):
+        self.konfiguration = konfiguration
+
+    def get_konfiguration(self):
+        return self.konfiguration
+
+    def lade_neu_falls_geaendert(self):
+        return False
+
+class BenchmarkQuarantaene:
+    """Ersatz für QuarantäneManager: zählt Quarantäne-Aufrufe, verschiebt aber keine Dateien (Korpus bleibt unverändert)."""
+    def __init__(self, quarantaene_pfad):
+        self.quarantaene_pfad = quarantaene_pfad
+        self.aufrufe = 0
+
+    def quarantäne_datei(self, datei_pfad, regel_name=None, **kwargs):
+        self.aufrufe += 1
+        return True
+
+    def warte_auf_transfers(self, timeout=None):
+        return True
+
+class BenchmarkWarnungen:
+    """Ersatz für WarnungsManager ohne Dialogfenster."""
+    def zeige_warnung(self, *args, **kwargs):
+        pass
+
+def ueberschreibe(ziel, werte):
+    """Überschreibt verschachtelte Konfigurationswerte (Dictionaries werden zusammengeführt)."""
+    for schluessel, wert in werte.items():
+        if isinstance(wert, dict) and isinstance(ziel.get(schluessel), dict):
+            ueberschreibe(ziel[schluessel], wert)
+        else:
+            ziel[schluessel] = wert
+    return ziel
+
+def erzeuge_konfiguration(standard, wurzel, regeln_datei, ueberschreibungen):
+    konfiguration = copy.deepcopy(standard)
+    ueberschreibe(konfiguration, {
+        "systempruefung": {"scan_verzeichnis": [wurzel], "system_verzeichnisse_ignoriert": [], "echtzeit_schutz": False,
+                           "echtzeit_dateischutz_aktiviert": False, "scan_cache_aktiviert": True},
+        "regeln": {"regelsatz_datei": regeln_datei},
+        "blockchain": {"aktiviert": False},
+        "ki": {"aktiviert": False, "modell_typ": "stub"},
+        "logging": {"log_level": "INFO"},
+    })
+    return ueberschreibe(konfiguration, copy.deepcopy(ueberschreibungen))
+
+def perzentil(werte, anteil):
+    if not werte:
+        return 0.0
+    return werte[min(len(werte) - 1, int(anteil * len(werte)))]
+
+def fuehre_profil_aus(name, ueberschreibungen, manifest, arbeitsverzeichnis, ergebnisse):
+    """Führt kalte und warme Prüfung eines Profils aus (läuft im Kindprozess) und legt die Kennzahlen in ergebnisse ab."""
+    os.chdir(arbeitsverzeichnis) # Relative Dateien (Scan-Cache, IOC-Index, KI-Cache) landen im Arbeitsverzeichnis
+    from config_rules_quarantine import KonfigurationManager, RegelManager
+    from logging_utils import beende_logging, initialisiere_logging
+    from system_pruefung_manager import BYTES_GEHASHT, SystemÜberprüfungsManager
+    from prozess_manager import ProzessManager
+    from netzwerk_manager import NetzwerkManager
+    from ki_analyse_manager import KIAnalyseManager
+    from quanten_analyse_manager import QuantenAnalyseManager
+    from blockchain_manager import BlockchainManager
+
+    regeln_datei = os.path.join(arbeitsverzeichnis, "regeln.json")
+    with open(regeln_datei, "w", encoding="utf-8") as datei:
+        json.dump(regelsatz(manifest["wurzel"]), datei, ensure_ascii=False, indent=2)
+    konfiguration = erzeuge_konfiguration(KonfigurationManager.STANDARD_KONFIGURATION, manifest["wurzel"], regeln_datei, ueberschreibungen)
+    log_konfig = konfiguration["logging"]
+    initialisiere_logging(log_konfig["log_level"], os.path.join(arbeitsverzeichnis, "virenschutz.log"), log_format=log_konfig.get("log_format", "jsonl"),
+                          asynchron=log_konfig.get("log_asynchron", True), warteschlange_max=log_konfig.get("log_warteschlange_max", 100000),
+                          drosselung=log_konfig.get("log_drosselung", {}))
+    konfig_manager = BenchmarkKonfiguration(konfiguration)
+    quarantaene = BenchmarkQuarantaene(os.path.join(arbeitsverzeichnis, "quarantaene"))
+    manager = SystemÜberprüfungsManager(konfig_manager, RegelManager(konfig_manager), quarantaene, ProzessManager(), NetzwerkManager(), BenchmarkWarnungen(),
+                                        KIAnalyseManager(konfig_manager), QuantenAnalyseManager(konfig_manager), BlockchainManager(konfig_manager))
+
+    # Latenz pro Datei: Beginn der Hash-Stufe bis Ende der Urteils-Stufe (inkl. Wartezeit in der Pipeline)
+    startzeiten = {}
+    latenzen = []
+    hash_stufe = manager._hash_stufe
+    urteils_stufe = manager._urteils_stufe
+    def gemessene_hash_stufe(datei_pfad, *args, **kwargs):
+        startzeiten[datei_pfad] = time.perf_counter()
+        return hash_stufe(datei_pfad, *args, **kwargs)
+    def gemessene_urteils_stufe(datei_pfad, *args, **kwargs):
+        urteils_stufe(datei_pfad, *args, **kwargs)
+        start = startzeiten.pop(datei_pfad, None)
+        if start is not None:
+            latenzen.append(time.perf_counter() - start)
+    manager._hash_stufe = gemessene_hash_stufe
+    manager._urteils_stufe = gemessene_urteils_stufe
+
+    ignorierte_endungen = tuple(endung.lower() for endung in konfiguration["systempruefung"].get("dateiendungen_ignoriert") or ())
+    erwartet = sum(1 for pfad in manifest["treffer"] if not pfad.lower().endswith(ignorierte_endungen))
+    ergebnis = {"profil": name, "konfiguration": ueberschreibungen}
+    try:
+        for lauf in ("kalt", "warm"):
+            latenzen.clear()
+            quarantaene.aufrufe = 0
+            bytes_vorher = BYTES_GEHASHT.wert()
+            start = time.perf_counter()
+            dateien, bedrohungen, _ = manager.starte_systempruefung()
+            dauer = time.perf_counter() - start
+            latenzen.sort()
+            ergebnis[lauf] = {
+                "dauer_sekunden": round(dauer, 3),
+                "dateien": dateien,
+                "dateien_pro_sekunde": round(dateien / dauer, 1),
+                "mb_pro_sekunde": round(manifest["bytes"] / 1e6 / dauer, 2), # Logischer Durchsatz über den ganzen Korpus
+                "bytes_gehasht": BYTES_GEHASHT.wert() - bytes_vorher,
+                "latenz_p50_ms": round(perzentil(latenzen, 0.50) * 1000, 3),
+                "latenz_p99_ms": round(perzentil(latenzen, 0.99) * 1000, 3),
+                "spitzen_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+                "erkennungen": bedrohungen,
+                "erwartete_erkennungen": erwartet,
+                "quarantaene_aufrufe": quarantaene.aufrufe,
+                "korrekt": bedrohungen == erwartet,
+                "stufen": manager.letzter_scan_bericht.als_dict()["stufen"], # Wand- und CPU-Zeit pro Stufe aus dem Scan-Bericht
+            }
+    except Exception as e:
+        ergebnis["fehler"] = f"{type(e).__name__}: {e}"
+    finally:
+        beende_logging()
+        ergebnisse.put(ergebnis)
+
+def vergleiche(basis, lauf, toleranz):
+    """Vergleicht zwei gespeicherte Läufe. Gibt eine Liste von Regressionen (Texte) zurück und druckt die Tabelle."""
+    regressionen = []
+    print(f"{'Profil':<20}{'Lauf':<6}{'Kennzahl':<22}{'Basis':>12}{'Aktuell':>12}{'Änderung':>11}")
+    for profil, aktuell in lauf["profile"].items():
+        vorher = basis["profile"].get(profil)
+        if vorher is None:
+            continue
+        for art in ("kalt", "warm"):
+            if art not in aktuell or art not in vorher:
+                continue
+            if not aktuell[art].get("korrekt", True):
+                regressionen.append(f"{profil}/{art}: {aktuell[art]['erkennungen']} statt {aktuell[art]['erwartete_erkennungen']} Erkennungen")
+            for kennzahl, groesser_besser in KENNZAHLEN.items():
+                alt, neu = vorher[art].get(kennzahl), aktuell[art].get(kennzahl)
+                if not alt or neu is None:
+                    continue
+                aenderung = (neu - alt) / alt
+                schlechter = -aenderung if groesser_besser else aenderung
+                markierung = " REGRESSION" if schlechter > toleranz else ""
+                print(f"{profil:<20}{art:<6}{kennzahl:<22}{alt:>12}{neu:>12}{aenderung * 100:>+10.1f}%{markierung}")
+                if markierung:
+                    regressionen.append(f"{profil}/{art}: {kennzahl} {alt} -> {neu} ({aenderung * 100:+.1f}%)")
+    return regressionen
+
+def lade_lauf(pfad):
+    with open(pfad, "r", encoding="utf-8") as datei:
+        return json.load(datei)
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-End-Benchmark der Systemprüfung über einen synthetischen Korpus.")
+    parser.add_argument("--korpus", default=os.path.join(tempfile.gettempdir(), "scan_benchmark_korpus"), help="Verzeichnis des Testkorpus (wird wiederverwendet)")
+    parser.add_argument("--profile", default=",".join(STANDARD_PROFILE), help="Kommagetrennte Profilnamen")
+    parser.add_argument("--konfiguration", help="JSON-Datei mit eigenen Profilen {name: Überschreibungen}")
+    parser.add_argument("--ausgabe", help="Ergebnisse als JSON speichern")
+    parser.add_argument("--basis", help="Gespeicherter Lauf, mit dem verglichen wird")
+    parser.add_argument("--vergleiche", nargs=2, metavar=("BASIS", "LAUF"), help="Nur zwei gespeicherte Läufe vergleichen")
+    parser.add_argument("--toleranz", type=float, default=0.10, help="Erlaubte relative Verschlechterung je Kennzahl")
+    parameter_argumente(parser)
+    args = parser.parse_args()
+
+    if args.vergleiche:
+        regressionen = vergleiche(lade_lauf(args.vergleiche[0]), lade_lauf(args.vergleiche[1]), args.toleranz)
+        print("\n".join(["Regressionen:"] + regressionen) if regressionen else "Keine Regressionen.")
+        sys.exit(1 if regressionen else 0)
+
+    profile = dict(STANDARD_PROFILE)
+    if args.konfiguration:
+        profile.update(lade_lauf(args.konfiguration))
+        if "--profile" not in sys.argv:
+            args.profile = ",".join(lade_lauf(args.konfiguration))
+    start = time.perf_counter()
+    manifest = erzeuge_korpus(args.korpus, parameter_aus_argumenten(args))
+    print(f"Korpus: {manifest['dateien']} Dateien, {manifest['bytes'] / 2**20:.1f} MiB, {len(manifest['treffer'])} platzierte Treffer "
+          f"({time.perf_counter() - start:.1f} s) unter '{manifest['wurzel']}'.")
+
+    lauf = {"zeit": datetime.now().isoformat(timespec="seconds"), "plattform": {"python": platform.python_version(), "system": platform.platform(), "cpus": os.cpu_count()},
+            "korpus": {schluessel: manifest[schluessel] for schluessel in ("parameter", "dateien", "bytes")}, "profile": {}}
+    kontext = multiprocessing.get_context("fork")
+    print(f"{'Profil':<20}{'Lauf':<6}{'Dateien/s':>11}{'MB/s':>9}{'p50 [ms]':>10}{'p99 [ms]':>10}{'RSS [MiB]':>11}{'Erkennungen':>13}")
+    for name in args.profile.split(","):
+        if name not in profile:
+            parser.error(f"Unbekanntes Profil '{name}' (verfügbar: {', '.join(profile)})")
+        arbeitsverzeichnis = tempfile.mkdtemp(prefix=f"scan_benchmark_{name}_")
+        try:
+            ergebnisse = kontext.Queue()
+            prozess = kontext.Process(target=fuehre_profil_aus, args=(name, profile[name], manifest, arbeitsverzeichnis, ergebnisse))
+            prozess.start()
+            ergebnis = ergebnisse.get()
+            prozess.join()
+        finally:
+            shutil.rmtree(arbeitsverzeichnis, ignore_errors=True)
+        lauf["profile"][name] = ergebnis
+        if "fehler" in ergebnis:
+            print(f"{name:<20}Fehler: {ergebnis['fehler']}")
+            continue
+        for art in ("kalt", "warm"):
+            werte = ergebnis[art]
+            erkennungen = f"{werte['erkennungen']}/{werte['erwartete_erkennungen']}" + ("" if werte["korrekt"] else " !")
+            print(f"{name:<20}{art:<6}{werte['dateien_pro_sekunde']:>11.0f}{werte['mb_pro_sekunde']:>9.1f}{werte['latenz_p50_ms']:>10.3f}"
+                  f"{werte['latenz_p99_ms']:>10.3f}{werte['spitzen_rss_mib']:>11.1f}{erkennungen:>13}")
+
+    if args.ausgabe:
+        with open(args.ausgabe, "w", encoding="utf-8") as datei:
+            json.dump(lauf, datei, ensure_ascii=False, indent=2)
+        print(f"Ergebnisse gespeichert in '{args.ausgabe}'.")
+    fehlerhaft = [name for name, ergebnis in lauf["profile"].items()
+                  if "fehler" in ergebnis or not all(ergebnis[art]["korrekt"] for art in ("kalt", "warm"))]
+    regressionen = vergleiche(lade_lauf(args.basis), lauf, args.toleranz) if args.basis else []
+    if regressionen:
+        print("\n".join(["Regressionen:"] + regressionen))
+    if fehlerhaft:
+        print(f"Fehlerhafte Profile (Fehler oder Erkennungen weichen von den platzierten Treffern ab): {', '.join(fehlerhaft)}")
+    sys.exit(1 if regressionen or fehlerhaft else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: Durchsatz der Inhaltsprüfung (SHA-256 + Byte-Signaturen) in GB/s.
+
+Erzeugt einen synthetischen Korpus aus Zufallsdateien, in die ein Teil der Signaturen eingestreut
+wird, und misst (bei warmem Seitencache):
+    - nur SHA-256 (bisheriger Lesepfad wie berechne_datei_hash_roh in system_pruefung_manager.py)
+    - SHA-256 + Signatursuche über mmap
+    - SHA-256 + Signatursuche über den wiederverwendeten Lesepuffer
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.signatur_engine_benchmark [--groesse-mb 256] [--dateien 64] [--signaturen 1,10,50]
+
+Die Kosten der Signatursuche wachsen mit der Anzahl unterschiedlicher Anker (ein bytes.find je Anker
+und Block); daher wird der Durchsatz für mehrere Signaturanzahlen ausgegeben.
+"""
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import signatur_engine
+from signatur_engine import SignaturSatz
+
+def nur_hash(datei_pfad):
+    """Referenz: reines SHA-256 mit 1-MiB-Blöcken, ohne Signatursuche."""
+    hasher = hashlib.sha256()
+    with open(datei_pfad, "rb") as datei:
+        while block := datei.read(signatur_engine.LESE_BLOCK_GROESSE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+def erzeuge_signaturen(anzahl, zufall):
+    """Erzeugt Hex-Signaturen mit Platzhaltern und Sprüngen."""
+    signaturen = []
+    for i in range(anzahl):
+        teil_a = bytes(zufall.getrandbits(8) for _ in range(6)).hex(" ")
+        teil_b = bytes(zufall.getrandbits(8) for _ in range(4)).hex(" ")
+        signaturen.append((f"Benchmark.Signatur.{i}", f"{teil_a} ?? {{0-8}} {teil_b}"))
+    return signaturen
+
+def erzeuge_korpus(verzeichnis, gesamt_bytes, anzahl_dateien, signaturen, zufall):
+    """Schreibt Zufallsdateien; in jede zweite Datei wird eine zufällige Signatur eingebettet."""
+    datei_groesse = max(1, gesamt_bytes // anzahl_dateien)
+    pfade = []
+    for i in range(anzahl_dateien):
+        daten = bytearray(os.urandom(datei_groesse))
+        if i % 2 == 0 and datei_groesse > 64:
+            _, muster = zufall.choice(signaturen)
+            eingebettet = bytes.fromhex(muster.replace("??", "00").replace("{0-8}", ""))
+            position = zufall.randrange(datei_groesse - len(eingebettet))
+            daten[position:position + len(eingebettet)] = eingebettet
+        pfad = os.path.join(verzeichnis, f"datei_{i:04d}.bin")
+        with open(pfad, "wb") as datei:
+            datei.write(daten)
+        pfade.append(pfad)
+    return pfade
+
+def miss(bezeichnung, funktion, pfade, gesamt_bytes):
+    start = time.perf_counter()
+    treffer = 0
+    for pfad in pfade:
+        ergebnis = funktion(pfad)
+        if isinstance(ergebnis, tuple) and ergebnis[1]:
+            treffer += 1
+    dauer = time.perf_counter() - start
+    print(f"{bezeichnung:<32}{gesamt_bytes / dauer / 1e9:>10.2f} GB/s{treffer:>10} Dateien mit Treffern")
+
+def main():
+    parser = argparse.ArgumentParser(description="Durchsatz der Signatur-Engine in GB/s.")
+    parser.add_argument("--groesse-mb", type=int, default=256, help="Gesamtgröße des Korpus in MiB")
+    parser.add_argument("--dateien", type=int, default=64, help="Anzahl Dateien im Korpus")
+    parser.add_argument("--signaturen", default="1,10,50", help="Kommagetrennte Liste von Signaturanzahlen")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    zufall = random.Random(args.seed)
+    anzahlen = [int(anzahl) for anzahl in args.signaturen.split(",")]
+    signaturen = erzeuge_signaturen(max(anzahlen), zufall)
+    verzeichnis = tempfile.mkdtemp(prefix="signatur_benchmark_")
+    try:
+        gesamt_bytes = args.groesse_mb * 1024 * 1024
+        pfade = erzeuge_korpus(verzeichnis, gesamt_bytes, args.dateien, signaturen, zufall)
+        gesamt_bytes = sum(os.path.getsize(pfad) for pfad in pfade)
+        print(f"Korpus: {len(pfade)} Dateien, {gesamt_bytes / 1e9:.2f} GB")
+        for pfad in pfade: # Seitencache aufwärmen
+            nur_hash(pfad)
+
+        miss("SHA-256", nur_hash, pfade, gesamt_bytes)
+        mmap_mindestgroesse = signatur_engine.MMAP_MINDESTGROESSE
+        try:
+            for anzahl in anzahlen:
+                satz = SignaturSatz(signaturen[:anzahl])
+                print(f"--- {len(satz)} Signaturen ({len(satz.anker_tabelle)} Anker)")
+                signatur_engine.MMAP_MINDESTGROESSE = 0
+                miss("SHA-256 + Signaturen (mmap)", satz.hashe_und_scanne, pfade, gesamt_bytes)
+                signatur_engine.MMAP_MINDESTGROESSE = float("inf")
+                miss("SHA-256 + Signaturen (Puffer)", satz.hashe_und_scanne, pfade, gesamt_bytes)
+        finally:
+            signatur_engine.MMAP_MINDESTGROESSE = mmap_mindestgroesse
+    finally:
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
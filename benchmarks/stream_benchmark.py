@@ -0,0 +1,143 @@
+"""
+Benchmark: Server-CPU der Web-UI mit Server-Sent Events (/api/stream) gegenüber periodischem Neuladen.
+
+Startet die Web-UI (WebUIManager mit Ersatz-Managern) auf einem freien Port, erzeugt laufend Log-Einträge
+und Erkennungen und misst für 0, 1 und viele Clients die CPU-Zeit des Server-Prozesses (getrusage):
+einmal mit offenen Stream-Verbindungen, einmal mit Clients, die wie bisher alle aktualisierungs_intervall
+Sekunden Dashboard und Log-Seite neu laden. Die Clients laufen in einem eigenen Prozess und zählen nicht mit.
+Nur unter Linux/Unix (resource, fork).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.stream_benchmark [--clients 1,50] [--dauer 10] [--ereignisse-pro-sekunde 5]
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import selectors
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from werkzeug.serving import make_server
+
+from ereignis_bus import hole_ereignis_bus, veroeffentliche_ereignis_global
+from logging_utils import beende_logging, initialisiere_logging, protokolliere_ereignis_global
+from web_ui_manager import WebUIManager
+
+class BenchmarkKonfiguration:
+    """Minimaler Ersatz für KonfigurationManager (nur get_konfiguration)."""
+    def __init__(self, web_ui_konfig, log_datei):
+        self.konfiguration = {"web_ui": web_ui_konfig, "logging": {"log_datei": log_datei}, "virenschutz": {"version": "benchmark"}}
+
+    def get_konfiguration(self):
+        return self.konfiguration
+
+def cpu_sekunden():
+    nutzung = resource.getrusage(resource.RUSAGE_SELF)
+    return nutzung.ru_utime + nutzung.ru_stime
+
+def stream_clients(port, anzahl, dauer, ergebnisse):
+    """Öffnet anzahl Stream-Verbindungen und liest bis zum Ende der Messdauer (läuft im Client-Prozess)."""
+    auswahl = selectors.DefaultSelector()
+    for _ in range(anzahl):
+        verbindung = socket.create_connection(("127.0.0.1", port))
+        verbindung.sendall(b"GET /api/stream HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n")
+        verbindung.setblocking(False)
+        auswahl.register(verbindung, selectors.EVENT_READ)
+    empfangen_bytes = ereignisse = 0
+    ende = time.monotonic() + dauer
+    while time.monotonic() < ende:
+        for schluessel, _ in auswahl.select(timeout=max(0.0, ende - time.monotonic())):
+            daten = schluessel.fileobj.recv(65536)
+            empfangen_bytes += len(daten)
+            ereignisse += daten.count(b"\nevent: ")
+    for schluessel in list(auswahl.get_map().values()):
+        schluessel.fileobj.close()
+    ergebnisse.put({"bytes": empfangen_bytes, "ereignisse": ereignisse, "anfragen": anzahl})
+
+def abfrage_clients(port, anzahl, dauer, intervall, ergebnisse):
+    """Lädt wie das bisherige setInterval(location.reload) pro Client alle intervall Sekunden "/" und "/logs" neu."""
+    empfangen_bytes = anfragen = 0
+    ende = time.monotonic() + dauer
+    naechste = [time.monotonic() + intervall * i / anzahl for i in range(anzahl)] # Clients über das Intervall verteilt
+    while time.monotonic() < ende:
+        client = min(range(anzahl), key=naechste.__getitem__)
+        time.sleep(max(0.0, naechste[client] - time.monotonic()))
+        for pfad in ("/", "/logs"):
+            with socket.create_connection(("127.0.0.1", port)) as verbindung:
+                verbindung.sendall(f"GET {pfad} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n".encode())
+                while daten := verbindung.recv(65536):
+                    empfangen_bytes += len(daten)
+            anfragen += 1
+        naechste[client] += intervall
+    ergebnisse.put({"bytes": empfangen_bytes, "ereignisse": 0, "anfragen": anfragen})
+
+def erzeuge_ereignisse(stopp, pro_sekunde):
+    """Schreibt Log-Einträge und veröffentlicht Erkennungen wie ein laufender Scan."""
+    nummer = 0
+    while not stopp.wait(1 / pro_sekunde):
+        nummer += 1
+        protokolliere_ereignis_global("warnung", "Benchmark-Warnung {nummer}", nummer=nummer)
+        veroeffentliche_ereignis_global("erkennung", {"quelle": "datei", "datei_pfad": f"/daten/datei{nummer}.exe", "regel_name": "Benchmark", "zeit": time.time()})
+
+def messe(port, modus, anzahl, dauer, intervall):
+    """Gibt (CPU-Sekunden des Servers, Client-Ergebnis) für einen Messdurchlauf zurück."""
+    kontext = multiprocessing.get_context("fork")
+    ergebnisse = kontext.Queue()
+    if modus == "stream":
+        prozess = kontext.Process(target=stream_clients, args=(port, anzahl, dauer, ergebnisse))
+    else:
+        prozess = kontext.Process(target=abfrage_clients, args=(port, anzahl, dauer, intervall, ergebnisse))
+    start = cpu_sekunden()
+    prozess.start()
+    ergebnis = ergebnisse.get()
+    cpu = cpu_sekunden() - start
+    prozess.join()
+    time.sleep(1) # Getrennte Stream-Verbindungen abbauen lassen
+    return cpu, ergebnis
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des Server-Sent-Events-Streams der Web-UI.")
+    parser.add_argument("--clients", default="1,50", help="Kommagetrennte Anzahlen gleichzeitiger Clients")
+    parser.add_argument("--dauer", type=float, default=10, help="Messdauer pro Durchlauf in Sekunden")
+    parser.add_argument("--ereignisse-pro-sekunde", type=float, default=5, help="Log-Einträge und Erkennungen pro Sekunde")
+    parser.add_argument("--intervall", type=float, default=5, help="Bisheriges Neulade-Intervall (aktualisierungs_intervall) in Sekunden")
+    args = parser.parse_args()
+
+    verzeichnis = tempfile.mkdtemp(prefix="stream_benchmark_")
+    log_datei = os.path.join(verzeichnis, "virenschutz.log")
+    initialisiere_logging("INFO", log_datei)
+    konfiguration = BenchmarkKonfiguration({"aktualisierungs_intervall": args.intervall, "stream_intervall_sekunden": 1}, log_datei)
+    web_ui = WebUIManager(konfiguration, SimpleNamespace(echtzeit_schutz_aktiv=True, letzte_pruefung_zeit_str="-", anzahl_bedrohungen_letzte_pruefung=0), None, None,
+                          SimpleNamespace(blockchain_aktiviert=False), SimpleNamespace(ki_aktiviert=False, get_statistik=dict))
+    stopp = threading.Event()
+    try:
+        web_ui.metrik_sampler.starte()
+        threading.Thread(target=web_ui._stream_quelle_schleife, name="StreamQuelle", daemon=True).start()
+        server = make_server("127.0.0.1", 0, web_ui.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        threading.Thread(target=erzeuge_ereignisse, args=(stopp, args.ereignisse_pro_sekunde), daemon=True).start()
+        time.sleep(1)
+
+        print(f"{'Modus':>10}{'Clients':>9}{'Server-CPU [ms/s]':>19}{'Anfragen':>10}{'Ereignisse/Client':>19}{'KiB/Client':>12}")
+        leerlauf_cpu, _ = messe(server.port, "stream", 0, args.dauer, args.intervall)
+        print(f"{'leerlauf':>10}{0:>9}{leerlauf_cpu / args.dauer * 1000:>19.1f}")
+        for modus in ("stream", "abfrage"):
+            for anzahl in (int(wert) for wert in args.clients.split(",")):
+                cpu, ergebnis = messe(server.port, modus, anzahl, args.dauer, args.intervall)
+                print(f"{modus:>10}{anzahl:>9}{cpu / args.dauer * 1000:>19.1f}{ergebnis['anfragen']:>10}"
+                      f"{ergebnis['ereignisse'] / anzahl:>19.1f}{ergebnis['bytes'] / anzahl / 1024:>12.1f}")
+        print(f"Ereignisbus: {hole_ereignis_bus().get_statistik()}")
+        server.shutdown()
+    finally:
+        stopp.set()
+        web_ui.metrik_sampler.stoppe()
+        beende_logging()
+        shutil.rmtree(verzeichnis, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: Kosten der Metrik-Erfassung im Hot Path (telemetrie.py) und des Abrufs von /metrics.
+
+Misst pro Aufruf die Kosten von Zaehler.erhoehe und Histogramm.beobachte mit 1 und mehreren Threads
+gegenüber einer Variante mit gemeinsamer Sperre (threading.Lock um ein Dictionary), sowie die Dauer
+der Ausgabe im Prometheus-Textformat bei vielen Label-Werten (z.B. Erkennungen pro Regel).
+
+Aufruf (im Projektverzeichnis):
+    python -m benchmarks.telemetrie_benchmark [--aufrufe 200000] [--threads 1,4,8] [--regeln 1000]
+"""
+import argparse
+import bisect
+import threading
+import time
+
+from telemetrie import LATENZ_GRENZEN, TelemetrieRegister
+
+class GesperrterZaehler:
+    """Vergleichsvariante: ein Dictionary hinter einer gemeinsamen Sperre."""
+    def __init__(self):
+        self.werte = {}
+        self.sperre = threading.Lock()
+
+    def erhoehe(self, wert=1, label_werte=()):
+        with self.sperre:
+            self.werte[label_werte] = self.werte.get(label_werte, 0) + wert
+
+class GesperrtesHistogramm:
+    """Vergleichsvariante: Bucket-Zähler hinter einer gemeinsamen Sperre."""
+    def __init__(self, grenzen=LATENZ_GRENZEN):
+        self.grenzen = grenzen
+        self.verteilung = [0] * (len(grenzen) + 1) + [0.0, 0]
+        self.sperre = threading.Lock()
+
+    def beobachte(self, wert, label_werte=()):
+        with self.sperre:
+            self.verteilung[bisect.bisect_left(self.grenzen, wert)] += 1
+            self.verteilung[-2] += wert
+            self.verteilung[-1] += 1
+
+def messe_ns(funktion, aufrufe, threads):
+    """Gibt die Wandzeit pro Aufruf in Nanosekunden zurück (aufrufe pro Thread, alle Threads gleichzeitig)."""
+    start_signal = threading.Barrier(threads + 1)
+    def arbeite():
+        start_signal.wait()
+        for i in range(aufrufe):
+            funktion(i)
+    arbeiter = [threading.Thread(target=arbeite) for _ in range(threads)]
+    for thread in arbeiter:
+        thread.start()
+    start_signal.wait()
+    start = time.perf_counter()
+    for thread in arbeiter:
+        thread.join()
+    return (time.perf_counter() - start) / (aufrufe * threads) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Metrik-Erfassung.")
+    parser.add_argument("--aufrufe", type=int, default=200_000, help="Aufrufe pro Thread")
+    parser.add_argument("--threads", default="1,4,8", help="Kommagetrennte Thread-Anzahlen")
+    parser.add_argument("--regeln", type=int, default=1000, help="Label-Werte für die Ausgabe (Erkennungen pro Regel)")
+    args = parser.parse_args()
+
+    print(f"{'Threads':>8}{'erhoehe [ns]':>14}{'mit Sperre [ns]':>17}{'beobachte [ns]':>16}{'mit Sperre [ns]':>17}")
+    for threads in (int(wert) for wert in args.threads.split(",")):
+        register = TelemetrieRegister()
+        zaehler = register.zaehler("benchmark_dateien_total", "Benchmark")
+        histogramm = register.histogramm("benchmark_dauer_sekunden", "Benchmark")
+        gesperrter_zaehler = GesperrterZaehler()
+        gesperrtes_histogramm = GesperrtesHistogramm()
+        erhoehe_ns = messe_ns(lambda i: zaehler.erhoehe(), args.aufrufe, threads)
+        gesperrt_erhoehe_ns = messe_ns(lambda i: gesperrter_zaehler.erhoehe(), args.aufrufe, threads)
+        beobachte_ns = messe_ns(lambda i: histogramm.beobachte((i % 1000) * 1e-5), args.aufrufe, threads)
+        gesperrt_beobachte_ns = messe_ns(lambda i: gesperrtes_histogramm.beobachte((i % 1000) * 1e-5), args.aufrufe, threads)
+        assert zaehler.wert() == args.aufrufe * threads and histogramm.zusammenfassung()["anzahl"] == args.aufrufe * threads
+        print(f"{threads:>8}{erhoehe_ns:>14.0f}{gesperrt_erhoehe_ns:>17.0f}{beobachte_ns:>16.0f}{gesperrt_beobachte_ns:>17.0f}")
+
+    register = TelemetrieRegister()
+    erkennungen = register.zaehler("benchmark_erkennungen_total", "Benchmark", ("quelle", "regel"))
+    latenz = register.histogramm("benchmark_regel_dauer_sekunden", "Benchmark", ("ziel",))
+    for nummer in range(args.regeln):
+        erkennungen.erhoehe(1, ("datei", f"Regel {nummer}"))
+    for ziel in ("datei", "prozess", "netzwerk"):
+        latenz.beobachte(0.001, (ziel,))
+    start = time.perf_counter()
+    text = register.als_text()
+    ausgabe_ms = (time.perf_counter() - start) * 1000
+    print(f"Ausgabe /metrics ({args.regeln} Regeln, {len(text.splitlines())} Zeilen, {len(text) // 1024} KiB): {ausgabe_ms:.2f} ms")
+
+if __name__ == "__main__":
+    main()
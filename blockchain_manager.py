@@ -1,13 +1,23 @@
 import hashlib
+import queue
 import threading
 import time
+from concurrent.futures import Future
 from datetime import datetime
 from dataclasses import dataclass, field
 # Importiere die globale Protokollierungsfunktion aus logging_utils.py
 from logging_utils import protokolliere_ereignis_global
+from reputations_cache import ReputationsCache # Persistenter LRU-Cache für Datei-Reputationen
+from merkle_anker import MerkleLogAnker # Gebündelte Verankerung von Log-Hashes über Merkle-Wurzeln
+from telemetrie import hole_telemetrie # Latenz-Histogramme für /metrics
 # Importiere web3.py (auskommentiert für Platzhalter-Demo, für echte Integration aktivieren)
 # from web3 import Web3
 
+REPUTATION_ABFRAGE_DAUER = hole_telemetrie().histogramm("virenschutz_reputation_abfrage_dauer_sekunden", "Dauer einer (gebündelten) Reputationsabfrage beim Backend.")
+_REPUTATION_ENDE = object() # Weckt den Reputations-Batch-Thread nach gesetztem Stopp-Event
+
+REPUTATION_HASHES = hole_telemetrie().zaehler("virenschutz_reputation_hashes_total", "Beim Backend angefragte Datei-Hashes (ohne Cache-Treffer).")
+
 @dataclass
 class ThreatIntelligenceDaten:
     """Datenklasse für Threat Intelligence Informationen."""
@@ -17,6 +27,10 @@ class ThreatIntelligenceDaten:
     vertrauenswürdigkeit: int = 50 # Vertrauenswürdigkeit der Quelle (0-100%)
     zusätzliche_infos: str = ""
 
+    def berechne_version(self):
+        """Berechnet einen Fingerabdruck der Indikatoren (unabhängig von deren Reihenfolge)."""
+        return hashlib.sha256("\n".join(sorted(str(indikator) for indikator in self.indikatoren)).encode('utf-8')).hexdigest()
+
 @dataclass
 class DateiReputationsDaten:
     """Datenklasse für Datei-Reputationsinformationen."""
@@ -43,13 +57,38 @@ class BlockchainManager:
         self.smart_contract_adresse = self.blockchain_konfig.get("smart_contract_adresse", "")
         self.blockchain_verbindung = None # Web3 Instanz oder ähnliches
         self.lokaler_threat_intelligence_cache = {}
-        self.lokaler_datei_reputation_cache = {}
-        self.lokale_log_hash_datenbank = []
+        self.reputations_cache = ReputationsCache(self.blockchain_konfig.get("reputation_cache_datei", "reputation_cache.db"),
+                                                  self.blockchain_konfig.get("reputation_cache_max_eintraege", 100000),
+                                                  self.blockchain_konfig.get("reputation_ttl_sekunden", 3600),
+                                                  self.blockchain_konfig.get("reputation_negativ_ttl_sekunden", 600))
+        self.reputation_batch_groesse = max(1, int(self.blockchain_konfig.get("reputation_batch_groesse", 256)))
+        self.reputation_batch_wartezeit_sekunden = self.blockchain_konfig.get("reputation_batch_wartezeit_ms", 50) / 1000
+        self.reputation_latenz_sekunden = self.blockchain_konfig.get("reputation_latenz_ms", 1000) / 1000 # Simulierte Dauer einer Abfrage (Round Trip)
+        self.ausstehende_reputationen = {} # Datei-Hash -> Future (gleiche Hashes teilen sich eine Abfrage)
+        self.reputation_sperre = threading.Lock()
+        self.reputation_warteschlange = queue.Queue()
+        self.reputation_thread = None
+        self.reputation_stopp = threading.Event() # Gesetzt von beende(): keine neuen Anforderungen, Batch-Thread endet
+        self.reputation_abfragen = 0 # Anzahl Round Trips zum Backend
+        self.log_anker_latenz_sekunden = self.blockchain_konfig.get("log_anker_latenz_ms", 500) / 1000 # Simulierte Transaktionszeit
+        # Log-Hashes mit Inklusionsbeweisen in einer Append-only-Datei statt einer Liste im Speicher
+        self.log_anker = MerkleLogAnker(self.blockchain_konfig.get("log_beweis_datei", "log_merkle_beweise.jsonl"),
+                                        self._verankere_merkle_wurzel,
+                                        self.blockchain_konfig.get("log_batch_groesse", 16384),
+                                        self.blockchain_konfig.get("log_batch_wartezeit_sekunden", 5),
+                                        self.blockchain_konfig.get("log_warteschlange_max", 100000))
 
         if self.blockchain_aktiviert:
             self.initialisiere_blockchain_verbindung()
         else:
             protokolliere_ereignis_global("info", "Blockchain-Integration ist DEAKTIVIERT gemäß Konfiguration.")
+        # Hintergrund-Threads schon hier starten: später erzeugt, erbten sie unter Linux die gesenkte Priorität des Scan-Threads,
+        # der die erste Anforderung stellt (ScanDrosselung.senke_prioritaet), und bedienten danach auch den Echtzeitschutz gedrosselt
+        if self._reputation_aktiv():
+            with self.reputation_sperre:
+                self._starte_reputation_thread()
+        if self.blockchain_aktiviert and self.log_registrierung_aktiviert:
+            self.log_anker.starte()
 
     def initialisiere_blockchain_verbindung(self):
         """Initialisiert die Verbindung zum Blockchain-Netzwerk (aktuell Platzhalter)."""
@@ -83,45 +122,30 @@ class BlockchainManager:
             protokolliere_ereignis_global("warnung", "Versuch, leere Log-Meldung in Blockchain zu registrieren. Abgebrochen.")
             return False
 
-        def _registriere_log_hash_thread(meldung):
-            try:
-                protokolliere_ereignis_global("debug", f"BlockchainManager (Thread): Registriere Log-Hash in Blockchain für Meldung: '{meldung}' (Simuliere Erfolg).")
-                log_hash = hashlib.sha256(meldung.encode('utf-8')).hexdigest()
-                protokolliere_ereignis_global("debug", f"BlockchainManager (Thread): Log-Meldungs-Hash: {log_hash}")
-
-                # --- ECHTE BLOCKCHAIN INTERAKTION (Beispiel - auskommentiert) ---
-                # if self.blockchain_verbindung:
-                #     try:
-                #         # Beispiel: Einfache Transaktion (ggf. Smart Contract Interaktion hier)
-                #         transaktion_hash_blockchain = self._sende_transaktion(log_hash) # Interne Methode für Transaktion
-                #         if transaktion_hash_blockchain:
-                #             protokolliere_ereignis_global("info", f"BlockchainManager (Thread): Log-Hash erfolgreich in Blockchain registriert. Transaktions-Hash: {transaktion_hash_blockchain}")
-                #         else:
-                #             protokolliere_ereignis_global("warnung", f"BlockchainManager (Thread): Fehler beim Senden der Log-Hash-Registrierungs-Transaktion.")
-                #     except Exception as blockchain_fehler:
-                #         protokolliere_ereignis_global("fehler", f"BlockchainManager (Thread): Fehler bei der Blockchain-Interaktion (Log-Registrierung): {blockchain_fehler}", {"fehler": str(blockchain_fehler)})
-                # else:
-                #     protokolliere_ereignis_global("warnung", "Blockchain-Verbindung nicht initialisiert. Log-Hash NICHT in Blockchain registriert (simuliert).")
-
-                # --- SIMULIERTE BLOCKCHAIN INTERAKTION (Platzhalter) ---
-                print(f"SIMULIERE BLOCKCHAIN TRANSAKTION: Log-Hash Registrierung für Hash: {log_hash}") # Ausgabe für Demo
-                time.sleep(0.5) # Simuliere Transaktionszeit
-                transaktion_hash_simulation = "simuliert_" + log_hash # Simulierte TX-Hash
-                protokolliere_ereignis_global("info", f"BlockchainManager (Thread - SIMULIERT): Log-Hash erfolgreich registriert in Blockchain. Hash: {log_hash}, Simulierte TX-Hash: {transaktion_hash_simulation}")
-
-                self.lokale_log_hash_datenbank.append({"hash": log_hash, "zeitstempel": datetime.now().isoformat(), "meldung_vorschau": meldung[:50] + "...", "blockchain_tx_hash": transaktion_hash_simulation}) # TX-Hash speichern
-                protokolliere_ereignis_global("debug", f"BlockchainManager (Thread): Lokale Log-Hash Datenbank aktualisiert. Aktuelle Anzahl Einträge: {len(self.lokale_log_hash_datenbank)}")
+        # Nur einreihen: der Hintergrund-Thread des Log-Ankers bündelt die Hashes und verankert die Merkle-Wurzel
+        log_hash = self.log_anker.fuege_hinzu(log_meldung)
+        if log_hash is None:
+            protokolliere_ereignis_global("warnung", "Warteschlange für Log-Hash-Registrierung ist voll. Log-Hash wird NICHT in Blockchain registriert.")
+            return False
+        return True
 
-                return log_hash
+    def _verankere_merkle_wurzel(self, merkle_wurzel, anzahl):
+        """Registriert die Merkle-Wurzel eines Batches von Log-Hashes in der Blockchain. Gibt den Transaktions-Hash zurück."""
+        protokolliere_ereignis_global("debug", f"BlockchainManager: Registriere Merkle-Wurzel für {anzahl} Log-Hash(es) in Blockchain: {merkle_wurzel} (Simuliere Erfolg).")
 
-            except Exception as e:
-                protokolliere_ereignis_global("fehler", f"BlockchainManager (Thread): Fehler bei der Log-Hash-Registrierung in Blockchain: {e}", {"fehler": str(e)})
-                return None
+        # --- ECHTE BLOCKCHAIN INTERAKTION (Beispiel - auskommentiert) ---
+        # if self.blockchain_verbindung:
+        #     # Beispiel: Eine Transaktion pro Batch (ggf. Smart Contract Interaktion hier); Fehler werden vom Log-Anker protokolliert
+        #     transaktion_hash_blockchain = self._sende_transaktion(merkle_wurzel) # Interne Methode für Transaktion
+        #     protokolliere_ereignis_global("info", f"BlockchainManager: Merkle-Wurzel erfolgreich in Blockchain registriert. Transaktions-Hash: {transaktion_hash_blockchain}")
+        #     return transaktion_hash_blockchain
+        # else:
+        #     protokolliere_ereignis_global("warnung", "Blockchain-Verbindung nicht initialisiert. Merkle-Wurzel NICHT in Blockchain registriert (simuliert).")
 
-        thread = threading.Thread(target=_registriere_log_hash_thread, args=(log_meldung,))
-        thread.daemon = True
-        thread.start()
-        return True
+        # --- SIMULIERTE BLOCKCHAIN INTERAKTION (Platzhalter) ---
+        print(f"SIMULIERE BLOCKCHAIN TRANSAKTION: Merkle-Wurzel Registrierung für {anzahl} Log-Hash(es): {merkle_wurzel}") # Ausgabe für Demo
+        time.sleep(self.log_anker_latenz_sekunden) # Simuliere Transaktionszeit (eine Transaktion pro Batch)
+        return "simuliert_" + merkle_wurzel # Simulierte TX-Hash
 
     def hole_threat_intelligence_blockchain(self):
         """Holt aktuelle Threat Intelligence von der Blockchain (aktuell Platzhalter)."""
@@ -254,41 +278,26 @@ class BlockchainManager:
         return True
 
     def rufe_letzte_log_hashes_ab_blockchain(self, anzahl=10):
-        """Ruft die letzten N Log-Hashes aus der Blockchain ab (aktuell Platzhalter)."""
+        """Ruft die letzten N registrierten Log-Hashes samt Merkle-Inklusionsbeweis ab (ältester zuerst)."""
         if not self.blockchain_aktiviert or not self.log_registrierung_aktiviert:
             protokolliere_ereignis_global("debug", "Blockchain-Log-Registrierung ist deaktiviert (oder Blockchain generell). Abruf von Log-Hashes nicht möglich.")
             return None
 
-        protokolliere_ereignis_global("debug", f"BlockchainManager: Rufe die letzten {anzahl} Log-Hashes von Blockchain ab (Simuliere leere Liste).")
+        protokolliere_ereignis_global("debug", f"BlockchainManager: Rufe die letzten {anzahl} Log-Hashes aus der lokalen Beweisdatei ab.")
 
-        # --- ECHTE BLOCKCHAIN INTERAKTION (Beispiel - auskommentiert) ---
-        # if self.blockchain_verbindung:
-        #     try:
-        #         # Beispiel: Abruf der letzten N Log-Hashes (z.B. aus Smart Contract Event Logs oder Datenstruktur)
-        #         letzte_hashes_blockchain = self._rufe_letzte_blockchain_daten("logHashRegister", anzahl) # Interne Methode
-        #         if letzte_hashes_blockchain:
-        #             validierte_hashes = self.validiere_log_hash_liste(letzte_hashes_blockchain) # Validierung
-        #             protokolliere_ereignis_global("info", f"Letzte {anzahl} Log-Hashes erfolgreich von Blockchain abgerufen und validiert.")
-        #             return validierte_hashes # Liste von Hashes zurückgeben
-        #         else:
-        #             protokolliere_ereignis_global("warnung", "Keine Log-Hashes von Blockchain erhalten (oder Fehler beim Abruf).")
-        #             return [] # Leere Liste zurückgeben
-        #     except Exception as blockchain_fehler:
-        #         protokolliere_ereignis_global("fehler", f"BlockchainManager: Fehler bei der Blockchain-Interaktion (Log-Hash Abruf): {blockchain_fehler}", {"fehler": str(blockchain_fehler)})
-        #         return None
-        # else:
-        #     protokolliere_ereignis_global("warnung", "Blockchain-Verbindung nicht initialisiert. Abruf von Log-Hashes NICHT möglich (simuliert).")
-        #     return None
+        # Die Beweisdatei enthält zu jedem Log-Hash die verankerte Merkle-Wurzel, den TX-Hash und den
+        # Inklusionsbeweis; mit merkle_anker.verifiziere_merkle_beweis lässt sich jeder Eintrag gegen die
+        # in der Blockchain registrierte Wurzel prüfen.
+        letzte_hashes = self.log_anker.lese_letzte_eintraege(anzahl)
+        protokolliere_ereignis_global("info", f"Letzte {len(letzte_hashes)} Log-Hashes aus der Beweisdatei abgerufen.")
+        return letzte_hashes
 
-        # --- SIMULIERTE BLOCKCHAIN INTERAKTION (Platzhalter) ---
-        print(f"SIMULIERE BLOCKCHAIN INTERAKTION: Abruf der letzten {anzahl} Log-Hashes") # Ausgabe für Demo
-        time.sleep(1) # Simuliere Abrufzeit
-        protokolliere_ereignis_global("info", f"Letzte {anzahl} Log-Hashes (simuliert) von Blockchain abgerufen (aktuell leer).")
-        return []
+    def _reputation_aktiv(self):
+        return self.blockchain_aktiviert and self.threat_intelligence_aktiviert
 
     def pruefe_datei_reputation_blockchain(self, datei_hash):
         """Prüft die Reputation einer Datei anhand eines Hashes in der Blockchain (aktuell Platzhalter, visionär)."""
-        if not self.blockchain_aktiviert or not self.threat_intelligence_aktiviert:
+        if not self._reputation_aktiv():
             protokolliere_ereignis_global("debug", "Blockchain-Datei-Reputationsprüfung ist deaktiviert (oder Blockchain/Threat-Intelligence generell). Keine Reputationsprüfung möglich.")
             return "unbekannt"
 
@@ -296,50 +305,164 @@ class BlockchainManager:
             protokolliere_ereignis_global("warnung", "Versuch, Datei-Reputation ohne Hash zu prüfen. Abgebrochen.")
             return "unbekannt"
 
-        if datei_hash in self.lokaler_datei_reputation_cache and (datetime.now() - datetime.fromisoformat(self.lokaler_datei_reputation_cache[datei_hash].get("letzter_abruf", "1970-01-01T00:00:00"))).total_seconds() < 3600:
-            protokolliere_ereignis_global("debug", f"Verwende Datei-Reputation für Hash '{datei_hash}' aus lokalem Cache (nicht älter als 1 Stunde).")
-            return DateiReputationsDaten(**self.lokaler_datei_reputation_cache[datei_hash].get("daten", {})).reputation_stufe
-
-        protokolliere_ereignis_global("debug", f"BlockchainManager: Prüfe Datei-Reputation für Hash '{datei_hash}' über Blockchain (Simuliere: unbekannt).")
+        return self.pruefe_datei_reputationen_blockchain([datei_hash]).get(datei_hash, "unbekannt")
+
+    def pruefe_datei_reputationen_blockchain(self, datei_hashes):
+        """
+        Prüft die Reputation vieler Dateien mit höchstens einer Abfrage pro `reputation_batch_groesse` Hashes.
+        Zwischengespeicherte Hashes werden nicht angefragt; Hashes, die bereits von einem anderen Thread angefragt
+        werden, teilen sich dessen Ergebnis. Gibt {datei_hash: reputation_stufe} zurück.
+        """
+        datei_hashes = [datei_hash for datei_hash in dict.fromkeys(datei_hashes) if datei_hash]
+        if not self._reputation_aktiv():
+            return {datei_hash: "unbekannt" for datei_hash in datei_hashes}
+
+        ergebnisse = self.reputations_cache.hole_viele(datei_hashes)
+        eigene, fremde = {}, {}
+        with self.reputation_sperre:
+            for datei_hash in datei_hashes:
+                if datei_hash in ergebnisse:
+                    continue
+                future = self.ausstehende_reputationen.get(datei_hash)
+                if future is not None:
+                    fremde[datei_hash] = future
+                else:
+                    eigene[datei_hash] = self.ausstehende_reputationen[datei_hash] = Future()
+        offene = list(eigene.items())
+        for beginn in range(0, len(offene), self.reputation_batch_groesse):
+            self._frage_und_verteile(offene[beginn:beginn + self.reputation_batch_groesse])
+        for datei_hash, future in (*eigene.items(), *fremde.items()):
+            ergebnisse[datei_hash] = future.result()
+        return ergebnisse
+
+    def fordere_datei_reputation_an(self, datei_hash):
+        """
+        Fordert die Reputation eines Hashes an, ohne zu blockieren, und gibt ein Future mit der Reputationsstufe zurück.
+        Anforderungen werden im Hintergrund gesammelt (bis `reputation_batch_groesse` oder `reputation_batch_wartezeit_ms`)
+        und gemeinsam abgefragt.
+        """
+        future = Future()
+        if not self._reputation_aktiv() or not datei_hash or self.reputation_stopp.is_set():
+            future.set_result("unbekannt")
+            return future
+        reputation_stufe = self.reputations_cache.hole(datei_hash)
+        if reputation_stufe is not None:
+            future.set_result(reputation_stufe)
+            return future
+        with self.reputation_sperre:
+            if self.reputation_stopp.is_set():
+                future.set_result("unbekannt")
+                return future
+            vorhandenes_future = self.ausstehende_reputationen.get(datei_hash)
+            if vorhandenes_future is not None:
+                return vorhandenes_future
+            self.ausstehende_reputationen[datei_hash] = future
+            self._starte_reputation_thread()
+            # Unter der Sperre eingereiht, damit nach dem Stopp-Marker nichts mehr in der Warteschlange landet
+            self.reputation_warteschlange.put((datei_hash, future))
+        return future
+
+    def _starte_reputation_thread(self):
+        """Startet den Reputations-Batch-Thread, falls er nicht läuft (unter reputation_sperre aufrufen)."""
+        if self.reputation_thread is None or not self.reputation_thread.is_alive():
+            self.reputation_thread = threading.Thread(target=self._reputation_batch_schleife, daemon=True)
+            self.reputation_thread.start()
+
+    def _reputation_batch_schleife(self):
+        """Sammelt angeforderte Hashes und fragt sie gesammelt ab (Hintergrund-Thread), bis der Stopp-Marker von beende() kommt."""
+        while True:
+            erste = self.reputation_warteschlange.get()
+            if erste is _REPUTATION_ENDE:
+                return
+            batch = [erste]
+            frist = time.monotonic() + self.reputation_batch_wartezeit_sekunden
+            beenden = False
+            while len(batch) < self.reputation_batch_groesse:
+                rest = frist - time.monotonic()
+                if rest <= 0:
+                    break
+                try:
+                    anfrage = self.reputation_warteschlange.get(timeout=rest)
+                except queue.Empty:
+                    break
+                if anfrage is _REPUTATION_ENDE:
+                    beenden = True
+                    break
+                batch.append(anfrage)
+            self._frage_und_verteile(batch)
+            if beenden:
+                return
+
+    def _frage_und_verteile(self, batch):
+        """Fragt einen Batch [(datei_hash, future), ...] in einem Round Trip ab, speichert das Ergebnis und löst die Futures auf."""
+        start = time.perf_counter()
+        try:
+            reputationen = self._rufe_datei_reputationen_ab([datei_hash for datei_hash, _ in batch])
+            REPUTATION_ABFRAGE_DAUER.beobachte(time.perf_counter() - start)
+            REPUTATION_HASHES.erhoehe(len(batch))
+            self.reputations_cache.setze_viele(reputationen)
+        except Exception as e:
+            # Fehlgeschlagene Abfragen werden nicht zwischengespeichert und beim nächsten Mal wiederholt
+            protokolliere_ereignis_global("fehler", f"BlockchainManager: Fehler bei der Datei-Reputationsprüfung für {len(batch)} Hash(es): {e}", {"fehler": str(e)})
+            reputationen = {}
+        with self.reputation_sperre:
+            for datei_hash, _ in batch:
+                self.ausstehende_reputationen.pop(datei_hash, None)
+        for datei_hash, future in batch:
+            if not future.done():
+                future.set_result(reputationen.get(datei_hash, "unbekannt"))
+
+    def _rufe_datei_reputationen_ab(self, datei_hashes):
+        """Fragt die Reputation mehrerer Hashes in einem Round Trip beim Backend ab. Gibt {datei_hash: reputation_stufe} zurück."""
+        protokolliere_ereignis_global("debug", f"BlockchainManager: Prüfe Datei-Reputation für {len(datei_hashes)} Hash(es) über Blockchain (Simuliere: unbekannt).")
+        with self.reputation_sperre: # Batch-Thread und synchrone Aufrufer zählen gleichzeitig
+            self.reputation_abfragen += 1
 
         # --- ECHTE BLOCKCHAIN INTERAKTION (Beispiel - auskommentiert) ---
         # if self.blockchain_verbindung:
-        #     try:
-        #         # Beispiel: Abruf der Datei-Reputation über Smart Contract oder dezentrale Datenbank
-        #         rohe_reputation_daten_blockchain = self._rufe_datei_reputation_von_blockchain(datei_hash) # Interne Methode
-        #         if rohe_reputation_daten_blockchain:
-        #             validierte_reputation_daten = self.validiere_datei_reputations_daten(rohe_reputation_daten_blockchain) # Validierung
-        #             serialisierte_reputation_daten = self.serialisiere_datei_reputations_daten_für_blockchain(validierte_reputation_daten) # Serialisierung
-        #             protokolliere_ereignis_global("info", f"Datei-Reputation für Hash '{datei_hash}' erfolgreich von Blockchain abgerufen und validiert. Reputation: {serialisierte_reputation_daten.reputation_stufe}")
-        #             # ... (Cache aktualisieren, Reputation zurückgeben) ...
-        #         else:
-        #             protokolliere_ereignis_global("info", f"Datei-Reputation für Hash '{datei_hash}' NICHT in Blockchain gefunden (oder Fehler beim Abruf). Reputation: unbekannt (Blockchain)")
-        #             return "unbekannt" # Oder Standard-Reputation zurückgeben
-        #     except Exception as blockchain_fehler:
-        #         protokolliere_ereignis_global("fehler", f"BlockchainManager: Fehler bei der Blockchain-Interaktion (Datei-Reputationsprüfung): {blockchain_fehler}", {"fehler": str(blockchain_fehler)})
-        #         return "unbekannt"
+        #     # Beispiel: Abruf der Reputationen aller Hashes mit einem Aufruf (Smart Contract oder dezentrale Datenbank)
+        #     rohe_reputationen_blockchain = self._rufe_datei_reputationen_von_blockchain(datei_hashes) # Interne Methode, wirft bei Fehlern
+        #     reputationen = {}
+        #     for rohe_reputation_daten in rohe_reputationen_blockchain:
+        #         validierte_reputation_daten = self.validiere_datei_reputations_daten(rohe_reputation_daten) # Validierung
+        #         reputationen[validierte_reputation_daten.datei_hash_sha256] = validierte_reputation_daten.reputation_stufe
+        #     # Nicht gefundene Hashes gelten als "unbekannt" (wird mit kürzerer TTL zwischengespeichert)
+        #     return {datei_hash: reputationen.get(datei_hash, "unbekannt") for datei_hash in datei_hashes}
         # else:
         #     protokolliere_ereignis_global("warnung", "Blockchain-Verbindung nicht initialisiert. Datei-Reputationsprüfung NICHT möglich (simuliert).")
-        #     return "unbekannt"
+        #     return {datei_hash: "unbekannt" for datei_hash in datei_hashes}
 
         # --- SIMULIERTE BLOCKCHAIN INTERAKTION (Platzhalter) ---
-        print(f"SIMULIERE BLOCKCHAIN INTERAKTION: Datei-Reputationsprüfung für Hash: {datei_hash}") # Ausgabe für Demo
-        time.sleep(1) # Simuliere Abrufzeit
-        protokolliere_ereignis_global("info", f"Datei-Reputation für Hash '{datei_hash}' (simuliert) von Blockchain abgerufen. Reputation: unbekannt.")
-        simulierte_reputation_daten = DateiReputationsDaten(
+        print(f"SIMULIERE BLOCKCHAIN INTERAKTION: Datei-Reputationsprüfung für {len(datei_hashes)} Hash(es)") # Ausgabe für Demo
+        time.sleep(self.reputation_latenz_sekunden) # Simuliere Abrufzeit (ein Round Trip für den gesamten Batch)
+        protokolliere_ereignis_global("info", f"Datei-Reputation für {len(datei_hashes)} Hash(es) (simuliert) von Blockchain abgerufen. Reputation: unbekannt.")
+        simulierte_reputation_daten = [DateiReputationsDaten(
             datei_hash_sha256=datei_hash,
             reputation_stufe="unbekannt",
             reputation_quellen=[],
             zusätzliche_infos="Simulierte Reputation von Blockchain"
-        )
-
-        self.lokaler_datei_reputation_cache[datei_hash] = {
-            "letzter_abruf": datetime.now().isoformat(),
-            "daten": simulierte_reputation_daten.__dict__
-        }
-        protokolliere_ereignis_global("debug", f"BlockchainManager: Lokaler Datei-Reputations-Cache für Hash '{datei_hash}' aktualisiert.")
-
-        return "unbekannt"
+        ) for datei_hash in datei_hashes]
+        return {daten.datei_hash_sha256: daten.reputation_stufe for daten in simulierte_reputation_daten}
+
+    def beende(self):
+        """Verankert alle wartenden Log-Hashes, beendet den Reputations-Batch-Thread und schließt den Reputations-Cache."""
+        self.log_anker.beende()
+        with self.reputation_sperre:
+            self.reputation_stopp.set()
+            self.reputation_warteschlange.put(_REPUTATION_ENDE)
+        if self.reputation_thread is not None:
+            # Bereits angeforderte Hashes werden noch abgefragt; erst danach darf der Cache geschlossen werden
+            self.reputation_thread.join(self.reputation_latenz_sekunden + self.reputation_batch_wartezeit_sekunden + 10)
+            if self.reputation_thread.is_alive():
+                protokolliere_ereignis_global("warnung", "BlockchainManager: Reputations-Batch-Thread reagiert nicht; Reputations-Cache bleibt offen.")
+                return
+        self.reputations_cache.schliesse()
+
+    def get_reputation_statistik(self):
+        """Gibt Cache-Statistik und Anzahl der Backend-Abfragen der Datei-Reputationsprüfung zurück."""
+        statistik = self.reputations_cache.get_statistik()
+        statistik["backend_abfragen"] = self.reputation_abfragen
+        return statistik
 
     def registriere_virenschutz_version_blockchain(self, version_hash):
         """Registriert die aktuelle Virenschutz-Version in der Blockchain (aktuell Platzhalter, für Transparenz)."""
@@ -459,19 +582,14 @@ class BlockchainManager:
     #         protokolliere_ereignis_global("fehler", f"_rufe_letzte_blockchain_daten: Fehler beim Abrufen der letzten Blockchain-Daten: {e}", {"fehler": str(e)})
     #         return []
 
-    # def _rufe_datei_reputation_von_blockchain(self, datei_hash):
-    #     """Beispiel für interne Methode zum Abrufen der Datei-Reputation von der Blockchain (Platzhalter)."""
+    # def _rufe_datei_reputationen_von_blockchain(self, datei_hashes):
+    #     """Beispiel für interne Methode zum Abrufen der Datei-Reputationen von der Blockchain (Platzhalter)."""
     #     if not self.blockchain_verbindung:
-    #         protokolliere_ereignis_global("warnung", "_rufe_datei_reputation_von_blockchain: Keine Blockchain-Verbindung.")
-    #         return None
-    #     try:
-    #         # Beispiel: Abruf der Reputation für einen Datei-Hash (Smart Contract oder dezentrale Datenbank)
-    #         # ... (Web3.py Code für Datei-Reputationsabruf) ...
-    #         simulierte_reputation = {"dateiHash": datei_hash, "reputation": "unbekannt", "quellen": ["simulierte_quelle"]} # Platzhalter-Reputation
-    #         return simulierte_reputation
-    #     except Exception as e:
-    #         protokolliere_ereignis_global("fehler", f"_rufe_datei_reputation_von_blockchain: Fehler beim Abrufen der Datei-Reputation von der Blockchain: {e}", {"fehler": str(e)})
-    #         return None
+    #         raise ConnectionError("_rufe_datei_reputationen_von_blockchain: Keine Blockchain-Verbindung.")
+    #     # Beispiel: Abruf der Reputationen für viele Datei-Hashes mit einem Aufruf (Smart Contract oder dezentrale Datenbank)
+    #     # ... (Web3.py Code für Datei-Reputationsabruf, z.B. eine View-Funktion mit bytes32[]-Parameter) ...
+    #     simulierte_reputationen = [{"dateiHash": datei_hash, "reputation": "unbekannt", "quellen": ["simulierte_quelle"]} for datei_hash in datei_hashes] # Platzhalter-Reputationen
+    #     return simulierte_reputationen
 
     # --- TODO: Datenvalidierungs-Methoden (Beispiele - vereinfacht) ---
     def validiere_threat_intelligence_daten(self, rohe_daten):
@@ -1,13 +1,23 @@
 import json
 import os
-import shutil
+import hashlib
 import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import tkinter as tk
 from tkinter import messagebox
 
 # Importiere die globale Protokollierungsfunktion aus logging_utils.py
 from logging_utils import protokolliere_ereignis_global
+from ereignis_bus import veroeffentliche_ereignis_global
+from regel_engine import KompilierteRegeln # Indizierter, unveränderlicher Regelsatz
+from telemetrie import hole_telemetrie # Zähler für /metrics
+from quarantaene_speicher import QuarantaeneSpeicher # Inhaltsadressierter Quarantäne-Speicher mit Metadaten-Index
+
+QUARANTAENE_AKTIONEN = hole_telemetrie().zaehler("virenschutz_quarantaene_aktionen_total", "Quarantäne-Aktionen nach Ergebnis.", ("ergebnis",))
 
 class KonfigurationManager:
     """
@@ -26,17 +36,65 @@ class KonfigurationManager:
             "dateiendungen_ignoriert": [".log", ".tmp", ".temp"],
             "system_verzeichnisse_ignoriert": ["C:\\Windows", "C:\\Program Files", "C:\\Program Files (x86)", "C:\\System Volume Information", "C:\\$Recycle.Bin", "C:\\ProgramData"],
             "echtzeit_schutz": True,
-            "pruefungs_intervall_sekunden": 600
+            "pruefungs_intervall_sekunden": 600,
+            "scan_cache_aktiviert": True,
+            "scan_cache_datei": "scan_cache.db",
+            "ioc_index_datei": "ioc_index.bin",
+            "pipeline_aktiviert": True,
+            "hash_worker_anzahl": 4,
+            "hash_worker_modus": "threads",
+            "pipeline_queue_groesse": 1024,
+            "scan_berichte_verzeichnis": "scan_berichte", # JSON-Bericht pro Systemprüfung (Web-UI: /api/scan_berichte)
+            "scan_berichte_max_anzahl": 50, # Ältere Berichte werden gelöscht
+            "scan_bericht_langsamste_dateien": 20,
+            "scan_max_parallel": 2, # Gleichzeitig laufende Prüfaufträge (Web-UI: /api/scan_jobs)
+            "scan_max_pro_volume": 1, # Gleichzeitige Prüfaufträge pro Volume
+            "scan_job_verlauf": 100, # Beendete Prüfaufträge, die abrufbar bleiben
+            "scan_checkpoint_aktiviert": True, # Unterbrochene Prüfungen nach einem Neustart fortsetzen
+            "scan_checkpoint_verzeichnis": "scan_checkpoints",
+            "scan_checkpoint_intervall_sekunden": 5,
+            "scan_drosselung": { # Ressourcenbudget der Systemprüfung; Änderungen wirken auch während einer laufenden Prüfung (0 = unbegrenzt bzw. aus)
+                "aktiviert": False,
+                "bytes_pro_sekunde": 0, # Gelesene Bytes (nur Dateien, die nicht aus dem Scan-Cache kommen)
+                "dateien_pro_sekunde": 0,
+                "burst_sekunden": 1, # Budget, das sich höchstens ansparen darf
+                "max_systemlast": 1.0, # 1-Minuten-Load pro CPU-Kern, darüber wird das Budget halbiert
+                "max_io_wartezeit_prozent": 20, # iowait (nur Linux)
+                "min_anteil": 0.05, # Untergrenze des Back-offs
+                "messintervall_sekunden": 1,
+                "prioritaet_senken": True, # Scan-Threads mit niedriger CPU- und I/O-Priorität
+                "nice": 10,
+                "io_klasse": "niedrig" # "niedrig" (best effort, niedrigste Stufe) oder "leerlauf"
+            },
+            "echtzeit_dateischutz_aktiviert": True, # inotify/fanotify (nur Linux)
+            "echtzeit_verzeichnisse": [], # Leer: scan_verzeichnis überwachen
+            "echtzeit_entprellung_ms": 100, # Ereignisse pro Datei innerhalb dieser Zeit zusammenfassen
+            "echtzeit_queue_groesse": 4096,
+            "echtzeit_worker_anzahl": 2,
+            "echtzeit_fanotify_bevorzugt": True # fanotify nutzen, falls die Rechte reichen (sonst inotify)
         },
         "regeln": {
             "regelsatz_datei": "virenschutz_regeln.json"
         },
         "quarantaene": {
-            "quarantaene_verzeichnis": "quarantaene"
+            "quarantaene_verzeichnis": "quarantaene", # Inhaltsadressierter Speicher (objekte/) mit Metadaten-Index (index.db)
+            "komprimieren": True, # zlib
+            "neutralisieren": True, # Gespeicherte Bytes per XOR verändern (nicht ausführbar, keine Signaturtreffer)
+            "kompressionsstufe": 6,
+            "roh_ab_bytes": 8 * 1024 * 1024, # Größere Dateien unverändert speichern: Hardlink (gleiches Dateisystem) oder Kopie im Kernel, ohne erneutes Lesen
+            "transfer_worker_anzahl": 2 # Threads für asynchrone Quarantäne-Übertragungen während der Systemprüfung
         },
         "logging": {
             "log_datei": "virenschutz.log",
-            "log_level": "DEBUG"
+            "log_level": "DEBUG",
+            "log_format": "jsonl", # "jsonl" (ein JSON-Datensatz pro Zeile) oder "text"
+            "log_asynchron": True, # Schreiben im Hintergrund-Thread statt im Scan
+            "log_warteschlange_max": 100000, # Darüber werden Ereignisse verworfen (und gezählt)
+            "log_drosselung": { # Sampling ("anteil") und Ratenbegrenzung ("max_pro_sekunde") je Ereignisart
+                "datei_geprueft": {"max_pro_sekunde": 100},
+                "datei_cache_treffer": {"max_pro_sekunde": 100},
+                "netzwerk_verbindung": {"max_pro_sekunde": 50}
+            }
         },
         "blockchain": {
             "aktiviert": False,
@@ -45,20 +103,51 @@ class KonfigurationManager:
             "update_verifizierung_aktiviert": False,
             "netzwerk_adresse": "http://localhost:8545", # Platzhalter für Netzwerkadresse (z.B. Ethereum)
             "api_schluessel": "rhAUQtxnceWojZHvhZ1EoG1CuYT7s7NyDWhKkBehOcI", # API Schlüssel falls benötigt
-            "smart_contract_adresse": "" # Smart Contract Adresse falls verwendet
+            "smart_contract_adresse": "", # Smart Contract Adresse falls verwendet
+            "reputation_cache_datei": "reputation_cache.db", # Persistenter Cache für Datei-Reputationen (SQLite)
+            "reputation_cache_max_eintraege": 100000, # Einträge im Speicher (LRU)
+            "reputation_ttl_sekunden": 3600,
+            "reputation_negativ_ttl_sekunden": 600, # TTL für "unbekannt"
+            "reputation_batch_groesse": 256, # Hashes pro Abfrage
+            "reputation_batch_wartezeit_ms": 50, # Maximale Sammelzeit für einen Batch
+            "reputation_latenz_ms": 1000, # Simulierte Dauer einer Abfrage
+            "log_beweis_datei": "log_merkle_beweise.jsonl", # Append-only-Datei mit Merkle-Inklusionsbeweisen der Log-Hashes
+            "log_batch_groesse": 16384, # Log-Hashes pro verankerter Merkle-Wurzel
+            "log_batch_wartezeit_sekunden": 5,
+            "log_warteschlange_max": 100000,
+            "log_anker_latenz_ms": 500 # Simulierte Transaktionszeit
         },
         "web_ui": {
             "aktiviert": True,
             "port": 5000,
-            "aktualisierungs_intervall": 5
+            "aktualisierungs_intervall": 5,
+            "metriken_intervall_sekunden": 1, # Messintervall des Metrik-Samplers
+            "metriken_verlauf_punkte": 3600, # Feiner Verlauf (1 Stunde bei 1 s)
+            "metriken_grob_intervall_sekunden": 60, # Mittelwerte für den groben Verlauf
+            "metriken_grob_verlauf_punkte": 1440, # Grober Verlauf (24 Stunden bei 60 s)
+            "stream_intervall_sekunden": 1, # Log und Metriken werden für /api/stream einmal pro Intervall gelesen
+            "stream_heartbeat_sekunden": 15,
+            "stream_log_max_eintraege": 200 # Log-Zeilen pro Stream-Ereignis (bei mehr nur die neuesten)
         },
         "ki": {  # KI Konfiguration hinzugefügt
             "aktiviert": True,
             "gemini_api_key": "YOUR_GEMINI_API_KEY",  # **WICHTIG: API-Key hier eintragen!**
-            "gemini_modell_name": "gemini-2.0-flash"
+            "gemini_modell_name": "gemini-2.0-flash",
+            "modell_typ": "gemini",  # "gemini" oder "stub" (lokales Testmodell ohne API-Key)
+            "stub_latenz_ms": 500,
+            "urteil_cache_datei": "ki_urteil_cache.json",
+            "urteil_cache_max_eintraege": 10000,
+            "urteil_cache_ttl_sekunden": 86400,
+            "batch_groesse": 16,  # Prozesse pro Modellanfrage
+            "batch_wartezeit_ms": 200,  # Maximale Sammelzeit für einen Batch
+            "anfragen_pro_minute": 30,
+            "anfragen_burst": 5,
+            "antwort_timeout_sekunden": 60
         }
     }
 
+    _datei_mtime_ns = None # Änderungszeit der zuletzt geladenen oder gespeicherten Konfigurationsdatei
+
     def __init__(self):
         self.konfiguration = self.lade_konfiguration()
 
@@ -67,6 +156,7 @@ class KonfigurationManager:
         try:
             with open(self.CONFIG_DATEI, 'r', encoding='utf-8') as f:
                 konfiguration = json.load(f)
+                self._datei_mtime_ns = os.fstat(f.fileno()).st_mtime_ns
             protokolliere_ereignis_global("info", f"Konfiguration erfolgreich aus '{self.CONFIG_DATEI}' geladen.")
             return konfiguration
         except FileNotFoundError:
@@ -84,6 +174,27 @@ class KonfigurationManager:
         """Gibt die aktuelle Konfiguration zurück."""
         return self.konfiguration
 
+    def lade_neu_falls_geaendert(self):
+        """Lädt die Konfigurationsdatei neu, falls sie seit dem letzten Laden geändert wurde. Gibt True zurück, wenn neu geladen wurde."""
+        try:
+            mtime_ns = os.stat(self.CONFIG_DATEI).st_mtime_ns
+        except OSError:
+            return False
+        if mtime_ns == self._datei_mtime_ns:
+            return False
+        self._datei_mtime_ns = mtime_ns
+        try:
+            with open(self.CONFIG_DATEI, 'r', encoding='utf-8') as f:
+                konfiguration = json.load(f)
+        except (OSError, ValueError) as e:
+            protokolliere_ereignis_global("warnung", f"Geänderte Konfigurationsdatei '{self.CONFIG_DATEI}' konnte nicht gelesen werden, bisherige Konfiguration bleibt aktiv: {e}",
+                                          {"datei": self.CONFIG_DATEI, "fehler": str(e)})
+            return False
+        self.konfiguration = konfiguration
+        protokolliere_ereignis_global("info", f"Konfiguration aus '{self.CONFIG_DATEI}' neu geladen (Datei geändert).")
+        veroeffentliche_ereignis_global("konfiguration", {"datei": self.CONFIG_DATEI})
+        return True
+
     def aktualisiere_konfiguration(self, neue_konfiguration):
         """Aktualisiert die Konfiguration und speichert sie in der Datei."""
         self.konfiguration = neue_konfiguration
@@ -95,7 +206,9 @@ class KonfigurationManager:
         try:
             with open(self.CONFIG_DATEI, 'w') as f:
                 json.dump(self.konfiguration, f, indent=4)
+            self._datei_mtime_ns = os.stat(self.CONFIG_DATEI).st_mtime_ns # Eigene Änderung nicht erneut laden
             protokolliere_ereignis_global("info", f"Konfiguration erfolgreich in '{self.CONFIG_DATEI}' gespeichert.")
+            veroeffentliche_ereignis_global("konfiguration", {"datei": self.CONFIG_DATEI}) # Offene Konfigurationsseiten aktualisieren
         except Exception as e:
             protokolliere_ereignis_global("fehler", f"Fehler beim Speichern der Konfiguration in '{self.CONFIG_DATEI}': {e}", {"datei": self.CONFIG_DATEI, "fehler": str(e)})
 
@@ -110,6 +223,8 @@ class RegelManager:
         self.konfig_manager = konfig_manager
         self.regeln_datei_pfad = self.konfig_manager.get_konfiguration().get("regeln").get("regelsatz_datei", self.REGELN_DATEI_DEFAULT) # Aus Konfig holen
         self.regeln = self.lade_regeln()
+        self.regelsatz_version = self.berechne_regelsatz_version(self.regeln)
+        self.kompilierte_regeln = KompilierteRegeln(self.regeln) # Einmalig beim Laden kompilieren
 
     def lade_regeln(self):
         """Lädt Regeln aus einer JSON-Datei und validiert die Struktur."""
@@ -158,6 +273,19 @@ class RegelManager:
         """Gibt die aktuellen Regeln zurück."""
         return self.regeln
 
+    def get_kompilierte_regeln(self):
+        """Gibt den kompilierten (indizierten) Regelsatz für die schnelle Auswertung zurück."""
+        return self.kompilierte_regeln
+
+    def berechne_regelsatz_version(self, regeln):
+        """Berechnet einen Fingerabdruck des Regelsatzes (z.B. für die Invalidierung des Scan-Caches)."""
+        kanonisch = json.dumps(regeln, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(kanonisch.encode('utf-8')).hexdigest()
+
+    def get_regelsatz_version(self):
+        """Gibt den Fingerabdruck des aktuell geladenen Regelsatzes zurück."""
+        return self.regelsatz_version
+
     def protokolliere_ereignis(self, typ, meldung, daten=None):
         """Protokolliert ein Ereignis über das Logging-Modul."""
         protokolliere_ereignis_global(typ, meldung, daten)
@@ -165,14 +293,46 @@ class RegelManager:
 class QuarantäneManager:
     """
     Verwaltet Quarantäne-Operationen.
-    Modul für Initialisierung und Datei-Quarantäne.
+    Modul für Initialisierung, Datei-Quarantäne, Suche, Wiederherstellung und Bereinigung.
+
+    Dateien liegen inhaltsadressiert im QuarantaeneSpeicher (dedupliziert, komprimiert, neutralisiert) mit
+    einem Metadaten-Index; Dateien der bisherigen flachen Quarantäne werden beim Start übernommen.
+    Mit asynchron=True übernimmt ein eigener Thread-Pool die Übertragung, damit die Prüfschleife bei großen
+    Dateien nicht blockiert; warte_auf_transfers() wartet auf alle ausstehenden Übertragungen.
     """
     QUARANTÄNE_PFAD_DEFAULT = "C:\\VirenschutzQuarantaene" # Standard, wird aber durch Konfig ersetzt
 
     def __init__(self, konfig_manager):
         self.konfig_manager = konfig_manager
-        self.quarantaene_pfad = self.konfig_manager.get_konfiguration().get("quarantaene").get("quarantaene_verzeichnis", self.QUARANTÄNE_PFAD_DEFAULT) # Aus Konfig holen
+        quarantaene_konfig = self.konfig_manager.get_konfiguration().get("quarantaene")
+        self.quarantaene_pfad = quarantaene_konfig.get("quarantaene_verzeichnis", self.QUARANTÄNE_PFAD_DEFAULT) # Aus Konfig holen
         self.initialisiere_quarantaene()
+        self.speicher = QuarantaeneSpeicher(self.quarantaene_pfad, komprimieren=quarantaene_konfig.get("komprimieren", True),
+                                            neutralisieren=quarantaene_konfig.get("neutralisieren", True),
+                                            kompressionsstufe=quarantaene_konfig.get("kompressionsstufe", 6),
+                                            roh_ab_bytes=quarantaene_konfig.get("roh_ab_bytes", 0))
+        transfer_worker_anzahl = max(1, int(quarantaene_konfig.get("transfer_worker_anzahl", 2)))
+        self.transfer_executor = ThreadPoolExecutor(max_workers=transfer_worker_anzahl, thread_name_prefix="QuarantaeneTransfer")
+        self._ausstehende_transfers = set()
+        self._transfer_sperre = threading.Lock()
+        self._starte_transfer_worker(transfer_worker_anzahl)
+        uebernommen = self.speicher.uebernehme_altbestand()
+        if uebernommen:
+            self.protokolliere_ereignis("info", f"{uebernommen} Datei(en) der bisherigen Quarantäne in den Quarantäne-Speicher übernommen.")
+
+    def _starte_transfer_worker(self, anzahl):
+        """
+        Startet alle Worker des Transfer-Pools sofort statt beim ersten submit. Die erste asynchrone Quarantäne kommt meist
+        aus einem Scan-Thread mit gesenkter Priorität; unter Linux erbten die Worker dessen nice/ionice und bedienten
+        danach auch den Echtzeitschutz gedrosselt. Die Aufgaben warten aufeinander, damit jedes submit einen neuen Worker braucht.
+        """
+        barriere = threading.Barrier(anzahl + 1)
+        for _ in range(anzahl):
+            self.transfer_executor.submit(barriere.wait, 10)
+        try:
+            barriere.wait(10)
+        except threading.BrokenBarrierError:
+            self.protokolliere_ereignis("warnung", "Nicht alle Quarantäne-Transfer-Worker konnten vorab gestartet werden.")
 
     def initialisiere_quarantaene(self):
         """Stellt sicher, dass der Quarantäne-Ordner existiert."""
@@ -185,22 +345,111 @@ class QuarantäneManager:
         else:
             self.protokolliere_ereignis("info", f"Quarantäne-Ordner '{self.quarantaene_pfad}' existiert bereits.")
 
-    def quarantäne_datei(self, datei_pfad):
-        """Verschiebt eine verdächtige Datei in den Quarantäne-Ordner."""
-        datei_name = os.path.basename(datei_pfad)
-        quarantaene_datei_pfad = os.path.join(self.quarantaene_pfad, datei_name + ".quarantäne")
+    def quarantäne_datei(self, datei_pfad, regel_name=None, datei_hash=None, datei_stat=None, asynchron=False):
+        """
+        Verschiebt eine verdächtige Datei in den Quarantäne-Speicher. Gibt True bei Erfolg zurück, mit asynchron=True
+        sofort ein Future mit diesem Ergebnis. datei_hash und datei_stat aus der Prüfung ersparen bei großen Dateien das erneute Lesen.
+        """
+        datei = (datei_pfad, regel_name, datei_hash, datei_stat) if datei_hash else (datei_pfad, regel_name)
+        if not asynchron:
+            return self.quarantäne_dateien([datei])[0] is not None
+        future = self.transfer_executor.submit(lambda: self.quarantäne_dateien([datei])[0] is not None)
+        with self._transfer_sperre:
+            self._ausstehende_transfers.add(future)
+        future.add_done_callback(self._transfer_beendet)
+        return future
+
+    def _transfer_beendet(self, future):
+        with self._transfer_sperre:
+            self._ausstehende_transfers.discard(future)
+
+    def warte_auf_transfers(self, timeout=None):
+        """Wartet auf alle ausstehenden asynchronen Übertragungen. Gibt False zurück, falls timeout vorher abläuft."""
+        with self._transfer_sperre:
+            ausstehend = list(self._ausstehende_transfers)
+        ende = None if timeout is None else time.monotonic() + timeout
+        for future in ausstehend:
+            try:
+                future.result(None if ende is None else max(0.0, ende - time.monotonic()))
+            except TimeoutError:
+                return False
+            except Exception as e: # Fehler einer Übertragung dürfen die Systemprüfung nicht abbrechen
+                self.protokolliere_ereignis("fehler", f"Fehler bei einer asynchronen Quarantäne-Übertragung: {e}", {"fehler": str(e)})
+        return True
+
+    def quarantäne_dateien(self, dateien):
+        """
+        Verschiebt mehrere Dateien (Pfade, (datei_pfad, regel_name) oder (datei_pfad, regel_name, datei_hash, datei_stat))
+        mit einer Index-Transaktion in den Quarantäne-Speicher.
+        Gibt pro Datei den Quarantäne-Eintrag oder None (nicht gefunden oder fehlgeschlagen) zurück.
+        """
+        dateien = [(datei, None) if isinstance(datei, str) else tuple(datei) for datei in dateien]
         try:
-            if not os.path.exists(datei_pfad):
-                raise FileNotFoundError(f"Datei zum Quarantänisieren nicht gefunden: '{datei_pfad}'")
-            shutil.move(datei_pfad, quarantaene_datei_pfad)
-            self.protokolliere_ereignis("aktion", f"Datei '{datei_name}' nach Quarantäne verschoben.", {"ursprungs_pfad": datei_pfad, "quarantaene_pfad": quarantaene_datei_pfad})
-            return True
-        except FileNotFoundError as e:
-            self.protokolliere_ereignis("warnung", f"Datei zum Quarantänisieren nicht gefunden: '{datei_pfad}'. Möglicherweise bereits gelöscht oder verschoben.", {"datei_pfad": datei_pfad, "fehler": str(e)})
-            return False
-        except Exception as e:
-            self.protokolliere_ereignis("fehler", f"Fehler beim Verschieben der Datei '{datei_pfad}' in Quarantäne: {e}", {"fehler": str(e), "datei_pfad": datei_pfad})
-            return False
+            ergebnisse = self.speicher.quarantaenisiere_mehrere(dateien)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            ergebnisse = [e] * len(dateien)
+        eintraege = []
+        for (datei_pfad, regel_name, *_), ergebnis in zip(dateien, ergebnisse):
+            if isinstance(ergebnis, FileNotFoundError):
+                QUARANTAENE_AKTIONEN.erhoehe(1, ("nicht_gefunden",))
+                self.protokolliere_ereignis("warnung", f"Datei zum Quarantänisieren nicht gefunden: '{datei_pfad}'. Möglicherweise bereits gelöscht oder verschoben.", {"datei_pfad": datei_pfad, "fehler": str(ergebnis)})
+                ergebnis = None
+            elif isinstance(ergebnis, Exception):
+                QUARANTAENE_AKTIONEN.erhoehe(1, ("fehlgeschlagen",))
+                self.protokolliere_ereignis("fehler", f"Fehler beim Verschieben der Datei '{datei_pfad}' in Quarantäne: {ergebnis}", {"fehler": str(ergebnis), "datei_pfad": datei_pfad})
+                ergebnis = None
+            else:
+                QUARANTAENE_AKTIONEN.erhoehe(1, ("verschoben",))
+                self.protokolliere_ereignis("aktion", f"Datei '{os.path.basename(datei_pfad)}' nach Quarantäne verschoben.",
+                                            {"ursprungs_pfad": datei_pfad, "quarantaene_id": ergebnis["id"], "datei_hash": ergebnis["datei_hash"], "regel_name": regel_name})
+            eintraege.append(ergebnis)
+        return eintraege
+
+    def liste_eintraege(self, limit=100, cursor=None, **filter):
+        """Seite von Quarantäne-Einträgen, neueste zuerst (Filter: pfad, pfad_praefix, regel_name, datei_hash, seit, bis; siehe QuarantaeneSpeicher.liste)."""
+        return self.speicher.liste(limit, cursor, **filter)
+
+    def hole_eintrag(self, eintrag_id):
+        """Gibt einen Quarantäne-Eintrag zurück oder None."""
+        return self.speicher.hole(eintrag_id)
+
+    def stelle_wieder_her(self, eintrag_id, ziel_pfad=None, ueberschreiben=False):
+        """
+        Stellt eine Datei aus der Quarantäne wieder her (ursprünglicher Pfad oder ziel_pfad). Gibt den Zielpfad zurück oder None.
+        Passt die Datei weiterhin zu einer Regel, wird sie bei der nächsten Prüfung erneut in Quarantäne verschoben.
+        """
+        try:
+            ziel = self.speicher.stelle_wieder_her(eintrag_id, ziel_pfad, ueberschreiben)
+        except KeyError:
+            self.protokolliere_ereignis("warnung", f"Quarantäne-Eintrag {eintrag_id} nicht gefunden.", {"quarantaene_id": eintrag_id})
+            return None
+        except (OSError, ValueError, sqlite3.Error) as e:
+            QUARANTAENE_AKTIONEN.erhoehe(1, ("wiederherstellung_fehlgeschlagen",))
+            self.protokolliere_ereignis("fehler", f"Fehler beim Wiederherstellen des Quarantäne-Eintrags {eintrag_id}: {e}", {"quarantaene_id": eintrag_id, "fehler": str(e)})
+            return None
+        QUARANTAENE_AKTIONEN.erhoehe(1, ("wiederhergestellt",))
+        self.protokolliere_ereignis("aktion", f"Datei aus Quarantäne wiederhergestellt: '{ziel}'.", {"quarantaene_id": eintrag_id, "ziel_pfad": ziel})
+        return ziel
+
+    def loesche_eintraege(self, eintrag_ids):
+        """Löscht Quarantäne-Einträge endgültig. Gibt die Anzahl gelöschter Einträge zurück."""
+        entfernt = self.speicher.loesche(eintrag_ids)
+        QUARANTAENE_AKTIONEN.erhoehe(entfernt, ("geloescht",))
+        self.protokolliere_ereignis("aktion", f"{entfernt} Quarantäne-Eintrag/-Einträge endgültig gelöscht.", {"anzahl": entfernt})
+        return entfernt
+
+    def bereinige(self, aelter_als_tage):
+        """Löscht alle Quarantäne-Einträge, die älter als aelter_als_tage sind. Gibt die Anzahl gelöschter Einträge zurück."""
+        entfernt = self.speicher.bereinige(aelter_als_tage * 86400)
+        QUARANTAENE_AKTIONEN.erhoehe(entfernt, ("geloescht",))
+        self.protokolliere_ereignis("aktion", f"Quarantäne bereinigt: {entfernt} Eintrag/Einträge älter als {aelter_als_tage} Tage gelöscht.", {"anzahl": entfernt})
+        return entfernt
+
+    def get_statistik(self):
+        """Anzahl Einträge und Objekte, Original- und belegte Größe, Übertragungsarten und ausstehende Übertragungen."""
+        statistik = self.speicher.get_statistik()
+        statistik["ausstehende_transfers"] = len(self._ausstehende_transfers)
+        return statistik
 
     def protokolliere_ereignis(self, typ, meldung, daten=None):
         """Protokolliert ein Ereignis über das Logging-Modul."""
@@ -0,0 +1,225 @@
+import os
+import stat # Für Dateiattribute und Dateitypen
+from collections import namedtuple
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+# Kompakter Datensatz pro Datei. Die st_*-Felder heißen wie bei os.stat_result, damit der
+# Datensatz überall dort verwendet werden kann, wo bisher ein stat-Ergebnis erwartet wurde.
+DateiEintrag = namedtuple("DateiEintrag", ["pfad", "name", "st_size", "st_dev", "st_ino", "st_mtime_ns", "st_ctime_ns"])
+
+_ENDE_MARKIERUNG = "" # Schlüssel im Trie-Knoten, der einen ausgeschlossenen Pfad abschließt (Komponentennamen sind nie leer)
+
+def _pfad_komponenten(pfad):
+    """Zerlegt einen Pfad in normalisierte, kleingeschriebene Komponenten (Vergleich ohne Groß-/Kleinschreibung)."""
+    normalisiert = os.path.abspath(os.path.expandvars(pfad)).lower()
+    laufwerk, rest = os.path.splitdrive(normalisiert)
+    komponenten = [k for k in rest.replace("\\", "/").split("/") if k]
+    return ([laufwerk] if laufwerk else ["/"]) + komponenten
+
+class WalkPosition:
+    """
+    Fortsetzbare Position eines Durchlaufs (für Scan-Checkpoints): der Stapel noch nicht gelesener
+    Verzeichnisse und im aktuellen Verzeichnis die Anzahl der bis zur zuletzt gelieferten Datei
+    gelesenen Einträge. Der Walker aktualisiert sie nur beim Liefern einer Datei.
+    """
+    __slots__ = ("stapel", "verzeichnis", "index", "fortsetzung")
+
+    def __init__(self, fortsetzung=None):
+        self.stapel = [] # Wird vom Walker durch seinen Stapel ersetzt: [(pfad, trie_knoten)]
+        self.verzeichnis = None
+        self.index = 0
+        self.fortsetzung = fortsetzung # Stand eines früheren Durchlaufs (aus stand()), an dem fortgesetzt wird
+
+    def stand(self):
+        """Gibt die Position als JSON-serialisierbares Dictionary zurück (nur aufrufen, während der Walker angehalten ist)."""
+        mtime_ns = None
+        if self.verzeichnis:
+            try:
+                mtime_ns = os.stat(self.verzeichnis).st_mtime_ns # Geändertes Verzeichnis: Einträge beim Fortsetzen nicht überspringen
+            except OSError:
+                pass
+        return {"stapel": [pfad for pfad, _ in self.stapel], "verzeichnis": self.verzeichnis, "index": self.index, "mtime_ns": mtime_ns}
+
+class DateiWalker:
+    """
+    Durchläuft Verzeichnisbäume mit os.scandir.
+    Modul für das schnelle Auflisten zu prüfender Dateien.
+
+    - Ausgeschlossene Verzeichnisse werden einmalig in einen Präfix-Trie über Pfadkomponenten
+      kompiliert. Jeder Eintrag im Stapel trägt seinen Trie-Knoten mit, sodass pro Unterverzeichnis
+      nur ein Dictionary-Zugriff nötig ist und ausgeschlossene Teilbäume gar nicht betreten werden.
+    - Ignorierte Dateiendungen werden über ein frozenset geprüft.
+    - Die stat-Daten stammen aus DirEntry (unter Windows ohne zusätzlichen Systemaufruf); es wird
+      kein zweites os.stat pro Datei ausgeführt.
+    - st_file_attributes existiert nur unter Windows und wird optional ausgewertet.
+    - Mit einer WalkPosition kann ein Durchlauf später an derselben Stelle fortgesetzt werden.
+    """
+    def __init__(self, verzeichnisse_ignoriert, dateiendungen_ignoriert):
+        self.ausschluss_trie = {}
+        for verzeichnis in verzeichnisse_ignoriert or []:
+            knoten = self.ausschluss_trie
+            for komponente in _pfad_komponenten(verzeichnis):
+                knoten = knoten.setdefault(komponente, {})
+            knoten[_ENDE_MARKIERUNG] = True
+
+        endungen = [endung.lower() for endung in (dateiendungen_ignoriert or [])] + [".sys"] # .sys Dateien werden immer ausgeschlossen
+        self.endungen_ignoriert = frozenset(e for e in endungen if e.startswith("."))
+        self.max_endungs_punkte = max((e.count(".") for e in self.endungen_ignoriert), default=1)
+        self.endungen_ignoriert_sonstige = tuple(e for e in endungen if not e.startswith(".")) # z.B. "~" ohne Punkt
+
+    def _startknoten(self, basis_verzeichnis):
+        """Ermittelt den Trie-Knoten eines Basisverzeichnisses (None = kein Ausschluss mehr möglich, False = ausgeschlossen)."""
+        knoten = self.ausschluss_trie
+        for komponente in _pfad_komponenten(basis_verzeichnis):
+            knoten = knoten.get(komponente)
+            if knoten is None:
+                return None
+            if _ENDE_MARKIERUNG in knoten:
+                return False
+        return knoten
+
+    def ist_endung_ignoriert(self, datei_name):
+        """Prüft, ob die Dateiendung ignoriert wird (frozenset-Lookup statt linearer Suche)."""
+        name = datei_name.lower()
+        punkt = len(name)
+        for _ in range(self.max_endungs_punkte):
+            punkt = name.rfind(".", 0, punkt)
+            if punkt < 0:
+                break
+            if name[punkt:] in self.endungen_ignoriert:
+                return True
+        return bool(self.endungen_ignoriert_sonstige) and name.endswith(self.endungen_ignoriert_sonstige)
+
+    def ist_verzeichnis_ausgeschlossen(self, verzeichnis):
+        """Prüft, ob ein Verzeichnis in einem ausgeschlossenen Teilbaum liegt."""
+        return self._startknoten(verzeichnis) is False
+
+    def eintrag_fuer_datei(self, datei_pfad):
+        """
+        Liefert den DateiEintrag einer einzelnen Datei (z.B. aus einem Dateiereignis) oder None,
+        falls sie nicht geprüft wird (ausgeschlossen, ignorierte Endung, keine reguläre Datei, gelöscht).
+        """
+        if self.ist_endung_ignoriert(os.path.basename(datei_pfad)) or self.ist_verzeichnis_ausgeschlossen(os.path.dirname(datei_pfad)):
+            return None
+        try:
+            datei_stat = os.stat(datei_pfad, follow_symlinks=False)
+        except OSError:
+            return None
+        if not stat.S_ISREG(datei_stat.st_mode) or getattr(datei_stat, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_SYSTEM:
+            return None
+        return DateiEintrag(datei_pfad, os.path.basename(datei_pfad), datei_stat.st_size, datei_stat.st_dev, datei_stat.st_ino,
+                            datei_stat.st_mtime_ns, datei_stat.st_ctime_ns)
+
+    def _fortsetzungs_stapel(self, stand):
+        """Baut den Stapel aus einem gespeicherten Stand neu auf; inzwischen ausgeschlossene Verzeichnisse entfallen."""
+        stapel = []
+        for verzeichnis in stand["stapel"] + ([stand["verzeichnis"]] if stand["verzeichnis"] else []):
+            knoten = self._startknoten(verzeichnis)
+            if knoten is not False:
+                stapel.append((verzeichnis, knoten))
+        ueberspringen = 0
+        if stapel and stapel[-1][0] == stand["verzeichnis"] and stand["mtime_ns"] is not None:
+            try:
+                if os.stat(stand["verzeichnis"]).st_mtime_ns == stand["mtime_ns"]:
+                    ueberspringen = stand["index"] # Unverändert: gleiche Reihenfolge der Einträge
+            except OSError:
+                pass
+        return stapel, ueberspringen
+
+    def durchlaufe(self, basis_verzeichnis, bericht=None, position=None):
+        """
+        Liefert einen DateiEintrag für jede zu prüfende reguläre Datei unterhalb von basis_verzeichnis.
+        Mit einem ScanBericht werden stat-Aufrufe als eigene Stufe gemessen und übersprungene Einträge nach Grund gezählt.
+        Mit einer WalkPosition wird deren Stand fortgeführt: Im zuletzt gelesenen Verzeichnis werden die bereits
+        gelieferten Dateien übersprungen (nur falls es unverändert ist), Unterverzeichnisse werden erneut eingesammelt.
+        """
+        ueberspringen = 0
+        if position is not None and position.fortsetzung:
+            stapel, ueberspringen = self._fortsetzungs_stapel(position.fortsetzung)
+        else:
+            startknoten = self._startknoten(basis_verzeichnis)
+            if startknoten is False:
+                protokolliere_ereignis_global("debug", f"Verzeichnis '{basis_verzeichnis}' ignoriert (Systemverzeichnis).")
+                if bericht:
+                    bericht.uebersprungen_wegen("verzeichnis_ausgeschlossen")
+                return
+            stapel = [(basis_verzeichnis, startknoten)]
+        if position is not None:
+            position.stapel = stapel
+        basis_geraet = None
+        while stapel:
+            verzeichnis, knoten = stapel.pop()
+            bereits_geliefert, ueberspringen = ueberspringen, 0 # Nur im ersten (fortgesetzten) Verzeichnis
+            if position is not None:
+                position.verzeichnis = verzeichnis
+                position.index = 0
+            unterverzeichnisse = []
+            try:
+                with os.scandir(verzeichnis) as eintraege:
+                    for index, eintrag in enumerate(eintraege, 1):
+                        try:
+                            if eintrag.is_dir():
+                                if eintrag.is_symlink():
+                                    if bericht:
+                                        bericht.uebersprungen_wegen("verzeichnis_symlink")
+                                    continue  # Wie os.walk: symbolischen Links auf Verzeichnisse nicht folgen
+                                kind_knoten = knoten.get(eintrag.name.lower()) if knoten else None
+                                if kind_knoten is not None and _ENDE_MARKIERUNG in kind_knoten:
+                                    protokolliere_ereignis_global("debug", "Verzeichnis '{pfad}' ignoriert (Systemverzeichnis).", art="verzeichnis_ignoriert", pfad=eintrag.path)
+                                    if bericht:
+                                        bericht.uebersprungen_wegen("verzeichnis_ausgeschlossen")
+                                    continue  # Teilbaum einmalig abschneiden
+                                unterverzeichnisse.append((eintrag.path, kind_knoten))
+                                continue
+
+                            if index <= bereits_geliefert:
+                                continue # Vor dem Checkpoint bereits geliefert
+
+                            if self.ist_endung_ignoriert(eintrag.name):
+                                if bericht:
+                                    bericht.uebersprungen_wegen("endung_ignoriert")
+                                continue
+
+                            if bericht:
+                                with bericht.stufe("stat"):
+                                    datei_stat = eintrag.stat()
+                            else:
+                                datei_stat = eintrag.stat()
+                            if not stat.S_ISREG(datei_stat.st_mode):
+                                if bericht:
+                                    bericht.uebersprungen_wegen("keine_regulaere_datei")
+                                continue  # FIFOs, Sockets und Gerätedateien nicht öffnen
+                            # Systemdateien explizit ausschließen (Dateiattribut nur unter Windows vorhanden)
+                            if getattr(datei_stat, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_SYSTEM:
+                                if bericht:
+                                    bericht.uebersprungen_wegen("systemdatei")
+                                continue
+
+                            inode = datei_stat.st_ino
+                            geraet = datei_stat.st_dev
+                            if not inode:
+                                # Windows: DirEntry.stat() liefert keine Datei-ID und kein Volume
+                                inode = eintrag.inode()
+                                if basis_geraet is None:
+                                    basis_geraet = os.stat(basis_verzeichnis).st_dev
+                                geraet = basis_geraet
+                            if position is not None:
+                                position.index = index
+                            yield DateiEintrag(eintrag.path, eintrag.name, datei_stat.st_size, geraet, inode,
+                                               datei_stat.st_mtime_ns, datei_stat.st_ctime_ns)
+                        except OSError as e:
+                            protokolliere_ereignis_global("debug", "Eintrag '{pfad}' übersprungen: {fehler}", art="eintrag_uebersprungen", pfad=eintrag.path, fehler=str(e))
+                            if bericht:
+                                bericht.uebersprungen_wegen("eintrag_fehler")
+            except OSError as e:
+                protokolliere_ereignis_global("warnung", f"Verzeichnis '{verzeichnis}' kann nicht gelesen werden: {e}", {"verzeichnis": verzeichnis, "fehler": str(e)})
+                if bericht:
+                    bericht.uebersprungen_wegen("verzeichnis_nicht_lesbar")
+                continue
+            # Umgekehrt auf den Stapel legen, damit Unterverzeichnisse in Verzeichnisreihenfolge besucht werden
+            stapel.extend(reversed(unterverzeichnisse))
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
@@ -0,0 +1,61 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Token-Bucket-Ratenbegrenzer (thread-sicher).
+    Modul für die Drosselung von Anfragen an externe Dienste und ressourcenintensive Vorgänge.
+
+    Es werden `rate` Tokens pro Sekunde nachgefüllt, höchstens `kapazitaet` Tokens angespart
+    (Burst). `hole()` blockiert, bis genügend Tokens vorhanden sind, und gibt die Wartezeit zurück.
+    """
+    def __init__(self, rate, kapazitaet=None):
+        self.rate = float(rate)
+        self.kapazitaet = float(kapazitaet if kapazitaet is not None else max(1.0, self.rate))
+        self.tokens = self.kapazitaet
+        self.letzte_auffuellung = time.monotonic()
+        self.sperre = threading.Lock()
+        self.gesamt_wartezeit = 0.0 # Summe aller Wartezeiten in Sekunden
+
+    def _fuelle_auf(self, jetzt):
+        self.tokens = min(self.kapazitaet, self.tokens + (jetzt - self.letzte_auffuellung) * self.rate)
+        self.letzte_auffuellung = jetzt
+
+    def versuche_zu_holen(self, anzahl=1):
+        """Entnimmt `anzahl` Tokens, falls sofort verfügbar. Gibt True bei Erfolg zurück."""
+        with self.sperre:
+            self._fuelle_auf(time.monotonic())
+            if self.tokens >= anzahl:
+                self.tokens -= anzahl
+                return True
+            return False
+
+    def hole(self, anzahl=1, timeout=None):
+        """
+        Entnimmt `anzahl` Tokens und wartet dafür bei Bedarf.
+        Gibt die Wartezeit in Sekunden zurück oder None, falls `timeout` überschritten würde.
+        """
+        if self.rate <= 0:
+            return 0.0 # Drosselung deaktiviert
+        with self.sperre:
+            jetzt = time.monotonic()
+            self._fuelle_auf(jetzt)
+            fehlend = anzahl - self.tokens
+            wartezeit = max(0.0, fehlend / self.rate)
+            if timeout is not None and wartezeit > timeout:
+                return None
+            # Tokens sofort reservieren (Kontostand darf negativ werden), damit Wartende in Reihenfolge bedient werden
+            self.tokens -= anzahl
+            self.gesamt_wartezeit += wartezeit
+        if wartezeit:
+            time.sleep(wartezeit)
+        return wartezeit
+
+    def setze_rate(self, rate, kapazitaet=None):
+        """Ändert Rate und Kapazität zur Laufzeit."""
+        with self.sperre:
+            self._fuelle_auf(time.monotonic())
+            self.rate = float(rate)
+            if kapazitaet is not None:
+                self.kapazitaet = float(kapazitaet)
+            self.tokens = min(self.tokens, self.kapazitaet)
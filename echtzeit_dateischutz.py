@@ -0,0 +1,384 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import queue
+import select
+import statistics
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+from telemetrie import hole_telemetrie # Latenz-Histogramme für /metrics
+
+ECHTZEIT_DATEI_LATENZ = hole_telemetrie().histogramm("virenschutz_echtzeit_datei_latenz_sekunden", "Zeit vom ersten Dateiereignis bis zum Abschluss der Echtzeitprüfung.")
+
+# inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_INOTIFY_MASKE = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+_INOTIFY_EREIGNIS = struct.Struct("iIII") # wd, mask, cookie, len (danach len Bytes Name)
+
+# fanotify (linux/fanotify.h)
+FAN_CLOSE_WRITE = 0x00000008
+FAN_Q_OVERFLOW = 0x00004000
+FAN_CLOEXEC = 0x00000001
+FAN_NONBLOCK = 0x00000002
+FAN_CLASS_NOTIF = 0x00000000
+FAN_MARK_ADD = 0x00000001
+FAN_MARK_MOUNT = 0x00000010
+FAN_NOFD = -1
+AT_FDCWD = -100
+_FANOTIFY_EREIGNIS = struct.Struct("IBBHQii") # event_len, vers, reserved, metadata_len, mask, fd, pid
+
+_LESE_PUFFER_GROESSE = 64 * 1024
+_ENDE = object() # Markierung zum Beenden der Prüf-Worker
+
+def _lade_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+
+class InotifyQuelle:
+    """
+    Dateiereignisse über inotify (ohne Sonderrechte). Überwacht jedes Verzeichnis einzeln; neu
+    angelegte Verzeichnisse werden sofort mitüberwacht und ihr bereits vorhandener Inhalt gemeldet,
+    damit beim schnellen Entpacken keine Dateien zwischen Anlegen und Überwachung verloren gehen.
+    """
+    name = "inotify"
+
+    def __init__(self, libc, verzeichnisse, ist_ausgeschlossen):
+        self.libc = libc
+        self.verzeichnisse = verzeichnisse
+        self.ist_ausgeschlossen = ist_ausgeschlossen
+        self.fd = -1
+        self.watch_pfade = {} # Watch-Deskriptor -> Verzeichnispfad
+        self.ueberlauf = False # Kernel-Warteschlange übergelaufen (Ereignisse verloren)
+
+    def starte(self):
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_init1: {os.strerror(ctypes.get_errno())}")
+        for verzeichnis in self.verzeichnisse:
+            self._ueberwache_baum(verzeichnis, [])
+        protokolliere_ereignis_global("info", f"inotify überwacht {len(self.watch_pfade)} Verzeichnis(se).")
+
+    def _ueberwache_baum(self, basis_verzeichnis, gefundene_dateien):
+        """Fügt Watches für einen Verzeichnisbaum hinzu und sammelt darin vorhandene Dateien."""
+        stapel = [basis_verzeichnis]
+        while stapel:
+            verzeichnis = stapel.pop()
+            if self.ist_ausgeschlossen(verzeichnis):
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(verzeichnis), _INOTIFY_MASKE)
+            if wd < 0:
+                fehler = ctypes.get_errno()
+                if fehler == errno.ENOSPC:
+                    protokolliere_ereignis_global("warnung", f"inotify-Limit erreicht (fs.inotify.max_user_watches). Verzeichnis '{verzeichnis}' wird nicht in Echtzeit überwacht.")
+                    return
+                continue # Verzeichnis inzwischen gelöscht oder nicht lesbar
+            self.watch_pfade[wd] = verzeichnis
+            try:
+                with os.scandir(verzeichnis) as eintraege:
+                    for eintrag in eintraege:
+                        if eintrag.is_dir(follow_symlinks=False):
+                            stapel.append(eintrag.path)
+                        else:
+                            gefundene_dateien.append(eintrag.path)
+            except OSError:
+                continue
+
+    def lese_ereignisse(self):
+        """Liest alle anstehenden Ereignisse (nicht blockierend). Gibt die Liste geänderter Dateipfade zurück."""
+        pfade = []
+        while True:
+            try:
+                daten = os.read(self.fd, _LESE_PUFFER_GROESSE)
+            except BlockingIOError:
+                return pfade
+            position = 0
+            while position < len(daten):
+                wd, maske, _, name_laenge = _INOTIFY_EREIGNIS.unpack_from(daten, position)
+                position += _INOTIFY_EREIGNIS.size
+                name = daten[position:position + name_laenge].rstrip(b"\0")
+                position += name_laenge
+                if maske & IN_Q_OVERFLOW:
+                    self.ueberlauf = True
+                    continue
+                if maske & IN_IGNORED:
+                    self.watch_pfade.pop(wd, None)
+                    continue
+                verzeichnis = self.watch_pfade.get(wd)
+                if verzeichnis is None or not name:
+                    continue
+                pfad = os.path.join(verzeichnis, os.fsdecode(name))
+                if maske & IN_ISDIR:
+                    if maske & (IN_CREATE | IN_MOVED_TO):
+                        self._ueberwache_baum(pfad, pfade)
+                elif maske & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    pfade.append(pfad)
+
+    def schliesse(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        self.watch_pfade.clear()
+
+class FanotifyQuelle:
+    """
+    Dateiereignisse über fanotify (benötigt CAP_SYS_ADMIN). Eine Markierung pro Mount deckt den
+    ganzen Baum ohne Watch pro Verzeichnis ab; Ereignisse außerhalb der überwachten Verzeichnisse
+    und Schreibzugriffe des Virenschutzes selbst werden verworfen.
+    """
+    name = "fanotify"
+
+    def __init__(self, libc, verzeichnisse, ist_ausgeschlossen):
+        self.libc = libc
+        self.verzeichnisse = [os.path.join(os.path.abspath(verzeichnis), "") for verzeichnis in verzeichnisse]
+        self.ist_ausgeschlossen = ist_ausgeschlossen
+        self.fd = -1
+        self.eigene_pid = os.getpid()
+        self.ueberlauf = False
+
+    def starte(self):
+        self.libc.fanotify_mark.argtypes = [ctypes.c_int, ctypes.c_uint, ctypes.c_uint64, ctypes.c_int, ctypes.c_char_p]
+        self.fd = self.libc.fanotify_init(FAN_CLASS_NOTIF | FAN_CLOEXEC | FAN_NONBLOCK, os.O_RDONLY | getattr(os, "O_LARGEFILE", 0) | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), f"fanotify_init: {os.strerror(ctypes.get_errno())}")
+        for verzeichnis in self.verzeichnisse:
+            if self.libc.fanotify_mark(self.fd, FAN_MARK_ADD | FAN_MARK_MOUNT, FAN_CLOSE_WRITE, AT_FDCWD, os.fsencode(verzeichnis)) < 0:
+                fehler = ctypes.get_errno()
+                self.schliesse()
+                raise OSError(fehler, f"fanotify_mark '{verzeichnis}': {os.strerror(fehler)}")
+        protokolliere_ereignis_global("info", f"fanotify überwacht die Mounts von {len(self.verzeichnisse)} Verzeichnis(sen).")
+
+    def lese_ereignisse(self):
+        pfade = []
+        while True:
+            try:
+                daten = os.read(self.fd, _LESE_PUFFER_GROESSE)
+            except BlockingIOError:
+                return pfade
+            position = 0
+            while position + _FANOTIFY_EREIGNIS.size <= len(daten):
+                ereignis_laenge, _, _, _, maske, datei_fd, pid = _FANOTIFY_EREIGNIS.unpack_from(daten, position)
+                position += ereignis_laenge
+                if maske & FAN_Q_OVERFLOW:
+                    self.ueberlauf = True
+                if datei_fd == FAN_NOFD:
+                    continue
+                try:
+                    if pid != self.eigene_pid:
+                        pfad = os.readlink(f"/proc/self/fd/{datei_fd}")
+                        if pfad.startswith(tuple(self.verzeichnisse)) and not self.ist_ausgeschlossen(os.path.dirname(pfad)):
+                            pfade.append(pfad)
+                except OSError:
+                    pass
+                finally:
+                    os.close(datei_fd)
+
+    def schliesse(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+class Entpreller:
+    """
+    Fasst Ereignisse pro Pfad zusammen. Ein Pfad wird `entprell_sekunden` nach seinem ersten Ereignis
+    fällig; weitere Ereignisse bis dahin verschieben die Frist nicht (begrenzte Latenz auch bei
+    Dateien, die ständig geschrieben werden). Da die Frist nur vom ersten Ereignis abhängt, ist die
+    Einfügereihenfolge zugleich die Fälligkeitsreihenfolge (OrderedDict als FIFO).
+    """
+    def __init__(self, entprell_sekunden, max_ausstehend):
+        self.entprell_sekunden = entprell_sekunden
+        self.max_ausstehend = max_ausstehend
+        self.ausstehend = OrderedDict() # pfad -> Zeitpunkt des ersten Ereignisses (time.monotonic)
+        self.zusammengefasst = 0
+        self.verworfen = 0
+        self.ueberlauf = False # Pfade verworfen (max_ausstehend erreicht): wie ein Kernel-Überlauf erneut prüfen
+
+    def melde(self, pfad, jetzt):
+        if pfad in self.ausstehend:
+            self.zusammengefasst += 1
+        elif len(self.ausstehend) < self.max_ausstehend:
+            self.ausstehend[pfad] = jetzt
+        else:
+            self.verworfen += 1
+            self.ueberlauf = True
+
+    def naechste_frist(self):
+        """Zeitpunkt, zu dem der nächste Pfad fällig wird (None, wenn nichts aussteht)."""
+        for erstes_ereignis in self.ausstehend.values():
+            return erstes_ereignis + self.entprell_sekunden
+        return None
+
+    def uebergebe_faellige(self, jetzt, ziel_queue):
+        """Reiht fällige Pfade in ziel_queue ein, solange dort Platz ist; der Rest bleibt ausstehend."""
+        grenze = jetzt - self.entprell_sekunden
+        while self.ausstehend:
+            pfad, erstes_ereignis = next(iter(self.ausstehend.items()))
+            if erstes_ereignis > grenze:
+                return
+            try:
+                ziel_queue.put_nowait((pfad, erstes_ereignis))
+            except queue.Full:
+                return # Backpressure: weitere Ereignisse für diese Pfade werden weiter zusammengefasst
+            del self.ausstehend[pfad]
+
+class EchtzeitDateiSchutz:
+    """
+    Echtzeit-Dateischutz für Linux.
+    Modul für die Prüfung neuer und geänderter Dateien unmittelbar nach dem Schreiben.
+
+    Ein Ereignis-Thread liest inotify- bzw. fanotify-Ereignisse (fanotify, falls bevorzugt und die
+    Rechte ausreichen), entprellt sie und füllt eine begrenzte Prüf-Queue. Prüf-Worker übergeben
+    jede Datei an `SystemÜberprüfungsManager.pruefe_datei_echtzeit` (Scan-Cache, Hash- und
+    Signaturprüfung, _analysiere_datei, Quarantäne wie bei der Systemprüfung).
+    """
+    def __init__(self, system_pruefungs_manager, verzeichnisse, entprell_ms=100, queue_groesse=4096, worker_anzahl=2,
+                 fanotify_bevorzugt=True, max_ausstehend=100000):
+        self.manager = system_pruefungs_manager
+        self.verzeichnisse = [verzeichnis for verzeichnis in verzeichnisse if os.path.isdir(verzeichnis)]
+        self.entpreller = Entpreller(entprell_ms / 1000, max_ausstehend)
+        self.pruef_queue = queue.Queue(maxsize=max(1, int(queue_groesse)))
+        self.worker_anzahl = max(1, int(worker_anzahl))
+        self.fanotify_bevorzugt = fanotify_bevorzugt
+        self.quelle = None
+        self.aktiv = False
+        self.ereignis_thread = None
+        self.worker_threads = []
+        self.sperre = threading.Lock()
+        self.gepruefte_dateien = 0
+        self.bedrohungen = 0
+        self.latenzen = deque(maxlen=1000) # Sekunden vom ersten Ereignis bis zum Urteil (letzte 1000 Dateien)
+
+    @staticmethod
+    def ist_verfuegbar():
+        """inotify (und ggf. fanotify) gibt es nur unter Linux."""
+        libc = _lade_libc()
+        return libc is not None and hasattr(libc, "inotify_init1")
+
+    def starte(self):
+        """Startet Ereignisquelle, Ereignis-Thread und Prüf-Worker. Gibt True bei Erfolg zurück."""
+        libc = _lade_libc()
+        if libc is None or not self.verzeichnisse:
+            protokolliere_ereignis_global("info", "Echtzeit-Dateischutz nicht verfügbar (kein Linux oder keine überwachbaren Verzeichnisse).")
+            return False
+        ist_ausgeschlossen = self.manager.datei_walker.ist_verzeichnis_ausgeschlossen
+        quellen = [FanotifyQuelle, InotifyQuelle] if self.fanotify_bevorzugt and hasattr(libc, "fanotify_init") else [InotifyQuelle]
+        for quellen_klasse in quellen:
+            quelle = quellen_klasse(libc, self.verzeichnisse, ist_ausgeschlossen)
+            try:
+                quelle.starte()
+                self.quelle = quelle
+                break
+            except OSError as e:
+                quelle.schliesse()
+                protokolliere_ereignis_global("debug", f"Dateiereignisquelle {quelle.name} nicht nutzbar: {e}", {"fehler": str(e)})
+        if self.quelle is None:
+            protokolliere_ereignis_global("warnung", "Echtzeit-Dateischutz konnte nicht gestartet werden (weder fanotify noch inotify verfügbar).")
+            return False
+
+        self.aktiv = True
+        self.ereignis_thread = threading.Thread(target=self._ereignis_schleife, daemon=True)
+        self.worker_threads = [threading.Thread(target=self._pruef_worker, daemon=True) for _ in range(self.worker_anzahl)]
+        self.ereignis_thread.start()
+        for worker_thread in self.worker_threads:
+            worker_thread.start()
+        protokolliere_ereignis_global("info", f"Echtzeit-Dateischutz gestartet ({self.quelle.name}) für: {self.verzeichnisse}")
+        return True
+
+    def stoppe(self):
+        """Beendet Ereignis-Thread und Prüf-Worker und schließt die Ereignisquelle."""
+        if not self.aktiv:
+            return
+        self.aktiv = False
+        if self.ereignis_thread:
+            self.ereignis_thread.join(timeout=5)
+        for _ in self.worker_threads:
+            self.pruef_queue.put(_ENDE)
+        for worker_thread in self.worker_threads:
+            worker_thread.join(timeout=5)
+        self.quelle.schliesse()
+        protokolliere_ereignis_global("info", "Echtzeit-Dateischutz gestoppt.")
+
+    def laeuft(self):
+        return self.aktiv and self.ereignis_thread is not None and self.ereignis_thread.is_alive()
+
+    def _ereignis_schleife(self):
+        poller = select.poll()
+        poller.register(self.quelle.fd, select.POLLIN)
+        while self.aktiv:
+            frist = self.entpreller.naechste_frist()
+            wartezeit = 0.2 if frist is None else min(0.2, max(0.0, frist - time.monotonic()))
+            try:
+                if poller.poll(wartezeit * 1000):
+                    jetzt = time.monotonic()
+                    for pfad in self.quelle.lese_ereignisse():
+                        self.entpreller.melde(pfad, jetzt)
+                self.entpreller.uebergebe_faellige(time.monotonic(), self.pruef_queue)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Fehler im Echtzeit-Dateischutz (Ereignisse): {e}", {"fehler": str(e)})
+                time.sleep(0.2)
+            if self.quelle.ueberlauf or self.entpreller.ueberlauf:
+                warteschlange = f"Ereignis-Warteschlange von {self.quelle.name}" if self.quelle.ueberlauf else f"Entprell-Warteschlange ({self.entpreller.max_ausstehend} Pfade)"
+                self.quelle.ueberlauf = self.entpreller.ueberlauf = False
+                protokolliere_ereignis_global("warnung", f"{warteschlange} übergelaufen; Dateiänderungen können fehlen. Die überwachten Verzeichnisse werden erneut geprüft.")
+                self.manager.scan_scheduler.reiche_ein("echtzeit", self.verzeichnisse) # Wiederholte Überläufe werden zusammengeführt
+
+    def _pruef_worker(self):
+        while True:
+            eintrag = self.pruef_queue.get()
+            if eintrag is _ENDE:
+                return
+            datei_pfad, erstes_ereignis = eintrag
+            try:
+                ergebnis = self.manager.pruefe_datei_echtzeit(datei_pfad)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Fehler im Echtzeit-Dateischutz für '{datei_pfad}': {e}", {"datei_pfad": datei_pfad, "fehler": str(e)})
+                continue
+            if ergebnis is None:
+                continue # Datei ausgeschlossen oder inzwischen gelöscht
+            latenz = time.monotonic() - erstes_ereignis
+            ECHTZEIT_DATEI_LATENZ.beobachte(latenz)
+            with self.sperre:
+                self.gepruefte_dateien += 1
+                if ergebnis == "bedrohung":
+                    self.bedrohungen += 1
+                self.latenzen.append(latenz)
+
+    def get_statistik(self):
+        """Gibt Quelle, Zähler, Queue-Füllstand und Latenzen (Median, Maximum der letzten 1000 Dateien) zurück."""
+        with self.sperre:
+            latenzen = list(self.latenzen)
+            statistik = {"quelle": self.quelle.name if self.quelle else None, "gepruefte_dateien": self.gepruefte_dateien, "bedrohungen": self.bedrohungen}
+        statistik.update({
+            "ausstehend": len(self.entpreller.ausstehend),
+            "zusammengefasst": self.entpreller.zusammengefasst,
+            "verworfen": self.entpreller.verworfen,
+            "queue_fuellstand": self.pruef_queue.qsize(),
+            "latenz_median_ms": round(statistics.median(latenzen) * 1000, 1) if latenzen else None,
+            "latenz_max_ms": round(max(latenzen) * 1000, 1) if latenzen else None,
+        })
+        return statistik
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
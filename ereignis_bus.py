@@ -0,0 +1,79 @@
+import collections
+import itertools
+import json
+import threading
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+class EreignisBus:
+    """
+    Verteilt Änderungsereignisse (Log-Einträge, Erkennungen, Scan-Fortschritt, Metriken) an alle Stream-Clients.
+    Modul für den Server-Sent-Events-Stream der Web-UI (/api/stream).
+
+    - Jedes Ereignis erhält eine fortlaufende ID und wird beim Veröffentlichen genau einmal als SSE-Frame
+      kodiert; alle Clients erhalten dieselben Bytes. Die Kosten pro Ereignis hängen damit nicht von der
+      Anzahl der Clients ab (bis auf das Versenden selbst).
+    - Die letzten puffer_groesse Frames werden vorgehalten, damit ein Client nach einem Verbindungsabbruch
+      über Last-Event-ID fortsetzen kann. Liegt seine ID außerhalb des Puffers, erhält er ein "reset"-Ereignis
+      und lädt den Zustand neu.
+    """
+    def __init__(self, puffer_groesse=1000):
+        self._puffer = collections.deque(maxlen=puffer_groesse) # (id, frame)
+        self._bedingung = threading.Condition()
+        self.letzte_id = 0
+        self.abonnenten = 0 # Verbundene Stream-Clients
+        self.veroeffentlicht = 0
+
+    def veroeffentliche(self, typ, daten):
+        """Kodiert ein Ereignis einmalig als SSE-Frame und weckt alle wartenden Clients. Gibt die Ereignis-ID zurück."""
+        nutzlast = json.dumps(daten, ensure_ascii=False, default=str, separators=(",", ":"))
+        with self._bedingung:
+            self.letzte_id += 1
+            ereignis_id = self.letzte_id
+            # backslashreplace: Dateinamen ohne gültiges UTF-8 (Surrogates) werden zu \udc..-Escapes im JSON-String
+            self._puffer.append((ereignis_id, f"id: {ereignis_id}\nevent: {typ}\ndata: {nutzlast}\n\n".encode("utf-8", "backslashreplace")))
+            self.veroeffentlicht += 1
+            self._bedingung.notify_all()
+        return ereignis_id
+
+    def hole_seit(self, letzte_id, timeout):
+        """
+        Wartet höchstens timeout Sekunden auf Ereignisse nach letzte_id.
+        Gibt (frames, neue_letzte_id) zurück; frames ist None, wenn letzte_id nicht mehr im Puffer liegt (Client muss neu laden).
+        """
+        with self._bedingung:
+            if letzte_id == self.letzte_id:
+                self._bedingung.wait(timeout)
+            if letzte_id > self.letzte_id or (self._puffer and letzte_id < self._puffer[0][0] - 1):
+                return None, self.letzte_id # Unbekannte ID (z.B. Neustart des Servers) oder aus dem Puffer verdrängt
+            if letzte_id == self.letzte_id:
+                return [], letzte_id
+            # IDs im Puffer sind lückenlos: erster fehlender Frame über seinen Abstand zur ältesten ID
+            frames = [frame for _, frame in itertools.islice(self._puffer, letzte_id + 1 - self._puffer[0][0], None)]
+            return frames, self.letzte_id
+
+    def melde_an(self):
+        with self._bedingung:
+            self.abonnenten += 1
+
+    def melde_ab(self):
+        with self._bedingung:
+            self.abonnenten -= 1
+
+    def get_statistik(self):
+        """Gibt verbundene Clients, veröffentlichte Ereignisse und die letzte ID zurück."""
+        return {"abonnenten": self.abonnenten, "veroeffentlicht": self.veroeffentlicht, "letzte_id": self.letzte_id, "gepuffert": len(self._puffer)}
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
+
+_bus = EreignisBus()
+
+def hole_ereignis_bus():
+    """Gibt den globalen Ereignisbus zurück."""
+    return _bus
+
+def veroeffentliche_ereignis_global(typ, daten):
+    """Globale Funktion zum Veröffentlichen eines Ereignisses für die Stream-Clients der Web-UI."""
+    return _bus.veroeffentliche(typ, daten)
@@ -0,0 +1,270 @@
+import mmap
+import os
+import struct
+import threading
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+IOC_REGEL_NAME = "Threat-Intelligence-Indikator" # Regelname für Treffer im IOC-Index (Scan-Ergebnis und Log)
+
+DIGEST_LAENGE = 32 # Rohes SHA-256
+BLOOM_MIN_BITS_PRO_EINTRAG = 12 # Größe wird auf eine Zweierpotenz aufgerundet (12-24 Bit pro Indikator, 10 Mio.: 16 MB)
+BLOOM_HASHFUNKTIONEN = 2 # Beide Positionen stammen aus den letzten 8 Bytes des Digests (höchstens 1-2 % Falsch-Positive)
+
+# Snapshot-Format (Little Endian):
+#   Kopf (128 Bytes): Magic, Anzahl Digests, Bloom-Bits, Bloom-Hashfunktionen, reserviert, TI-Version (64 Bytes ASCII)
+#   Bloom-Filter (Bloom-Bits / 8 Bytes, auf 8 Bytes aufgerundet)
+#   Sortiertes Array der 32-Byte-Digests
+_MAGIC = b"IOCIDX01"
+_KOPF = struct.Struct("<8sQQII64s")
+_KOPF_LAENGE = 128
+
+def digest_aus_indikator(indikator):
+    """Wandelt einen SHA-256-Indikator ("ab12...", "sha256:AB12...") in 32 Rohbytes um; andere Indikatoren ergeben None."""
+    if isinstance(indikator, bytes) and len(indikator) == DIGEST_LAENGE:
+        return indikator
+    text = str(indikator).strip().lower()
+    if text.startswith("sha256:"):
+        text = text[7:]
+    if len(text) != 2 * DIGEST_LAENGE:
+        return None
+    try:
+        return bytes.fromhex(text)
+    except ValueError:
+        return None
+
+class _IOCZustand:
+    """
+    Unveränderlicher Stand eines geladenen Snapshots (mmap, Bloom-Filter, Maske, Anzahl). Wird als Ganzes ausgetauscht;
+    Leser zählen sich für die Suche im mmap an, damit es erst nach der letzten laufenden Suche geschlossen wird.
+    """
+    __slots__ = ("datei", "abbild", "bloom", "maske", "anzahl", "array_beginn", "version", "sperre", "leser", "geschlossen", "frei")
+
+    def __init__(self, datei, abbild, bloom, bloom_bits, anzahl, array_beginn, version):
+        self.datei = datei
+        self.abbild = abbild
+        self.bloom = bloom
+        self.maske = bloom_bits - 1
+        self.anzahl = anzahl
+        self.array_beginn = array_beginn
+        self.version = version
+        self.sperre = threading.Lock() # Schützt leser und geschlossen
+        self.leser = 0
+        self.geschlossen = False
+        self.frei = threading.Event() # Gesetzt, sobald nach dem Schließen der letzte Leser fertig ist
+
+    def schliesse(self):
+        """Sperrt neue Leser aus, wartet auf laufende Suchen (Mikrosekunden) und gibt mmap und Datei frei."""
+        with self.sperre:
+            self.geschlossen = True
+            warten = self.leser > 0
+        if warten:
+            self.frei.wait()
+        self.abbild.close()
+        self.datei.close()
+
+class IOCIndex:
+    """
+    Kompakter Index der Datei-Hashes aus der Threat Intelligence.
+    Modul für die Prüfung jedes Datei-Hashes gegen Millionen von Indikatoren.
+
+    Die Digests liegen sortiert in einer per mmap eingeblendeten Snapshot-Datei und belegen damit
+    keinen Python-Speicher; resident ist nur der Bloom-Filter (bei 10 Mio. Indikatoren 16 MB).
+    SHA-256-Digests sind bereits gleichverteilt, daher werden die Bloom-Positionen direkt aus den
+    letzten 8 Bytes des Digests genommen (bei Hex-Strings ohne vorherige Umwandlung des ganzen Hashes).
+    Der Bloom-Filter beantwortet fast alle negativen Anfragen, ohne das Array zu berühren; nur bei
+    einem Bloom-Treffer wird per Interpolationssuche im Array gesucht. Beim Start wird der Snapshot
+    lediglich geöffnet.
+    """
+    def __init__(self, snapshot_datei_pfad):
+        self.snapshot_datei_pfad = snapshot_datei_pfad
+        self.sperre = threading.Lock() # Serialisiert Neuaufbau und Öffnen
+        self._zustand = None # _IOCZustand; Austausch mit einer einzigen Zuweisung, Leser lesen das Attribut einmal
+        self.lade_snapshot()
+
+    @property
+    def anzahl(self):
+        zustand = self._zustand
+        return zustand.anzahl if zustand else 0
+
+    @property
+    def version(self):
+        zustand = self._zustand
+        return zustand.version if zustand else ""
+
+    @property
+    def bloom(self):
+        zustand = self._zustand
+        return zustand.bloom if zustand else b""
+
+    def lade_snapshot(self):
+        """Öffnet den Snapshot (falls vorhanden). Gibt True zurück, wenn ein gültiger Snapshot geladen wurde."""
+        with self.sperre:
+            if not os.path.exists(self.snapshot_datei_pfad):
+                self._schliesse()
+                protokolliere_ereignis_global("debug", f"Kein IOC-Snapshot unter '{self.snapshot_datei_pfad}' vorhanden.")
+                return False
+            datei = abbild = None
+            try:
+                datei = open(self.snapshot_datei_pfad, "rb")
+                abbild = mmap.mmap(datei.fileno(), 0, access=mmap.ACCESS_READ) # ValueError bei leerer Datei
+                magic, anzahl, bloom_bits, bloom_hashfunktionen, _, version = _KOPF.unpack_from(abbild, 0)
+                bloom_laenge = self._bloom_laenge(bloom_bits)
+                if magic != _MAGIC or len(abbild) != _KOPF_LAENGE + bloom_laenge + anzahl * DIGEST_LAENGE:
+                    raise ValueError("Ungültiger Kopf oder unerwartete Dateigröße.")
+                if bloom_hashfunktionen != BLOOM_HASHFUNKTIONEN or bloom_bits & (bloom_bits - 1):
+                    raise ValueError("Nicht unterstütztes Bloom-Filter-Format.")
+            except (OSError, ValueError, struct.error) as e:
+                if abbild is not None:
+                    abbild.close()
+                if datei is not None:
+                    datei.close()
+                protokolliere_ereignis_global("warnung", f"IOC-Snapshot '{self.snapshot_datei_pfad}' konnte nicht geladen werden: {e}", {"datei": self.snapshot_datei_pfad, "fehler": str(e)})
+                self._schliesse()
+                return False
+            # Bloom-Filter resident halten; der alte Stand bleibt bis zum Austausch abfragbar
+            alt, self._zustand = self._zustand, _IOCZustand(datei, abbild, abbild[_KOPF_LAENGE:_KOPF_LAENGE + bloom_laenge], bloom_bits, anzahl,
+                                        _KOPF_LAENGE + bloom_laenge, version.rstrip(b"\0").decode("ascii"))
+            if alt is not None:
+                alt.schliesse()
+        protokolliere_ereignis_global("info", f"IOC-Index geladen: {anzahl} Indikatoren, Bloom-Filter {len(self.bloom) / 1e6:.1f} MB.", {"anzahl": anzahl, "version": self.version})
+        return True
+
+    @staticmethod
+    def _bloom_laenge(bloom_bits):
+        return ((bloom_bits + 63) // 64) * 8
+
+    def _schliesse(self):
+        zustand, self._zustand = self._zustand, None
+        if zustand is not None:
+            zustand.schliesse()
+
+    def schliesse(self):
+        """Gibt mmap und Datei-Handle frei."""
+        with self.sperre:
+            self._schliesse()
+
+    def baue_neu(self, indikatoren, version):
+        """
+        Baut den Snapshot aus den Indikatoren neu auf und lädt ihn. Nicht-SHA-256-Indikatoren (z.B. IPs) werden übersprungen.
+        Der Snapshot wird in eine temporäre Datei geschrieben und atomar ersetzt.
+        """
+        digests = sorted({digest for digest in map(digest_aus_indikator, indikatoren) if digest})
+        anzahl = len(digests)
+        bloom_bits = 64
+        while bloom_bits < anzahl * BLOOM_MIN_BITS_PRO_EINTRAG:
+            bloom_bits *= 2
+        if bloom_bits > 1 << 32:
+            protokolliere_ereignis_global("fehler", f"Zu viele Indikatoren für den IOC-Index: {anzahl}.", {"anzahl": anzahl})
+            return False
+        maske = bloom_bits - 1
+        bloom = bytearray(self._bloom_laenge(bloom_bits))
+        for digest in digests:
+            wert = int.from_bytes(digest[24:], "big")
+            for bit in (wert & maske, (wert >> 32) & maske):
+                bloom[bit >> 3] |= 1 << (bit & 7)
+
+        temp_pfad = f"{self.snapshot_datei_pfad}.tmp"
+        try:
+            verzeichnis = os.path.dirname(os.path.abspath(self.snapshot_datei_pfad))
+            os.makedirs(verzeichnis, exist_ok=True)
+            with open(temp_pfad, "wb") as datei:
+                kopf = _KOPF.pack(_MAGIC, anzahl, bloom_bits, BLOOM_HASHFUNKTIONEN, 0, version.encode("ascii")[:64])
+                datei.write(kopf.ljust(_KOPF_LAENGE, b"\0"))
+                datei.write(bloom)
+                datei.write(b"".join(digests))
+                datei.flush()
+                os.fsync(datei.fileno())
+            with self.sperre:
+                if os.name == "nt":
+                    self._schliesse() # Unter Windows kann eine eingeblendete Datei nicht ersetzt werden
+                os.replace(temp_pfad, self.snapshot_datei_pfad) # Sonst bleibt der alte Snapshot bis zum Laden des neuen abfragbar
+        except OSError as e:
+            protokolliere_ereignis_global("fehler", f"Fehler beim Schreiben des IOC-Snapshots '{self.snapshot_datei_pfad}': {e}", {"datei": self.snapshot_datei_pfad, "fehler": str(e)})
+            return False
+        protokolliere_ereignis_global("info", f"IOC-Index neu aufgebaut: {anzahl} SHA-256-Indikatoren.", {"anzahl": anzahl, "version": version})
+        return self.lade_snapshot()
+
+    def enthaelt(self, datei_hash):
+        """Prüft, ob ein Datei-Hash (Hex-String oder 32 Rohbytes) als Indikator bekannt ist."""
+        try:
+            if isinstance(datei_hash, str):
+                if len(datei_hash) != 2 * DIGEST_LAENGE:
+                    return False
+                wert = int(datei_hash[48:], 16)
+            else:
+                if len(datei_hash) != DIGEST_LAENGE:
+                    return False
+                wert = int.from_bytes(datei_hash[24:], "big")
+        except ValueError: # Kein Hex-String
+            return False
+        while True:
+            zustand = self._zustand # Bloom-Filter, Maske und mmap stammen immer aus demselben Snapshot
+            if zustand is None:
+                return False
+            # Bloom-Filter (2 Positionen aus den letzten 8 Bytes); bei einem nicht gesetzten Bit sofort abbrechen
+            bloom = zustand.bloom
+            bit = wert & zustand.maske
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                return False
+            bit = (wert >> 32) & zustand.maske
+            if not bloom[bit >> 3] & (1 << (bit & 7)):
+                return False
+            with zustand.sperre:
+                if zustand.geschlossen:
+                    continue # Während eines Neuaufbaus: mit dem neuen Snapshot erneut prüfen
+                zustand.leser += 1
+            try:
+                return self._suche(zustand, bytes.fromhex(datei_hash) if isinstance(datei_hash, str) else datei_hash)
+            except ValueError: # Kein Hex-String
+                return False
+            finally:
+                with zustand.sperre:
+                    zustand.leser -= 1
+                    if zustand.geschlossen and not zustand.leser:
+                        zustand.frei.set()
+
+    def _suche(self, zustand, digest):
+        """Interpolationssuche im sortierten Digest-Array mit exponentieller Eingrenzung und Binärsuche."""
+        abbild = zustand.abbild
+        anzahl = zustand.anzahl
+        beginn = zustand.array_beginn
+        def eintrag(index):
+            position = beginn + index * DIGEST_LAENGE
+            return abbild[position:position + DIGEST_LAENGE]
+        schaetzung = min(anzahl - 1, (int.from_bytes(digest[:8], "big") * anzahl) >> 64)
+        wert = eintrag(schaetzung)
+        if wert == digest:
+            return True
+        # Von der Schätzung aus exponentiell in Richtung des Ziels eingrenzen
+        schritt = 1
+        if wert < digest:
+            unten, oben = schaetzung + 1, min(anzahl - 1, schaetzung + 1)
+            while oben < anzahl - 1 and eintrag(oben) < digest:
+                unten = oben + 1
+                schritt *= 2
+                oben = min(anzahl - 1, schaetzung + schritt)
+        else:
+            unten, oben = max(0, schaetzung - 1), schaetzung - 1
+            while unten > 0 and eintrag(unten) > digest:
+                oben = unten - 1
+                schritt *= 2
+                unten = max(0, schaetzung - schritt)
+        while unten <= oben:
+            mitte = (unten + oben) // 2
+            wert = eintrag(mitte)
+            if wert == digest:
+                return True
+            if wert < digest:
+                unten = mitte + 1
+            else:
+                oben = mitte - 1
+        return False
+
+    def get_statistik(self):
+        """Gibt Anzahl, Version und Speicherbedarf des Bloom-Filters zurück."""
+        return {"anzahl": self.anzahl, "version": self.version, "bloom_bytes": len(self.bloom), "snapshot_datei": self.snapshot_datei_pfad}
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
@@ -1,8 +1,46 @@
-import google.generativeai as genai # Gemini API import
+try:
+    import google.generativeai as genai # Gemini API import
+except ImportError: # Optional: ohne Paket steht nur das lokale Stub-Modell zur Verfügung (z.B. Benchmarks offline)
+    genai = None
 # Importiere die globale Protokollierungsfunktion aus logging_utils.py
 from logging_utils import protokolliere_ereignis_global
 import time # Für Simulationen
 import os
+import re
+import hashlib
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+from drosselung import TokenBucket # Ratenbegrenzung der Modellanfragen
+from ki_urteil_cache import KIUrteilCache, berechne_prozess_identitaet # Persistenter Cache für KI-Urteile
+from telemetrie import hole_telemetrie # Latenz-Histogramme für /metrics
+
+_BATCH_ENDE = object() # Markierung zum Beenden des Batch-Threads
+_ANTWORT_ZEILE = re.compile(r"^\s*(\d+)\s*[:.)]\s*(.*)$")
+KI_ANFRAGE_DAUER = hole_telemetrie().histogramm("virenschutz_ki_anfrage_dauer_sekunden", "Dauer der Anfragen an das KI-Modell nach Ergebnis.", ("ergebnis",))
+
+class LokalesStubModell:
+    """
+    Lokales Stub-Modell mit der Schnittstelle von genai.GenerativeModel (generate_content -> .text).
+    Für Tests und Benchmarks ohne API-Schlüssel: beantwortet Batch-Prompts Zeile für Zeile nach
+    einer konfigurierbaren Latenz; Prozesse mit einem der Muster im Namen gelten als verdächtig.
+    """
+    def __init__(self, latenz_sekunden=0.5, verdaechtige_muster=("wscript", "cscript")):
+        self.latenz_sekunden = latenz_sekunden
+        self.verdaechtige_muster = tuple(muster.lower() for muster in verdaechtige_muster)
+        self.anfragen = 0
+
+    def generate_content(self, prompt):
+        self.anfragen += 1
+        time.sleep(self.latenz_sekunden)
+        zeilen = []
+        for nummer, prozess_name in re.findall(r"^(\d+)\. Prozess '([^']*)'", prompt, re.MULTILINE):
+            if any(muster in prozess_name.lower() for muster in self.verdaechtige_muster):
+                zeilen.append(f"{nummer}: verdächtig - Skript-Interpreter wird häufig von Schadsoftware missbraucht.")
+            else:
+                zeilen.append(f"{nummer}: normal - Keine Auffälligkeiten.")
+        return SimpleNamespace(text="\n".join(zeilen))
 
 class KIAnalyseManager:
     """
@@ -15,21 +53,48 @@ class KIAnalyseManager:
         self.ki_aktiviert = self.ki_konfig.get("aktiviert", True)
         self.gemini_api_key = self.ki_konfig.get("gemini_api_key")
         self.gemini_modell_name = self.ki_konfig.get("gemini_modell_name")
+        self.modell_typ = self.ki_konfig.get("modell_typ", "gemini") # "gemini" oder "stub" (lokales Testmodell)
+        self.batch_groesse = max(1, int(self.ki_konfig.get("batch_groesse", 16)))
+        self.batch_wartezeit_sekunden = self.ki_konfig.get("batch_wartezeit_ms", 200) / 1000
+        self.antwort_timeout_sekunden = self.ki_konfig.get("antwort_timeout_sekunden", 60)
+        self.drosselung = TokenBucket(self.ki_konfig.get("anfragen_pro_minute", 30) / 60, self.ki_konfig.get("anfragen_burst", 5))
+        self.urteil_cache = KIUrteilCache(self.ki_konfig.get("urteil_cache_datei", "ki_urteil_cache.json"),
+                                          self.ki_konfig.get("urteil_cache_max_eintraege", 10000),
+                                          self.ki_konfig.get("urteil_cache_ttl_sekunden", 86400))
+        self.exe_hash_cache = {} # (exe, größe, mtime_ns) -> SHA-256 der ausführbaren Datei
+        self.batch_warteschlange = queue.Queue()
+        self.ausstehende_anfragen = {} # Prozess-Identität -> Future (gleiche Prozesse teilen sich eine Modellanfrage)
+        self.ausstehend_sperre = threading.Lock()
+        self.batch_thread = None
+        self.statistik_sperre = threading.Lock()
+        self.modell_anfragen = 0
+        self.analysierte_prozesse = 0
+        self.wartezeit_modell_sekunden = 0.0
+        self.letzte_cache_speicherung = time.monotonic()
 
         self.ki_modell_pfad = self.konfig_manager.get_konfiguration().get("ki_modell_pfad") # unused config key
         self.lade_ki_modelle()
         self.gemini_modell = None
 
-        if self.ki_aktiviert and self.gemini_api_key and self.gemini_api_key != "YOUR_GEMINI_API_KEY": # API Key Check hinzugefügt
+        if self.ki_aktiviert and self.modell_typ == "stub":
+            self.gemini_modell = LokalesStubModell(self.ki_konfig.get("stub_latenz_ms", 500) / 1000)
+            protokolliere_ereignis_global("info", "KI-Analyse verwendet das lokale Stub-Modell (keine Anfragen an Gemini).")
+        elif self.ki_aktiviert and self.gemini_api_key and self.gemini_api_key != "YOUR_GEMINI_API_KEY": # API Key Check hinzugefügt
             self.initialisiere_gemini()
         elif self.ki_aktiviert and (not self.gemini_api_key or self.gemini_api_key == "YOUR_GEMINI_API_KEY"):
             protokolliere_ereignis_global("warnung", "KI-Analyse aktiviert, aber kein gültiger Gemini API-Schlüssel konfiguriert. KI-Funktionen mit Gemini werden deaktiviert.")
             self.ki_aktiviert = False
         else:
             protokolliere_ereignis_global("info", "KI-Analyse ist DEAKTIVIERT gemäß Konfiguration.")
+        if self.ki_aktiviert:
+            self._starte_batch_thread() # Nicht erst aus einem Scan-Thread mit gesenkter Priorität (würde unter Linux vererbt)
 
     def initialisiere_gemini(self):
         """Initialisiert das Gemini KI-Modell."""
+        if genai is None:
+            protokolliere_ereignis_global("warnung", "Paket 'google-generativeai' ist nicht installiert. KI-Funktionen mit Gemini werden deaktiviert (modell_typ 'stub' für das lokale Testmodell).")
+            self.ki_aktiviert = False
+            return
         try:
             genai.configure(api_key=self.gemini_api_key) # API Key Konfiguration HIER
             self.gemini_modell = genai.GenerativeModel(self.gemini_modell_name) # Kein API Key hier
@@ -51,32 +116,193 @@ class KIAnalyseManager:
             protokolliere_ereignis_global("warnung", "Gemini KI-Modell ist nicht initialisiert oder KI ist deaktiviert. Keine KI-Analyse möglich.")
             return "KI-Analyse nicht verfügbar."
 
+        start = time.perf_counter() # Vor try: auch Fehler beim Protokollieren der Anfrage werden mit Dauer erfasst
         try:
             protokolliere_ereignis_global("debug", f"Sende Anfrage an Gemini: '{prompt}'")
             antwort = self.gemini_modell.generate_content(prompt)
+            KI_ANFRAGE_DAUER.beobachte(time.perf_counter() - start, ("erfolgreich",))
             protokolliere_ereignis_global("debug", f"Antwort von Gemini erhalten.")
             return antwort.text
         except Exception as e:
+            KI_ANFRAGE_DAUER.beobachte(time.perf_counter() - start, ("fehler",))
             protokolliere_ereignis_global("fehler", f"Fehler bei der Anfrage an Gemini: {e}", {"fehler": str(e)})
             return f"Fehler bei KI-Analyse: {e}"
 
-    def analysiere_prozess_verhalten(self, prozess_info):
-        """Analysiert Prozessverhalten mit KI (nutzt Gemini)."""
-        if not self.ki_aktiviert or not self.gemini_modell:
-            protokolliere_ereignis_global("warnung", "KI-Analyse für Prozessverhalten ist deaktiviert oder nicht initialisiert. Verwende Standardanalyse.")
+    @staticmethod
+    def _bewerte_antwort(ki_antwort):
+        """Leitet aus einer Modellantwort das Urteil "verdächtig" oder "normal" ab."""
+        text = ki_antwort.strip().lower()
+        if text.startswith("normal"):
             return "normal"
+        if text.startswith("verdächtig") or "verdächtig" in text or "ungewöhnlich" in text or "potenziell gefährlich" in text:
+            return "verdächtig"
+        return "normal"
+
+    def _berechne_exe_hash(self, exe_pfad):
+        """SHA-256 der ausführbaren Datei; zwischengespeichert, solange Größe und mtime unverändert sind."""
+        if not exe_pfad:
+            return ""
+        try:
+            datei_stat = os.stat(exe_pfad)
+        except OSError:
+            return ""
+        schluessel = (exe_pfad, datei_stat.st_size, datei_stat.st_mtime_ns)
+        exe_hash = self.exe_hash_cache.get(schluessel)
+        if exe_hash is None:
+            hasher = hashlib.sha256()
+            try:
+                with open(exe_pfad, 'rb') as datei:
+                    while block := datei.read(1024 * 1024):
+                        hasher.update(block)
+            except OSError:
+                return ""
+            exe_hash = hasher.hexdigest()
+            if len(self.exe_hash_cache) >= 4096:
+                self.exe_hash_cache.clear()
+            self.exe_hash_cache[schluessel] = exe_hash
+        return exe_hash
+
+    def _starte_batch_thread(self):
+        if self.batch_thread is None or not self.batch_thread.is_alive():
+            self.batch_thread = threading.Thread(target=self._batch_schleife, daemon=True)
+            self.batch_thread.start()
+
+    def _reiche_ein(self, schluessel, prozess_info):
+        """Reiht einen Prozess zur Batch-Analyse ein und gibt ein Future mit dem Urteil zurück."""
+        with self.ausstehend_sperre:
+            future = self.ausstehende_anfragen.get(schluessel)
+            if future is not None:
+                return future # Gleicher Prozess bereits angefragt: Ergebnis teilen
+            future = Future()
+            self.ausstehende_anfragen[schluessel] = future
+        self._starte_batch_thread()
+        self.batch_warteschlange.put((schluessel, prozess_info, future))
+        return future
 
-        prozess_name = prozess_info.get('name', 'Unbekannt')
-        pid = prozess_info.get('pid', 'Unbekannt')
-        prompt = f"Analysiere das Verhalten des Prozesses '{prozess_name}' (PID: {pid}). Ist das Verhalten verdächtig im Kontext eines Virenschutzprogramms? Begründe deine Antwort kurz."
+    def _batch_schleife(self):
+        """Sammelt ausstehende Anfragen (bis batch_groesse oder batch_wartezeit) und sendet sie als eine Modellanfrage."""
+        while True:
+            erste = self.batch_warteschlange.get()
+            if erste is _BATCH_ENDE:
+                return
+            batch = [erste]
+            frist = time.monotonic() + self.batch_wartezeit_sekunden
+            beenden = False
+            while len(batch) < self.batch_groesse:
+                rest = frist - time.monotonic()
+                if rest <= 0:
+                    break
+                try:
+                    anfrage = self.batch_warteschlange.get(timeout=rest)
+                except queue.Empty:
+                    break
+                if anfrage is _BATCH_ENDE:
+                    beenden = True
+                    break
+                batch.append(anfrage)
+            try:
+                self._verarbeite_batch(batch)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Fehler bei der Batch-KI-Analyse: {e}", {"fehler": str(e)})
+                self._loese_auf(batch, {})
+            if time.monotonic() - self.letzte_cache_speicherung > 30:
+                self.urteil_cache.speichere_cache()
+                self.letzte_cache_speicherung = time.monotonic()
+            if beenden:
+                return
 
+    def _verarbeite_batch(self, batch):
+        """Fragt das Modell einmal für alle Prozesse eines Batches und verteilt die Urteile."""
+        zeilen = []
+        for nummer, (_, prozess_info, _) in enumerate(batch, start=1):
+            kommandozeile = " ".join(str(teil) for teil in (prozess_info.get('cmdline') or []))[:200]
+            zeilen.append(f"{nummer}. Prozess '{prozess_info.get('name', 'Unbekannt')}' (PID: {prozess_info.get('pid', 'Unbekannt')}, Pfad: {prozess_info.get('exe') or 'unbekannt'}, Kommandozeile: {kommandozeile or 'unbekannt'})")
+        prompt = ("Analysiere das Verhalten der folgenden Prozesse im Kontext eines Virenschutzprogramms. "
+                  "Antworte für jeden Prozess in genau einer Zeile im Format '<Nummer>: verdächtig - <kurze Begründung>' "
+                  "oder '<Nummer>: normal - <kurze Begründung>'.\n" + "\n".join(zeilen))
+
+        self.drosselung.hole() # Ratenbegrenzung: eine Anfrage pro Token
+        start = time.monotonic()
         ki_antwort = self._frage_gemini(prompt)
-        protokolliere_ereignis_global("info", f"KI-Analyse (Gemini) für Prozess '{prozess_name}' (PID: {pid}): Antwort: {ki_antwort}")
+        dauer = time.monotonic() - start
+        with self.statistik_sperre:
+            self.modell_anfragen += 1
+            self.analysierte_prozesse += len(batch)
+            self.wartezeit_modell_sekunden += dauer
 
-        if "verdächtig" in ki_antwort.lower() or "ungewöhnlich" in ki_antwort.lower() or "potenziell gefährlich" in ki_antwort.lower():
-            return "verdächtig"
-        else:
-            return "normal"
+        antworten = {}
+        for zeile in ki_antwort.splitlines():
+            treffer = _ANTWORT_ZEILE.match(zeile)
+            if treffer:
+                antworten[int(treffer.group(1))] = treffer.group(2).strip()
+        protokolliere_ereignis_global("info", f"KI-Analyse (Batch) für {len(batch)} Prozess(e) in {dauer:.2f} s: {len(antworten)} Antwort(en).")
+        self._loese_auf(batch, antworten)
+
+    def _loese_auf(self, batch, antworten):
+        """Setzt die Urteile der Futures. Nur tatsächlich beantwortete Prozesse werden zwischengespeichert."""
+        for nummer, (schluessel, prozess_info, future) in enumerate(batch, start=1):
+            antwort = antworten.get(nummer)
+            urteil = self._bewerte_antwort(antwort) if antwort else "normal"
+            if antwort:
+                self.urteil_cache.setze(schluessel, urteil, antwort)
+                protokolliere_ereignis_global("info", f"KI-Analyse (Gemini) für Prozess '{prozess_info.get('name', 'Unbekannt')}' (PID: {prozess_info.get('pid', 'Unbekannt')}): Antwort: {antwort}")
+            with self.ausstehend_sperre:
+                self.ausstehende_anfragen.pop(schluessel, None)
+            if not future.done():
+                future.set_result(urteil)
+
+    def analysiere_prozesse_verhalten_batch(self, prozess_infos):
+        """
+        Analysiert mehrere Prozesse mit KI. Zwischengespeicherte Urteile werden direkt verwendet, alle übrigen
+        Prozesse gemeinsam (in Batches) an das Modell geschickt. Gibt die Urteile in der Reihenfolge der Eingabe zurück.
+        """
+        if not self.ki_aktiviert or not self.gemini_modell:
+            protokolliere_ereignis_global("warnung", "KI-Analyse für Prozessverhalten ist deaktiviert oder nicht initialisiert. Verwende Standardanalyse.")
+            return ["normal"] * len(prozess_infos)
+
+        urteile = [None] * len(prozess_infos)
+        offene = []
+        for index, prozess_info in enumerate(prozess_infos):
+            schluessel = berechne_prozess_identitaet(prozess_info, self._berechne_exe_hash(prozess_info.get('exe')))
+            eintrag = self.urteil_cache.hole(schluessel)
+            if eintrag:
+                urteile[index] = eintrag[0]
+                protokolliere_ereignis_global("debug", f"KI-Urteil für Prozess '{prozess_info.get('name', 'Unbekannt')}' aus Cache: {eintrag[0]}")
+            else:
+                offene.append((index, self._reiche_ein(schluessel, prozess_info)))
+
+        frist = time.monotonic() + self.antwort_timeout_sekunden
+        for index, future in offene:
+            try:
+                urteile[index] = future.result(timeout=max(0.0, frist - time.monotonic()))
+            except FutureTimeoutError:
+                protokolliere_ereignis_global("warnung", f"Zeitüberschreitung bei der KI-Analyse für Prozess '{prozess_infos[index].get('name', 'Unbekannt')}'. Verwende Standardanalyse.")
+                urteile[index] = "normal"
+        return urteile
+
+    def analysiere_prozess_verhalten(self, prozess_info):
+        """Analysiert Prozessverhalten mit KI (nutzt Gemini, mit Urteilscache, Batching und Ratenbegrenzung)."""
+        return self.analysiere_prozesse_verhalten_batch([prozess_info])[0]
+
+    def get_statistik(self):
+        """Gibt Cache-Trefferquote, Anzahl Modellanfragen und Wartezeiten seit dem Programmstart zurück."""
+        with self.statistik_sperre:
+            statistik = {
+                "modell_anfragen": self.modell_anfragen,
+                "analysierte_prozesse": self.analysierte_prozesse,
+                "mittlere_batch_groesse": (self.analysierte_prozesse / self.modell_anfragen) if self.modell_anfragen else 0.0,
+                "wartezeit_modell_sekunden": round(self.wartezeit_modell_sekunden, 3),
+                "wartezeit_drosselung_sekunden": round(self.drosselung.gesamt_wartezeit, 3),
+            }
+        statistik["cache"] = self.urteil_cache.get_statistik()
+        return statistik
+
+    def beende(self):
+        """Beendet den Batch-Thread und speichert den Urteilscache."""
+        if self.batch_thread and self.batch_thread.is_alive():
+            self.batch_warteschlange.put(_BATCH_ENDE)
+            self.batch_thread.join(timeout=self.antwort_timeout_sekunden)
+        self.urteil_cache.speichere_cache()
 
     def analysiere_datei_verhalten(self, datei_pfad):
         """Analysiert Dateiverhalten mit KI (aktuell Platzhalter)."""
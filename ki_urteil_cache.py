@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+def berechne_prozess_identitaet(prozess_info, exe_hash):
+    """
+    Bildet den Cache-Schlüssel eines Prozesses aus Name, Pfad der ausführbaren Datei, deren Hash
+    und einem Fingerabdruck der Kommandozeile. Die PID gehört bewusst nicht dazu.
+    """
+    kommandozeile = prozess_info.get("cmdline") or []
+    kommandozeile_fingerabdruck = hashlib.sha256("\0".join(str(teil) for teil in kommandozeile).encode("utf-8", "replace")).hexdigest()[:16]
+    teile = [str(prozess_info.get("name") or "").lower(), str(prozess_info.get("exe") or "").lower(), exe_hash or "", kommandozeile_fingerabdruck]
+    return hashlib.sha256("\x1f".join(teile).encode("utf-8", "replace")).hexdigest()
+
+class KIUrteilCache:
+    """
+    Verwaltet den persistenten Cache für KI-Urteile über Prozesse.
+    Modul für das Vermeiden wiederholter Modellanfragen zu identischen Prozessen.
+
+    LRU-Cache mit TTL pro Eintrag (OrderedDict). Wird als JSON-Datei gespeichert (atomar über
+    temporäre Datei und os.replace) und beim Start wieder geladen; abgelaufene Einträge werden
+    dabei verworfen. Zeitstempel sind Wall-Clock-Zeiten, damit sie Neustarts überdauern.
+    """
+    def __init__(self, cache_datei_pfad, max_eintraege=10000, ttl_sekunden=86400):
+        self.cache_datei_pfad = cache_datei_pfad
+        self.max_eintraege = max(1, int(max_eintraege))
+        self.ttl_sekunden = ttl_sekunden
+        self.eintraege = OrderedDict() # schluessel -> (urteil, begruendung, zeitstempel)
+        self.sperre = threading.Lock()
+        self.treffer = 0
+        self.fehlschlaege = 0
+        self.abgelaufen = 0
+        self.geaendert = False
+        self.lade_cache()
+
+    def lade_cache(self):
+        """Lädt gespeicherte Urteile (falls vorhanden)."""
+        if not self.cache_datei_pfad or not os.path.exists(self.cache_datei_pfad):
+            return
+        try:
+            with open(self.cache_datei_pfad, 'r', encoding='utf-8') as f:
+                daten = json.load(f)
+            jetzt = time.time()
+            with self.sperre:
+                for schluessel, urteil, begruendung, zeitstempel in daten.get("eintraege", []):
+                    if jetzt - zeitstempel < self.ttl_sekunden:
+                        self.eintraege[schluessel] = (urteil, begruendung, zeitstempel)
+                while len(self.eintraege) > self.max_eintraege:
+                    self.eintraege.popitem(last=False)
+            protokolliere_ereignis_global("info", f"KI-Urteilscache geladen: {len(self.eintraege)} Einträge aus '{self.cache_datei_pfad}'.")
+        except (OSError, ValueError, TypeError) as e:
+            protokolliere_ereignis_global("warnung", f"KI-Urteilscache '{self.cache_datei_pfad}' konnte nicht geladen werden: {e}. Starte mit leerem Cache.", {"datei": self.cache_datei_pfad, "fehler": str(e)})
+
+    def speichere_cache(self):
+        """Schreibt den Cache atomar auf die Festplatte (nur bei Änderungen)."""
+        if not self.cache_datei_pfad:
+            return
+        with self.sperre:
+            if not self.geaendert:
+                return
+            # Älteste Einträge zuerst, damit die LRU-Reihenfolge beim Laden erhalten bleibt
+            daten = {"eintraege": [[schluessel, *eintrag] for schluessel, eintrag in self.eintraege.items()]}
+            self.geaendert = False
+        temp_pfad = f"{self.cache_datei_pfad}.tmp"
+        try:
+            with open(temp_pfad, 'w', encoding='utf-8') as f:
+                json.dump(daten, f)
+            os.replace(temp_pfad, self.cache_datei_pfad)
+        except OSError as e:
+            with self.sperre:
+                self.geaendert = True
+            protokolliere_ereignis_global("fehler", f"Fehler beim Speichern des KI-Urteilscaches '{self.cache_datei_pfad}': {e}", {"datei": self.cache_datei_pfad, "fehler": str(e)})
+
+    def hole(self, schluessel):
+        """Gibt (urteil, begruendung) für einen gültigen Eintrag zurück, sonst None."""
+        with self.sperre:
+            eintrag = self.eintraege.get(schluessel)
+            if eintrag is None:
+                self.fehlschlaege += 1
+                return None
+            if time.time() - eintrag[2] >= self.ttl_sekunden:
+                del self.eintraege[schluessel]
+                self.geaendert = True
+                self.abgelaufen += 1
+                self.fehlschlaege += 1
+                return None
+            self.eintraege.move_to_end(schluessel)
+            self.treffer += 1
+            return eintrag[0], eintrag[1]
+
+    def setze(self, schluessel, urteil, begruendung=""):
+        """Speichert ein Urteil; verdrängt bei Bedarf den am längsten nicht genutzten Eintrag."""
+        with self.sperre:
+            self.eintraege[schluessel] = (urteil, begruendung, time.time())
+            self.eintraege.move_to_end(schluessel)
+            while len(self.eintraege) > self.max_eintraege:
+                self.eintraege.popitem(last=False)
+            self.geaendert = True
+
+    def get_statistik(self):
+        """Gibt Treffer, Fehlschläge, abgelaufene Einträge und Trefferquote seit dem Programmstart zurück."""
+        with self.sperre:
+            gesamt = self.treffer + self.fehlschlaege
+            return {
+                "eintraege": len(self.eintraege),
+                "treffer": self.treffer,
+                "fehlschlaege": self.fehlschlaege,
+                "abgelaufen": self.abgelaufen,
+                "trefferquote": (self.treffer / gesamt) if gesamt else 0.0
+            }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
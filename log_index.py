@@ -0,0 +1,274 @@
+import json
+import os
+import threading
+import time
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+# Log-Stufen als Bits der Stufenmaske eines Blocks (Bit 0: Zeilen ohne erkennbare Stufe, z.B. Tracebacks)
+_STUFEN_BITS = {b"DEBUG": 1 << 1, b"INFO": 1 << 2, b"WARNING": 1 << 3, b"ERROR": 1 << 4, b"CRITICAL": 1 << 5}
+_STUFEN_REIHENFOLGE = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_STUFEN_ALIASE = {"WARNUNG": "WARNING", "FEHLER": "ERROR", "AKTION": "INFO"} # Ereignistypen aus logging_utils
+_JSONL_PRAEFIX = b'{"zeit": "'
+# Stufenkennungen im JSON-Lines- und im Textformat (Suche im ganzen Block statt Parsen jeder Zeile)
+_STUFEN_MUSTER = tuple((bit, (b'"stufe": "' + name + b'"', b" - " + name + b" - ")) for name, bit in _STUFEN_BITS.items())
+_LESE_BLOCK = 1024 * 1024
+
+def stufen_maske_ab(stufe):
+    """Gibt die Stufenmaske für eine Mindeststufe zurück (z.B. "WARNING" -> WARNING, ERROR, CRITICAL); None bei unbekannter Stufe."""
+    name = _STUFEN_ALIASE.get(stufe.upper(), stufe.upper())
+    if name not in _STUFEN_REIHENFOLGE:
+        return None
+    return sum(_STUFEN_BITS[s.encode()] for s in _STUFEN_REIHENFOLGE[_STUFEN_REIHENFOLGE.index(name):])
+
+def zeit_als_text(zeit):
+    """Wandelt Epoch-Sekunden oder einen Zeitstempel ("2025-01-01 12:00:00", "2025-01-01T12:00") in das Format der Log-Datei um."""
+    try:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(float(zeit)))
+    except ValueError:
+        pass
+    text = str(zeit).strip().replace("T", " ")
+    for zeit_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.strftime("%Y-%m-%d %H:%M:%S", time.strptime(text, zeit_format))
+        except ValueError:
+            continue
+    raise ValueError(f"Ungültiger Zeitpunkt: '{zeit}'")
+
+def _kopf(zeile):
+    """Liest Zeitstempel und Stufe einer Log-Zeile (JSON-Lines- oder Textformat) ohne die ganze Zeile zu parsen. Gibt (zeit, stufen_bit) zurück."""
+    if zeile.startswith(_JSONL_PRAEFIX):
+        ende = zeile.find(b'"', 10)
+        start = zeile.find(b'"stufe": "', ende)
+        if ende > 0 and start > 0:
+            return zeile[10:ende], _STUFEN_BITS.get(zeile[start + 10:zeile.find(b'"', start + 10)], 1)
+        return None, 1
+    teile = zeile.split(b" - ", 2) # "2025-01-01 12:00:00.123 - INFO - Meldung"
+    if len(teile) >= 2 and teile[0][:2].isdigit():
+        return teile[0], _STUFEN_BITS.get(teile[1], 1)
+    return None, 1
+
+class LogIndex:
+    """
+    Liest die Log-Datei über einen dünn besetzten Index statt sie bei jeder Anfrage vollständig einzulesen.
+    Modul für die Log-Anzeige der Web-UI (Seiten mit Cursor, Filter nach Stufe und Zeit).
+
+    - Die Datei wird ab dem zuletzt gelesenen Byte-Versatz weitergelesen (tail); pro Aufruf werden nur neu
+      angehängte vollständige Zeilen verarbeitet.
+    - Alle block_groesse Bytes beginnt ein Indexblock mit Start-Versatz, erster/letzter Zeit und einer
+      Bitmaske der enthaltenen Stufen. Seiten werden rückwärts blockweise per seek gelesen; Blöcke ohne
+      passende Stufe oder außerhalb des Zeitraums werden übersprungen. Die Antwortzeit hängt damit von
+      der Seitengröße ab, nicht von der Dateigröße.
+    - Der Index wird neben der Log-Datei gespeichert (<log_datei>.idx) und nach einem Neustart weiterverwendet.
+    - Rotation (andere Datei-Identität) oder Kürzen der Datei setzt den Index zurück; Cursor enthalten die
+      Inode, sodass Cursor auf die alte Datei erkannt werden.
+    """
+    def __init__(self, log_datei_pfad, block_groesse=256 * 1024):
+        self.log_datei_pfad = os.path.abspath(log_datei_pfad)
+        self.index_datei_pfad = self.log_datei_pfad + ".idx"
+        self.block_groesse = block_groesse
+        self._sperre = threading.Lock()
+        self._setze_zurueck(None)
+        self._gespeicherte_bloecke = 0
+        self._lade_index()
+
+    def _setze_zurueck(self, identitaet):
+        self.identitaet = identitaet # (st_dev, st_ino) der indizierten Datei
+        self.indiziert_bis = 0 # Versatz hinter der letzten vollständig gelesenen Zeile
+        self.bloecke = [] # [start_versatz, erste_zeit, letzte_zeit, stufen_maske]; der letzte Block wird noch gefüllt
+
+    def _lade_index(self):
+        """Lädt den gespeicherten Index, falls er zur aktuellen Log-Datei passt."""
+        try:
+            with open(self.index_datei_pfad, "r", encoding="utf-8") as datei:
+                gespeichert = json.load(datei)
+            datei_stat = os.stat(self.log_datei_pfad)
+        except (OSError, ValueError):
+            return
+        identitaet = (datei_stat.st_dev, datei_stat.st_ino)
+        if (tuple(gespeichert.get("identitaet", ())) != identitaet or gespeichert.get("block_groesse") != self.block_groesse
+                or gespeichert.get("indiziert_bis", 0) > datei_stat.st_size):
+            return # Index gehört zu einer rotierten oder gekürzten Datei
+        self.identitaet = identitaet
+        self.indiziert_bis = gespeichert["indiziert_bis"]
+        self.bloecke = [[start, erste and erste.encode(), letzte and letzte.encode(), maske] for start, erste, letzte, maske in gespeichert["bloecke"]]
+        self._gespeicherte_bloecke = len(self.bloecke)
+
+    def _speichere_index(self):
+        """Speichert den Index atomar neben der Log-Datei."""
+        temp_pfad = self.index_datei_pfad + ".tmp"
+        try:
+            with open(temp_pfad, "w", encoding="utf-8") as datei:
+                json.dump({"identitaet": self.identitaet, "block_groesse": self.block_groesse, "indiziert_bis": self.indiziert_bis,
+                           "bloecke": [[start, erste and erste.decode(errors="replace"), letzte and letzte.decode(errors="replace"), maske]
+                                       for start, erste, letzte, maske in self.bloecke]}, datei)
+            os.replace(temp_pfad, self.index_datei_pfad)
+            self._gespeicherte_bloecke = len(self.bloecke)
+        except OSError as e:
+            protokolliere_ereignis_global("warnung", f"Log-Index konnte nicht gespeichert werden: {e}", {"index_datei": self.index_datei_pfad, "fehler": str(e)})
+
+    def aktualisiere(self):
+        """Erkennt Rotation und indiziert neu angehängte Zeilen. Gibt False zurück, wenn die Log-Datei fehlt."""
+        with self._sperre:
+            try:
+                datei_stat = os.stat(self.log_datei_pfad)
+            except OSError:
+                self._setze_zurueck(None)
+                return False
+            identitaet = (datei_stat.st_dev, datei_stat.st_ino)
+            if identitaet != self.identitaet or datei_stat.st_size < self.indiziert_bis:
+                if self.identitaet is not None:
+                    protokolliere_ereignis_global("info", f"Log-Rotation erkannt, Log-Index für '{self.log_datei_pfad}' wird neu aufgebaut.")
+                self._setze_zurueck(identitaet)
+            if datei_stat.st_size > self.indiziert_bis:
+                self._indiziere(datei_stat.st_size)
+                if len(self.bloecke) != self._gespeicherte_bloecke:
+                    self._speichere_index() # Nur bei neuen Blöcken speichern, nicht bei jeder angehängten Zeile
+            return True
+
+    def _indiziere(self, bis):
+        """
+        Liest die Datei ab indiziert_bis und trägt vollständige Zeilen in den Index ein. Die Stufenmaske eines
+        Blocks wird per Teilstring-Suche ermittelt, Zeitstempel nur aus der ersten und letzten Zeile gelesen.
+        """
+        with open(self.log_datei_pfad, "rb") as datei:
+            datei.seek(self.indiziert_bis)
+            versatz = self.indiziert_bis
+            rest = b""
+            while versatz + len(rest) < bis:
+                daten = datei.read(min(_LESE_BLOCK, bis - versatz - len(rest)))
+                if not daten:
+                    break
+                daten = rest + daten
+                ende = daten.rfind(b"\n") + 1
+                rest = daten[ende:]
+                position = 0
+                while position < ende:
+                    block = self.bloecke[-1] if self.bloecke else None
+                    if block is None or versatz + position - block[0] >= self.block_groesse:
+                        block = [versatz + position, None, None, 0]
+                        self.bloecke.append(block)
+                    # Abschnitt bis zur ersten Zeile, die nach der Blockgrenze beginnt
+                    grenze = daten.find(b"\n", max(block[0] + self.block_groesse - versatz - 1, position), ende) + 1 or ende
+                    abschnitt = daten[position:grenze]
+                    for bit, muster in _STUFEN_MUSTER:
+                        if not block[3] & bit and (muster[0] in abschnitt or muster[1] in abschnitt):
+                            block[3] |= bit
+                    erste_zeit, _ = _kopf(abschnitt[:abschnitt.find(b"\n")])
+                    letzte_zeit, _ = _kopf(abschnitt[abschnitt.rfind(b"\n", 0, len(abschnitt) - 1) + 1:-1])
+                    if block[1] is None:
+                        block[1] = erste_zeit or letzte_zeit
+                    block[2] = letzte_zeit or erste_zeit or block[2]
+                    position = grenze
+                versatz += ende
+            self.indiziert_bis = versatz
+
+    def _cursor(self, versatz):
+        return f"{self.identitaet[1]}-{versatz}" if self.identitaet else None
+
+    def _lies_cursor(self, cursor):
+        """Gibt den Versatz eines Cursors zurück, oder None, falls er fehlt oder zu einer rotierten Datei gehört."""
+        if not cursor:
+            return None
+        try:
+            inode, versatz = (int(teil) for teil in str(cursor).split("-"))
+        except ValueError:
+            raise ValueError(f"Ungültiger Cursor: '{cursor}'")
+        if not self.identitaet or inode != self.identitaet[1] or versatz > self.indiziert_bis:
+            return None
+        return versatz
+
+    def _lies_block(self, datei, start, ende):
+        """Liest die Zeilen zwischen zwei Versätzen. Gibt [(versatz, zeile)] zurück."""
+        datei.seek(start)
+        zeilen = []
+        versatz = start
+        for zeile in datei.read(ende - start).split(b"\n")[:-1]:
+            zeilen.append((versatz, zeile))
+            versatz += len(zeile) + 1
+        return zeilen
+
+    @staticmethod
+    def _passt(zeile, stufen_maske, seit):
+        if stufen_maske is None and seit is None:
+            return True
+        zeit, stufen_bit = _kopf(zeile)
+        if stufen_maske is not None and not stufen_bit & stufen_maske:
+            return False
+        return seit is None or (zeit is not None and zeit >= seit)
+
+    def hole_eintraege(self, anzahl=100, cursor=None, richtung="aelter", stufe=None, seit=None):
+        """
+        Gibt eine Seite von Log-Zeilen zurück (chronologisch sortiert).
+
+        richtung="aelter": die neuesten passenden Zeilen vor dem Cursor (ohne Cursor: vor dem Dateiende).
+        richtung="neuer": die ältesten passenden Zeilen ab dem Cursor (ohne Cursor: ab "seit" bzw. Dateianfang).
+        stufe ist eine Mindeststufe ("WARNING" liefert auch ERROR/CRITICAL), seit ein Zeitpunkt (Epoch oder Zeitstempel).
+        Gibt {"eintraege", "cursor_aelter", "cursor_neuer"} zurück; cursor_aelter ist None, wenn es keine älteren Zeilen gibt.
+        """
+        stufen_maske = stufen_maske_ab(stufe) if stufe else None
+        if stufe and stufen_maske is None:
+            raise ValueError(f"Unbekannte Log-Stufe: '{stufe}'")
+        seit = zeit_als_text(seit).encode() if seit not in (None, "") else None
+        if not self.aktualisiere():
+            return {"eintraege": [], "cursor_aelter": None, "cursor_neuer": None}
+        with self._sperre:
+            versatz = self._lies_cursor(cursor)
+            bloecke = list(self.bloecke)
+            indiziert_bis = self.indiziert_bis
+            enden = [block[0] for block in bloecke[1:]] + [indiziert_bis]
+            gefunden = []
+            with open(self.log_datei_pfad, "rb") as datei:
+                if richtung == "neuer":
+                    start = versatz if versatz is not None else 0
+                    naechster = start
+                    for block, ende in zip(bloecke, enden):
+                        if ende <= start or (seit is not None and block[2] is not None and block[2] < seit) or (stufen_maske is not None and not block[3] & stufen_maske):
+                            naechster = max(naechster, ende)
+                            continue
+                        for zeilen_versatz, zeile in self._lies_block(datei, max(block[0], start), ende):
+                            naechster = zeilen_versatz + len(zeile) + 1
+                            if self._passt(zeile, stufen_maske, seit):
+                                gefunden.append((zeilen_versatz, zeile))
+                                if len(gefunden) >= anzahl:
+                                    break
+                        if len(gefunden) >= anzahl:
+                            break
+                        naechster = max(naechster, ende)
+                    cursor_neuer = naechster
+                    erster = gefunden[0][0] if gefunden else start
+                    cursor_aelter = erster if erster > 0 else None
+                else:
+                    ende_gesamt = versatz if versatz is not None else indiziert_bis
+                    cursor_aelter = None
+                    for block, ende in zip(reversed(bloecke), reversed(enden)):
+                        if block[0] >= ende_gesamt:
+                            continue
+                        if seit is not None and block[2] is not None and block[2] < seit:
+                            break # Alle älteren Blöcke liegen ebenfalls vor "seit"
+                        if stufen_maske is not None and not block[3] & stufen_maske:
+                            continue
+                        zeilen = self._lies_block(datei, block[0], min(ende, ende_gesamt))
+                        for zeilen_versatz, zeile in reversed(zeilen):
+                            if self._passt(zeile, stufen_maske, seit):
+                                gefunden.append((zeilen_versatz, zeile))
+                                if len(gefunden) >= anzahl:
+                                    break
+                        if len(gefunden) >= anzahl:
+                            cursor_aelter = gefunden[-1][0] if gefunden[-1][0] > 0 else None
+                            break
+                    gefunden.reverse()
+                    cursor_neuer = versatz if versatz is not None else indiziert_bis
+            return {
+                "eintraege": [zeile.decode("utf-8", errors="replace").rstrip("\r") for _, zeile in gefunden],
+                "cursor_aelter": self._cursor(cursor_aelter) if cursor_aelter is not None else None,
+                "cursor_neuer": self._cursor(cursor_neuer)
+            }
+
+    def get_statistik(self):
+        """Gibt indizierte Bytes und die Anzahl der Indexblöcke zurück."""
+        return {"indiziert_bytes": self.indiziert_bis, "bloecke": len(self.bloecke), "block_groesse": self.block_groesse}
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
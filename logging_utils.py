@@ -1,8 +1,34 @@
 # --- Inhalt von: logging_utils.py ---
+import atexit
+import collections
+import json
 import logging
+import random
+import sys
+import threading
+import time
 
-def initialisiere_logging(log_level_str, log_datei_pfad):
-    """Initialisiert das Logging-System."""
+# Ereignistypen -> Logging-Stufe
+_TYP_STUFEN = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "aktion": logging.INFO,
+    "warnung": logging.WARNING,
+    "fehler": logging.ERROR
+}
+
+_schreiber = None # Aktiver LogSchreiber (None: Fallback auf das logging-Modul, z.B. vor der Initialisierung)
+_min_stufe = logging.NOTSET # Vor der Initialisierung entscheidet das logging-Modul über die Stufe
+
+def initialisiere_logging(log_level_str, log_datei_pfad, log_format="jsonl", asynchron=True, warteschlange_max=100000, drosselung=None):
+    """
+    Initialisiert das Logging-System.
+
+    Ereignisse werden in eine Warteschlange gestellt und von einem Hintergrund-Thread als JSON-Lines-Datensätze
+    (bzw. mit log_format="text" als Textzeilen) in die Log-Datei geschrieben. drosselung ordnet Ereignisarten
+    ("art") {"anteil": 0.0-1.0, "max_pro_sekunde": n} zu (Sampling und Ratenbegrenzung für häufige Debug-Ereignisse).
+    """
+    global _schreiber, _min_stufe
     log_level_mapping = {
         "DEBUG": logging.DEBUG,
         "INFO": logging.INFO,
@@ -12,25 +38,245 @@ def initialisiere_logging(log_level_str, log_datei_pfad):
     }
     log_level = log_level_mapping.get(log_level_str.upper(), logging.INFO) # Standardmäßig INFO
 
-    logging.basicConfig(
-        filename=log_datei_pfad,
-        level=log_level,
-        format='%(asctime)s - %(levelname)s - %(message)s - %(daten)s', # Daten im Format einfügen
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    protokolliere_ereignis_global("info", f"Logging initialisiert. Log-Level: {logging.getLevelName(log_level)}, Log-Datei: '{log_datei_pfad}'")
-
-def protokolliere_ereignis_global(typ, meldung, daten=None):
-    """Globale Funktion zum Protokollieren von Ereignissen."""
-    if typ == "info":
-        logging.info(meldung, extra={'daten': daten} if daten else {})
-    elif typ == "warnung":
-        logging.warning(meldung, extra={'daten': daten} if daten else {})
-    elif typ == "fehler":
-        logging.error(meldung, extra={'daten': daten} if daten else {})
-    elif typ == "debug":
-        logging.debug(meldung, extra={'daten': daten} if daten else {})
-    elif typ == "aktion":
-        logging.info(f"AKTION: {meldung}", extra={'daten': daten} if daten else {}) # Kennzeichnung für Aktionen im Log
-    else:
-        logging.info(f"Unbekannter Ereignistyp '{typ}': {meldung}", extra={'daten': daten} if daten else {})
+    if _schreiber is not None:
+        _schreiber.stoppe()
+    _min_stufe = log_level
+    _schreiber = LogSchreiber(log_datei_pfad, log_format, asynchron, warteschlange_max, drosselung)
+    # Meldungen anderer Bibliotheken (z.B. Flask/Werkzeug) über das logging-Modul ebenfalls in die Log-Datei leiten
+    wurzel_logger = logging.getLogger()
+    wurzel_logger.setLevel(log_level)
+    if not any(isinstance(handler, _LoggingWeiterleitung) for handler in wurzel_logger.handlers):
+        wurzel_logger.addHandler(_LoggingWeiterleitung())
+    protokolliere_ereignis_global("info", "Logging initialisiert. Log-Level: {log_level}, Log-Datei: '{log_datei}', Format: {log_format}, asynchron: {asynchron}",
+                                  log_level=logging.getLevelName(log_level), log_datei=log_datei_pfad, log_format=log_format, asynchron=asynchron)
+
+def beende_logging():
+    """Schreibt alle ausstehenden Ereignisse und beendet den Hintergrund-Thread (auch automatisch beim Programmende)."""
+    global _schreiber
+    if _schreiber is not None:
+        _schreiber.stoppe()
+        _schreiber = None
+
+atexit.register(beende_logging)
+
+def ist_stufe_aktiv(typ):
+    """Gibt zurück, ob Ereignisse dieses Typs protokolliert würden (z.B. um teure Debug-Daten nur bei Bedarf zu sammeln)."""
+    stufe = _TYP_STUFEN.get(typ, logging.INFO)
+    if _schreiber is None:
+        return logging.getLogger().isEnabledFor(stufe)
+    return stufe >= _min_stufe
+
+def get_logging_statistik():
+    """Gibt die Zähler des Log-Schreibers zurück (geschrieben, verworfen, gedrosselt je Art), oder None vor der Initialisierung."""
+    return _schreiber.get_statistik() if _schreiber is not None else None
+
+def protokolliere_ereignis_global(typ, meldung, daten=None, art=None, **felder):
+    """
+    Globale Funktion zum Protokollieren von Ereignissen.
+
+    Werden Felder als Schlüsselwortargumente übergeben, ist meldung eine str.format-Vorlage, die erst im
+    Hintergrund-Thread formatiert wird; die Felder landen mit ihrem Typ in den Daten des Datensatzes. Ist die
+    Stufe deaktiviert, kehrt der Aufruf sofort zurück. art benennt die Ereignisart für Sampling und Ratenbegrenzung
+    (Standard: die Vorlage, falls Felder übergeben wurden).
+    """
+    stufe = _TYP_STUFEN.get(typ, logging.INFO)
+    schreiber = _schreiber
+    if schreiber is None:
+        _protokolliere_logging_modul(typ, stufe, meldung, daten, felder)
+        return
+    if stufe < _min_stufe:
+        return
+    if art is None and felder:
+        art = meldung
+    schreiber.schreibe(time.time(), typ, stufe, meldung, daten, art, felder)
+
+def _formatiere(meldung, felder):
+    """Formatiert eine Vorlage mit ihren Feldern; Mengen werden für die Ausgabe sortiert."""
+    if not felder:
+        return meldung
+    werte = {name: sorted(wert, key=str) if isinstance(wert, (set, frozenset)) else wert for name, wert in felder.items()}
+    try:
+        return meldung.format_map(werte)
+    except (KeyError, IndexError, ValueError):
+        return f"{meldung} {werte}" # Fehlerhafte Vorlage: Meldung nicht verlieren
+
+def _json_wert(wert):
+    """json.dumps-Fallback für nicht serialisierbare Werte."""
+    if isinstance(wert, (set, frozenset)):
+        return sorted(wert, key=str)
+    if isinstance(wert, bytes):
+        return wert.hex()
+    return str(wert)
+
+def _protokolliere_logging_modul(typ, stufe, meldung, daten, felder):
+    """Fallback vor initialisiere_logging(): direkt über das logging-Modul (z.B. in Benchmarks und Werkzeugen)."""
+    if not logging.getLogger().isEnabledFor(stufe):
+        return
+    text = _formatiere(meldung, felder)
+    if typ == "aktion":
+        text = f"AKTION: {text}" # Kennzeichnung für Aktionen im Log
+    elif typ not in _TYP_STUFEN:
+        text = f"Unbekannter Ereignistyp '{typ}': {text}"
+    logging.log(stufe, text)
+
+class _LoggingWeiterleitung(logging.Handler):
+    """Leitet Datensätze des logging-Moduls an den aktiven LogSchreiber weiter."""
+    _TYPEN = ((logging.ERROR, "fehler"), (logging.WARNING, "warnung"), (logging.INFO, "info"))
+
+    def emit(self, record):
+        schreiber = _schreiber
+        if schreiber is None or record.levelno < _min_stufe:
+            return
+        typ = next((typ for stufe, typ in self._TYPEN if record.levelno >= stufe), "debug")
+        try:
+            meldung = record.getMessage()
+        except (TypeError, ValueError):
+            meldung = str(record.msg)
+        schreiber.schreibe(record.created, typ, record.levelno, meldung, {"logger": record.name}, None, {})
+
+class LogSchreiber:
+    """
+    Schreibt Ereignisse aus einer Warteschlange im Hintergrund in die Log-Datei.
+
+    Der aufrufende Thread hängt nur ein Tupel an eine deque an; Formatierung, JSON-Serialisierung und
+    Datei-I/O erfolgen gebündelt im Schreib-Thread. Warnungen und Fehler wecken den Thread sofort, alle
+    anderen Ereignisse werden spätestens nach schreib_intervall Sekunden geschrieben. Ist die Warteschlange
+    voll, werden neue Ereignisse verworfen und gezählt statt den Scan zu blockieren.
+    """
+    def __init__(self, log_datei_pfad, log_format="jsonl", asynchron=True, warteschlange_max=100000, drosselung=None, schreib_intervall=0.2):
+        self.log_datei_pfad = log_datei_pfad
+        self.log_format = log_format if log_format in ("jsonl", "text") else "jsonl"
+        self.asynchron = asynchron
+        self.warteschlange_max = warteschlange_max
+        self.schreib_intervall = schreib_intervall
+        self.drosselung = {art: (float(regel.get("anteil", 1.0)), regel.get("max_pro_sekunde")) for art, regel in (drosselung or {}).items()}
+        self._fenster = {} # art -> [Sekunde, Anzahl in dieser Sekunde]
+        self._drossel_sperre = threading.Lock() # Prüfen und Zählen der Drosselung (mehrere erzeugende Threads), ohne auf Datei-I/O zu warten
+        self.gedrosselt = collections.Counter() # art -> unterdrückte Ereignisse (seit der letzten Zusammenfassung)
+        self.gedrosselt_gesamt = 0
+        self.verworfen = 0
+        self.geschrieben = 0
+        self._zufall = random.Random()
+        self._warteschlange = collections.deque()
+        self._signal = threading.Event()
+        self._sperre = threading.Lock() # Serialisiert Schreibzugriffe (Schreib-Thread, synchroner Modus, stoppe())
+        self._datei = open(log_datei_pfad, "a", encoding="utf-8", errors="backslashreplace") # Dateinamen ohne gültiges UTF-8 nicht die ganze Gruppe verwerfen lassen
+        self._laeuft = True
+        self._thread = None
+        if asynchron:
+            self._thread = threading.Thread(target=self._schreib_schleife, name="LogSchreiber", daemon=True)
+            self._thread.start()
+
+    def schreibe(self, zeit, typ, stufe, meldung, daten, art, felder):
+        """Nimmt ein Ereignis an (Sampling/Ratenbegrenzung, dann Warteschlange oder direktes Schreiben)."""
+        if art is not None and art in self.drosselung and not self._durchlassen(art, zeit):
+            return
+        ereignis = (zeit, typ, stufe, meldung, daten, art, felder, threading.current_thread().name)
+        if not self.asynchron:
+            with self._sperre:
+                self._schreibe_datensaetze([ereignis])
+            return
+        if len(self._warteschlange) >= self.warteschlange_max:
+            self.verworfen += 1
+            return
+        self._warteschlange.append(ereignis)
+        if stufe >= logging.WARNING:
+            self._signal.set()
+
+    def _durchlassen(self, art, zeit):
+        """Sampling (Anteil) und Ratenbegrenzung (pro Sekunde) für eine Ereignisart."""
+        anteil, max_pro_sekunde = self.drosselung[art]
+        with self._drossel_sperre:
+            if anteil < 1.0 and self._zufall.random() >= anteil:
+                self._unterdruecke(art)
+                return False
+            if max_pro_sekunde is not None:
+                sekunde = int(zeit)
+                fenster = self._fenster.get(art)
+                if fenster is None or fenster[0] != sekunde:
+                    fenster = self._fenster[art] = [sekunde, 0]
+                if fenster[1] >= max_pro_sekunde:
+                    self._unterdruecke(art)
+                    return False
+                fenster[1] += 1
+        return True
+
+    def _unterdruecke(self, art):
+        """Zählt ein unterdrücktes Ereignis (unter self._drossel_sperre aufrufen)."""
+        self.gedrosselt[art] += 1
+        self.gedrosselt_gesamt += 1
+
+    def _schreib_schleife(self):
+        """Hintergrund-Thread: leert die Warteschlange blockweise."""
+        while self._laeuft:
+            self._signal.wait(self.schreib_intervall)
+            self._signal.clear()
+            self._leere_warteschlange()
+        self._leere_warteschlange()
+
+    def _leere_warteschlange(self):
+        with self._sperre:
+            while self._warteschlange:
+                block = []
+                while self._warteschlange and len(block) < 4096:
+                    block.append(self._warteschlange.popleft())
+                self._schreibe_datensaetze(block)
+            with self._drossel_sperre:
+                gedrosselt, self.gedrosselt = self.gedrosselt, collections.Counter()
+            if gedrosselt:
+                # Unterdrückte Ereignisse zusammengefasst protokollieren, damit ihr Volumen sichtbar bleibt
+                self._schreibe_datensaetze([(time.time(), "info", logging.INFO, "{anzahl} Ereignis(se) durch Sampling/Ratenbegrenzung unterdrückt.",
+                                             None, None, {"anzahl": sum(gedrosselt.values()), "je_art": dict(gedrosselt)}, threading.current_thread().name)])
+
+    def _schreibe_datensaetze(self, ereignisse):
+        """Formatiert Ereignisse und schreibt sie in einem Aufruf (Aufrufer hält _sperre)."""
+        zeilen = []
+        for zeit, typ, stufe, meldung, daten, art, felder, thread_name in ereignisse:
+            text = _formatiere(meldung, felder)
+            if typ == "aktion":
+                text = f"AKTION: {text}" # Kennzeichnung für Aktionen im Log
+            elif typ not in _TYP_STUFEN:
+                text = f"Unbekannter Ereignistyp '{typ}': {text}"
+            if felder:
+                daten = {**daten, **felder} if isinstance(daten, dict) else {**felder, "daten": daten} if daten is not None else felder
+            zeitstempel = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(zeit)) + f".{int(zeit * 1000) % 1000:03d}"
+            if self.log_format == "jsonl":
+                datensatz = {"zeit": zeitstempel, "stufe": logging.getLevelName(stufe), "typ": typ, "meldung": text, "thread": thread_name}
+                if art is not None and art != meldung:
+                    datensatz["art"] = art
+                if daten is not None:
+                    datensatz["daten"] = daten
+                zeilen.append(json.dumps(datensatz, ensure_ascii=False, default=_json_wert))
+            else:
+                zeilen.append(f"{zeitstempel} - {logging.getLevelName(stufe)} - {text}" + (f" - {json.dumps(daten, ensure_ascii=False, default=_json_wert)}" if daten is not None else ""))
+        try:
+            self._datei.write("\n".join(zeilen) + "\n")
+            self._datei.flush()
+            self.geschrieben += len(zeilen)
+        except (OSError, ValueError) as e:
+            print(f"Fehler beim Schreiben der Log-Datei '{self.log_datei_pfad}': {e}", file=sys.stderr)
+
+    def stoppe(self):
+        """Schreibt ausstehende Ereignisse, beendet den Thread und schließt die Datei."""
+        self._laeuft = False
+        self._signal.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self._leere_warteschlange()
+        with self._sperre:
+            self._datei.close()
+
+    def get_statistik(self):
+        """Gibt geschriebene, verworfene und gedrosselte Ereignisse sowie die aktuelle Warteschlangenlänge zurück."""
+        return {
+            "format": self.log_format,
+            "asynchron": self.asynchron,
+            "geschrieben": self.geschrieben,
+            "warteschlange": len(self._warteschlange),
+            "verworfen": self.verworfen,
+            "gedrosselt": self.gedrosselt_gesamt
+        }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
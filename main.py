@@ -41,8 +41,11 @@ def setup_logging(config: dict) -> None:
     log_config = config.get("logging", {})
     log_datei = log_config.get("log_datei", "virenschutz.log")
     log_level = log_config.get("log_level", "DEBUG")
-    initialisiere_logging(log_level, log_datei)
-    protokolliere_ereignis_global("info", f"Logging wurde initialisiert: Level={log_level}, Datei='{log_datei}'")
+    initialisiere_logging(log_level, log_datei,
+                          log_format=log_config.get("log_format", "jsonl"),
+                          asynchron=log_config.get("log_asynchron", True),
+                          warteschlange_max=log_config.get("log_warteschlange_max", 100000),
+                          drosselung=log_config.get("log_drosselung", {}))
 
 # Hauptfunktion, die alle Komponenten initialisiert und den Virenschutz startet
 def main() -> None:
@@ -90,7 +93,6 @@ def main() -> None:
 
     # Web-UI (Flask) instanziieren
     web_ui_manager = WebUIManager(config_manager, system_pruefung_manager, prozess_manager, warnungs_manager, blockchain_manager, ki_analyse_manager) # ki_analyse_manager hinzugefügt
-    globals()['web_ui_manager'] = web_ui_manager # Globale Instanz für Zugriff durch SystemÜberprüfungsManager
 
     # Starte den Web-UI-Server in einem eigenen Thread (falls in der Konfiguration aktiviert)
     web_ui_manager.starte_web_ui()
@@ -126,6 +128,8 @@ def main() -> None:
     hauptfenster.mainloop()
 
     # Beim Beenden der GUI wird der Virenschutz ordentlich heruntergefahren
+    ki_analyse_manager.beende() # Ausstehende KI-Anfragen abschließen und Urteilscache speichern
+    blockchain_manager.beende() # Wartende Log-Hashes verankern
     protokolliere_ereignis_global("info", "Virenschutz wird beendet.")
 
 # Standard‑Eintrittspunkt
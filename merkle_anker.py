@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+_BLATT_PRAEFIX = b"\x00" # Trennung von Blatt- und Knoten-Hashes (verhindert Second-Preimage-Angriffe auf den Baum)
+_KNOTEN_PRAEFIX = b"\x01"
+_ENDE = object() # Markierung zum Beenden des Batch-Threads
+_LESE_BLOCK_GROESSE = 64 * 1024
+
+def berechne_merkle_baum(blatt_hashes):
+    """
+    Berechnet Merkle-Wurzel und Inklusionsbeweise für eine Liste von Blatt-Hashes (je 32 Rohbytes).
+    Ein Beweis ist eine Liste von Geschwister-Hashes (Hex) mit Präfix "L" oder "R" für die Seite des Geschwisters.
+    Bei ungerader Anzahl wird der letzte Knoten einer Ebene unverändert übernommen.
+    Gibt (wurzel_hex, [beweis, ...]) zurück.
+    """
+    sha256 = hashlib.sha256
+    ebenen = [[sha256(_BLATT_PRAEFIX + blatt).digest() for blatt in blatt_hashes]]
+    while len(ebenen[-1]) > 1:
+        ebene = ebenen[-1]
+        naechste_ebene = [sha256(_KNOTEN_PRAEFIX + ebene[i] + ebene[i + 1]).digest() for i in range(0, len(ebene) - 1, 2)]
+        if len(ebene) % 2:
+            naechste_ebene.append(ebene[-1])
+        ebenen.append(naechste_ebene)
+    # Geschwister-Hashes jeder Ebene nur einmal in Hex umwandeln
+    ebenen_hex = [[knoten.hex() for knoten in ebene] for ebene in ebenen[:-1]]
+    beweise = []
+    for blatt_index in range(len(ebenen[0])):
+        beweis = []
+        position = blatt_index
+        for ebene_hex in ebenen_hex:
+            geschwister = position ^ 1
+            if geschwister < len(ebene_hex):
+                beweis.append(("L" if geschwister < position else "R") + ebene_hex[geschwister])
+            position >>= 1
+        beweise.append(beweis)
+    return (ebenen[-1][0].hex() if ebenen[0] else ""), beweise
+
+def verifiziere_merkle_beweis(log_hash, beweis, wurzel):
+    """Prüft, ob ein Log-Hash (Hex) mit dem Inklusionsbeweis zur Merkle-Wurzel (Hex) führt."""
+    try:
+        knoten = hashlib.sha256(_BLATT_PRAEFIX + bytes.fromhex(log_hash)).digest()
+        for schritt in beweis:
+            geschwister = bytes.fromhex(schritt[1:])
+            if schritt[0] == "L":
+                knoten = hashlib.sha256(_KNOTEN_PRAEFIX + geschwister + knoten).digest()
+            else:
+                knoten = hashlib.sha256(_KNOTEN_PRAEFIX + knoten + geschwister).digest()
+    except (ValueError, IndexError, TypeError):
+        return False
+    return knoten.hex() == wurzel
+
+class MerkleLogAnker:
+    """
+    Sammelt Log-Hashes und verankert sie gebündelt über die Wurzel eines Merkle-Baums.
+    Modul für die fälschungssichere Registrierung von Log-Meldungen mit konstanter Thread-Anzahl.
+
+    Zwei Hintergrund-Threads (unabhängig von der Last): der Batch-Thread sammelt Hashes, bis
+    `max_batch_groesse` erreicht oder `max_wartezeit_sekunden` seit dem ersten Hash vergangen sind,
+    und berechnet Merkle-Baum und Beweiszeilen; der Anker-Thread übergibt nur die Wurzel an
+    `anker_funktion(wurzel, anzahl) -> transaktions_hash` und hängt danach alle Einträge mit
+    Inklusionsbeweis als JSON-Zeilen an die Beweisdatei an (ein Schreibvorgang pro Batch).
+    Während eine Wurzel verankert wird, entsteht bereits der nächste Batch.
+    Die Warteschlange ist begrenzt; ist sie voll, wird der Hash verworfen und gezählt, statt
+    den Aufrufer zu blockieren.
+    """
+    def __init__(self, beweis_datei_pfad, anker_funktion, max_batch_groesse=16384, max_wartezeit_sekunden=5.0, max_warteschlange=100000):
+        self.beweis_datei_pfad = beweis_datei_pfad
+        self.anker_funktion = anker_funktion
+        self.max_batch_groesse = max(1, int(max_batch_groesse))
+        self.max_wartezeit_sekunden = max_wartezeit_sekunden
+        self.warteschlange = queue.Queue(maxsize=max(1, int(max_warteschlange)))
+        self.anker_warteschlange = queue.Queue(maxsize=2) # Fertige Batches, die auf ihre Verankerung warten
+        self.sperre = threading.Lock() # Schützt Thread-Start und Beweisdatei
+        self.thread = None
+        self.anker_thread = None
+        self.registriert = 0
+        self.verworfen = 0
+        self.verankerte_batches = 0
+
+    def starte(self):
+        """
+        Startet Batch- und Anker-Thread, falls sie nicht laufen. Vorab aus einem Thread mit normaler Priorität aufrufen:
+        unter Linux erben neue Threads nice/ionice des erzeugenden Threads (etwa eines gedrosselten Scan-Threads).
+        """
+        with self.sperre:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._batch_schleife, daemon=True)
+                self.anker_thread = threading.Thread(target=self._anker_schleife, daemon=True)
+                self.thread.start()
+                self.anker_thread.start()
+
+    def fuege_hinzu(self, log_meldung):
+        """Reiht den Hash einer Log-Meldung zur Verankerung ein, ohne zu blockieren. Gibt den Hash zurück oder None, falls die Warteschlange voll ist."""
+        log_hash = hashlib.sha256(log_meldung.encode('utf-8')).hexdigest()
+        if self.thread is None or not self.thread.is_alive():
+            self.starte()
+        try:
+            self.warteschlange.put_nowait((log_hash, datetime.now().isoformat(), log_meldung[:50]))
+        except queue.Full:
+            self.verworfen += 1
+            return None
+        return log_hash
+
+    def _batch_schleife(self):
+        while True:
+            erster = self.warteschlange.get()
+            if erster is _ENDE:
+                self.anker_warteschlange.put(_ENDE)
+                return
+            batch = [erster]
+            frist = time.monotonic() + self.max_wartezeit_sekunden
+            beenden = False
+            while len(batch) < self.max_batch_groesse:
+                try:
+                    eintrag = self.warteschlange.get_nowait() # Bereits wartende Einträge ohne Timeout abholen
+                except queue.Empty:
+                    rest = frist - time.monotonic()
+                    if rest <= 0:
+                        break
+                    try:
+                        eintrag = self.warteschlange.get(timeout=rest)
+                    except queue.Empty:
+                        break
+                if eintrag is _ENDE:
+                    beenden = True
+                    break
+                batch.append(eintrag)
+            self.anker_warteschlange.put(self._bereite_batch_vor(batch))
+            if beenden:
+                self.anker_warteschlange.put(_ENDE)
+                return
+
+    @staticmethod
+    def _bereite_batch_vor(batch):
+        """Berechnet den Merkle-Baum eines Batches und die Beweiszeilen (ohne TX-Hash). Gibt (wurzel, anzahl, zeilen) zurück."""
+        wurzel, beweise = berechne_merkle_baum([bytes.fromhex(log_hash) for log_hash, _, _ in batch])
+        dumps = json.dumps
+        # Zeilen ohne öffnende Klammer; der TX-Hash wird nach der Verankerung vorangestellt
+        zeilen = [dumps({"hash": log_hash, "zeitstempel": zeitstempel, "meldung_vorschau": vorschau + "...",
+                         "merkle_wurzel": wurzel, "index": index, "beweis": beweis}, ensure_ascii=False)[1:]
+                  for index, ((log_hash, zeitstempel, vorschau), beweis) in enumerate(zip(batch, beweise))]
+        return wurzel, len(batch), zeilen
+
+    def _anker_schleife(self):
+        while True:
+            eintrag = self.anker_warteschlange.get()
+            if eintrag is _ENDE:
+                return
+            wurzel, anzahl, zeilen = eintrag
+            try:
+                self._verankere_batch(wurzel, anzahl, zeilen)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Fehler bei der Verankerung von {anzahl} Log-Hash(es): {e}", {"fehler": str(e)})
+
+    def _verankere_batch(self, wurzel, anzahl, zeilen):
+        """Verankert die Merkle-Wurzel eines Batches und hängt die Beweiszeilen an die Beweisdatei an."""
+        transaktions_hash = self.anker_funktion(wurzel, anzahl)
+        praefix = '{"blockchain_tx_hash": ' + json.dumps(transaktions_hash) + ', '
+        daten = (praefix + ("\n" + praefix).join(zeilen) + "\n").encode("utf-8")
+        with self.sperre:
+            with open(self.beweis_datei_pfad, "ab") as datei:
+                datei.write(daten)
+        self.registriert += anzahl
+        self.verankerte_batches += 1
+        protokolliere_ereignis_global("info", f"{anzahl} Log-Hash(es) über Merkle-Wurzel {wurzel[:16]}... verankert. TX-Hash: {transaktions_hash}",
+                                      {"anzahl": anzahl, "merkle_wurzel": wurzel, "blockchain_tx_hash": transaktions_hash})
+
+    def lese_letzte_eintraege(self, anzahl=10):
+        """Liest die letzten `anzahl` Einträge (ältester zuerst) vom Ende der Beweisdatei, ohne die ganze Datei zu laden."""
+        if anzahl <= 0:
+            return []
+        with self.sperre:
+            try:
+                with open(self.beweis_datei_pfad, "rb") as datei:
+                    position = datei.seek(0, os.SEEK_END)
+                    rest = b""
+                    while position > 0 and rest.count(b"\n") <= anzahl:
+                        laenge = min(_LESE_BLOCK_GROESSE, position)
+                        position -= laenge
+                        datei.seek(position)
+                        rest = datei.read(laenge) + rest
+            except FileNotFoundError:
+                return []
+        zeilen = rest.splitlines()[-anzahl:]
+        eintraege = []
+        for zeile in zeilen:
+            try:
+                eintraege.append(json.loads(zeile))
+            except ValueError:
+                continue # Unvollständige Zeile (z.B. nach einem Absturz beim Schreiben)
+        return eintraege
+
+    def beende(self, timeout=10):
+        """Verankert alle wartenden Hashes und beendet Batch- und Anker-Thread."""
+        if self.thread is not None and self.thread.is_alive():
+            self.warteschlange.put(_ENDE)
+            self.thread.join(timeout)
+        if self.anker_thread is not None:
+            self.anker_thread.join(timeout)
+
+    def get_statistik(self):
+        """Gibt Anzahl registrierter, verworfener und wartender Hashes sowie verankerter Batches zurück."""
+        return {"registriert": self.registriert, "verworfen": self.verworfen, "wartend": self.warteschlange.qsize(),
+                "verankerte_batches": self.verankerte_batches}
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
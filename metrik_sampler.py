@@ -0,0 +1,192 @@
+import array
+import os
+import threading
+import time
+import psutil
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+# Erfasste Metriken (Reihenfolge = Spalten der Ringpuffer)
+METRIKEN = (
+    "system_cpu_prozent", # Systemweite CPU-Auslastung
+    "system_speicher_prozent",
+    "prozess_cpu_prozent", # CPU-Auslastung des Virenschutz-Prozesses (100 = ein Kern)
+    "prozess_rss_bytes",
+    "prozess_threads",
+    "prozess_io_lesen_bytes_pro_s",
+    "prozess_io_schreiben_bytes_pro_s"
+)
+
+class RingPuffer:
+    """
+    Zeitreihe fester Länge in array.array('d')-Puffern (Zeitstempel plus eine Spalte pro Metrik).
+    Der Speicherbedarf ist unabhängig von der Laufzeit: ältere Werte werden überschrieben.
+    """
+    def __init__(self, kapazitaet, metriken=METRIKEN):
+        self.kapazitaet = kapazitaet
+        self.metriken = metriken
+        self.zeiten = array.array("d", bytes(8 * kapazitaet))
+        self.spalten = {name: array.array("d", bytes(8 * kapazitaet)) for name in metriken}
+        self.position = 0 # Nächster Schreibindex
+        self.anzahl = 0
+
+    def fuege_hinzu(self, zeit, werte):
+        position = self.position
+        self.zeiten[position] = zeit
+        for name, spalte in self.spalten.items():
+            spalte[position] = werte.get(name, 0.0)
+        self.position = (position + 1) % self.kapazitaet
+        self.anzahl = min(self.anzahl + 1, self.kapazitaet)
+
+    def _indizes(self):
+        """Indizes vom ältesten zum neuesten Wert."""
+        start = (self.position - self.anzahl) % self.kapazitaet
+        return [(start + i) % self.kapazitaet for i in range(self.anzahl)]
+
+    def als_reihen(self, metriken=None, seit=None, max_punkte=None):
+        """Gibt {"zeit": [...], <metrik>: [...]} zurück (optional ab "seit" und ausgedünnt auf max_punkte)."""
+        indizes = self._indizes()
+        if seit is not None:
+            indizes = [i for i in indizes if self.zeiten[i] >= seit]
+        if max_punkte and len(indizes) > max_punkte:
+            schritt = len(indizes) / max_punkte
+            indizes = [indizes[int(k * schritt)] for k in range(max_punkte - 1)] + [indizes[-1]] # Neuester Wert bleibt enthalten
+        reihen = {"zeit": [round(self.zeiten[i], 3) for i in indizes]}
+        for name in metriken or self.metriken:
+            spalte = self.spalten[name]
+            reihen[name] = [spalte[i] for i in indizes]
+        return reihen
+
+    def speicher_bytes(self):
+        return self.zeiten.itemsize * self.kapazitaet * (1 + len(self.spalten))
+
+class MetrikSampler:
+    """
+    Erfasst Ressourcenmetriken im Hintergrund, damit Web-Anfragen nicht blockieren.
+    Modul für Dashboard- und Verlaufsdaten (ersetzt psutil.cpu_percent(interval=1) pro Anfrage).
+
+    - Ein Thread misst alle intervall_sekunden CPU (System und eigener Prozess), Speicher, RSS,
+      Thread-Anzahl und I/O-Raten des eigenen Prozesses. CPU-Werte stammen aus cpu_percent(interval=None),
+      d.h. aus der Differenz zur vorherigen Messung, ohne zu warten.
+    - Der letzte Messwert wird als Dictionary bereitgehalten (aktuell()), die Verläufe liegen in zwei
+      Ringpuffern fester Größe: "fein" mit jedem Messwert, "grob" mit Mittelwerten über grob_intervall_sekunden.
+    """
+    def __init__(self, intervall_sekunden=1.0, verlauf_punkte=3600, grob_intervall_sekunden=60, grob_verlauf_punkte=1440):
+        self.intervall_sekunden = intervall_sekunden
+        self.grob_intervall_sekunden = grob_intervall_sekunden
+        self.fein = RingPuffer(verlauf_punkte)
+        self.grob = RingPuffer(grob_verlauf_punkte)
+        self.prozess = psutil.Process(os.getpid())
+        self._sperre = threading.Lock()
+        self._stopp = threading.Event()
+        self._thread = None
+        self._letzter_wert = {}
+        self._letzte_io = None # (zeit, lese_bytes, schreib_bytes)
+        self._grob_summen = dict.fromkeys(METRIKEN, 0.0)
+        self._grob_anzahl = 0
+        self._grob_start = None
+        self.messdauer_sekunden = 0.0 # Dauer der letzten Messung (Kosten des Samplers)
+        # CPU-Zähler initialisieren: cpu_percent(interval=None) misst jeweils seit dem vorherigen Aufruf
+        psutil.cpu_percent(interval=None)
+        self.prozess.cpu_percent(interval=None)
+
+    def starte(self):
+        """Startet den Hintergrund-Thread (mehrfacher Aufruf ist unschädlich)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopp.clear()
+        self._thread = threading.Thread(target=self._schleife, name="MetrikSampler", daemon=True)
+        self._thread.start()
+        protokolliere_ereignis_global("info", f"Metrik-Sampler gestartet (Intervall {self.intervall_sekunden} s, Verlauf {self.fein.kapazitaet} + {self.grob.kapazitaet} Punkte, "
+                                              f"{(self.fein.speicher_bytes() + self.grob.speicher_bytes()) // 1024} KiB).")
+
+    def stoppe(self):
+        """Beendet den Hintergrund-Thread; die Verläufe bleiben lesbar."""
+        self._stopp.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _schleife(self):
+        naechste = time.monotonic()
+        while not self._stopp.is_set():
+            try:
+                self.messe()
+            except (psutil.Error, OSError) as e:
+                protokolliere_ereignis_global("warnung", f"Metrik-Messung fehlgeschlagen: {e}", {"fehler": str(e)})
+            naechste += self.intervall_sekunden
+            self._stopp.wait(max(0.0, naechste - time.monotonic()))
+
+    def messe(self):
+        """Führt eine Messung durch und legt sie in den Ringpuffern ab. Gibt den Messwert zurück."""
+        start = time.perf_counter()
+        jetzt = time.time()
+        werte = {
+            "system_cpu_prozent": psutil.cpu_percent(interval=None),
+            "system_speicher_prozent": psutil.virtual_memory().percent
+        }
+        with self.prozess.oneshot():
+            werte["prozess_cpu_prozent"] = self.prozess.cpu_percent(interval=None)
+            werte["prozess_rss_bytes"] = float(self.prozess.memory_info().rss)
+            werte["prozess_threads"] = float(self.prozess.num_threads())
+            try:
+                io = self.prozess.io_counters()
+            except (AttributeError, psutil.AccessDenied):
+                io = None # z.B. macOS: keine I/O-Zähler pro Prozess
+        if io is not None:
+            if self._letzte_io is not None and jetzt > self._letzte_io[0]:
+                dauer = jetzt - self._letzte_io[0]
+                werte["prozess_io_lesen_bytes_pro_s"] = max(0.0, (io.read_bytes - self._letzte_io[1]) / dauer)
+                werte["prozess_io_schreiben_bytes_pro_s"] = max(0.0, (io.write_bytes - self._letzte_io[2]) / dauer)
+            self._letzte_io = (jetzt, io.read_bytes, io.write_bytes)
+
+        with self._sperre:
+            self.fein.fuege_hinzu(jetzt, werte)
+            if self._grob_start is None:
+                self._grob_start = jetzt
+            for name in METRIKEN:
+                self._grob_summen[name] += werte.get(name, 0.0)
+            self._grob_anzahl += 1
+            if jetzt - self._grob_start >= self.grob_intervall_sekunden:
+                self.grob.fuege_hinzu(jetzt, {name: summe / self._grob_anzahl for name, summe in self._grob_summen.items()})
+                self._grob_summen = dict.fromkeys(METRIKEN, 0.0)
+                self._grob_anzahl = 0
+                self._grob_start = jetzt
+            self._letzter_wert = dict(werte, zeit=jetzt)
+        self.messdauer_sekunden = time.perf_counter() - start
+        return werte
+
+    def aktuell(self):
+        """Gibt den letzten Messwert zurück (aus dem Speicher, ohne Systemaufrufe); {} vor der ersten Messung."""
+        return self._letzter_wert
+
+    def verlauf(self, metriken=None, seit=None, max_punkte=None, aufloesung=None):
+        """
+        Gibt Zeitreihen zurück. aufloesung "fein" oder "grob"; ohne Angabe wird "grob" gewählt, wenn "seit"
+        vor dem ältesten feinen Messwert liegt. Unbekannte Metriken lösen einen ValueError aus.
+        """
+        unbekannt = [name for name in metriken or () if name not in METRIKEN]
+        if unbekannt:
+            raise ValueError(f"Unbekannte Metrik(en): {', '.join(unbekannt)}")
+        with self._sperre:
+            if aufloesung is None:
+                aeltester_fein = self.fein.zeiten[(self.fein.position - self.fein.anzahl) % self.fein.kapazitaet] if self.fein.anzahl else None
+                aufloesung = "grob" if seit is not None and aeltester_fein is not None and seit < aeltester_fein and self.grob.anzahl else "fein"
+            puffer = self.grob if aufloesung == "grob" else self.fein
+            reihen = puffer.als_reihen(metriken, seit, max_punkte)
+        reihen["aufloesung"] = aufloesung
+        reihen["intervall_sekunden"] = self.grob_intervall_sekunden if aufloesung == "grob" else self.intervall_sekunden
+        return reihen
+
+    def get_statistik(self):
+        """Gibt Messpunkte, Speicherbedarf der Puffer und die Dauer der letzten Messung zurück."""
+        return {
+            "punkte_fein": self.fein.anzahl,
+            "punkte_grob": self.grob.anzahl,
+            "puffer_bytes": self.fein.speicher_bytes() + self.grob.speicher_bytes(),
+            "messdauer_ms": round(self.messdauer_sekunden * 1000, 3)
+        }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
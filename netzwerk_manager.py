@@ -1,37 +1,188 @@
+import binascii
+import os
+import socket
+import sys
+import time
 import psutil
 from logging_utils import protokolliere_ereignis_global
 
+# Verbindungstabellen des Kernels: (Datei unter /proc/net, Adressfamilie, Protokoll)
+_PROC_NET_TABELLEN = ((b"tcp", socket.AF_INET, "tcp"), (b"tcp6", socket.AF_INET6, "tcp"), (b"udp", socket.AF_INET, "udp"), (b"udp6", socket.AF_INET6, "udp"))
+_TABELLEN_INFO = {datei: (familie, protokoll) for datei, familie, protokoll in _PROC_NET_TABELLEN}
+# TCP-Zustände (include/net/tcp_states.h), Bezeichnungen wie bei psutil
+_TCP_ZUSTAENDE = {b"01": "ESTABLISHED", b"02": "SYN_SENT", b"03": "SYN_RECV", b"04": "FIN_WAIT1", b"05": "FIN_WAIT2", b"06": "TIME_WAIT",
+                  b"07": "CLOSE", b"08": "CLOSE_WAIT", b"09": "LAST_ACK", b"0A": "LISTEN", b"0B": "CLOSING"}
+
+def _dekodiere_proc_adresse(hex_adresse, familie):
+    """Wandelt eine Adresse aus /proc/net/* ("0100007F:1F90") in (ip, port) um; (None, None) für keine Gegenstelle."""
+    ip_hex, port_hex = hex_adresse.split(b":")
+    port = int(port_hex, 16)
+    roh = binascii.unhexlify(ip_hex)
+    if not port and not roh.strip(b"\0"):
+        return None, None
+    if sys.byteorder == "little":
+        # Der Kernel gibt jedes 32-Bit-Wort in Host-Byte-Reihenfolge aus
+        roh = b"".join(roh[i:i + 4][::-1] for i in range(0, len(roh), 4))
+    return socket.inet_ntop(familie, roh), port
+
 class NetzwerkManager:
     """
     Verwaltet Netzwerk-bezogene Operationen.
-    Modul für Netzwerküberwachung (erweitert).
+    Modul für Netzwerküberwachung (systemweiter Verbindungs-Schnappschuss mit Diff pro Tick).
+
+    Pro Tick wird genau ein Schnappschuss aller Verbindungen erstellt und mit dem vorherigen verglichen;
+    gemeldet werden nur geöffnete und geschlossene Verbindungen (mit Lebensdauer). Unter Linux werden
+    die Tabellen aus /proc/net direkt gelesen und über ihre Rohzeilen verglichen, sodass nur Adressen
+    geänderter Verbindungen dekodiert werden; die Zuordnung Socket -> PID wird nur für unbekannte
+    Sockets aufgefrischt. Auf anderen Systemen dient ein psutil.net_connections('inet')-Aufruf als Fallback.
     """
-    def __init__(self):
-        pass  # Keine Initialisierung aktuell
+    def __init__(self, proc_verzeichnis="/proc"):
+        self.proc_verzeichnis = proc_verzeichnis
+        self.proc_net_aktiv = sys.platform.startswith("linux") and os.path.exists(f"{proc_verzeichnis}/net/tcp")
+        self.offene_verbindungen = {} # schluessel -> (geöffnet_seit, zustand, pid)
+        self.socket_pids = {} # Socket-Inode -> PID (nur /proc)
+        self._pid_index = None # pid -> [schluessel, ...], bei Bedarf aus dem letzten Schnappschuss aufgebaut
+        self.geoeffnet_gesamt = 0
+        self.geschlossen_gesamt = 0
+        self.lebensdauer_summe = 0.0 # Sekunden aller geschlossenen Verbindungen
+        self.schnappschuss_dauer = 0.0
+        self.erster_schnappschuss = True
 
     def überwache_netzwerk_verbindungen(self):
-        """Überwacht aktive Netzwerkverbindungen (rudimentär)."""
-        protokolliere_ereignis_global("info", "Überprüfe Netzwerkverbindungen...")
-        for proc in psutil.process_iter(['pid', 'name']):
+        """
+        Erstellt einen systemweiten Schnappschuss der Verbindungen und vergleicht ihn mit dem vorherigen.
+        Gibt (geoeffnet, geschlossen) als Listen von Verbindungsinfos zurück; geschlossene enthalten die Lebensdauer.
+        """
+        start = time.perf_counter()
+        try:
+            aktuelle = self._lese_proc_net() if self.proc_net_aktiv else self._lese_psutil()
+        except psutil.AccessDenied as e:
+            protokolliere_ereignis_global("warnung", f"Zugriff verweigert beim Abrufen der Netzwerkverbindungen (NetzwerkManager): {e}", {"fehler": str(e)})
+            return [], []
+        jetzt = time.monotonic()
+        bisherige = self.offene_verbindungen
+
+        if self.proc_net_aktiv and any(inode and inode not in self.socket_pids
+                                       for schluessel, (_, inode) in aktuelle.items() if schluessel not in bisherige):
+            self._aktualisiere_socket_pids()
+
+        offene_verbindungen = {}
+        geoeffnet = []
+        for schluessel, (zustand, kennung) in aktuelle.items():
+            bekannt = bisherige.get(schluessel)
+            if bekannt is None:
+                pid = self.socket_pids.get(kennung) if self.proc_net_aktiv else kennung
+                offene_verbindungen[schluessel] = (jetzt, zustand, pid)
+                geoeffnet.append(self._verbindung_info(schluessel, zustand, pid))
+            elif bekannt[1] != zustand:
+                offene_verbindungen[schluessel] = (bekannt[0], zustand, bekannt[2]) # z.B. SYN_SENT -> ESTABLISHED; PID bleibt auch in TIME_WAIT erhalten
+            else:
+                offene_verbindungen[schluessel] = bekannt
+        geschlossen = []
+        for schluessel in bisherige.keys() - aktuelle.keys():
+            seit, zustand, pid = bisherige[schluessel]
+            verbindung_info = self._verbindung_info(schluessel, zustand, pid)
+            verbindung_info["dauer_sekunden"] = round(jetzt - seit, 1)
+            self.lebensdauer_summe += jetzt - seit
+            geschlossen.append(verbindung_info)
+        self.offene_verbindungen = offene_verbindungen
+        self._pid_index = None
+        self.geoeffnet_gesamt += len(geoeffnet)
+        self.geschlossen_gesamt += len(geschlossen)
+        self.schnappschuss_dauer = time.perf_counter() - start
+
+        if self.erster_schnappschuss:
+            # Beim Start nur zusammenfassen statt jede bestehende Verbindung einzeln zu protokollieren
+            self.erster_schnappschuss = False
+            protokolliere_ereignis_global("info", f"Netzwerküberwachung gestartet: {len(aktuelle)} bestehende Verbindung(en).")
+        else:
+            for verbindung_info in geoeffnet:
+                protokolliere_ereignis_global("debug", "Netzwerkverbindung geöffnet: PID {pid}, {protokoll} {lip}:{lport} -> {rip}:{rport}, Status: {status}",
+                                              art="netzwerk_verbindung", **verbindung_info)
+            for verbindung_info in geschlossen:
+                protokolliere_ereignis_global("debug", "Netzwerkverbindung geschlossen nach {dauer_sekunden} s: PID {pid}, {protokoll} {lip}:{lport} -> {rip}:{rport}",
+                                              art="netzwerk_verbindung", **verbindung_info)
+        return geoeffnet, geschlossen
+
+    def _lese_proc_net(self):
+        """Linux: liest die Verbindungstabellen als Rohzeilen. Gibt {(tabelle, lokal_hex, remote_hex): (zustand_hex, socket_inode)} zurück."""
+        aktuelle = {}
+        for tabelle, _, _ in _PROC_NET_TABELLEN:
             try:
-                prozess_obj = psutil.Process(proc.info['pid'])  # Prozess Objekt holen um net_connections() aufzurufen
-                prozess_name = proc.info['name'].lower()
-                for verbindung in prozess_obj.net_connections():  # Korrekte Verwendung von net_connections()
-                    if verbindung.status in ["ESTABLISHED", "LISTEN"]:
-                        remote_port = verbindung.raddr.port if verbindung.raddr else 'N/A'
-                        protokolliere_ereignis_global("debug",
-                                                      f"Aktive Netzwerkverbindung: Prozess: {prozess_name} (PID: {proc.info['pid']}), "
-                                                      f"Lokaler Port: {verbindung.laddr.port}, Remote Port: {remote_port}, Status: {verbindung.status}")
-                        # TODO: Zukünftig: Hier detailliertere Analyse und KI-Anbindung
-                        # Beispiel: Analyse von verbindung.raddr (Remote-Adresse) auf verdächtige IPs/Domains
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
-                protokolliere_ereignis_global("warnung",
-                                              f"Fehler beim Zugriff auf Prozess-Netzwerkinformationen (NetzwerkManager): {e}",
-                                              {"prozess_pid": proc.info.get('pid', 'Unbekannt'), "fehler": str(e)})
-            except Exception as e:
-                protokolliere_ereignis_global("fehler",
-                                              f"Unerwarteter Fehler bei der Netzwerküberwachung (NetzwerkManager): {e}",
-                                              {"fehler": str(e)})
+                with open(f"{self.proc_verzeichnis}/net/{tabelle.decode()}", "rb") as datei:
+                    zeilen = datei.read().split(b"\n")
+            except OSError:
+                continue # z.B. IPv6 deaktiviert
+            for zeile in zeilen[1:]:
+                felder = zeile.split()
+                if len(felder) >= 10:
+                    aktuelle[(tabelle, felder[1], felder[2])] = (felder[3], int(felder[9]))
+        return aktuelle
+
+    def _aktualisiere_socket_pids(self):
+        """Ordnet Socket-Inodes über /proc/<pid>/fd ihren Prozessen zu (nur nötig, wenn unbekannte Sockets auftauchen)."""
+        socket_pids = {}
+        for eintrag in os.listdir(self.proc_verzeichnis):
+            if not eintrag.isdigit():
+                continue
+            fd_verzeichnis = f"{self.proc_verzeichnis}/{eintrag}/fd"
+            try:
+                fds = os.listdir(fd_verzeichnis)
+            except OSError:
+                continue # Prozess beendet oder fehlende Rechte
+            pid = int(eintrag)
+            for fd in fds:
+                try:
+                    ziel = os.readlink(f"{fd_verzeichnis}/{fd}")
+                except OSError:
+                    continue
+                if ziel.startswith("socket:["):
+                    socket_pids[int(ziel[8:-1])] = pid
+        self.socket_pids = socket_pids
+
+    @staticmethod
+    def _lese_psutil():
+        """Fallback: ein psutil.net_connections('inet')-Aufruf. Gibt {(protokoll, laddr, raddr): (status, pid)} zurück."""
+        aktuelle = {}
+        for verbindung in psutil.net_connections('inet'):
+            protokoll = "tcp" if verbindung.type == socket.SOCK_STREAM else "udp"
+            aktuelle[(protokoll, verbindung.laddr, verbindung.raddr)] = (verbindung.status, verbindung.pid)
+        return aktuelle
+
+    def _verbindung_info(self, schluessel, zustand, pid):
+        """Erstellt die Verbindungsinfo (dekodiert Adressen nur für gemeldete Verbindungen)."""
+        if self.proc_net_aktiv:
+            tabelle, lokal, remote = schluessel
+            familie, protokoll = _TABELLEN_INFO[tabelle]
+            lip, lport = _dekodiere_proc_adresse(lokal, familie)
+            rip, rport = _dekodiere_proc_adresse(remote, familie)
+            status = _TCP_ZUSTAENDE.get(zustand, "NONE") if protokoll == "tcp" else "NONE"
+        else:
+            protokoll, laddr, raddr = schluessel
+            lip, lport = (laddr.ip, laddr.port) if laddr else (None, None)
+            rip, rport = (raddr.ip, raddr.port) if raddr else (None, None)
+            status = zustand
+        return {"pid": pid, "protokoll": protokoll, "lip": lip, "lport": lport, "rip": rip, "rport": rport, "status": status}
+
+    def verbindungen_fuer_pid(self, pid):
+        """Gibt die Verbindungsinfos eines Prozesses aus dem letzten Schnappschuss zurück (ohne weitere Systemaufrufe)."""
+        if self._pid_index is None:
+            pid_index = {}
+            for schluessel, (_, _, verbindung_pid) in self.offene_verbindungen.items():
+                pid_index.setdefault(verbindung_pid, []).append(schluessel)
+            self._pid_index = pid_index
+        return [self._verbindung_info(schluessel, *self.offene_verbindungen[schluessel][1:]) for schluessel in self._pid_index.get(pid, ())]
+
+    def get_statistik(self):
+        """Gibt offene Verbindungen, geöffnete/geschlossene seit dem Start, mittlere Lebensdauer und Dauer des letzten Schnappschusses zurück."""
+        return {
+            "quelle": "proc" if self.proc_net_aktiv else "psutil",
+            "offene_verbindungen": len(self.offene_verbindungen),
+            "geoeffnet": self.geoeffnet_gesamt,
+            "geschlossen": self.geschlossen_gesamt,
+            "mittlere_lebensdauer_sekunden": round(self.lebensdauer_summe / self.geschlossen_gesamt, 1) if self.geschlossen_gesamt else None,
+            "schnappschuss_dauer_ms": round(self.schnappschuss_dauer * 1000, 2)
+        }
 
     def protokolliere_ereignis(self, typ, meldung, daten=None):
         """Protokolliert ein Ereignis über das Logging-Modul."""
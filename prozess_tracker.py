@@ -0,0 +1,138 @@
+import os
+import sys
+import psutil
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+_COMM_MAX_LAENGE = 15 # Der Kernel kürzt den Prozessnamen (comm) auf 15 Zeichen
+_STAT_LESE_GROESSE = 1024 # /proc/<pid>/stat ist eine Zeile mit ca. 300 Bytes
+
+class ProzessTracker:
+    """
+    Verfolgt die Prozesstabelle zwischen zwei Echtzeit-Prüfungen.
+    Modul für das inkrementelle Erkennen neuer und geänderter Prozesse.
+
+    Ein Prozess wird über (pid, Startzeit) identifiziert, sodass wiederverwendete PIDs als neuer
+    Prozess erkannt werden. Pro lebendem Prozess wird nur ein kompakter Eintrag (Kurzname, prozess_info)
+    und das letzte Urteil gehalten. Unter Linux wird /proc direkt gelesen: pro Tick eine Verzeichnisliste
+    und ein Lesezugriff auf /proc/<pid>/stat je Prozess; Pfad und Kommandozeile nur für neue Prozesse
+    oder nach einem exec() (geänderter Kurzname). Auf anderen Systemen dient psutil als Fallback.
+    """
+    def __init__(self, proc_verzeichnis="/proc"):
+        self.proc_verzeichnis = proc_verzeichnis
+        self.proc_aktiv = sys.platform.startswith("linux") and os.path.isdir(proc_verzeichnis)
+        self.prozesse = {} # (pid, startzeit) -> (kurzname, prozess_info)
+        self.urteile = {} # (pid, startzeit) -> (ergebnis, regel_name)
+        self.neue_prozesse = 0
+        self.beendete_prozesse = 0
+
+    def aktualisiere(self, alle=False):
+        """
+        Liest die aktuelle Prozesstabelle und entfernt beendete Prozesse samt Urteil.
+        Gibt [(schluessel, prozess_info), ...] der neuen oder geänderten Prozesse zurück (mit alle=True: aller Prozesse).
+        """
+        aktuelle = self._lese_proc() if self.proc_aktiv else self._lese_psutil()
+        geaendert = []
+        for schluessel, (kurzname, prozess_info) in aktuelle.items():
+            bekannt = self.prozesse.get(schluessel)
+            if bekannt is None or bekannt[0] != kurzname:
+                self.urteile.pop(schluessel, None)
+                if bekannt is None:
+                    self.neue_prozesse += 1
+                geaendert.append((schluessel, prozess_info))
+            elif alle:
+                geaendert.append((schluessel, prozess_info))
+        beendet = self.prozesse.keys() - aktuelle.keys()
+        for schluessel in beendet:
+            self.urteile.pop(schluessel, None)
+        self.beendete_prozesse += len(beendet)
+        self.prozesse = aktuelle
+        return geaendert
+
+    def _lese_proc(self):
+        """Linux: liest /proc/<pid>/stat aller Prozesse; Details nur für unbekannte oder geänderte Prozesse."""
+        aktuelle = {}
+        for eintrag in os.listdir(self.proc_verzeichnis):
+            if not eintrag.isdigit():
+                continue
+            try:
+                # os.open/os.read statt open(): spart das Dateiobjekt, der größte Einzelposten pro Prozess
+                fd = os.open(f"{self.proc_verzeichnis}/{eintrag}/stat", os.O_RDONLY)
+                try:
+                    stat = os.read(fd, _STAT_LESE_GROESSE)
+                finally:
+                    os.close(fd)
+            except OSError:
+                continue # Prozess inzwischen beendet
+            # Format: "pid (comm) state ppid ..."; comm kann Leerzeichen und Klammern enthalten
+            ende_name = stat.rfind(b")")
+            kurzname = stat[stat.find(b"(") + 1:ende_name].decode("utf-8", "replace")
+            felder = stat[ende_name + 2:].split()
+            if len(felder) < 20:
+                continue
+            pid = int(eintrag)
+            schluessel = (pid, int(felder[19])) # Feld 22 (starttime) in Ticks seit Systemstart
+            bekannt = self.prozesse.get(schluessel)
+            if bekannt is not None and bekannt[0] == kurzname:
+                aktuelle[schluessel] = bekannt
+            else:
+                aktuelle[schluessel] = (kurzname, self._lese_proc_details(pid, kurzname))
+        return aktuelle
+
+    def _lese_proc_details(self, pid, kurzname):
+        """Liest Kommandozeile und Programmpfad eines Prozesses aus /proc (wie psutil: fehlende Rechte -> None)."""
+        try:
+            with open(f"{self.proc_verzeichnis}/{pid}/cmdline", "rb") as datei:
+                kommandozeile = [teil.decode("utf-8", "replace") for teil in datei.read().split(b"\0")]
+            if kommandozeile and not kommandozeile[-1]:
+                kommandozeile.pop()
+        except OSError:
+            kommandozeile = None
+        try:
+            exe = os.readlink(f"{self.proc_verzeichnis}/{pid}/exe")
+        except OSError:
+            exe = None
+        name = kurzname
+        # Gekürzten Kurznamen wie psutil über die Kommandozeile vervollständigen
+        if len(kurzname) >= _COMM_MAX_LAENGE and kommandozeile:
+            voller_name = os.path.basename(kommandozeile[0])
+            if voller_name.startswith(kurzname):
+                name = voller_name
+        return {"pid": pid, "name": name, "exe": exe, "cmdline": kommandozeile}
+
+    def _lese_psutil(self):
+        """Fallback über psutil; process_iter hält die Process-Objekte (samt Startzeit) zwischen Aufrufen vor."""
+        aktuelle = {}
+        for prozess in psutil.process_iter():
+            try:
+                schluessel = (prozess.pid, prozess.create_time())
+                bekannt = self.prozesse.get(schluessel)
+                if bekannt is None:
+                    prozess_info = prozess.as_dict(['pid', 'name', 'exe', 'cmdline'], ad_value=None)
+                    bekannt = (prozess_info.get('name') or "", prozess_info)
+                aktuelle[schluessel] = bekannt
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        return aktuelle
+
+    def setze_urteil(self, schluessel, ergebnis, regel_name):
+        """Merkt sich das Urteil eines lebenden Prozesses bis zu dessen Ende oder Änderung."""
+        if schluessel in self.prozesse:
+            self.urteile[schluessel] = (ergebnis, regel_name)
+
+    def hole_urteil(self, schluessel):
+        return self.urteile.get(schluessel)
+
+    def get_statistik(self):
+        """Gibt Anzahl lebender Prozesse, zwischengespeicherter Urteile sowie neuer und beendeter Prozesse zurück."""
+        return {
+            "prozesse": len(self.prozesse),
+            "urteile": len(self.urteile),
+            "neue_prozesse": self.neue_prozesse,
+            "beendete_prozesse": self.beendete_prozesse,
+            "quelle": "proc" if self.proc_aktiv else "psutil"
+        }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
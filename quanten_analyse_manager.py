@@ -1,6 +1,9 @@
 # Importiere die globale Protokollierungsfunktion aus logging_utils.py
 from logging_utils import protokolliere_ereignis_global
 import time # Für Simulationen
+from telemetrie import hole_telemetrie # Latenz-Histogramme für /metrics
+
+QUANTEN_ANALYSE_DAUER = hole_telemetrie().histogramm("virenschutz_quanten_analyse_dauer_sekunden", "Dauer der Quantenanalysen nach Art.", ("art",))
 
 class QuantenAnalyseManager:
     """
@@ -22,15 +25,19 @@ class QuantenAnalyseManager:
     def quanten_malware_signatur_analyse(self, datei_daten):
         """Analysiert Malware-Signaturen mit Quantenalgorithmen (aktuell Platzhalter)."""
         protokolliere_ereignis_global("debug", f"QuantenAnalyseManager: Quanten-Malware-Signaturanalyse für Datei (Simuliere: Unauffällig)")
+        start = time.perf_counter()
         # TODO: Quantenalgorithmus für beschleunigte Signaturanalyse implementieren (z.B. basierend auf Quantum Pattern Matching Algorithmen)
         time.sleep(0.4) # Simuliere Quantenanalyse-Zeit
+        QUANTEN_ANALYSE_DAUER.beobachte(time.perf_counter() - start, ("signatur",))
         return "normal" # Simuliere: Keine verdächtige Signatur gefunden
 
     def quanten_anomalie_erkennung(self, system_daten):
         """Erkennt Anomalien im Systemverhalten mit Quantenalgorithmen (aktuell Platzhalter)."""
         protokolliere_ereignis_global("debug", f"QuantenAnalyseManager: Quanten-Anomalieerkennung im Systemverhalten (Simuliere: Unauffällig)")
+        start = time.perf_counter()
         # TODO: Quantenalgorithmus für fortgeschrittene Anomalieerkennung implementieren (z.B. Quantum Anomaly Detection Algorithmen, Quantum Support Vector Machines)
         time.sleep(0.6) # Simuliere Quantenanalyse-Zeit
+        QUANTEN_ANALYSE_DAUER.beobachte(time.perf_counter() - start, ("anomalie",))
         return "normal" # Simuliere: Keine Anomalien gefunden
 
     def protokolliere_ereignis(self, typ, meldung, daten=None):
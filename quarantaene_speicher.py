@@ -0,0 +1,523 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+try:
+    import pwd # Besitzernamen (nur Unix)
+except ImportError:
+    pwd = None
+
+OBJEKT_KENNUNG = b"VVQ1" # Kopf kodierter Objektdateien: Kennung, Flags (1 Byte), Originalgröße (8 Byte); Roh-Objekte haben keinen Kopf
+FLAG_ZLIB = 1
+FLAG_NEUTRALISIERT = 2
+NEUTRALISIERUNGS_SCHLUESSEL = 0xA5
+_NEUTRALISIERUNG = bytes(wert ^ NEUTRALISIERUNGS_SCHLUESSEL for wert in range(256)) # XOR per bytes.translate (in C)
+BLOCK_GROESSE = 1024 * 1024
+ALTBESTAND_ENDUNG = ".quarantäne" # Dateien der bisherigen flachen Quarantäne
+_URSPRUNG_UNBEKANNT = object() # Als ursprungs_pfad übergeben: Eintrag ohne Ursprung (NULL), Wiederherstellung nur mit ziel_pfad
+SPALTEN = ("id", "datei_hash", "ursprungs_pfad", "regel_name", "zeit", "besitzer", "uid", "gid", "modus", "mtime_ns", "groesse")
+
+def _gleiche_datei(stat_a, stat_b, streng=False):
+    """
+    True, falls beide stat-Ergebnisse dieselbe, seitdem unveränderte Datei beschreiben. Die mtime lässt sich per utime
+    zurücksetzen; mit streng=True muss daher auch die ctime übereinstimmen (nicht fälschbar), bevor der Inhalt ohne Hash-Vergleich gilt.
+    """
+    if stat_b is None or (stat_a.st_dev, stat_a.st_ino, stat_a.st_size, stat_a.st_mtime_ns) != \
+            (stat_b.st_dev, stat_b.st_ino, stat_b.st_size, stat_b.st_mtime_ns):
+        return False
+    return not streng or stat_a.st_ctime_ns == stat_b.st_ctime_ns
+
+def _pfad_fuer_index(pfad):
+    """
+    Gibt (Text, Bytes oder None) für die Spalten ursprungs_pfad und ursprungs_pfad_bytes zurück. SQLite speichert nur
+    gültiges UTF-8; Dateinamen aus anderen Bytes (unter Linux erlaubt) erscheinen als Text mit \\x..-Escapes und werden
+    zusätzlich unverändert als BLOB gespeichert, damit die Wiederherstellung den ursprünglichen Namen trifft.
+    """
+    try:
+        pfad.encode("utf-8")
+        return pfad, None
+    except UnicodeEncodeError:
+        return pfad.encode("utf-8", "surrogateescape").decode("utf-8", "backslashreplace"), os.fsencode(pfad)
+
+def _hash_datei(pfad):
+    with open(pfad, "rb") as datei:
+        return _hash_dateiobjekt(datei)
+
+def _hash_dateiobjekt(datei):
+    """Hash einer geöffneten Datei ab ihrem Anfang (ohne den Pfad erneut aufzulösen)."""
+    datei.seek(0)
+    hasher = hashlib.sha256()
+    while block := datei.read(BLOCK_GROESSE):
+        hasher.update(block)
+    return hasher.hexdigest()
+
+def kopiere_im_kernel(quelle, ziel):
+    """
+    Kopiert den Inhalt der geöffneten Datei quelle nach ziel, ohne die Daten in den Prozess zu lesen:
+    copy_file_range (Linux, auch Reflink/serverseitig), sonst sendfile, sonst shutil.copyfileobj.
+    """
+    quelle_fd, ziel_fd = quelle.fileno(), ziel.fileno()
+    for funktion in ("copy_file_range", "sendfile"):
+        if not hasattr(os, funktion):
+            continue
+        kopieren = getattr(os, funktion)
+        versatz = 0
+        try:
+            while True:
+                if funktion == "copy_file_range":
+                    anzahl = kopieren(quelle_fd, ziel_fd, 64 * BLOCK_GROESSE)
+                else:
+                    anzahl = kopieren(ziel_fd, quelle_fd, versatz, 64 * BLOCK_GROESSE)
+                if not anzahl:
+                    return
+                versatz += anzahl
+        except OSError:
+            if versatz: # Abbruch mitten in der Kopie: nicht mit anderem Verfahren fortsetzen
+                raise
+    shutil.copyfileobj(quelle, ziel, BLOCK_GROESSE)
+
+class QuarantaeneSpeicher:
+    """
+    Inhaltsadressierter Quarantäne-Speicher mit Metadaten-Index.
+    Modul für Quarantäne, Suche, Wiederherstellung und Bereinigung.
+
+    - Nutzdaten liegen einmal pro Inhalt unter objekte/<sha256[:2]>/<sha256>; identische Dateien werden
+      dedupliziert (Referenzzähler pro Objekt). Optional zlib-komprimiert und neutralisiert (XOR), damit die
+      gespeicherten Bytes weder ausführbar sind noch von Signaturen erkannt werden. Objektdateien haben Modus 0600.
+    - Metadaten in SQLite (index.db): ursprünglicher Pfad, Regel, Zeitpunkt, Besitzer, Modus, mtime und Größe.
+      Listen werden per Keyset-Cursor (absteigende id) seitenweise gelesen und bleiben auch mit 100.000
+      Einträgen schnell; Filter auf Pfadpräfix, Regel, Hash und Zeit nutzen Indizes.
+    - Große Dateien (ab roh_ab_bytes, oder alle ohne Kompression und Neutralisierung) werden unverändert als
+      Roh-Objekt gespeichert, ohne sie erneut im Prozess zu lesen, falls der Hash der Prüfung vorliegt: auf demselben
+      Dateisystem per Hardlink (nur ohne weitere Hardlinks und mit Inode, Größe, mtime und ctime unverändert seit der
+      Prüfung), sonst per Kopie im Kernel (copy_file_range, sendfile) mit anschließendem Hash-Vergleich des Ziels. Bei einem Hardlink könnte ein
+      Prozess, der die Datei noch geöffnet hat, das Objekt nachträglich ändern; Wiederherstellen prüft daher den Hash.
+    - Reihenfolge beim Quarantänisieren: Objekt schreiben (temporäre Datei, fsync, os.replace), Index-Eintrag
+      festschreiben, erst dann das Original löschen. Ein Absturz verliert die Datei also nie.
+    - Fehler werden als Ausnahmen gemeldet; Protokollierung und Zähler übernimmt der QuarantäneManager.
+    """
+    def __init__(self, verzeichnis, komprimieren=True, neutralisieren=True, kompressionsstufe=6, roh_ab_bytes=0):
+        self.verzeichnis = verzeichnis
+        self.objekt_verzeichnis = os.path.join(verzeichnis, "objekte")
+        self.temp_verzeichnis = os.path.join(verzeichnis, "tmp")
+        self.index_datei = os.path.join(verzeichnis, "index.db")
+        self.komprimieren = komprimieren
+        self.neutralisieren = neutralisieren
+        self.kompressionsstufe = kompressionsstufe
+        self.roh_ab_bytes = roh_ab_bytes # 0: nur ohne Kompression und Neutralisierung roh speichern
+        self.uebertragungen = {"kodiert": 0, "hardlink": 0, "kernel_kopie": 0, "dedupliziert": 0}
+        self.sperre = threading.Lock() # Index und Referenzzähler; Objekte werden nur unter der Sperre angelegt oder entfernt
+        os.makedirs(self.objekt_verzeichnis, exist_ok=True)
+        os.makedirs(self.temp_verzeichnis, exist_ok=True)
+        self.verbindung = sqlite3.connect(self.index_datei, check_same_thread=False)
+        self.verbindung.execute("PRAGMA journal_mode=WAL")
+        self.verbindung.execute("PRAGMA synchronous=NORMAL")
+        self.verbindung.execute(
+            "CREATE TABLE IF NOT EXISTS objekte ("
+            "datei_hash TEXT PRIMARY KEY, groesse INTEGER, gespeichert_bytes INTEGER, referenzen INTEGER, flags INTEGER) WITHOUT ROWID"
+        )
+        self.verbindung.execute(
+            "CREATE TABLE IF NOT EXISTS eintraege ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, datei_hash TEXT NOT NULL, ursprungs_pfad TEXT, regel_name TEXT, zeit REAL, "
+            "besitzer TEXT, uid INTEGER, gid INTEGER, modus INTEGER, mtime_ns INTEGER, groesse INTEGER)"
+        )
+        if "flags" not in [spalte[1] for spalte in self.verbindung.execute("PRAGMA table_info(objekte)")]:
+            self.verbindung.execute("ALTER TABLE objekte ADD COLUMN flags INTEGER") # NULL: Objekt mit Kopf (ältere Version)
+        if "ursprungs_pfad_bytes" not in [spalte[1] for spalte in self.verbindung.execute("PRAGMA table_info(eintraege)")]:
+            self.verbindung.execute("ALTER TABLE eintraege ADD COLUMN ursprungs_pfad_bytes BLOB") # Nur für Pfade, die kein gültiges UTF-8 sind
+        self.verbindung.execute("CREATE INDEX IF NOT EXISTS eintraege_pfad ON eintraege (ursprungs_pfad)")
+        self.verbindung.execute("CREATE INDEX IF NOT EXISTS eintraege_hash ON eintraege (datei_hash)")
+        self.verbindung.execute("CREATE INDEX IF NOT EXISTS eintraege_regel ON eintraege (regel_name, id)")
+        self.verbindung.execute("CREATE INDEX IF NOT EXISTS eintraege_zeit ON eintraege (zeit)")
+        self.verbindung.commit()
+        self._entferne_temp_dateien()
+
+    def _objekt_pfad(self, datei_hash):
+        return os.path.join(self.objekt_verzeichnis, datei_hash[:2], datei_hash)
+
+    def _entferne_temp_dateien(self):
+        """Entfernt halb geschriebene Objekte eines abgebrochenen Vorgangs (das Original wurde dann nicht gelöscht)."""
+        for name in os.listdir(self.temp_verzeichnis):
+            try:
+                os.remove(os.path.join(self.temp_verzeichnis, name))
+            except OSError:
+                pass
+
+    def _temp_pfad(self):
+        return os.path.join(self.temp_verzeichnis, f"{os.getpid()}_{threading.get_ident()}_{time.monotonic_ns()}")
+
+    def _schreibe_objekt(self, datei_pfad, datei_hash=None, scan_stat=None):
+        """
+        Bringt die Nutzdaten einer Datei als temporäres Objekt in den Speicher (das Original bleibt erhalten).
+        Gibt (datei_hash, datei_stat, temp_pfad, gespeichert_bytes, flags) zurück; temp_pfad ist None, falls das Objekt
+        bereits vorhanden ist. datei_hash und scan_stat stammen aus der Prüfung und ersparen das erneute Lesen.
+        """
+        datei_stat = os.stat(datei_pfad)
+        roh = not (self.komprimieren or self.neutralisieren) or (self.roh_ab_bytes and datei_stat.st_size >= self.roh_ab_bytes)
+        if roh and datei_hash and _gleiche_datei(datei_stat, scan_stat):
+            return self._uebertrage_roh(datei_pfad, datei_hash, datei_stat, scan_stat)
+        flags = 0 if roh else (FLAG_ZLIB if self.komprimieren else 0) | (FLAG_NEUTRALISIERT if self.neutralisieren else 0)
+        return self._kodiere_objekt(datei_pfad, flags)
+
+    def _kodiere_objekt(self, datei_pfad, flags):
+        """Liest die Datei einmal: Hash berechnen und Nutzdaten (mit flags komprimiert/neutralisiert, dann mit Kopf) schreiben."""
+        kompressor = zlib.compressobj(self.kompressionsstufe) if flags & FLAG_ZLIB else None
+        neutralisieren = flags & FLAG_NEUTRALISIERT
+        hasher = hashlib.sha256()
+        temp_pfad = self._temp_pfad()
+        with open(datei_pfad, "rb") as quelle:
+            datei_stat = os.fstat(quelle.fileno())
+            ziel_fd = os.open(temp_pfad, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+            try:
+                with open(ziel_fd, "wb") as ziel:
+                    if flags:
+                        ziel.write(OBJEKT_KENNUNG + bytes((flags,)) + datei_stat.st_size.to_bytes(8, "little"))
+                    while block := quelle.read(BLOCK_GROESSE):
+                        hasher.update(block)
+                        if kompressor:
+                            block = kompressor.compress(block)
+                        if neutralisieren:
+                            block = block.translate(_NEUTRALISIERUNG)
+                        ziel.write(block)
+                    if kompressor:
+                        rest = kompressor.flush()
+                        ziel.write(rest.translate(_NEUTRALISIERUNG) if neutralisieren else rest)
+                    ziel.flush()
+                    os.fsync(ziel.fileno())
+                    gespeichert_bytes = ziel.tell()
+            except BaseException:
+                os.remove(temp_pfad)
+                raise
+        self.uebertragungen["kodiert"] += 1
+        return hasher.hexdigest(), datei_stat, temp_pfad, gespeichert_bytes, flags
+
+    def _uebertrage_roh(self, datei_pfad, datei_hash, datei_stat, scan_stat):
+        """
+        Roh-Objekt ohne Lesen im Prozess: Hardlink auf demselben Dateisystem, sonst Kopie im Kernel mit Hash-Vergleich.
+        Ohne Hash-Vergleich (Hardlink, Deduplizierung) nur, falls die Datei seit der Prüfung nachweislich unverändert ist
+        (streng, inklusive ctime) und keinen weiteren Hardlink hat, über den sie außerhalb der Quarantäne erreichbar bliebe.
+        """
+        unveraendert = datei_stat.st_nlink == 1 and _gleiche_datei(datei_stat, scan_stat, streng=True)
+        if unveraendert and os.path.exists(self._objekt_pfad(datei_hash)):
+            self.uebertragungen["dedupliziert"] += 1
+            return datei_hash, datei_stat, None, datei_stat.st_size, 0
+        temp_pfad = self._temp_pfad()
+        if unveraendert and datei_stat.st_dev == os.stat(self.temp_verzeichnis).st_dev:
+            try:
+                os.link(datei_pfad, temp_pfad)
+            except OSError:
+                pass # Dateisystem ohne Hardlinks (z.B. FAT): kopieren
+            else:
+                link_stat = os.stat(temp_pfad)
+                # Genau zwei Links (Original und Objekt); der Link selbst ändert die ctime, daher hier ohne streng
+                if link_stat.st_nlink == 2 and _gleiche_datei(link_stat, datei_stat):
+                    os.chmod(temp_pfad, 0o600) # Gilt für denselben Inode, also auch das noch vorhandene Original
+                    self.uebertragungen["hardlink"] += 1
+                    return datei_hash, datei_stat, temp_pfad, datei_stat.st_size, 0
+                os.remove(temp_pfad) # Zwischen stat und link geändert oder neu verlinkt: kopieren und Hash prüfen
+        try:
+            with open(datei_pfad, "rb") as quelle:
+                ziel_fd = os.open(temp_pfad, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+                with open(ziel_fd, "wb") as ziel:
+                    kopiere_im_kernel(quelle, ziel)
+                    os.fsync(ziel.fileno())
+            if _hash_datei(temp_pfad) != datei_hash:
+                raise ValueError(f"Kopie von '{datei_pfad}' passt nicht zum Hash der Prüfung (Datei seitdem geändert?).")
+        except BaseException:
+            if os.path.exists(temp_pfad):
+                os.remove(temp_pfad)
+            raise
+        self.uebertragungen["kernel_kopie"] += 1
+        return datei_hash, datei_stat, temp_pfad, datei_stat.st_size, 0
+
+    def _besitzer(self, uid):
+        if pwd is None:
+            return None
+        try:
+            return pwd.getpwuid(uid).pw_name
+        except KeyError:
+            return str(uid)
+
+    def quarantaenisiere(self, datei_pfad, regel_name=None, ursprungs_pfad=None):
+        """Verschiebt eine Datei in den Speicher und gibt den Eintrag (Dictionary) zurück. Fehler als OSError/sqlite3.Error."""
+        ergebnis = self.quarantaenisiere_mehrere([(datei_pfad, regel_name)], ursprungs_pfade=[ursprungs_pfad])[0]
+        if isinstance(ergebnis, Exception):
+            raise ergebnis
+        return ergebnis
+
+    def quarantaenisiere_mehrere(self, dateien, ursprungs_pfade=None):
+        """
+        Verschiebt mehrere Dateien mit einer einzigen Index-Transaktion. Pro Datei (datei_pfad, regel_name) oder
+        (datei_pfad, regel_name, datei_hash, datei_stat) mit Hash und stat aus der Prüfung (für Roh-Objekte ohne erneutes Lesen).
+        Gibt pro Datei den Eintrag oder die Ausnahme zurück, mit der sie gescheitert ist (das Original bleibt dann erhalten).
+        """
+        ergebnisse = [None] * len(dateien)
+        geschrieben = []
+        for position, (datei_pfad, regel_name, *pruefung) in enumerate(dateien):
+            try:
+                geschrieben.append((position, datei_pfad, regel_name) + self._schreibe_objekt(datei_pfad, *pruefung))
+            except (OSError, ValueError) as e:
+                ergebnisse[position] = e
+        if not geschrieben:
+            return ergebnisse
+        zeit = time.time()
+        eintraege = []
+        neue_objekte = [] # In diesem Aufruf angelegte Objekte, bei einem Rollback wieder entfernen
+        with self.sperre:
+            try:
+                if not self.verbindung.in_transaction:
+                    self.verbindung.execute("BEGIN") # Savepoints pro Datei innerhalb einer einzigen Transaktion
+                for position, datei_pfad, regel_name, datei_hash, datei_stat, temp_pfad, gespeichert_bytes, flags in geschrieben:
+                    objekt_pfad = self._objekt_pfad(datei_hash)
+                    neu = False
+                    self.verbindung.execute("SAVEPOINT datei") # Fehler einer Datei nehmen nur ihre eigenen Änderungen zurück
+                    try:
+                        ursprung = (ursprungs_pfade[position] if ursprungs_pfade else None) or os.path.abspath(datei_pfad)
+                        ursprung_text, ursprung_bytes = (None, None) if ursprung is _URSPRUNG_UNBEKANNT else _pfad_fuer_index(ursprung)
+                        werte = (datei_hash, ursprung_text, regel_name, zeit, self._besitzer(datei_stat.st_uid), datei_stat.st_uid,
+                                 datei_stat.st_gid, datei_stat.st_mode & 0o7777, datei_stat.st_mtime_ns, datei_stat.st_size)
+                        if os.path.exists(objekt_pfad):
+                            if temp_pfad:
+                                os.remove(temp_pfad) # Inhalt bereits vorhanden (Deduplizierung)
+                        elif temp_pfad is None:
+                            # Objekt wurde seit der Prüfung auf Vorhandensein gelöscht; Original bleibt erhalten
+                            raise FileNotFoundError(f"Quarantäne-Objekt {datei_hash} wurde zwischenzeitlich entfernt.")
+                        else:
+                            os.makedirs(os.path.dirname(objekt_pfad), exist_ok=True)
+                            os.replace(temp_pfad, objekt_pfad)
+                            neu = True
+                        self.verbindung.execute(
+                            "INSERT INTO objekte (datei_hash, groesse, gespeichert_bytes, referenzen, flags) VALUES (?, ?, ?, 1, ?) "
+                            "ON CONFLICT (datei_hash) DO UPDATE SET referenzen = referenzen + 1",
+                            (datei_hash, datei_stat.st_size, gespeichert_bytes, flags))
+                        cursor = self.verbindung.execute(
+                            "INSERT INTO eintraege (datei_hash, ursprungs_pfad, regel_name, zeit, besitzer, uid, gid, modus, mtime_ns, groesse, ursprungs_pfad_bytes) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", werte + (ursprung_bytes,))
+                        self.verbindung.execute("RELEASE datei")
+                    except (OSError, ValueError, sqlite3.Error) as e:
+                        self.verbindung.execute("ROLLBACK TO datei")
+                        self.verbindung.execute("RELEASE datei")
+                        for pfad in (temp_pfad, objekt_pfad if neu else None):
+                            if pfad and os.path.exists(pfad):
+                                os.remove(pfad)
+                        ergebnisse[position] = e
+                        continue
+                    if neu:
+                        neue_objekte.append(objekt_pfad)
+                    eintraege.append((position, datei_pfad, dict(zip(SPALTEN, (cursor.lastrowid,) + werte))))
+                self.verbindung.commit()
+            except BaseException:
+                self.verbindung.rollback()
+                for pfad in [eintrag[5] for eintrag in geschrieben] + neue_objekte:
+                    if pfad and os.path.exists(pfad):
+                        os.remove(pfad)
+                raise
+        # Erst nach dem Festschreiben des Index die Originale entfernen
+        fehlgeschlagen = []
+        for position, datei_pfad, eintrag in eintraege:
+            try:
+                os.remove(datei_pfad)
+                ergebnisse[position] = eintrag
+            except OSError as e:
+                ergebnisse[position] = e
+                fehlgeschlagen.append(eintrag["id"])
+                try:
+                    os.chmod(datei_pfad, eintrag["modus"]) # Hardlink-Objekt hat den Modus des Originals auf 0600 gesetzt
+                except OSError:
+                    pass
+        if fehlgeschlagen:
+            self.loesche(fehlgeschlagen) # Original nicht entfernbar: Eintrag zurücknehmen
+        return ergebnisse
+
+    def liste(self, limit=100, cursor=None, pfad=None, pfad_praefix=None, regel_name=None, datei_hash=None, seit=None, bis=None):
+        """
+        Gibt {"eintraege": [...], "cursor": id} zurück, neueste zuerst; cursor ist die id, ab der die nächste (ältere) Seite beginnt,
+        oder None. pfad sucht Teilzeichenfolgen (ohne Index), pfad_praefix, regel_name, datei_hash, seit und bis nutzen Indizes.
+        """
+        bedingungen, parameter = [], []
+        if cursor is not None:
+            bedingungen.append("id < ?")
+            parameter.append(int(cursor))
+        if pfad:
+            bedingungen.append("ursprungs_pfad LIKE ? ESCAPE '\\'")
+            parameter.append("%" + pfad.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if pfad_praefix:
+            bedingungen.append("ursprungs_pfad >= ? AND ursprungs_pfad < ?")
+            parameter += [pfad_praefix, pfad_praefix + "\U0010ffff"]
+        for spalte, wert in (("regel_name", regel_name), ("datei_hash", datei_hash)):
+            if wert:
+                bedingungen.append(f"{spalte} = ?")
+                parameter.append(wert)
+        if seit is not None:
+            bedingungen.append("zeit >= ?")
+            parameter.append(float(seit))
+        if bis is not None:
+            bedingungen.append("zeit < ?")
+            parameter.append(float(bis))
+        sql = f"SELECT {', '.join(SPALTEN)} FROM eintraege"
+        if bedingungen:
+            sql += " WHERE " + " AND ".join(bedingungen)
+        sql += " ORDER BY id DESC LIMIT ?"
+        parameter.append(limit + 1)
+        with self.sperre:
+            zeilen = self.verbindung.execute(sql, parameter).fetchall()
+        eintraege = [dict(zip(SPALTEN, zeile)) for zeile in zeilen[:limit]]
+        return {"eintraege": eintraege, "cursor": eintraege[-1]["id"] if len(zeilen) > limit else None}
+
+    def hole(self, eintrag_id):
+        """Gibt den Eintrag mit dieser id zurück oder None."""
+        with self.sperre:
+            zeile = self.verbindung.execute(f"SELECT {', '.join(SPALTEN)} FROM eintraege WHERE id = ?", (int(eintrag_id),)).fetchone()
+        return dict(zip(SPALTEN, zeile)) if zeile else None
+
+    def stelle_wieder_her(self, eintrag_id, ziel_pfad=None, ueberschreiben=False):
+        """
+        Schreibt die Datei an ihren ursprünglichen Pfad (oder ziel_pfad) zurück, mit Modus, mtime und (falls erlaubt) Besitzer,
+        und entfernt den Eintrag. Gibt den Zielpfad zurück. KeyError für unbekannte Einträge, FileExistsError ohne ueberschreiben,
+        ValueError, falls das Objekt nicht mehr zum gespeicherten Hash passt oder der Eintrag ohne ziel_pfad keinen Ursprung hat (Altbestand).
+        """
+        eintrag = self.hole(eintrag_id)
+        if eintrag is None:
+            raise KeyError(eintrag_id)
+        if not ziel_pfad and eintrag["ursprungs_pfad"] is None:
+            raise ValueError(f"Ursprünglicher Pfad des Quarantäne-Eintrags {eintrag['id']} ist unbekannt (Altbestand); ziel_pfad angeben.")
+        if not ziel_pfad:
+            with self.sperre:
+                ursprung_bytes = self.verbindung.execute("SELECT ursprungs_pfad_bytes FROM eintraege WHERE id = ?", (eintrag["id"],)).fetchone()[0]
+            ziel_pfad = os.fsdecode(ursprung_bytes) if ursprung_bytes is not None else eintrag["ursprungs_pfad"]
+        if not ueberschreiben and os.path.lexists(ziel_pfad):
+            raise FileExistsError(f"Ziel existiert bereits: '{ziel_pfad}'")
+        ziel_verzeichnis = os.path.dirname(os.path.abspath(ziel_pfad))
+        os.makedirs(ziel_verzeichnis, exist_ok=True)
+        with self.sperre:
+            zeile = self.verbindung.execute("SELECT flags FROM objekte WHERE datei_hash = ?", (eintrag["datei_hash"],)).fetchone()
+        roh = zeile is not None and zeile[0] == 0 # NULL: Objekt einer älteren Version, immer mit Kopf
+        # Das Zielverzeichnis kann Benutzern gehören: zufälliger Name mit O_EXCL (folgt keinem vorab angelegten Symlink),
+        # Metadaten nur über den Deskriptor setzen, erst dann per rename an den Zielpfad
+        ziel_fd, temp_pfad = tempfile.mkstemp(prefix=".wiederherstellung-", dir=ziel_verzeichnis)
+        try:
+            with open(ziel_fd, "w+b") as ziel, open(self._objekt_pfad(eintrag["datei_hash"]), "rb") as quelle:
+                if roh:
+                    kopiere_im_kernel(quelle, ziel)
+                    datei_hash = _hash_dateiobjekt(ziel) # Roh-Objekte (ggf. Hardlink) nach der Kopie prüfen
+                else:
+                    datei_hash = self._dekodiere(quelle, ziel, eintrag["datei_hash"])
+                if datei_hash != eintrag["datei_hash"]:
+                    raise ValueError(f"Quarantäne-Objekt {eintrag['datei_hash']} ist beschädigt (Hash stimmt nicht überein).")
+                ziel.flush()
+                if hasattr(os, "fchown"):
+                    try:
+                        os.fchown(ziel.fileno(), eintrag["uid"], eintrag["gid"]) # Vor fchmod: chown löscht setuid/setgid
+                    except OSError:
+                        pass # Ohne Root-Rechte gehört die Datei dem Virenschutz-Prozess
+                if hasattr(os, "fchmod"):
+                    os.fchmod(ziel.fileno(), eintrag["modus"])
+                    os.utime(ziel.fileno(), ns=(eintrag["mtime_ns"], eintrag["mtime_ns"]))
+            if not hasattr(os, "fchmod"): # Windows: keine fd-Varianten; die mit mkstemp exklusiv angelegte Datei ist hier kein Link
+                os.chmod(temp_pfad, eintrag["modus"])
+                os.utime(temp_pfad, ns=(eintrag["mtime_ns"], eintrag["mtime_ns"]))
+            os.replace(temp_pfad, ziel_pfad)
+        except BaseException:
+            try:
+                os.remove(temp_pfad)
+            except OSError:
+                pass
+            raise
+        self.loesche([eintrag["id"]])
+        return ziel_pfad
+
+    @staticmethod
+    def _dekodiere(quelle, ziel, datei_hash):
+        """Schreibt die Nutzdaten eines Objekts mit Kopf nach ziel und gibt ihren Hash zurück."""
+        kopf = quelle.read(len(OBJEKT_KENNUNG) + 9)
+        if kopf[:len(OBJEKT_KENNUNG)] != OBJEKT_KENNUNG:
+            raise ValueError(f"Ungültiges Quarantäne-Objekt {datei_hash}")
+        flags = kopf[len(OBJEKT_KENNUNG)]
+        dekompressor = zlib.decompressobj() if flags & FLAG_ZLIB else None
+        hasher = hashlib.sha256()
+        try:
+            while block := quelle.read(BLOCK_GROESSE):
+                if flags & FLAG_NEUTRALISIERT:
+                    block = block.translate(_NEUTRALISIERUNG)
+                if dekompressor:
+                    block = dekompressor.decompress(block)
+                hasher.update(block)
+                ziel.write(block)
+            if dekompressor:
+                rest = dekompressor.flush()
+                hasher.update(rest)
+                ziel.write(rest)
+        except zlib.error as e:
+            raise ValueError(f"Quarantäne-Objekt {datei_hash} ist beschädigt: {e}") from e
+        return hasher.hexdigest()
+
+    def loesche(self, eintrag_ids):
+        """Entfernt Einträge endgültig (Objekte ohne weitere Referenz werden gelöscht). Gibt die Anzahl entfernter Einträge zurück."""
+        entfernt = 0
+        with self.sperre:
+            for eintrag_id in eintrag_ids:
+                zeile = self.verbindung.execute("DELETE FROM eintraege WHERE id = ? RETURNING datei_hash", (int(eintrag_id),)).fetchone()
+                if zeile is None:
+                    continue
+                entfernt += 1
+                referenzen = self.verbindung.execute("UPDATE objekte SET referenzen = referenzen - 1 WHERE datei_hash = ? RETURNING referenzen",
+                                                     (zeile[0],)).fetchone()
+                if referenzen and referenzen[0] <= 0:
+                    self.verbindung.execute("DELETE FROM objekte WHERE datei_hash = ?", (zeile[0],))
+                    try:
+                        os.remove(self._objekt_pfad(zeile[0]))
+                    except FileNotFoundError:
+                        pass
+            self.verbindung.commit()
+        return entfernt
+
+    def bereinige(self, aelter_als_sekunden):
+        """Entfernt alle Einträge, die älter als aelter_als_sekunden sind. Gibt die Anzahl entfernter Einträge zurück."""
+        grenze = time.time() - aelter_als_sekunden
+        entfernt = 0
+        while True:
+            with self.sperre:
+                ids = [zeile[0] for zeile in self.verbindung.execute("SELECT id FROM eintraege WHERE zeit < ? LIMIT 1000", (grenze,))]
+            if not ids:
+                return entfernt
+            entfernt += self.loesche(ids)
+
+    def uebernehme_altbestand(self):
+        """
+        Übernimmt Dateien der bisherigen flachen Quarantäne (<name>.quarantäne). Der ursprüngliche Ordner ist unbekannt, daher
+        bleibt ursprungs_pfad leer (NULL) statt eines relativen Namens, der bei der Wiederherstellung im Arbeitsverzeichnis landen würde.
+        """
+        uebernommen = 0
+        for eintrag in os.scandir(self.verzeichnis):
+            if eintrag.is_file(follow_symlinks=False) and eintrag.name.endswith(ALTBESTAND_ENDUNG):
+                try:
+                    ergebnis = self.quarantaenisiere(eintrag.path, "Altbestand", ursprungs_pfad=_URSPRUNG_UNBEKANNT)
+                    uebernommen += 1
+                    self.protokolliere_ereignis("info", f"Quarantäne-Altbestand '{eintrag.name}' als Eintrag {ergebnis['id']} übernommen (Wiederherstellung nur mit Zielpfad).",
+                                                {"quarantaene_id": ergebnis["id"], "datei_name": eintrag.name[:-len(ALTBESTAND_ENDUNG)]})
+                except (OSError, sqlite3.Error) as e:
+                    self.protokolliere_ereignis("warnung", f"Quarantäne-Altbestand '{eintrag.path}' konnte nicht übernommen werden: {e}", {"datei_pfad": eintrag.path, "fehler": str(e)})
+        return uebernommen
+
+    def get_statistik(self):
+        """Anzahl Einträge und Objekte sowie Originalgröße und belegter Speicher der Objekte."""
+        with self.sperre:
+            eintraege = self.verbindung.execute("SELECT COUNT(*) FROM eintraege").fetchone()[0]
+            objekte, groesse, gespeichert = self.verbindung.execute("SELECT COUNT(*), COALESCE(SUM(groesse), 0), COALESCE(SUM(gespeichert_bytes), 0) FROM objekte").fetchone()
+        return {"eintraege": eintraege, "objekte": objekte, "bytes_original": groesse, "bytes_gespeichert": gespeichert,
+                "uebertragungen": dict(self.uebertragungen)}
+
+    def schliesse(self):
+        with self.sperre:
+            self.verbindung.close()
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
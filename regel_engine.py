@@ -0,0 +1,336 @@
+import ipaddress
+import os
+import socket
+from collections import deque, namedtuple
+from types import MappingProxyType
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+from signatur_engine import SignaturSatz
+
+# Kompilierte Einzelregeln (unveränderlich). "index" ist die Position innerhalb der Kategorie und
+# legt die Auswertungsreihenfolge fest, damit sich das Verhalten gegenüber der linearen Auswertung nicht ändert.
+DateiRegel = namedtuple("DateiRegel", ["index", "name", "aktion", "pfad_praefixe", "quanten_analyse_aktiviert", "blockchain_reputation_aktiviert", "muster", "signaturen"])
+ProzessRegel = namedtuple("ProzessRegel", ["index", "name", "aktion", "quanten_analyse_aktiviert", "muster"])
+NetzwerkRegel = namedtuple("NetzwerkRegel", ["index", "name", "aktion", "quanten_analyse_aktiviert", "muster", "adressen"])
+
+ANZAHL_PORTS = 65536
+_IPV4_GEMAPPT = b"\0" * 10 + b"\xff\xff" # ::ffff:a.b.c.d
+
+def normalisiere_pfad(pfad):
+    """Normalisiert einen Pfad für Vergleiche ohne Groß-/Kleinschreibung."""
+    return os.path.normcase(os.path.normpath(pfad)).lower()
+
+class AhoCorasick:
+    """
+    Aho-Corasick-Automat für die gleichzeitige Suche vieler Teilzeichenketten.
+    Die Suchkosten hängen nur von der Textlänge ab, nicht von der Anzahl der Muster.
+    """
+    def __init__(self, muster_liste):
+        self.uebergaenge = [{}] # Zustand -> {Zeichen: Folgezustand}
+        self.fehler = [0]
+        self.ausgaben = [frozenset()]
+        ausgaben = [set()]
+        for muster_id, muster in enumerate(muster_liste):
+            zustand = 0
+            for zeichen in muster:
+                folge = self.uebergaenge[zustand].get(zeichen)
+                if folge is None:
+                    folge = len(self.uebergaenge)
+                    self.uebergaenge[zustand][zeichen] = folge
+                    self.uebergaenge.append({})
+                    self.fehler.append(0)
+                    ausgaben.append(set())
+                zustand = folge
+            ausgaben[zustand].add(muster_id)
+
+        # Fehlerverweise per Breitensuche berechnen und Ausgaben entlang der Fehlerkette zusammenführen
+        warteschlange = deque(self.uebergaenge[0].values())
+        while warteschlange:
+            zustand = warteschlange.popleft()
+            for zeichen, folge in self.uebergaenge[zustand].items():
+                warteschlange.append(folge)
+                rueckfall = self.fehler[zustand]
+                while rueckfall and zeichen not in self.uebergaenge[rueckfall]:
+                    rueckfall = self.fehler[rueckfall]
+                ziel = self.uebergaenge[rueckfall].get(zeichen, 0)
+                self.fehler[folge] = ziel if ziel != folge else 0
+                ausgaben[folge] |= ausgaben[self.fehler[folge]]
+        self.ausgaben = [frozenset(a) for a in ausgaben]
+
+    def finde(self, text):
+        """Gibt die IDs aller Muster zurück, die als Teilzeichenkette in text vorkommen."""
+        treffer = set(self.ausgaben[0])
+        zustand = 0
+        uebergaenge = self.uebergaenge
+        fehler = self.fehler
+        ausgaben = self.ausgaben
+        for zeichen in text:
+            while zustand and zeichen not in uebergaenge[zustand]:
+                zustand = fehler[zustand]
+            zustand = uebergaenge[zustand].get(zeichen, 0)
+            if ausgaben[zustand]:
+                treffer |= ausgaben[zustand]
+        return treffer
+
+def parse_ip_netz(text):
+    """Wandelt "10.0.0.0/8", "2001:db8::/32" oder eine einzelne Adresse in (gepackte Netzadresse, Präfixlänge) um; ungültig: None."""
+    try:
+        netz = ipaddress.ip_network(str(text).strip(), strict=False)
+    except ValueError:
+        return None
+    return netz.network_address.packed, netz.prefixlen
+
+def packe_ip(ip):
+    """Wandelt eine IP-Adresse (Text) in 4 bzw. 16 Bytes um; IPv4-gemappte IPv6-Adressen ergeben 4 Bytes. Ungültig: None."""
+    try:
+        if ":" not in ip:
+            return socket.inet_pton(socket.AF_INET, ip)
+        roh = socket.inet_pton(socket.AF_INET6, ip.split("%", 1)[0]) # Zonenindex (fe80::1%eth0) ignorieren
+    except (OSError, TypeError):
+        return None
+    return roh[12:] if roh.startswith(_IPV4_GEMAPPT) else roh
+
+class IPPraefixBaum:
+    """
+    Multibit-Trie (Schrittweite 8 Bit) für die Suche nach dem längsten passenden IP-Präfix, getrennt für IPv4 und IPv6.
+    Eine Suche besucht höchstens 4 (IPv4) bzw. 16 (IPv6) Knoten, unabhängig von der Anzahl der Netze.
+
+    Präfixe, deren Länge kein Vielfaches von 8 ist, werden im Knoten ihres letzten Bytes auf alle passenden
+    Bytewerte expandiert. Die Netze werden nach aufsteigender Präfixlänge eingefügt; jeder Treffer verweist
+    dabei auf den Treffer des ihn umfassenden Netzes (verkettete Liste), sodass der tiefste Treffer zu allen
+    passenden Werten führt, ohne dass Werte in jeden Eintrag kopiert werden.
+    """
+    def __init__(self, netze):
+        self._wurzeln = {4: [None, {}], 16: [None, {}]} # Adresslänge -> [Treffer für /0, Knoten]; Knoten: {Byte: [Treffer, Kindknoten]}
+        self.anzahl = 0
+        for (adresse, laenge), wert in sorted(netze, key=lambda eintrag: eintrag[0][1]):
+            self._fuege_ein(adresse, laenge, wert)
+            self.anzahl += 1
+
+    def _fuege_ein(self, adresse, laenge, wert):
+        wurzel = self._wurzeln[len(adresse)]
+        if laenge == 0:
+            wurzel[0] = (wert, wurzel[0])
+            return
+        umfassend = wurzel[0] # Treffer des längsten bereits eingefügten umfassenden Netzes auf dem Pfad
+        knoten = wurzel[1]
+        letztes_byte = (laenge - 1) // 8
+        for tiefe in range(letztes_byte):
+            eintrag = knoten.get(adresse[tiefe])
+            if eintrag is None:
+                eintrag = knoten[adresse[tiefe]] = [None, None]
+            if eintrag[0] is not None:
+                umfassend = eintrag[0]
+            if eintrag[1] is None:
+                eintrag[1] = {}
+            knoten = eintrag[1]
+        # Freie Bits im letzten Byte auf alle Bytewerte expandieren
+        freie_bits = 8 * (letztes_byte + 1) - laenge
+        erstes = adresse[letztes_byte] & (0xFF << freie_bits) & 0xFF
+        for byte in range(erstes, erstes + (1 << freie_bits)):
+            eintrag = knoten.get(byte)
+            if eintrag is None:
+                knoten[byte] = [(wert, umfassend), None]
+            else:
+                # Ein vorhandener Treffer stammt von einem kürzeren (oder gleich langen) Netz, das "umfassend" bereits enthält
+                eintrag[0] = (wert, eintrag[0] if eintrag[0] is not None else umfassend)
+
+    def finde(self, ip):
+        """Gibt die Werte aller Netze zurück, die die IP-Adresse (Text oder gepackte Bytes) enthalten (spezifischstes zuletzt), sonst ()."""
+        roh = packe_ip(ip) if isinstance(ip, str) else ip
+        if roh is None:
+            return ()
+        wurzel = self._wurzeln.get(len(roh))
+        if wurzel is None:
+            return ()
+        treffer, knoten = wurzel
+        for byte in roh:
+            eintrag = knoten.get(byte)
+            if eintrag is None:
+                break
+            if eintrag[0] is not None:
+                treffer = eintrag[0]
+            knoten = eintrag[1]
+            if knoten is None:
+                break
+        werte = []
+        while treffer is not None:
+            werte.append(treffer[0])
+            treffer = treffer[1]
+        werte.reverse()
+        return tuple(werte)
+
+class KompilierteRegeln:
+    """
+    Unveränderlicher, indizierter Regelsatz.
+    Wird beim Laden der Regeln einmalig aus virenschutz_regeln.json erzeugt.
+
+    - Dateien: Hash-Map Dateiendung -> Regeln, Pfadbedingungen als expandierte, normalisierte Präfixe,
+      Byte-Signaturen aller Dateiregeln in einem gemeinsamen SignaturSatz.
+    - Prozesse: ein Aho-Corasick-Automat über alle Prozessnamen-Muster.
+    - Netzwerk: Port-Bitset (65536 Bit) als Vorfilter und Hash-Map Port -> Regeln für reine Portregeln;
+      Regeln mit "adressen" (IPv4/IPv6-Netze in CIDR-Schreibweise) in einem IPPraefixBaum. Hat eine
+      Adressregel zusätzlich Ports, müssen beide zutreffen.
+    """
+    def __init__(self, regeln):
+        self._kompiliere_dateiregeln(regeln.get("dateien", {}).get("regeln", []))
+        self._kompiliere_prozessregeln(regeln.get("prozesse", {}).get("regeln", []))
+        self._kompiliere_netzwerkregeln(regeln.get("netzwerk", {}).get("regeln", []))
+        self._versiegelt = True
+
+    def _kompiliere_dateiregeln(self, regel_liste):
+        endungs_index = {}
+        ohne_endungsindex = []
+        alle_endungen = [] # Regeln ohne Endungsmuster, aber mit Signaturen, gelten für jede Datei
+        dateiregeln = []
+        signaturen = {}
+        for index, regel in enumerate(regel_liste):
+            if not regel.get("aktiviert"):
+                continue
+            muster_liste = tuple(str(muster).lower() for muster in regel.get("muster", []))
+            pfad_praefixe = []
+            for pfad_muster in regel.get("pfade", []):
+                erweiterter_pfad = os.path.expandvars(pfad_muster)
+                if "%" in erweiterter_pfad or "$" in erweiterter_pfad:
+                    protokolliere_ereignis_global("debug", f"Pfadbedingung '{pfad_muster}' der Regel '{regel.get('name')}' enthält nicht auflösbare Umgebungsvariablen.")
+                pfad_praefixe.append(normalisiere_pfad(erweiterter_pfad))
+            signatur_ids = []
+            for signatur in regel.get("signaturen", []):
+                signatur_id = str(signatur.get("id") or f"{regel.get('name')}#{len(signatur_ids)}")
+                if signaturen.setdefault(signatur_id, signatur.get("muster")) != signatur.get("muster"):
+                    protokolliere_ereignis_global("warnung", f"Signatur-ID '{signatur_id}' ist mehrfach mit unterschiedlichen Mustern definiert. Die erste Definition wird verwendet.")
+                signatur_ids.append(signatur_id)
+            kompiliert = DateiRegel(index, regel.get("name"), regel.get("aktion"), tuple(pfad_praefixe),
+                                    regel.get("quanten_analyse_aktiviert", False), regel.get("blockchain_reputation_aktiviert", False),
+                                    muster_liste, frozenset(signatur_ids))
+            dateiregeln.append(kompiliert)
+            if not muster_liste and signatur_ids:
+                alle_endungen.append(kompiliert)
+            sonstige_muster = False
+            for muster in muster_liste:
+                # Einfache Endungen (".exe") landen in der Hash-Map, alles andere wird per endswith geprüft
+                if muster.startswith(".") and muster.count(".") == 1:
+                    endungs_index.setdefault(muster, []).append(kompiliert)
+                else:
+                    sonstige_muster = True
+            if sonstige_muster:
+                ohne_endungsindex.append(kompiliert)
+        self.dateiregeln = tuple(dateiregeln)
+        self.datei_endungs_index = MappingProxyType({endung: tuple(liste) for endung, liste in endungs_index.items()})
+        self.dateiregeln_ohne_endungsindex = tuple(ohne_endungsindex)
+        self.dateiregeln_alle_endungen = tuple(alle_endungen)
+        self.signatur_satz = SignaturSatz(signaturen.items())
+        self.hat_reputationsregeln = any(regel.blockchain_reputation_aktiviert for regel in self.dateiregeln) # Reputationsabfragen im Scan nur bei Bedarf
+
+    def _kompiliere_prozessregeln(self, regel_liste):
+        muster_zu_regeln = {}
+        prozessregeln = []
+        for index, regel in enumerate(regel_liste):
+            if not regel.get("aktiviert"):
+                continue
+            muster_liste = tuple(str(muster).lower() for muster in regel.get("muster", []))
+            kompiliert = ProzessRegel(index, regel.get("name"), regel.get("aktion"), regel.get("quanten_analyse_aktiviert", False), muster_liste)
+            prozessregeln.append(kompiliert)
+            for muster in muster_liste:
+                muster_zu_regeln.setdefault(muster, []).append(kompiliert)
+        self.prozessregeln = tuple(prozessregeln)
+        self._prozess_muster = tuple(muster_zu_regeln)
+        self._prozess_muster_regeln = tuple(tuple(muster_zu_regeln[muster]) for muster in self._prozess_muster)
+        self._prozess_automat = AhoCorasick(self._prozess_muster)
+
+    def _kompiliere_netzwerkregeln(self, regel_liste):
+        port_bits = bytearray(ANZAHL_PORTS // 8)
+        port_index = {}
+        netzwerkregeln = []
+        adress_netze = []
+        for index, regel in enumerate(regel_liste):
+            if not regel.get("aktiviert"):
+                continue
+            ports = []
+            for muster in regel.get("muster", []):
+                try:
+                    port = int(muster)
+                except (TypeError, ValueError):
+                    protokolliere_ereignis_global("warnung", f"Ungültiger Port '{muster}' in Netzwerkregel '{regel.get('name')}' ignoriert.")
+                    continue
+                if 0 <= port < ANZAHL_PORTS:
+                    ports.append(port)
+            netze = []
+            adressen = []
+            for adresse in regel.get("adressen", []):
+                netz = parse_ip_netz(adresse)
+                if netz is None:
+                    protokolliere_ereignis_global("warnung", f"Ungültige Adresse '{adresse}' in Netzwerkregel '{regel.get('name')}' ignoriert.")
+                    continue
+                netze.append(netz)
+                adressen.append(str(adresse).strip())
+            kompiliert = NetzwerkRegel(index, regel.get("name"), regel.get("aktion"), regel.get("quanten_analyse_aktiviert", False), tuple(ports), tuple(adressen))
+            netzwerkregeln.append(kompiliert)
+            if netze:
+                adress_netze.extend((netz, kompiliert) for netz in netze)
+                continue # Adressregeln nur über den Präfixbaum finden (Ports werden dort zusätzlich geprüft)
+            for port in ports:
+                port_bits[port >> 3] |= 1 << (port & 7)
+                port_index.setdefault(port, []).append(kompiliert)
+        self.netzwerkregeln = tuple(netzwerkregeln)
+        self.port_bitset = bytes(port_bits)
+        self.port_index = MappingProxyType({port: tuple(liste) for port, liste in port_index.items()})
+        self.adress_baum = IPPraefixBaum(adress_netze)
+
+    def __setattr__(self, name, wert):
+        # Nach der Kompilierung keine Änderungen mehr zulassen
+        if self.__dict__.get("_versiegelt"):
+            raise AttributeError("KompilierteRegeln sind unveränderlich.")
+        super().__setattr__(name, wert)
+
+    # --- Abfragen (Kandidaten in Auswertungsreihenfolge) ---
+    def finde_dateiregeln(self, datei_pfad):
+        """
+        Liefert (als Generator) alle Dateiregeln, deren Endungs- und Pfadbedingung auf die Datei zutrifft.
+        Pfadbedingungen werden erst beim Weiteriterieren geprüft, sodass die erste zutreffende Regel ohne Mehraufwand endet.
+        """
+        datei_name = os.path.basename(datei_pfad).lower()
+        punkt = datei_name.rfind(".")
+        kandidaten = self.datei_endungs_index.get(datei_name[punkt:], ()) if punkt >= 0 else ()
+        if self.dateiregeln_ohne_endungsindex or self.dateiregeln_alle_endungen:
+            zusaetzlich = [r for r in self.dateiregeln_ohne_endungsindex if r not in kandidaten and datei_name.endswith(r.muster)]
+            zusaetzlich.extend(self.dateiregeln_alle_endungen)
+            if zusaetzlich:
+                kandidaten = sorted(set(kandidaten) | set(zusaetzlich), key=lambda r: r.index)
+        datei_pfad_norm = None
+        for regel in kandidaten:
+            if regel.pfad_praefixe:
+                if datei_pfad_norm is None:
+                    datei_pfad_norm = normalisiere_pfad(datei_pfad)
+                if not any(self._hat_praefix(datei_pfad_norm, praefix) for praefix in regel.pfad_praefixe):
+                    continue
+            yield regel
+
+    @staticmethod
+    def _hat_praefix(pfad, praefix):
+        """Präfixvergleich an Pfadkomponenten-Grenzen."""
+        return pfad.startswith(praefix) and (len(pfad) == len(praefix) or pfad[len(praefix)] in "\\/" or praefix.endswith(("\\", "/")))
+
+    def finde_prozessregeln(self, prozess_name):
+        """Gibt alle Prozessregeln zurück, von denen mindestens ein Muster im Prozessnamen vorkommt."""
+        if not self._prozess_muster:
+            return ()
+        muster_ids = self._prozess_automat.finde((prozess_name or "").lower())
+        if not muster_ids:
+            return ()
+        regeln = {regel for muster_id in muster_ids for regel in self._prozess_muster_regeln[muster_id]}
+        return sorted(regeln, key=lambda r: r.index)
+
+    def finde_netzwerkregeln(self, remote_port, remote_ip=None):
+        """Gibt alle Netzwerkregeln zurück, deren Ports bzw. Adressen (und ggf. Ports) auf die Gegenstelle zutreffen."""
+        if not isinstance(remote_port, int) or not 0 <= remote_port < ANZAHL_PORTS:
+            remote_port = None
+        kandidaten = ()
+        if remote_port is not None and self.port_bitset[remote_port >> 3] & (1 << (remote_port & 7)):
+            kandidaten = self.port_index.get(remote_port, ())
+        if remote_ip and self.adress_baum.anzahl:
+            adress_regeln = [regel for regel in self.adress_baum.finde(remote_ip) if not regel.muster or remote_port in regel.muster]
+            if adress_regeln:
+                # Eine Regel kann über mehrere ihrer Netze gefunden werden
+                kandidaten = sorted(set(kandidaten).union(adress_regeln), key=lambda r: r.index)
+        return kandidaten
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+class ReputationsCache:
+    """
+    Verwaltet den persistenten Cache für Datei-Reputationen (Datei-Hash -> Reputationsstufe).
+    Modul für das Vermeiden wiederholter Reputationsabfragen über Neustarts hinweg.
+
+    Vorne liegt ein begrenzter LRU-Cache im Speicher, dahinter eine SQLite-Datenbank. Jeder
+    Eintrag speichert seinen Ablaufzeitpunkt als Unix-Zeit, sodass ein Treffer nur einen
+    Zahlenvergleich kostet. "unbekannt" wird als negatives Ergebnis mit eigener, kürzerer
+    TTL zwischengespeichert, damit unbekannte Hashes nicht bei jeder Prüfung erneut angefragt werden.
+    """
+    SQL_PARAMETER_MAX = 500 # Hashes pro "IN (...)"-Abfrage
+
+    def __init__(self, cache_datei_pfad, max_eintraege=100000, ttl_sekunden=3600, negativ_ttl_sekunden=600):
+        self.cache_datei_pfad = cache_datei_pfad
+        self.max_eintraege = max(1, int(max_eintraege))
+        self.ttl_sekunden = ttl_sekunden
+        self.negativ_ttl_sekunden = negativ_ttl_sekunden
+        self.eintraege = OrderedDict() # datei_hash -> (reputation_stufe, ablauf)
+        self.sperre = threading.Lock()
+        self.verbindung = None
+        self.treffer = 0
+        self.fehlschlaege = 0
+        self.initialisiere_cache()
+
+    def initialisiere_cache(self):
+        """Öffnet (oder erstellt) die Cache-Datenbank und entfernt abgelaufene Einträge."""
+        if not self.cache_datei_pfad:
+            return
+        try:
+            cache_verzeichnis = os.path.dirname(os.path.abspath(self.cache_datei_pfad))
+            os.makedirs(cache_verzeichnis, exist_ok=True)
+            self.verbindung = sqlite3.connect(self.cache_datei_pfad, check_same_thread=False)
+            self.verbindung.execute("PRAGMA journal_mode=WAL")
+            self.verbindung.execute("PRAGMA synchronous=NORMAL")
+            self.verbindung.execute("CREATE TABLE IF NOT EXISTS reputationen (datei_hash TEXT PRIMARY KEY, reputation_stufe TEXT, ablauf REAL) WITHOUT ROWID")
+            self.verbindung.execute("DELETE FROM reputationen WHERE ablauf <= ?", (time.time(),))
+            self.verbindung.commit()
+            protokolliere_ereignis_global("info", f"Reputations-Cache '{self.cache_datei_pfad}' geöffnet.")
+        except sqlite3.Error as e:
+            protokolliere_ereignis_global("fehler", f"Fehler beim Öffnen des Reputations-Caches '{self.cache_datei_pfad}': {e}. Reputationen werden nur im Speicher zwischengespeichert.", {"datei": self.cache_datei_pfad, "fehler": str(e)})
+            self.verbindung = None
+
+    def _merke(self, datei_hash, reputation_stufe, ablauf):
+        self.eintraege[datei_hash] = (reputation_stufe, ablauf)
+        self.eintraege.move_to_end(datei_hash)
+        if len(self.eintraege) > self.max_eintraege:
+            self.eintraege.popitem(last=False)
+
+    def hole_viele(self, datei_hashes):
+        """Gibt {datei_hash: reputation_stufe} für alle gültig zwischengespeicherten Hashes zurück."""
+        jetzt = time.time()
+        ergebnisse = {}
+        fehlend = []
+        with self.sperre:
+            for datei_hash in datei_hashes:
+                eintrag = self.eintraege.get(datei_hash)
+                if eintrag is not None and eintrag[1] > jetzt:
+                    self.eintraege.move_to_end(datei_hash)
+                    ergebnisse[datei_hash] = eintrag[0]
+                else:
+                    fehlend.append(datei_hash)
+            # Nicht im Speicher: in der Datenbank nachsehen (z.B. nach einem Neustart)
+            if fehlend and self.verbindung is not None:
+                try:
+                    for beginn in range(0, len(fehlend), self.SQL_PARAMETER_MAX):
+                        teil = fehlend[beginn:beginn + self.SQL_PARAMETER_MAX]
+                        zeilen = self.verbindung.execute(
+                            f"SELECT datei_hash, reputation_stufe, ablauf FROM reputationen WHERE ablauf > ? AND datei_hash IN ({','.join('?' * len(teil))})",
+                            (jetzt, *teil)
+                        ).fetchall()
+                        for datei_hash, reputation_stufe, ablauf in zeilen:
+                            self._merke(datei_hash, reputation_stufe, ablauf)
+                            ergebnisse[datei_hash] = reputation_stufe
+                except sqlite3.Error as e:
+                    protokolliere_ereignis_global("fehler", f"Fehler beim Lesen aus dem Reputations-Cache: {e}", {"fehler": str(e)})
+            self.treffer += len(ergebnisse)
+            self.fehlschlaege += len(datei_hashes) - len(ergebnisse)
+        return ergebnisse
+
+    def hole(self, datei_hash):
+        """Gibt die zwischengespeicherte Reputationsstufe eines Hashes zurück, sonst None."""
+        return self.hole_viele([datei_hash]).get(datei_hash)
+
+    def setze_viele(self, reputationen):
+        """Speichert {datei_hash: reputation_stufe} im Speicher und in einer Transaktion in der Datenbank."""
+        if not reputationen:
+            return
+        jetzt = time.time()
+        zeilen = []
+        with self.sperre:
+            for datei_hash, reputation_stufe in reputationen.items():
+                ablauf = jetzt + (self.negativ_ttl_sekunden if reputation_stufe == "unbekannt" else self.ttl_sekunden)
+                self._merke(datei_hash, reputation_stufe, ablauf)
+                zeilen.append((datei_hash, reputation_stufe, ablauf))
+            if self.verbindung is not None:
+                try:
+                    self.verbindung.executemany("INSERT OR REPLACE INTO reputationen (datei_hash, reputation_stufe, ablauf) VALUES (?, ?, ?)", zeilen)
+                    self.verbindung.commit()
+                except sqlite3.Error as e:
+                    protokolliere_ereignis_global("fehler", f"Fehler beim Schreiben in den Reputations-Cache: {e}", {"fehler": str(e)})
+
+    def get_statistik(self):
+        """Gibt Einträge im Speicher, Treffer, Fehlschläge und Trefferquote seit dem Programmstart zurück."""
+        with self.sperre:
+            gesamt = self.treffer + self.fehlschlaege
+            return {
+                "eintraege_speicher": len(self.eintraege),
+                "treffer": self.treffer,
+                "fehlschlaege": self.fehlschlaege,
+                "trefferquote": (self.treffer / gesamt) if gesamt else 0.0
+            }
+
+    def schliesse(self):
+        """Schließt die Datenbankverbindung."""
+        with self.sperre:
+            if self.verbindung is not None:
+                self.verbindung.close()
+                self.verbindung = None
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
@@ -0,0 +1,276 @@
+import heapq
+import json
+import os
+import re
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+# Stufen einer Systemprüfung in der Reihenfolge, in der sie im Bericht erscheinen
+SCAN_STUFEN = ("verzeichnisse", "stat", "scan_cache", "hash", "regeln", "reputation", "quantenanalyse", "quarantaene", "checkpoint", "drosselung")
+ZUSAMMENFASSUNG_FELDER = ("id", "start", "dauer_sekunden", "verzeichnisse", "abgebrochen", "ergebnis", "bytes_gelesen")
+_BERICHT_ID = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9]{6}$")
+_KEINE_MESSUNG = nullcontext()
+CPU_STICHPROBE = 8 # CPU-Zeit bei jedem n-ten Aufruf einer Stufe messen
+
+def miss_stufe(bericht, name):
+    """Gibt die Stufenmessung des Berichts zurück, ohne Bericht (z.B. Echtzeit-Dateischutz) einen leeren Kontext."""
+    return bericht.stufe(name) if bericht else _KEINE_MESSUNG
+
+class _StufenMessung:
+    """
+    Zeitmessung einer Stufe in einem Thread (ein wiederverwendetes Objekt pro Thread und Stufe, daher ohne
+    Sperre und ohne Allokation im Hot Path). Die Wandzeit wird bei jedem Aufruf gemessen; die CPU-Zeit
+    (time.thread_time ist ein Systemaufruf) nur bei jedem CPU_STICHPROBE-ten Aufruf und über das Verhältnis
+    CPU/Wand der Stichproben hochgerechnet. Verschachtelte Stufen werden von der umgebenden abgezogen und
+    immer mit ihr zusammen als Stichprobe gemessen. Eine Stufe darf nicht in sich selbst verschachtelt werden.
+    """
+    __slots__ = ("name", "stapel", "aufrufe", "wand", "stichprobe_wand", "stichprobe_cpu", "wand_start", "cpu_start", "kinder_wand", "kinder_cpu")
+
+    def __init__(self, name, stapel):
+        self.name = name
+        self.stapel = stapel # Aktive Messungen des Threads (innerste zuletzt)
+        self.aufrufe = 0
+        self.wand = 0.0
+        self.stichprobe_wand = 0.0
+        self.stichprobe_cpu = 0.0
+        self.cpu_start = None
+
+    def __enter__(self):
+        stapel = self.stapel
+        self.aufrufe += 1
+        self.kinder_wand = self.kinder_cpu = 0.0
+        if (stapel and stapel[-1].cpu_start is not None) or self.aufrufe % CPU_STICHPROBE == 1:
+            self.cpu_start = time.thread_time()
+        stapel.append(self)
+        self.wand_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *fehler):
+        wand = time.perf_counter() - self.wand_start
+        stapel = self.stapel
+        stapel.pop()
+        eltern = stapel[-1] if stapel else None
+        if eltern is not None:
+            eltern.kinder_wand += wand
+        self.wand += wand - self.kinder_wand
+        if self.cpu_start is not None:
+            cpu = time.thread_time() - self.cpu_start
+            self.cpu_start = None
+            if eltern is not None:
+                eltern.kinder_cpu += cpu
+            self.stichprobe_wand += wand - self.kinder_wand
+            self.stichprobe_cpu += cpu - self.kinder_cpu
+        return False
+
+class ScanBericht:
+    """
+    Strukturierter Bericht einer Systemprüfung.
+    Modul für die Auswertung, wohin die Zeit einer Prüfung geht.
+
+    - Pro Stufe (SCAN_STUFEN) Wandzeit, CPU-Zeit des ausführenden Threads und Anzahl der Aufrufe
+      (siehe _StufenMessung). Stufen schließen einander aus: Zeit einer verschachtelten Stufe (z.B. stat im
+      Verzeichnis-Walker, Reputation in der Regelauswertung) zählt nur bei der inneren Stufe.
+      Mit Hash-Worker-Prozessen fällt die CPU-Zeit des Hashens in den Worker-Prozessen an und fehlt hier.
+    - Gelesene Bytes, die langsamsten Dateien (Hash-Stufe plus Urteil), Treffer und Auswertungsdauer
+      pro Regel sowie übersprungene Einträge nach Grund.
+    - Bytes und Übersprungen-Zähler sind thread-sicher (Walker- und Hash-Worker-Threads); Regel- und
+      Dateiwerte werden nur aus der Urteils-Stufe geschrieben, die immer in einem Thread läuft.
+    """
+    def __init__(self, verzeichnisse, langsamste_anzahl=20):
+        self.start = datetime.now()
+        self.bericht_id = self.start.strftime("%Y%m%d-%H%M%S-%f")
+        self.verzeichnisse = list(verzeichnisse)
+        self.langsamste_anzahl = max(0, int(langsamste_anzahl))
+        self.bytes_gelesen = 0
+        self.regeln = {} # regel_name -> [auswertungen, treffer, sekunden]
+        self.uebersprungen = {} # grund -> anzahl
+        self.hash_dauer = {} # datei_pfad -> Sekunden der Hash-Stufe, bis das Urteil vorliegt
+        self.langsamste = [] # Min-Heap (sekunden, datei_pfad, groesse)
+        self.ergebnis = {}
+        self.dauer_sekunden = None
+        self.abgebrochen = False # Prüfauftrag vor dem Ende abgebrochen (Ergebnis unvollständig)
+        self.fortgesetzt_von = None # Bericht-ID der unterbrochenen Prüfung, deren Checkpoint fortgesetzt wurde
+        self.checkpoints = None # {"geschrieben": n, "sekunden": s}
+        self._lokal = threading.local()
+        self._messungen = [] # Alle _StufenMessung-Objekte aller Threads
+        self._sperre = threading.Lock()
+
+    def stufe(self, name):
+        """Misst den Block `with bericht.stufe(name):` als Stufe name."""
+        try:
+            return self._lokal.messungen[name]
+        except AttributeError:
+            self._lokal.messungen = {}
+            self._lokal.stapel = []
+        except KeyError:
+            pass
+        messung = self._lokal.messungen[name] = _StufenMessung(name, self._lokal.stapel)
+        with self._sperre:
+            self._messungen.append(messung)
+        return messung
+
+    def _stufen(self):
+        """Summiert die Messungen aller Threads pro Stufe."""
+        summen = {name: [0, 0.0, 0.0, 0.0] for name in SCAN_STUFEN} # aufrufe, wand, stichprobe_wand, stichprobe_cpu
+        with self._sperre:
+            messungen = list(self._messungen)
+        for messung in messungen:
+            summe = summen.setdefault(messung.name, [0, 0.0, 0.0, 0.0])
+            summe[0] += messung.aufrufe
+            summe[1] += messung.wand
+            summe[2] += messung.stichprobe_wand
+            summe[3] += messung.stichprobe_cpu
+        return {name: {"wand_sekunden": round(wand, 6),
+                       "cpu_sekunden": round(min(wand, max(0.0, wand * stichprobe_cpu / stichprobe_wand)) if stichprobe_wand > 0 else 0.0, 6),
+                       "aufrufe": aufrufe}
+                for name, (aufrufe, wand, stichprobe_wand, stichprobe_cpu) in summen.items()}
+
+    def uebersprungen_wegen(self, grund):
+        """Zählt einen übersprungenen Eintrag (Verzeichnis oder Datei) unter grund."""
+        with self._sperre:
+            self.uebersprungen[grund] = self.uebersprungen.get(grund, 0) + 1
+
+    def datei_gehasht(self, datei_pfad, groesse, sekunden):
+        """Hash-Stufe einer Datei abgeschlossen (Hash-Worker-Threads)."""
+        with self._sperre:
+            self.bytes_gelesen += groesse
+        self.hash_dauer[datei_pfad] = sekunden
+
+    def datei_beurteilt(self, datei_pfad, groesse, sekunden):
+        """Urteil einer Datei abgeschlossen (Urteils-Stufe); führt die Liste der langsamsten Dateien."""
+        sekunden += self.hash_dauer.pop(datei_pfad, 0.0)
+        if len(self.langsamste) < self.langsamste_anzahl:
+            heapq.heappush(self.langsamste, (sekunden, datei_pfad, groesse))
+        elif self.langsamste and sekunden > self.langsamste[0][0]:
+            heapq.heapreplace(self.langsamste, (sekunden, datei_pfad, groesse))
+
+    def regel_ausgewertet(self, regel_name, sekunden, treffer):
+        """Eine Regel wurde für eine Datei ausgewertet (Urteils-Stufe)."""
+        werte = self.regeln.get(regel_name)
+        if werte is None:
+            werte = self.regeln[regel_name] = [0, 0, 0.0]
+        werte[0] += 1
+        werte[1] += bool(treffer)
+        werte[2] += sekunden
+
+    def regel_treffer(self, regel_name):
+        """Treffer ohne Auswertung (z.B. Ergebnis aus dem Scan-Cache oder IOC-Index)."""
+        werte = self.regeln.get(regel_name)
+        if werte is None:
+            werte = self.regeln[regel_name] = [0, 0, 0.0]
+        werte[1] += 1
+
+    def abschliessen(self, zaehler, abgebrochen=False):
+        """Übernimmt die Zähler der Prüfung und die Gesamtdauer."""
+        self.ergebnis = dict(zaehler)
+        self.abgebrochen = abgebrochen
+        self.dauer_sekunden = (datetime.now() - self.start).total_seconds()
+        self.hash_dauer.clear()
+
+    def als_dict(self):
+        """Gibt den Bericht als JSON-serialisierbares Dictionary zurück."""
+        stufen = self._stufen()
+        with self._sperre:
+            uebersprungen = dict(sorted(self.uebersprungen.items()))
+            bytes_gelesen = self.bytes_gelesen
+        dauer = self.dauer_sekunden
+        return {
+            "id": self.bericht_id,
+            "start": self.start.strftime("%Y-%m-%d %H:%M:%S"),
+            "dauer_sekunden": round(dauer, 3) if dauer is not None else None,
+            "verzeichnisse": self.verzeichnisse,
+            "abgebrochen": self.abgebrochen,
+            "fortgesetzt_von": self.fortgesetzt_von,
+            "checkpoints": self.checkpoints,
+            "ergebnis": self.ergebnis,
+            "bytes_gelesen": bytes_gelesen,
+            "mb_pro_sekunde": round(bytes_gelesen / 1e6 / dauer, 2) if dauer else None,
+            "stufen": stufen,
+            "langsamste_dateien": [{"datei_pfad": pfad, "sekunden": round(sekunden, 6), "groesse": groesse}
+                                   for sekunden, pfad, groesse in sorted(self.langsamste, reverse=True)],
+            "regeln": {name: {"auswertungen": auswertungen, "treffer": treffer, "sekunden": round(sekunden, 6)}
+                       for name, (auswertungen, treffer, sekunden) in sorted(self.regeln.items(), key=lambda eintrag: -eintrag[1][2])},
+            "uebersprungen": uebersprungen
+        }
+
+    def zusammenfassung(self):
+        """Kurzfassung für Listen (ohne Stufen, Regeln und Dateien)."""
+        daten = self.als_dict()
+        return {schluessel: daten[schluessel] for schluessel in ZUSAMMENFASSUNG_FELDER}
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
+
+class ScanBerichtArchiv:
+    """
+    Speichert Scan-Berichte als JSON-Dateien (eine pro Prüfung, atomar über temporäre Datei und os.replace)
+    und hält die letzten max_anzahl Berichte vor; ältere werden gelöscht.
+    """
+    def __init__(self, verzeichnis, max_anzahl=50):
+        self.verzeichnis = verzeichnis
+        self.max_anzahl = max(1, int(max_anzahl))
+        self.sperre = threading.Lock()
+
+    def _pfad(self, bericht_id):
+        return os.path.join(self.verzeichnis, f"scan_{bericht_id}.json")
+
+    def _ids(self):
+        """Bericht-IDs, neueste zuerst (die ID beginnt mit dem Startzeitpunkt)."""
+        try:
+            namen = os.listdir(self.verzeichnis)
+        except OSError:
+            return []
+        ids = [name[5:-5] for name in namen if name.startswith("scan_") and name.endswith(".json")]
+        return sorted((bericht_id for bericht_id in ids if _BERICHT_ID.match(bericht_id)), reverse=True)
+
+    def speichere(self, bericht):
+        """Schreibt einen Bericht und entfernt Berichte über max_anzahl hinaus."""
+        daten = bericht.als_dict()
+        pfad = self._pfad(bericht.bericht_id)
+        temp_pfad = f"{pfad}.tmp"
+        with self.sperre:
+            try:
+                os.makedirs(self.verzeichnis, exist_ok=True)
+                with open(temp_pfad, 'w', encoding='utf-8') as f:
+                    json.dump(daten, f, indent=1) # ASCII-Escapes: auch Dateinamen ohne gültiges UTF-8 (Surrogates) bleiben speicherbar
+                os.replace(temp_pfad, pfad)
+                for alte_id in self._ids()[self.max_anzahl:]:
+                    os.remove(self._pfad(alte_id))
+            except (OSError, ValueError) as e:
+                self.protokolliere_ereignis("fehler", f"Scan-Bericht konnte nicht in '{self.verzeichnis}' gespeichert werden: {e}", {"verzeichnis": self.verzeichnis, "fehler": str(e)})
+                return None
+        return pfad
+
+    def lade(self, bericht_id):
+        """Gibt einen gespeicherten Bericht zurück ("letzter" = neuester), oder None."""
+        if bericht_id == "letzter":
+            ids = self._ids()
+            bericht_id = ids[0] if ids else None
+        if not bericht_id or not _BERICHT_ID.match(bericht_id):
+            return None
+        try:
+            with open(self._pfad(bericht_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.protokolliere_ereignis("warnung", f"Scan-Bericht '{bericht_id}' konnte nicht gelesen werden: {e}", {"bericht_id": bericht_id, "fehler": str(e)})
+            return None
+
+    def liste(self, limit=20):
+        """Kurzfassungen der neuesten Berichte (neueste zuerst)."""
+        zusammenfassungen = []
+        for bericht_id in self._ids()[:max(0, limit)]:
+            daten = self.lade(bericht_id)
+            if daten:
+                zusammenfassungen.append({schluessel: daten.get(schluessel) for schluessel in ZUSAMMENFASSUNG_FELDER})
+        return zusammenfassungen
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import threading
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+def _pfad_text(datei_pfad):
+    """Pfad als gültiges UTF-8 für SQLite; Bytes aus Dateinamen ohne gültiges UTF-8 (unter Linux erlaubt) als \\x..-Escapes."""
+    return datei_pfad.encode("utf-8", "surrogateescape").decode("utf-8", "backslashreplace")
+
+class ScanCacheManager:
+    """
+    Verwaltet den persistenten Scan-Cache für inkrementelle Systemprüfungen.
+    Modul für das Überspringen unveränderter Dateien anhand ihrer Datei-Identität.
+
+    Schlüssel eines Eintrags ist (Gerät, Inode); gültig ist er nur, solange Größe,
+    mtime_ns und ctime_ns unverändert sind. Gespeichert werden SHA-256-Hash, Ergebnis
+    und Regelname der letzten Analyse. Ändert sich der Regelsatz oder die Threat-
+    Intelligence-Version, wird der gesamte Cache verworfen.
+    """
+    COMMIT_INTERVALL = 1000 # Anzahl Schreibvorgänge bis zum nächsten Commit
+
+    def __init__(self, cache_datei_pfad):
+        self.cache_datei_pfad = cache_datei_pfad
+        self.sperre = threading.Lock()
+        self.verbindung = None
+        self.ausstehende_schreibvorgaenge = 0
+        self.treffer = 0
+        self.fehlschlaege = 0
+        self.initialisiere_cache()
+
+    def initialisiere_cache(self):
+        """Öffnet (oder erstellt) die Cache-Datenbank."""
+        try:
+            cache_verzeichnis = os.path.dirname(os.path.abspath(self.cache_datei_pfad))
+            os.makedirs(cache_verzeichnis, exist_ok=True)
+            self.verbindung = sqlite3.connect(self.cache_datei_pfad, check_same_thread=False)
+            self.verbindung.execute("PRAGMA journal_mode=WAL")
+            self.verbindung.execute("PRAGMA synchronous=NORMAL")
+            self.verbindung.execute("CREATE TABLE IF NOT EXISTS meta (schluessel TEXT PRIMARY KEY, wert TEXT)")
+            self.verbindung.execute(
+                "CREATE TABLE IF NOT EXISTS eintraege ("
+                "geraet INTEGER, inode INTEGER, groesse INTEGER, mtime_ns INTEGER, ctime_ns INTEGER, "
+                "pfad TEXT, datei_hash TEXT, ergebnis TEXT, regel_name TEXT, "
+                "PRIMARY KEY (geraet, inode)) WITHOUT ROWID"
+            )
+            self.verbindung.commit()
+            protokolliere_ereignis_global("info", f"Scan-Cache '{self.cache_datei_pfad}' geöffnet.")
+        except sqlite3.Error as e:
+            protokolliere_ereignis_global("fehler", f"Fehler beim Öffnen des Scan-Caches '{self.cache_datei_pfad}': {e}. Inkrementelle Prüfung deaktiviert.", {"datei": self.cache_datei_pfad, "fehler": str(e)})
+            self.verbindung = None
+
+    @property
+    def aktiv(self):
+        """Gibt an, ob der Cache verwendet werden kann."""
+        return self.verbindung is not None
+
+    def pruefe_version(self, version):
+        """Verwirft alle Einträge, falls sich Regelsatz- oder Threat-Intelligence-Version geändert haben."""
+        if not self.aktiv:
+            return
+        with self.sperre:
+            zeile = self.verbindung.execute("SELECT wert FROM meta WHERE schluessel = 'version'").fetchone()
+            if zeile and zeile[0] == version:
+                return
+            self.verbindung.execute("DELETE FROM eintraege")
+            self.verbindung.execute("INSERT OR REPLACE INTO meta (schluessel, wert) VALUES ('version', ?)", (version,))
+            self.verbindung.commit()
+        if zeile:
+            protokolliere_ereignis_global("info", "Regelsatz oder Threat Intelligence geändert. Scan-Cache wurde invalidiert.", {"alte_version": zeile[0], "neue_version": version})
+
+    def hole_eintrag(self, datei_pfad, datei_stat):
+        """
+        Gibt (datei_hash, ergebnis, regel_name) für eine unveränderte Datei zurück, sonst None.
+        datei_stat kann ein os.stat_result oder ein DateiEintrag aus datei_walker sein.
+        """
+        if not self.aktiv:
+            return None
+        with self.sperre:
+            zeile = self.verbindung.execute(
+                "SELECT groesse, mtime_ns, ctime_ns, pfad, datei_hash, ergebnis, regel_name FROM eintraege WHERE geraet = ? AND inode = ?",
+                (datei_stat.st_dev, datei_stat.st_ino)
+            ).fetchone()
+            if zeile and zeile[:4] == (datei_stat.st_size, datei_stat.st_mtime_ns, datei_stat.st_ctime_ns, _pfad_text(datei_pfad)):
+                self.treffer += 1
+                return zeile[4], zeile[5], zeile[6]
+            self.fehlschlaege += 1
+            return None
+
+    def speichere_eintrag(self, datei_pfad, datei_stat, datei_hash, ergebnis, regel_name):
+        """Speichert Hash und Ergebnis der Analyse einer Datei."""
+        if not self.aktiv:
+            return
+        with self.sperre:
+            self.verbindung.execute(
+                "INSERT OR REPLACE INTO eintraege VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (datei_stat.st_dev, datei_stat.st_ino, datei_stat.st_size, datei_stat.st_mtime_ns, datei_stat.st_ctime_ns,
+                 _pfad_text(datei_pfad), datei_hash, ergebnis, regel_name)
+            )
+            self.ausstehende_schreibvorgaenge += 1
+            if self.ausstehende_schreibvorgaenge >= self.COMMIT_INTERVALL:
+                self.verbindung.commit()
+                self.ausstehende_schreibvorgaenge = 0
+
+    def schreibe_aenderungen(self):
+        """Schreibt ausstehende Änderungen auf die Festplatte."""
+        if not self.aktiv:
+            return
+        with self.sperre:
+            self.verbindung.commit()
+            self.ausstehende_schreibvorgaenge = 0
+
+    def get_statistik(self):
+        """Gibt Treffer, Fehlschläge und Trefferquote seit dem Programmstart zurück."""
+        with self.sperre:
+            gesamt = self.treffer + self.fehlschlaege
+            return {
+                "treffer": self.treffer,
+                "fehlschlaege": self.fehlschlaege,
+                "trefferquote": (self.treffer / gesamt) if gesamt else 0.0
+            }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
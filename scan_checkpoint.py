@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+CHECKPOINT_FORMAT = 1
+
+class ScanCheckpoint:
+    """
+    Fortsetzungspunkt einer Systemprüfung.
+    Modul für das Fortsetzen langer Prüfungen nach einem Neustart oder Absturz.
+
+    - Ein Checkpoint pro Menge von Scan-Verzeichnissen (Dateiname aus deren Hash), damit parallele
+      Prüfaufträge sich nicht gegenseitig überschreiben.
+    - Inhalt: Position des Walkers (Index des Basisverzeichnisses, Stapel noch nicht gelesener Verzeichnisse,
+      Fortschritt im aktuellen Verzeichnis), Zähler und die Dateien, deren Urteil (und damit ggf. die
+      Quarantäne) noch aussteht. Bereits geprüfte Teilbäume werden nicht aufgezählt, daher bleibt er klein.
+    - Geschrieben wird atomar (temporäre Datei, fsync, os.replace); ein Absturz hinterlässt immer den
+      vorherigen oder den neuen Checkpoint. Ein Checkpoint eines anderen Regelsatzes oder einer anderen
+      Threat Intelligence (version) wird verworfen, da die Urteile davor nicht mehr gelten.
+    """
+    def __init__(self, verzeichnis, scan_verzeichnisse, version, intervall_sekunden=5):
+        self.verzeichnis = verzeichnis
+        self.scan_verzeichnisse = list(scan_verzeichnisse)
+        schluessel = hashlib.sha1(json.dumps(self.scan_verzeichnisse).encode("utf-8")).hexdigest()[:16]
+        self.pfad = os.path.join(verzeichnis, f"checkpoint_{schluessel}.json")
+        self.version = version
+        self.intervall_sekunden = max(0.1, float(intervall_sekunden))
+        self.faellig_ab = time.monotonic() + self.intervall_sekunden # Wird pro Datei mit time.monotonic() verglichen
+        self.geschrieben = 0
+        self.sekunden = 0.0 # Summe der Schreibzeiten (Kosten der Checkpoints)
+
+    def lade(self):
+        """Gibt den gespeicherten Stand zurück, falls er zu diesen Verzeichnissen und dieser Version passt, sonst None."""
+        try:
+            with open(self.pfad, 'r', encoding='utf-8') as f:
+                stand = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.protokolliere_ereignis("warnung", f"Scan-Checkpoint '{self.pfad}' konnte nicht gelesen werden: {e}", {"pfad": self.pfad, "fehler": str(e)})
+            return None
+        if stand.get("format") != CHECKPOINT_FORMAT or stand.get("verzeichnisse") != self.scan_verzeichnisse:
+            return None
+        if stand.get("version") != self.version:
+            self.protokolliere_ereignis("info", "Scan-Checkpoint verworfen: Regelsatz oder Threat Intelligence haben sich geändert.", {"pfad": self.pfad})
+            self.entferne()
+            return None
+        return stand
+
+    def schreibe(self, walker, zaehler, ausstehend, bericht_id):
+        """Schreibt den Checkpoint atomar; walker ist der Stand aus WalkPosition.stand() plus basis_index."""
+        start = time.perf_counter()
+        stand = {
+            "format": CHECKPOINT_FORMAT,
+            "verzeichnisse": self.scan_verzeichnisse,
+            "version": self.version,
+            "zeit": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "bericht_id": bericht_id,
+            "walker": walker,
+            "zaehler": dict(zaehler),
+            "ausstehend": list(ausstehend)
+        }
+        temp_pfad = f"{self.pfad}.tmp"
+        try:
+            os.makedirs(self.verzeichnis, exist_ok=True)
+            with open(temp_pfad, 'w', encoding='utf-8') as f:
+                json.dump(stand, f, separators=(",", ":")) # ASCII-Escapes: Verzeichnisnamen ohne gültiges UTF-8 (Surrogates) bleiben erhalten
+                f.flush()
+                os.fsync(f.fileno()) # Erst danach ersetzen: nach einem Absturz nie ein halb geschriebener Checkpoint
+            os.replace(temp_pfad, self.pfad)
+        except (OSError, ValueError) as e:
+            self.protokolliere_ereignis("fehler", f"Scan-Checkpoint konnte nicht geschrieben werden: {e}", {"pfad": self.pfad, "fehler": str(e)})
+            if os.path.exists(temp_pfad):
+                try:
+                    os.remove(temp_pfad)
+                except OSError:
+                    pass
+        self.geschrieben += 1
+        self.sekunden += time.perf_counter() - start
+        self.faellig_ab = time.monotonic() + self.intervall_sekunden
+
+    def entferne(self):
+        """Entfernt den Checkpoint (nach einer vollständig abgeschlossenen Prüfung)."""
+        try:
+            os.remove(self.pfad)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.protokolliere_ereignis("warnung", f"Scan-Checkpoint '{self.pfad}' konnte nicht entfernt werden: {e}", {"pfad": self.pfad, "fehler": str(e)})
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
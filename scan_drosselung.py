@@ -0,0 +1,202 @@
+import ctypes
+import os
+import sys
+import threading
+import time
+import psutil
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+from drosselung import TokenBucket
+from scan_bericht import miss_stufe
+
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000 # SetThreadPriority (Windows): niedrige CPU-, I/O- und Speicherpriorität für den Thread
+BACKOFF_FAKTOR = 0.5 # Anteil des Budgets pro Messintervall mit Überlast (multiplikativ verringern)
+ERHOLUNG_SCHRITT = 0.1 # Anteil des Budgets pro Messintervall ohne Überlast (additiv erhöhen)
+
+class ScanDrosselung:
+    """
+    Ressourcenbudget der Systemprüfung.
+    Modul für Systemprüfungen, die den Rechner während der Arbeitszeit nicht ausbremsen.
+
+    - Zwei Token-Buckets, gemeinsam für alle laufenden Prüfaufträge: gelesene Bytes pro Sekunde (nur Dateien,
+      die nicht aus dem Scan-Cache kommen) und aufgezählte Dateien pro Sekunde. 0 bedeutet unbegrenzt.
+    - Adaptiver Back-off: Ein Thread misst während einer Prüfung jede messintervall_sekunden die Systemlast
+      (1-Minuten-Load pro CPU-Kern) und die I/O-Wartezeit (iowait, nur Linux). Liegt einer der Werte über
+      seiner Schwelle, wird der nutzbare Anteil des Budgets halbiert (bis min_anteil), sonst um 10 % erhöht.
+      Ohne festes Budget bezieht sich der Anteil auf den zuletzt ungedrosselt gemessenen Durchsatz.
+    - Scan-Threads senken ihre eigene CPU- und I/O-Priorität (Linux: nice und ionice pro Thread,
+      Windows: Hintergrundmodus des Threads). Andere Threads des Prozesses (Echtzeitschutz, Web-UI) bleiben unberührt.
+    - Die Einstellungen (systempruefung.scan_drosselung) werden bei jeder Messung neu gelesen; Änderungen an
+      virenschutz_config.json wirken daher auch während einer laufenden Prüfung.
+    """
+    def __init__(self, konfig_manager):
+        self.konfig_manager = konfig_manager
+        self.bytes_bucket = TokenBucket(0)
+        self.dateien_bucket = TokenBucket(0)
+        self.einstellungen = {}
+        self.aktiviert = False
+        self.prioritaet_senken = False
+        self.anteil = 1.0 # Nutzbarer Anteil des Budgets (Back-off)
+        self.ueberlastet = False
+        self.systemlast = None # Letzte Messung: Load pro CPU-Kern
+        self.io_wartezeit_prozent = None
+        self.backoff_anzahl = 0
+        self._referenz = {"bytes": 0.0, "dateien": 0.0} # Ungedrosselt gemessener Durchsatz pro Sekunde
+        # Durchsatz seit der letzten Messung; ohne Sperre gezählt (nur Schätzwert für den Back-off)
+        self._gezaehlt = {"bytes": 0, "dateien": 0}
+        self._aktive_pruefungen = 0
+        self._sperre = threading.Lock()
+        self._stopp = threading.Event()
+        self._ueberwachungs_thread = None
+        self._prioritaet_gemeldet = False
+        self.konfiguriere(self._lese_einstellungen())
+
+    def _lese_einstellungen(self):
+        return self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_drosselung", {})
+
+    def konfiguriere(self, einstellungen):
+        """Übernimmt die Einstellungen und setzt die Raten der Token-Buckets (auch während einer Prüfung)."""
+        einstellungen = dict(einstellungen)
+        if einstellungen != self.einstellungen:
+            if self.einstellungen:
+                self.protokolliere_ereignis("info", "Ressourcenbudget der Systemprüfung geändert.", einstellungen)
+            self.einstellungen = einstellungen
+            self.aktiviert = bool(einstellungen.get("aktiviert", False))
+            self.prioritaet_senken = self.aktiviert and bool(einstellungen.get("prioritaet_senken", True))
+            if not self.aktiviert:
+                self.anteil = 1.0
+                self.ueberlastet = False
+        self._setze_raten()
+
+    def _setze_raten(self):
+        burst_sekunden = max(0.1, float(self.einstellungen.get("burst_sekunden", 1)))
+        for art, bucket in (("bytes", self.bytes_bucket), ("dateien", self.dateien_bucket)):
+            rate = float(self.einstellungen.get(f"{art}_pro_sekunde", 0)) if self.aktiviert else 0.0
+            if rate <= 0 and self.anteil < 1.0:
+                rate = self._referenz[art] # Ohne festes Budget: Back-off vom gemessenen Durchsatz aus
+            rate *= self.anteil
+            if rate != bucket.rate:
+                bucket.setze_rate(rate, max(1.0, rate * burst_sekunden))
+
+    def beginne(self):
+        """Meldet eine laufende Prüfung an; die erste startet die Messung von Systemlast und I/O-Wartezeit."""
+        with self._sperre:
+            self._aktive_pruefungen += 1
+            if self._ueberwachungs_thread is not None:
+                return
+            self.anteil = 1.0 # Back-off einer früheren Prüfung nicht übernehmen (Referenzdurchsatz veraltet)
+            self.ueberlastet = False
+            self.konfiguriere(self._lese_einstellungen())
+            psutil.cpu_times_percent(interval=None) # Basiswert für die erste Messung
+            self._stopp.clear()
+            self._ueberwachungs_thread = threading.Thread(target=self._ueberwachungs_schleife, name="ScanDrosselung", daemon=True)
+            self._ueberwachungs_thread.start()
+
+    def beende(self):
+        """Meldet eine Prüfung ab; nach der letzten endet die Messung."""
+        with self._sperre:
+            self._aktive_pruefungen -= 1
+            if self._aktive_pruefungen > 0 or self._ueberwachungs_thread is None:
+                return
+            thread, self._ueberwachungs_thread = self._ueberwachungs_thread, None
+            self._stopp.set()
+        thread.join()
+
+    def hole_datei(self, bericht=None):
+        """Verbraucht das Budget für eine aufgezählte Datei (blockiert bei Bedarf)."""
+        self._gezaehlt["dateien"] += 1
+        if self.dateien_bucket.rate > 0:
+            with miss_stufe(bericht, "drosselung"):
+                self.dateien_bucket.hole(1)
+
+    def hole_bytes(self, anzahl, bericht=None):
+        """Verbraucht das Budget für anzahl zu lesende Bytes (blockiert bei Bedarf)."""
+        self._gezaehlt["bytes"] += anzahl
+        if self.bytes_bucket.rate > 0:
+            with miss_stufe(bericht, "drosselung"):
+                self.bytes_bucket.hole(anzahl)
+
+    def senke_prioritaet(self):
+        """
+        Senkt CPU- und I/O-Priorität des aufrufenden Threads (nur in eigens für die Prüfung gestarteten Threads aufrufen).
+        Unter Linux erben alle danach von diesem Thread erzeugten Threads die Werte; gemeinsam genutzte Hintergrund-Threads
+        (Quarantäne-Transfer, Reputations-, KI- und Log-Anker-Batches) starten daher bereits bei der Initialisierung ihrer Manager.
+        """
+        if not self.prioritaet_senken:
+            return
+        try:
+            if os.name == "nt":
+                kernel32 = ctypes.windll.kernel32
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+            elif sys.platform.startswith("linux"):
+                # Unter Linux gelten nice und ionice für die Thread-ID einzeln; neue Threads erben die Werte
+                thread_id = threading.get_native_id()
+                nice = int(self.einstellungen.get("nice", 10))
+                if os.getpriority(os.PRIO_PROCESS, thread_id) < nice: # Nur senken: Anheben erfordert meist Root-Rechte
+                    os.setpriority(os.PRIO_PROCESS, thread_id, nice)
+                if self.einstellungen.get("io_klasse", "niedrig") == "leerlauf":
+                    psutil.Process(thread_id).ionice(psutil.IOPRIO_CLASS_IDLE)
+                else:
+                    psutil.Process(thread_id).ionice(psutil.IOPRIO_CLASS_BE, 7)
+            elif not self._prioritaet_gemeldet:
+                self._prioritaet_gemeldet = True
+                self.protokolliere_ereignis("debug", f"Priorität der Scan-Threads kann auf '{sys.platform}' nicht gesenkt werden.")
+        except (OSError, AttributeError, psutil.Error) as e:
+            if not self._prioritaet_gemeldet:
+                self._prioritaet_gemeldet = True
+                self.protokolliere_ereignis("warnung", f"Priorität der Scan-Threads konnte nicht gesenkt werden: {e}", {"fehler": str(e)})
+
+    def _ueberwachungs_schleife(self):
+        letzte_messung = time.monotonic()
+        while not self._stopp.wait(max(0.1, float(self.einstellungen.get("messintervall_sekunden", 1)))):
+            jetzt = time.monotonic()
+            dauer, letzte_messung = jetzt - letzte_messung, jetzt
+            try:
+                self.konfig_manager.lade_neu_falls_geaendert() # Budgets aus einer geänderten Konfigurationsdatei übernehmen
+                self.konfiguriere(self._lese_einstellungen())
+                self._miss_und_passe_an(dauer)
+            except Exception as e:
+                self.protokolliere_ereignis("fehler", f"Fehler bei der Messung der Systemlast: {e}", {"fehler": str(e)})
+
+    def _miss_und_passe_an(self, dauer):
+        """Misst Systemlast und I/O-Wartezeit und passt den nutzbaren Anteil des Budgets an (AIMD)."""
+        gezaehlt, self._gezaehlt = self._gezaehlt, {"bytes": 0, "dateien": 0}
+        self.systemlast = psutil.getloadavg()[0] / (psutil.cpu_count() or 1)
+        self.io_wartezeit_prozent = getattr(psutil.cpu_times_percent(interval=None), "iowait", None)
+        if not self.aktiviert:
+            return
+        if self.anteil >= 1.0:
+            self._referenz = {art: anzahl / dauer for art, anzahl in gezaehlt.items()}
+        max_systemlast = float(self.einstellungen.get("max_systemlast", 0))
+        max_io_wartezeit = float(self.einstellungen.get("max_io_wartezeit_prozent", 0))
+        ueberlastet = (max_systemlast > 0 and self.systemlast > max_systemlast) or \
+                      (max_io_wartezeit > 0 and self.io_wartezeit_prozent is not None and self.io_wartezeit_prozent > max_io_wartezeit)
+        if ueberlastet:
+            self.anteil = max(float(self.einstellungen.get("min_anteil", 0.05)), self.anteil * BACKOFF_FAKTOR)
+            self.backoff_anzahl += 1
+            if not self.ueberlastet:
+                self.protokolliere_ereignis("info", f"Systemprüfung gedrosselt: Systemlast {self.systemlast:.2f} pro Kern, I/O-Wartezeit {self.io_wartezeit_prozent} %.",
+                                            {"systemlast": round(self.systemlast, 2), "io_wartezeit_prozent": self.io_wartezeit_prozent})
+        else:
+            self.anteil = min(1.0, self.anteil + ERHOLUNG_SCHRITT)
+        self.ueberlastet = ueberlastet
+        self._setze_raten()
+
+    def get_statistik(self):
+        """Aktueller Zustand für die Web-UI."""
+        return {
+            "aktiviert": self.aktiviert,
+            "aktive_pruefungen": self._aktive_pruefungen,
+            "anteil": round(self.anteil, 3),
+            "ueberlastet": self.ueberlastet,
+            "systemlast": round(self.systemlast, 2) if self.systemlast is not None else None,
+            "io_wartezeit_prozent": self.io_wartezeit_prozent,
+            "backoff_anzahl": self.backoff_anzahl,
+            "bytes_pro_sekunde": round(self.bytes_bucket.rate),
+            "dateien_pro_sekunde": round(self.dateien_bucket.rate, 1),
+            "wartezeit_sekunden": round(self.bytes_bucket.gesamt_wartezeit + self.dateien_bucket.gesamt_wartezeit, 3)
+        }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
@@ -0,0 +1,128 @@
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+from signatur_engine import initialisiere_worker # Signatursatz einmal pro Worker-Prozess statt pro Datei
+
+_ENDE = object() # Markierung für das Ende eines Datenstroms zwischen den Stufen
+
+class ScanPipeline:
+    """
+    Parallele Producer/Consumer-Pipeline für die Systemprüfung.
+
+    Stufen:
+        1. Verzeichnis-Walker (eigener Thread) füllt eine begrenzte Datei-Queue.
+        2. Ein Pool von Hash-Workern fragt den Scan-Cache ab, berechnet Datei-Hashes und sucht Byte-Signaturen
+           (Threads oder, für CPU-gebundene Pfade, zusätzlich Worker-Prozesse).
+        3. Die Urteils-Stufe (aufrufender Thread) wertet Regeln aus und verschiebt Bedrohungen in Quarantäne.
+
+    Beide Queues sind begrenzt, sodass ein langsamer Verbraucher die vorgelagerten Stufen bremst (Backpressure).
+    Zähler werden ausschließlich in der Urteils-Stufe fortgeschrieben und bleiben dadurch exakt.
+    """
+    def __init__(self, system_pruefungs_manager, worker_anzahl=4, worker_modus="threads", queue_groesse=1024):
+        self.manager = system_pruefungs_manager
+        self.worker_anzahl = max(1, int(worker_anzahl))
+        self.worker_modus = worker_modus
+        self.datei_queue = queue.Queue(maxsize=queue_groesse)
+        self.urteil_queue = queue.Queue(maxsize=queue_groesse)
+        self.hash_executor = None
+        self.bericht = None
+        self.job = None
+        self.checkpoint = None
+        self.checkpoint_barriere = threading.Barrier(self.worker_anzahl)
+
+    def fuehre_aus(self, scan_verzeichnisse, zaehler, bericht=None, job=None, checkpoint=None, walker_stand=None):
+        """
+        Führt die Pipeline für die angegebenen Verzeichnisse aus und schreibt die Ergebnisse in `zaehler` (Stufenzeiten in `bericht`).
+        Pause und Abbruch eines Prüfauftrags (job) wirken in allen Stufen; nach einem Abbruch werden die Queues nur noch geleert.
+        Checkpoint-Markierungen des Walkers passieren die Hash-Worker als Barriere: Die Urteils-Stufe erhält eine Markierung
+        erst, wenn alle vorher eingereihten Dateien bei ihr angekommen sind, und schreibt dann den Checkpoint.
+        """
+        self.bericht = bericht
+        self.job = job
+        self.checkpoint = checkpoint
+        if self.worker_modus == "prozesse":
+            # Die Worker prüfen mit dem Signatursatz vom Start der Prüfung (eine Übertragung pro Prozess)
+            signatur_satz = self.manager.regel_manager.get_kompilierte_regeln().signatur_satz
+            self.hash_executor = ProcessPoolExecutor(max_workers=self.worker_anzahl, initializer=initialisiere_worker, initargs=(signatur_satz,))
+        protokolliere_ereignis_global("info", f"Scan-Pipeline gestartet: {self.worker_anzahl} Hash-Worker (Modus: {self.worker_modus}).")
+
+        walker_thread = threading.Thread(target=self._walker_stufe, args=(scan_verzeichnisse, walker_stand), daemon=True)
+        worker_threads = [threading.Thread(target=self._hash_worker, daemon=True) for _ in range(self.worker_anzahl)]
+        walker_thread.start()
+        for worker_thread in worker_threads:
+            worker_thread.start()
+
+        try:
+            self._urteils_stufe(zaehler)
+        finally:
+            walker_thread.join()
+            for worker_thread in worker_threads:
+                worker_thread.join()
+            if self.hash_executor:
+                self.hash_executor.shutdown()
+                self.hash_executor = None
+
+    def _walker_stufe(self, scan_verzeichnisse, walker_stand=None):
+        """Stufe 1: Dateien auflisten und in die Datei-Queue einreihen (blockiert, wenn die Queue voll ist)."""
+        self.manager.scan_drosselung.senke_prioritaet()
+        try:
+            for datei_pfad, datei_stat in self.manager._iteriere_scan_dateien(scan_verzeichnisse, self.bericht, self.job, self.checkpoint, walker_stand):
+                if datei_pfad is None:
+                    for _ in range(self.worker_anzahl): # Checkpoint-Markierung: eine pro Hash-Worker
+                        self.datei_queue.put((None, datei_stat))
+                    continue
+                self.datei_queue.put((datei_pfad, datei_stat))
+        except Exception as e:
+            protokolliere_ereignis_global("fehler", f"Scan-Pipeline: Fehler im Verzeichnis-Walker: {e}", {"fehler": str(e)})
+        finally:
+            for _ in range(self.worker_anzahl):
+                self.datei_queue.put(_ENDE)
+
+    def _hash_worker(self):
+        """Stufe 2: Scan-Cache abfragen, Datei-Hash berechnen und Byte-Signaturen suchen."""
+        self.manager.scan_drosselung.senke_prioritaet()
+        while True:
+            eintrag = self.datei_queue.get()
+            if eintrag is _ENDE:
+                self.urteil_queue.put(_ENDE)
+                return
+            datei_pfad, datei_stat = eintrag
+            if datei_pfad is None:
+                # Alle Worker haben ihre vorherigen Dateien weitergereicht; einer gibt die Markierung weiter
+                if self.checkpoint_barriere.wait() == 0:
+                    self.urteil_queue.put((None, datei_stat, None, (), None))
+                continue
+            if self.job is not None and self.job.unterbrechung and not self.job.warte_auf_fortsetzung():
+                continue # Abgebrochen: Datei-Queue leeren, bis der Walker endet
+            try:
+                datei_hash, signatur_treffer, cache_eintrag = self.manager._hash_stufe(datei_pfad, datei_stat, hash_executor=self.hash_executor, bericht=self.bericht,
+                                                                                             drosselung=self.manager.scan_drosselung)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Scan-Pipeline: Fehler im Hash-Worker für '{datei_pfad}': {e}", {"datei_pfad": datei_pfad, "fehler": str(e)})
+                datei_hash, signatur_treffer, cache_eintrag = None, (), None
+            # Auch fehlgeschlagene Dateien weiterreichen, damit die Dateizählung exakt bleibt
+            self.urteil_queue.put((datei_pfad, datei_stat, datei_hash, signatur_treffer, cache_eintrag))
+
+    def _urteils_stufe(self, zaehler):
+        """Stufe 3: Regeln auswerten und Quarantäne ausführen, bis alle Hash-Worker beendet sind."""
+        beendete_worker = 0
+        while beendete_worker < self.worker_anzahl:
+            eintrag = self.urteil_queue.get()
+            if eintrag is _ENDE:
+                beendete_worker += 1
+                continue
+            datei_pfad, datei_stat, datei_hash, signatur_treffer, cache_eintrag = eintrag
+            if self.job is not None and self.job.unterbrechung and not self.job.warte_auf_fortsetzung():
+                continue # Nach einem Abbruch auch keinen Checkpoint mehr schreiben (übersprungene Dateien)
+            if datei_pfad is None:
+                try:
+                    self.manager._schreibe_checkpoint(self.checkpoint, datei_stat, zaehler, self.bericht)
+                except Exception as e: # Nicht abbrechen: Walker und Hash-Worker blockierten sonst an vollen Queues
+                    protokolliere_ereignis_global("fehler", f"Scan-Pipeline: Fehler beim Schreiben des Checkpoints: {e}", {"fehler": str(e)})
+                continue
+            try:
+                self.manager._urteils_stufe(datei_pfad, datei_stat, datei_hash, signatur_treffer, cache_eintrag, zaehler, self.bericht)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Scan-Pipeline: Fehler in der Urteils-Stufe für '{datei_pfad}': {e}", {"datei_pfad": datei_pfad, "fehler": str(e)})
@@ -0,0 +1,352 @@
+import collections
+import heapq
+import itertools
+import os
+import threading
+import time
+from datetime import datetime
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+from ereignis_bus import veroeffentliche_ereignis_global # Änderungsereignisse für den Stream der Web-UI
+
+# Dringlichkeit der Auftragsarten (kleiner = dringender). Innerhalb einer Art hat die Prüfung einzelner
+# Verzeichnisse Vorrang vor der vollständigen Prüfung, daher verdrängt sie eine laufende vollständige Prüfung.
+ART_PRIORITAET = {"echtzeit": 0, "manuell": 1, "geplant": 2}
+JOB_ZUSTAENDE = ("wartend", "laufend", "pausiert", "abgebrochen", "abgeschlossen", "fehlgeschlagen")
+ENDZUSTAENDE = ("abgebrochen", "abgeschlossen", "fehlgeschlagen")
+
+def berechne_prioritaet(art, verzeichnisse):
+    """Priorität eines Auftrags: Art zuerst, dann einzelne Verzeichnisse vor vollständiger Prüfung."""
+    return ART_PRIORITAET[art] * 2 + (0 if verzeichnisse else 1)
+
+class ScanJob:
+    """
+    Ein Prüfauftrag (vollständige Systemprüfung oder einzelne Verzeichnisse).
+
+    Abbruch und Pause sind kooperativ: Die Systemprüfung fragt pro Datei das Attribut `unterbrechung` ab
+    (ein einfacher Attributzugriff) und ruft nur dann `warte_auf_fortsetzung` auf.
+    """
+    def __init__(self, job_id, art, verzeichnisse, volumes):
+        self.job_id = job_id
+        self.art = art
+        self.verzeichnisse = verzeichnisse # None: vollständige Prüfung (scan_verzeichnis)
+        self.volumes = volumes # Geräte-IDs der geprüften Verzeichnisse (Begrenzung pro Volume)
+        self.prioritaet = berechne_prioritaet(art, verzeichnisse)
+        self.zustand = "wartend"
+        self.erstellt = datetime.now()
+        self.gestartet = None
+        self.beendet = None
+        self.zusammengefuehrt = 0 # Doppelte Aufträge, die in diesem aufgegangen sind
+        self.geplant = art == "geplant" # Erfüllt (auch zusammengeführt) die geplante Prüfung
+        self.verdraengt = 0 # Wie oft der Auftrag für einen dringenderen pausiert wurde
+        self.ergebnis = None
+        self.bericht_id = None # Scan-Bericht der Prüfung, sobald sie läuft
+        self.fehler = None
+        self.unterbrechung = False # Abbruch oder Pause angefordert (Abfrage im Hot Path)
+        self.abbruch_angefordert = False
+        self._fortsetzen = threading.Event()
+        self._fortsetzen.set()
+
+    @property
+    def schluessel(self):
+        """Gleiche Schlüssel bedeuten gleiche Arbeit (Grundlage für das Zusammenführen)."""
+        return tuple(self.verzeichnisse) if self.verzeichnisse else None
+
+    def pausiere(self):
+        self._fortsetzen.clear()
+        self.unterbrechung = True
+
+    def setze_fort(self):
+        self.unterbrechung = self.abbruch_angefordert
+        self._fortsetzen.set()
+
+    def breche_ab(self):
+        self.abbruch_angefordert = True
+        self.unterbrechung = True
+        self._fortsetzen.set()
+
+    def warte_auf_fortsetzung(self):
+        """Blockiert, solange der Auftrag pausiert ist. Gibt False zurück, wenn er abgebrochen wurde."""
+        self._fortsetzen.wait()
+        return not self.abbruch_angefordert
+
+    def als_dict(self):
+        return {
+            "job_id": self.job_id,
+            "art": self.art,
+            "prioritaet": self.prioritaet,
+            "verzeichnisse": self.verzeichnisse,
+            "zustand": self.zustand,
+            "erstellt": self.erstellt.strftime("%Y-%m-%d %H:%M:%S"),
+            "gestartet": self.gestartet.strftime("%Y-%m-%d %H:%M:%S") if self.gestartet else None,
+            "beendet": self.beendet.strftime("%Y-%m-%d %H:%M:%S") if self.beendet else None,
+            "zusammengefuehrt": self.zusammengefuehrt,
+            "verdraengt": self.verdraengt,
+            "ergebnis": self.ergebnis,
+            "bericht_id": self.bericht_id,
+            "fehler": self.fehler
+        }
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
+
+class ScanScheduler:
+    """
+    Warteschlange für Systemprüfungen.
+    Modul für die Koordination von Echtzeit-, manuellen und geplanten Prüfungen.
+
+    - Aufträge werden nach Priorität (ART_PRIORITAET, einzelne Verzeichnisse vor vollständiger Prüfung)
+      und Einreichungsreihenfolge gestartet, höchstens max_parallel gleichzeitig und höchstens
+      max_pro_volume pro Volume (Geräte-ID der Verzeichnisse).
+    - Ein Auftrag mit denselben Verzeichnissen wie ein wartender oder laufender Auftrag wird mit diesem
+      zusammengeführt (die Priorität steigt ggf.). Geplante vollständige Prüfungen überlappen dadurch nie;
+      die nächste geplante Prüfung ist erst intervall_sekunden nach dem Ende der letzten fällig.
+    - Ist ein Volume durch einen weniger dringenden Auftrag belegt, wird dieser pausiert und später
+      fortgesetzt (z.B. verdrängt die manuelle Prüfung eines Verzeichnisses eine vollständige Prüfung).
+    - Ein Dispatcher-Thread verteilt die Aufträge; jeder laufende Auftrag hat einen eigenen Thread.
+    """
+    def __init__(self, fuehre_aus, voll_verzeichnisse, max_parallel=2, max_pro_volume=1, verlauf_groesse=100):
+        self.fuehre_aus = fuehre_aus # Callable(job) -> Ergebnis-Dictionary
+        self.voll_verzeichnisse = list(voll_verzeichnisse) # Verzeichnisse der vollständigen Prüfung (für deren Volumes)
+        self.max_parallel = max(1, int(max_parallel))
+        self.max_pro_volume = max(1, int(max_pro_volume))
+        self.warteschlange = [] # Heap (prioritaet, nummer, job) der wartenden Aufträge
+        self.aktive = {} # job_id -> job (laufend oder pausiert)
+        self.verlauf = collections.deque(maxlen=max(1, int(verlauf_groesse))) # Beendete Aufträge
+        self.intervall_sekunden = None # Geplante Prüfung aus, solange None
+        self.naechste_geplante = None # time.monotonic() der nächsten geplanten Prüfung
+        self._nummern = itertools.count(1)
+        self._bedingung = threading.Condition()
+        self._aktiv = False
+        self._dispatcher = None
+
+    def starte(self):
+        with self._bedingung:
+            if self._aktiv:
+                return
+            self._aktiv = True
+        self._dispatcher = threading.Thread(target=self._dispatcher_schleife, name="ScanScheduler", daemon=True)
+        self._dispatcher.start()
+
+    def stoppe(self, abbrechen=True):
+        """Beendet den Dispatcher; laufende Aufträge werden abgebrochen (kooperativ)."""
+        with self._bedingung:
+            self._aktiv = False
+            if abbrechen:
+                for job in list(self.aktive.values()) + [job for _, _, job in self.warteschlange]:
+                    job.breche_ab()
+            self._bedingung.notify_all()
+        if self._dispatcher:
+            self._dispatcher.join(timeout=5)
+
+    def plane(self, intervall_sekunden):
+        """Aktiviert die geplante vollständige Prüfung; die erste ist sofort fällig."""
+        with self._bedingung:
+            self.intervall_sekunden = max(1, intervall_sekunden)
+            self.naechste_geplante = time.monotonic()
+            self._bedingung.notify_all()
+
+    def beende_planung(self):
+        """Deaktiviert die geplante Prüfung und bricht wartende oder laufende geplante Aufträge ab."""
+        with self._bedingung:
+            self.intervall_sekunden = None
+            self.naechste_geplante = None
+            abgebrochen = [job for job in self._alle_offenen() if job.art == "geplant"]
+        for job in abgebrochen:
+            self.breche_ab(job.job_id)
+        return len(abgebrochen)
+
+    def reiche_ein(self, art, verzeichnisse=None):
+        """
+        Reiht einen Auftrag ein und gibt ihn zurück. Existiert bereits ein wartender oder laufender Auftrag für
+        dieselben Verzeichnisse, wird dieser zurückgegeben (zusammengeführt).
+        """
+        if art not in ART_PRIORITAET:
+            raise ValueError(f"Unbekannte Auftragsart: {art}")
+        verzeichnisse = sorted({os.path.normcase(os.path.abspath(verzeichnis)) for verzeichnis in verzeichnisse}) if verzeichnisse else None
+        with self._bedingung:
+            schluessel = tuple(verzeichnisse) if verzeichnisse else None
+            for job in self._alle_offenen():
+                if job.schluessel == schluessel and not job.abbruch_angefordert:
+                    job.zusammengefuehrt += 1
+                    job.geplant = job.geplant or art == "geplant"
+                    prioritaet = berechne_prioritaet(art, verzeichnisse)
+                    if prioritaet < job.prioritaet:
+                        job.prioritaet = prioritaet
+                        job.art = art # Z.B. bricht das Stoppen der Planung eine angeforderte manuelle Prüfung nicht ab
+                        if job.zustand == "wartend":
+                            # Neue Priorität im Heap berücksichtigen: Eintrag mit der alten Priorität ersetzen (Reihenfolge bleibt erhalten)
+                            self.warteschlange = [(job.prioritaet if eintrag[2] is job else eintrag[0],) + eintrag[1:] for eintrag in self.warteschlange]
+                            heapq.heapify(self.warteschlange)
+                    self._bedingung.notify_all()
+                    protokolliere_ereignis_global("info", f"Prüfauftrag ({art}) mit Auftrag {job.job_id} ({job.zustand}) zusammengeführt.", {"job_id": job.job_id})
+                    return job
+            job = ScanJob(f"job-{next(self._nummern)}", art, verzeichnisse, self._volumes(verzeichnisse))
+            self._reihe_ein(job)
+        protokolliere_ereignis_global("info", f"Prüfauftrag {job.job_id} ({art}) eingereiht: {verzeichnisse or 'vollständige Prüfung'}.", {"job_id": job.job_id})
+        self._melde(job)
+        return job
+
+    def breche_ab(self, job_id):
+        """Bricht einen wartenden, laufenden oder pausierten Auftrag ab. Gibt den Auftrag zurück (None, falls unbekannt oder beendet)."""
+        with self._bedingung:
+            job = next((job for job in self._alle_offenen() if job.job_id == job_id), None)
+            if job is None:
+                return None
+            job.breche_ab()
+            if job.zustand == "wartend":
+                self.warteschlange = [eintrag for eintrag in self.warteschlange if eintrag[2] is not job]
+                heapq.heapify(self.warteschlange)
+                self._beende(job, "abgebrochen")
+            self._bedingung.notify_all()
+        protokolliere_ereignis_global("info", f"Prüfauftrag {job_id} wird abgebrochen.", {"job_id": job_id})
+        return job
+
+    def hole_job(self, job_id):
+        with self._bedingung:
+            for job in itertools.chain(self._alle_offenen(), self.verlauf):
+                if job.job_id == job_id:
+                    return job.als_dict()
+        return None
+
+    def jobs(self):
+        """Gibt alle offenen Aufträge (nach Priorität) und die zuletzt beendeten (neueste zuerst) zurück."""
+        with self._bedingung:
+            offen = sorted(self._alle_offenen(), key=lambda job: (job.prioritaet, job.erstellt))
+            return {
+                "offen": [job.als_dict() for job in offen],
+                "beendet": [job.als_dict() for job in reversed(self.verlauf)],
+                "planung": self._planung()
+            }
+
+    def _planung(self):
+        faellig_in = None
+        if self.naechste_geplante is not None:
+            faellig_in = round(max(0.0, self.naechste_geplante - time.monotonic()), 1)
+        return {"intervall_sekunden": self.intervall_sekunden, "naechste_in_sekunden": faellig_in,
+                "max_parallel": self.max_parallel, "max_pro_volume": self.max_pro_volume}
+
+    def _alle_offenen(self):
+        return list(self.aktive.values()) + [job for _, _, job in self.warteschlange]
+
+    def _reihe_ein(self, job):
+        heapq.heappush(self.warteschlange, (job.prioritaet, next(self._nummern), job))
+        self._bedingung.notify_all()
+
+    @staticmethod
+    def _volumes(verzeichnisse):
+        """Geräte-IDs der Verzeichnisse; nicht lesbare Verzeichnisse zählen als eigenes Volume."""
+        if not verzeichnisse:
+            return None # Vollständige Prüfung: Volumes von voll_verzeichnisse, beim ersten Verteilen bestimmt
+        volumes = set()
+        for verzeichnis in verzeichnisse:
+            try:
+                volumes.add(os.stat(verzeichnis).st_dev)
+            except OSError:
+                volumes.add(verzeichnis)
+        return frozenset(volumes)
+
+    def _dispatcher_schleife(self):
+        with self._bedingung:
+            while self._aktiv:
+                jetzt = time.monotonic()
+                if self.naechste_geplante is not None and jetzt >= self.naechste_geplante:
+                    self.naechste_geplante = None # Wird beim Ende des geplanten Auftrags neu gesetzt
+                    self.reiche_ein("geplant") # Die Bedingung nutzt eine RLock
+                    continue
+                self._verteile()
+                wartezeit = None if self.naechste_geplante is None else max(0.0, self.naechste_geplante - jetzt)
+                self._bedingung.wait(wartezeit)
+
+    def _verteile(self):
+        """Startet oder setzt wartende bzw. pausierte Aufträge nach Priorität fort (unter self._bedingung)."""
+        kandidaten = [(job.prioritaet, 0, job) for job in self.aktive.values() if job.zustand == "pausiert" and not job.abbruch_angefordert]
+        kandidaten += sorted(self.warteschlange)
+        for _, _, job in sorted(kandidaten, key=lambda eintrag: (eintrag[0], eintrag[1])):
+            laufend = [aktiv for aktiv in self.aktive.values() if aktiv.zustand == "laufend"]
+            blockierer = self._blockierer(job, laufend)
+            if blockierer is None:
+                continue # Nur durch gleich dringende oder dringendere Aufträge blockiert
+            for verdraengt in blockierer:
+                verdraengt.pausiere()
+                verdraengt.zustand = "pausiert"
+                verdraengt.verdraengt += 1
+                protokolliere_ereignis_global("info", f"Prüfauftrag {verdraengt.job_id} pausiert zugunsten von {job.job_id}.", {"job_id": verdraengt.job_id})
+                self._melde(verdraengt)
+            if job.zustand == "pausiert":
+                job.zustand = "laufend"
+                job.setze_fort()
+                protokolliere_ereignis_global("info", f"Prüfauftrag {job.job_id} wird fortgesetzt.", {"job_id": job.job_id})
+            else:
+                self.warteschlange.remove(next(eintrag for eintrag in self.warteschlange if eintrag[2] is job))
+                heapq.heapify(self.warteschlange)
+                job.zustand = "laufend"
+                job.gestartet = datetime.now()
+                self.aktive[job.job_id] = job
+                threading.Thread(target=self._fuehre_job_aus, args=(job,), name=f"Scan-{job.job_id}", daemon=True).start()
+            self._melde(job)
+
+    def _blockierer(self, job, laufend):
+        """
+        Gibt die laufenden Aufträge zurück, die für job pausiert werden müssen (leere Liste: sofort startbar),
+        oder None, wenn job warten muss.
+        """
+        volumes = self._job_volumes(job)
+        blockierer = []
+        if len(laufend) >= self.max_parallel:
+            niedrigster = max(laufend, key=lambda aktiv: aktiv.prioritaet)
+            if niedrigster.prioritaet <= job.prioritaet:
+                return None
+            blockierer.append(niedrigster)
+        for volume in volumes:
+            belegt = [aktiv for aktiv in laufend if aktiv not in blockierer and volume in self._job_volumes(aktiv)]
+            while len(belegt) >= self.max_pro_volume:
+                niedrigster = max(belegt, key=lambda aktiv: aktiv.prioritaet)
+                if niedrigster.prioritaet <= job.prioritaet:
+                    return None
+                belegt.remove(niedrigster)
+                blockierer.append(niedrigster)
+        return blockierer
+
+    def _job_volumes(self, job):
+        if job.volumes is None:
+            job.volumes = self._volumes(self.voll_verzeichnisse)
+        return job.volumes
+
+    def _fuehre_job_aus(self, job):
+        protokolliere_ereignis_global("info", f"Prüfauftrag {job.job_id} ({job.art}) gestartet.", {"job_id": job.job_id})
+        zustand = "abgeschlossen"
+        try:
+            job.ergebnis = self.fuehre_aus(job)
+            if job.abbruch_angefordert:
+                zustand = "abgebrochen"
+        except Exception as e:
+            job.fehler = str(e)
+            zustand = "fehlgeschlagen"
+            protokolliere_ereignis_global("fehler", f"Prüfauftrag {job.job_id} fehlgeschlagen: {e}", {"job_id": job.job_id, "fehler": str(e)})
+        with self._bedingung:
+            self.aktive.pop(job.job_id, None)
+            self._beende(job, zustand)
+            self._bedingung.notify_all()
+
+    def _beende(self, job, zustand):
+        job.zustand = zustand
+        job.beendet = datetime.now()
+        self.verlauf.append(job)
+        if job.geplant and self.intervall_sekunden is not None:
+            self.naechste_geplante = time.monotonic() + self.intervall_sekunden # Kein Überlappen: Intervall ab Ende
+        protokolliere_ereignis_global("info", f"Prüfauftrag {job.job_id} {zustand}.", {"job_id": job.job_id, "ergebnis": job.ergebnis})
+        self._melde(job)
+
+    def _melde(self, job):
+        veroeffentliche_ereignis_global("scan_job", job.als_dict())
+
+    def get_statistik(self):
+        with self._bedingung:
+            zustaende = collections.Counter(job.zustand for job in self._alle_offenen())
+            return {"wartend": zustaende["wartend"], "laufend": zustaende["laufend"], "pausiert": zustaende["pausiert"], "beendet": len(self.verlauf)}
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
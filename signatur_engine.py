@@ -0,0 +1,234 @@
+import hashlib
+import mmap
+import os
+import re
+import threading
+from collections import namedtuple
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+LESE_BLOCK_GROESSE = 1024 * 1024 # Blockgröße für Hash und Signatursuche (bleibt im CPU-Cache, bevor der nächste Block gelesen wird)
+MMAP_MINDESTGROESSE = LESE_BLOCK_GROESSE # Kleinere Dateien werden in einen wiederverwendeten Puffer gelesen
+MAX_SIGNATUR_LAENGE = 64 * 1024 # Maximale Länge eines Treffers (bestimmt den Überlappungsbereich zwischen zwei Blöcken)
+
+# Kompilierte Signatur. "anker" ist das längste feste Literal, über das Kandidaten gesucht werden;
+# vor_min/vor_max geben den möglichen Abstand des Ankers vom Signaturbeginn an.
+Signatur = namedtuple("Signatur", ["id", "muster", "regex", "anker", "vor_min", "vor_max", "max_laenge"])
+
+_HEX_ZEICHEN = "0123456789abcdefABCDEF"
+_lokaler_puffer = threading.local() # Ein Lesepuffer pro Thread bzw. Worker-Prozess
+_worker_signatur_satz = None # Signatursatz eines Worker-Prozesses (einmal per initialisiere_worker übertragen)
+
+def _nibble_klasse(zeichen, hohes_nibble_fest):
+    """Erzeugt eine Regex-Zeichenklasse für ein Byte mit einem Platzhalter-Nibble (z.B. '4?' oder '?A')."""
+    wert = int(zeichen, 16)
+    werte = [(wert << 4) | n for n in range(16)] if hohes_nibble_fest else [(n << 4) | wert for n in range(16)]
+    return b"[" + b"".join(re.escape(bytes([w])) for w in werte) + b"]"
+
+def kompiliere_signatur(signatur_id, muster):
+    """
+    Kompiliert ein Hex-Muster in eine Signatur.
+
+    Syntax (Leerzeichen werden ignoriert):
+        4D5A     feste Bytes
+        ??       beliebiges Byte
+        4? / ?D  Byte mit beliebigem unteren bzw. oberen Nibble
+        {n}      genau n beliebige Bytes
+        {n-m}    n bis m beliebige Bytes ({-m} entspricht {0-m})
+
+    Wirft ValueError bei ungültiger Syntax, unbegrenzten Sprüngen oder Mustern ohne festes Literal aus mindestens 2 Bytes.
+    """
+    text = "".join(str(muster).split())
+    elemente = [] # ("literal", bytes) | ("klasse", regex) | ("sprung", min, max)
+    i = 0
+    while i < len(text):
+        if text[i] == "{":
+            ende = text.find("}", i)
+            if ende < 0:
+                raise ValueError(f"Nicht geschlossener Sprung bei Position {i}.")
+            inhalt = text[i + 1:ende]
+            von, trenner, bis = inhalt.partition("-")
+            if not trenner:
+                bis = von
+            if not bis:
+                raise ValueError(f"Unbegrenzter Sprung '{{{inhalt}}}' wird nicht unterstützt.")
+            minimum, maximum = int(von or 0), int(bis)
+            if minimum > maximum:
+                raise ValueError(f"Ungültiger Sprung '{{{inhalt}}}'.")
+            elemente.append(("sprung", minimum, maximum))
+            i = ende + 1
+            continue
+        paar = text[i:i + 2]
+        if len(paar) < 2:
+            raise ValueError("Ungerade Anzahl Hex-Zeichen.")
+        if paar == "??":
+            elemente.append(("sprung", 1, 1))
+        elif paar[0] == "?" and paar[1] in _HEX_ZEICHEN:
+            elemente.append(("klasse", _nibble_klasse(paar[1], False)))
+        elif paar[1] == "?" and paar[0] in _HEX_ZEICHEN:
+            elemente.append(("klasse", _nibble_klasse(paar[0], True)))
+        elif paar[0] in _HEX_ZEICHEN and paar[1] in _HEX_ZEICHEN:
+            byte = bytes.fromhex(paar)
+            if elemente and elemente[-1][0] == "literal":
+                elemente[-1] = ("literal", elemente[-1][1] + byte)
+            else:
+                elemente.append(("literal", byte))
+        else:
+            raise ValueError(f"Ungültiges Zeichen in '{paar}' bei Position {i}.")
+        i += 2
+
+    regex_teile = []
+    literale = [] # (bytes, abstand_min, abstand_max)
+    position_min = position_max = 0
+    for element in elemente:
+        if element[0] == "literal":
+            literale.append((element[1], position_min, position_max))
+            regex_teile.append(re.escape(element[1]))
+            position_min += len(element[1])
+            position_max += len(element[1])
+        elif element[0] == "klasse":
+            regex_teile.append(element[1])
+            position_min += 1
+            position_max += 1
+        else:
+            _, minimum, maximum = element
+            regex_teile.append(b".{%d}" % minimum if minimum == maximum else b".{%d,%d}" % (minimum, maximum))
+            position_min += minimum
+            position_max += maximum
+
+    if position_max > MAX_SIGNATUR_LAENGE:
+        raise ValueError(f"Signatur ist länger als {MAX_SIGNATUR_LAENGE} Bytes.")
+    # Anker: längstes Literal, bei gleicher Länge eines mit festem Abstand zum Signaturbeginn
+    kandidaten = [literal for literal in literale if len(literal[0]) >= 2]
+    if not kandidaten:
+        raise ValueError("Signatur benötigt mindestens ein festes Literal aus 2 Bytes.")
+    anker, vor_min, vor_max = max(kandidaten, key=lambda literal: (len(literal[0]), literal[1] == literal[2]))
+    regex = re.compile(b"".join(regex_teile), re.DOTALL)
+    return Signatur(signatur_id, str(muster), regex, anker, vor_min, vor_max, position_max)
+
+class SignaturSatz:
+    """
+    Menge kompilierter Byte-Signaturen für die Inhaltsprüfung von Dateien.
+
+    Alle Signaturen werden über ihre festen Literale (Anker) in einer gemeinsamen Tabelle
+    Anker -> Signaturen zusammengefasst; ein Anker wird pro Block nur einmal gesucht (bytes.find,
+    C-Geschwindigkeit), auch wenn ihn mehrere Signaturen teilen. Nur an Anker-Treffern wird die
+    vollständige Signatur (Platzhalter, Sprünge) per vorkompiliertem Regex verifiziert.
+    Pro Signatur wird ein Treffer (ID, Offset des Signaturbeginns) gemeldet, in der Regel der erste in der Datei.
+
+    Die Instanz enthält nur Tupel und kompilierte Regex-Objekte und kann daher an Worker-Prozesse übergeben werden.
+    """
+    def __init__(self, signaturen):
+        kompiliert = []
+        for signatur_id, muster in signaturen:
+            try:
+                kompiliert.append(kompiliere_signatur(signatur_id, muster))
+            except ValueError as e:
+                protokolliere_ereignis_global("warnung", f"Signatur '{signatur_id}' ignoriert: {e}", {"signatur_id": signatur_id, "fehler": str(e)})
+        self.signaturen = tuple(kompiliert)
+        anker_tabelle = {}
+        for index, signatur in enumerate(self.signaturen):
+            anker_tabelle.setdefault(signatur.anker, []).append(index)
+        self.anker_tabelle = tuple((anker, tuple(indizes)) for anker, indizes in anker_tabelle.items())
+        self.max_laenge = max((signatur.max_laenge for signatur in self.signaturen), default=0)
+
+    def __bool__(self):
+        return bool(self.signaturen)
+
+    def __len__(self):
+        return len(self.signaturen)
+
+    def _scanne_bereich(self, puffer, von, bis, daten_ende, basis_offset, treffer):
+        """
+        Sucht Signaturen, deren Anker in puffer[von:bis] beginnt. Verifiziert wird bis daten_ende.
+        treffer (Index -> Datei-Offset) wird ergänzt; bereits gefundene Signaturen werden übersprungen.
+        """
+        for anker, indizes in self.anker_tabelle:
+            offen = [index for index in indizes if index not in treffer]
+            if not offen:
+                continue
+            such_ende = min(bis + len(anker) - 1, daten_ende)
+            position = puffer.find(anker, von, such_ende)
+            while position >= 0 and offen:
+                for index in list(offen):
+                    signatur = self.signaturen[index]
+                    # Größter Abstand zuerst: frühester möglicher Signaturbeginn zu diesem Anker
+                    for abstand in range(min(signatur.vor_max, position), signatur.vor_min - 1, -1):
+                        beginn = position - abstand
+                        if signatur.regex.match(puffer, beginn, daten_ende):
+                            treffer[index] = basis_offset + beginn
+                            offen.remove(index)
+                            break
+                position = puffer.find(anker, position + 1, such_ende)
+
+    def hashe_und_scanne(self, datei_pfad, algorithmus="sha256"):
+        """
+        Liest die Datei genau einmal: jeder Block wird zuerst in den Hash und dann in die Signatursuche gegeben.
+        Große Dateien werden per mmap eingeblendet (keine Kopie in den Python-Speicher), kleine Dateien
+        in einen wiederverwendeten Puffer gelesen. Gibt (hexdigest, ((signatur_id, offset), ...)) zurück.
+        """
+        hasher = hashlib.new(algorithmus)
+        treffer = {}
+        with open(datei_pfad, 'rb') as datei:
+            groesse = os.fstat(datei.fileno()).st_size
+            if groesse and groesse >= MMAP_MINDESTGROESSE: # Leere Dateien lassen sich nicht einblenden
+                self._lese_per_mmap(datei, hasher, treffer)
+            else:
+                self._lese_per_puffer(datei, hasher, treffer)
+        ergebnis = sorted(((self.signaturen[index].id, offset) for index, offset in treffer.items()), key=lambda t: t[1])
+        return hasher.hexdigest(), tuple(ergebnis)
+
+    def _lese_per_mmap(self, datei, hasher, treffer):
+        with mmap.mmap(datei.fileno(), 0, access=mmap.ACCESS_READ) as abbild:
+            if hasattr(abbild, "madvise"):
+                abbild.madvise(mmap.MADV_SEQUENTIAL)
+            groesse = len(abbild)
+            ansicht = memoryview(abbild)
+            try:
+                for von in range(0, groesse, LESE_BLOCK_GROESSE):
+                    bis = min(von + LESE_BLOCK_GROESSE, groesse)
+                    hasher.update(ansicht[von:bis])
+                    if len(treffer) < len(self.signaturen):
+                        self._scanne_bereich(abbild, von, bis, groesse, 0, treffer)
+            finally:
+                ansicht.release() # Muss vor dem Schließen des mmap freigegeben werden
+
+    def _lese_per_puffer(self, datei, hasher, treffer):
+        ueberlappung = max(self.max_laenge - 1, 0)
+        puffer = getattr(_lokaler_puffer, "puffer", None)
+        if puffer is None or len(puffer) < LESE_BLOCK_GROESSE + ueberlappung:
+            puffer = _lokaler_puffer.puffer = bytearray(LESE_BLOCK_GROESSE + ueberlappung)
+        ansicht = memoryview(puffer)
+        try:
+            behalten = 0 # Bytes aus dem vorherigen Block, die für blockübergreifende Treffer erhalten bleiben
+            basis_offset = 0 # Datei-Offset von puffer[0]
+            while True:
+                gelesen = datei.readinto(ansicht[behalten:behalten + LESE_BLOCK_GROESSE])
+                if not gelesen:
+                    break
+                hasher.update(ansicht[behalten:behalten + gelesen])
+                fuellstand = behalten + gelesen
+                if len(treffer) < len(self.signaturen):
+                    self._scanne_bereich(puffer, 0, fuellstand, fuellstand, basis_offset, treffer)
+                neu_behalten = min(ueberlappung, fuellstand)
+                ansicht[:neu_behalten] = bytes(ansicht[fuellstand - neu_behalten:fuellstand])
+                basis_offset += fuellstand - neu_behalten
+                behalten = neu_behalten
+        finally:
+            ansicht.release()
+
+def hashe_und_scanne_datei(datei_pfad, signatur_satz, algorithmus="sha256"):
+    """Hash und Signaturtreffer einer Datei im aufrufenden Thread."""
+    return signatur_satz.hashe_und_scanne(datei_pfad, algorithmus)
+
+def initialisiere_worker(signatur_satz):
+    """
+    initializer für ProcessPoolExecutor: legt den Signatursatz einmal pro Worker-Prozess ab, statt ihn mit jeder
+    Datei erneut zu serialisieren. Ohne Signaturen (None) wird nur gehasht.
+    """
+    global _worker_signatur_satz
+    _worker_signatur_satz = signatur_satz if signatur_satz is not None else SignaturSatz(())
+
+def hashe_und_scanne_im_worker(datei_pfad, algorithmus="sha256"):
+    """Modulfunktion für Worker-Prozesse (nach initialisiere_worker): Hash und Signaturtreffer einer Datei."""
+    return _worker_signatur_satz.hashe_und_scanne(datei_pfad, algorithmus)
@@ -4,9 +4,12 @@ import time
 import os
 import hashlib
 import threading
+from collections import deque
 from datetime import datetime
-from typing import Union
-from logging_utils import protokolliere_ereignis_global
+from typing import Tuple, Union
+from logging_utils import ist_stufe_aktiv, protokolliere_ereignis_global
+from ereignis_bus import veroeffentliche_ereignis_global # Änderungsereignisse für den Stream der Web-UI
+from telemetrie import hole_telemetrie # Zähler und Latenz-Histogramme für /metrics
 from config_rules_quarantine import QuarantäneManager, RegelManager, KonfigurationManager # Importe, WarnungsManager entfernt
 from warnungs_manager import WarnungsManager # Import WarnungsManager aus warnungs_manager.py
 from prozess_manager import ProzessManager # Import ProzessManager
@@ -14,7 +17,43 @@ from netzwerk_manager import NetzwerkManager # Import NetzwerkManager
 from ki_analyse_manager import KIAnalyseManager # Import KIAnalyseManager
 from quanten_analyse_manager import QuantenAnalyseManager # Import QuantenAnalyseManager
 from blockchain_manager import BlockchainManager # Import BlockchainManager
-import stat # Für Dateiattribute
+from scan_cache import ScanCacheManager # Persistenter Cache für inkrementelle Prüfungen
+from scan_pipeline import ScanPipeline # Parallele Hash-Pipeline
+from datei_walker import DateiWalker, WalkPosition # scandir-basierter Verzeichnis-Walker
+from signatur_engine import hashe_und_scanne_datei, hashe_und_scanne_im_worker # Hash und Byte-Signaturen in einem Lesedurchlauf
+from ioc_index import IOCIndex, IOC_REGEL_NAME # Kompakter Index der Threat-Intelligence-Hashes
+from regel_engine import IPPraefixBaum, parse_ip_netz # Präfixbaum für IP-Indikatoren der Threat Intelligence
+from echtzeit_dateischutz import EchtzeitDateiSchutz # inotify/fanotify-basierter Dateischutz (Linux)
+from prozess_tracker import ProzessTracker # Inkrementelle Prozesstabelle (/proc unter Linux)
+from scan_bericht import ScanBericht, ScanBerichtArchiv, miss_stufe # Strukturierter Bericht pro Systemprüfung
+from scan_scheduler import ScanScheduler # Prüfaufträge mit Prioritäten, Abbruch und Begrenzung pro Volume
+from scan_checkpoint import ScanCheckpoint # Fortsetzen unterbrochener Prüfungen
+from scan_drosselung import ScanDrosselung # Ressourcenbudget (Bytes/Dateien pro Sekunde, Back-off bei Systemlast)
+
+HASH_BLOCK_GROESSE = 1024 * 1024 # 1 MiB: hashlib gibt bei großen Blöcken das GIL frei, weniger Systemaufrufe
+MAX_ZURUECKGESTELLTE_DATEIEN = 4096 # Dateien, die höchstens auf ihre Reputation warten, bevor die Urteils-Stufe blockiert
+SCAN_FORTSCHRITT_INTERVALL_SEKUNDEN = 0.5 # Höchstens so oft ein Fortschrittsereignis für den Stream der Web-UI
+
+# Metriken für /metrics (lock-arm, auch im Hot Path pro Datei)
+_telemetrie = hole_telemetrie()
+DATEIEN_GEPRUEFT = _telemetrie.zaehler("virenschutz_dateien_geprueft_total", "Geprüfte Dateien.", ("quelle",))
+BYTES_GEHASHT = _telemetrie.zaehler("virenschutz_bytes_gehasht_total", "Gelesene und gehashte Bytes.")
+SCAN_CACHE_TREFFER = _telemetrie.zaehler("virenschutz_scan_cache_treffer_total", "Dateien, deren Ergebnis aus dem Scan-Cache stammt.")
+SCAN_CACHE_FEHLSCHLAEGE = _telemetrie.zaehler("virenschutz_scan_cache_fehlschlaege_total", "Dateien, die nicht im Scan-Cache lagen oder sich geändert haben.")
+ERKENNUNGEN = _telemetrie.zaehler("virenschutz_erkennungen_total", "Erkannte Bedrohungen nach Quelle und Regel.", ("quelle", "regel"))
+HASH_DAUER = _telemetrie.histogramm("virenschutz_hash_dauer_sekunden", "Dauer von Lesen, Hash und Signatursuche pro Datei.")
+REGEL_AUSWERTUNG_DAUER = _telemetrie.histogramm("virenschutz_regel_auswertung_dauer_sekunden", "Dauer der Regelauswertung pro Datei, Prozess oder Verbindung (inkl. Reputation, KI, Quantenanalyse).", ("ziel",))
+ECHTZEIT_TICK_DAUER = _telemetrie.histogramm("virenschutz_echtzeit_tick_dauer_sekunden", "Dauer der Prüfungen eines Ticks der Echtzeitschutz-Schleife.", ("pruefung",))
+SYSTEMPRUEFUNG_DAUER = _telemetrie.histogramm("virenschutz_systempruefung_dauer_sekunden", "Dauer vollständiger Systemprüfungen.",
+                                              grenzen=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, 7200))
+
+def berechne_datei_hash_roh(datei_pfad, algorithmus="sha256"):
+    """Berechnet den Hash einer Datei ohne Protokollierung (auch in Worker-Prozessen nutzbar)."""
+    hasher = hashlib.new(algorithmus)
+    with open(datei_pfad, 'rb') as datei:
+        while block := datei.read(HASH_BLOCK_GROESSE):
+            hasher.update(block)
+    return hasher.hexdigest()
 
 class SystemÜberprüfungsManager:
     """Verwaltet die Systemüberprüfung."""
@@ -32,11 +71,44 @@ class SystemÜberprüfungsManager:
         self.scan_verzeichnis = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_verzeichnis")
         self.dateiendungen_ignoriert = self.konfig_manager.get_konfiguration().get("systempruefung").get("dateiendungen_ignoriert")
         self.system_verzeichnisse_ignoriert = self.konfig_manager.get_konfiguration().get("systempruefung").get("system_verzeichnisse_ignoriert") # Hinzugefügt
+        # Ausschlüsse einmalig vorkompilieren; der Quarantäne-Speicher enthält große Dateien unverändert (Roh-Objekte)
+        self.datei_walker = DateiWalker(list(self.system_verzeichnisse_ignoriert or []) + [self.quarantaene_manager.quarantaene_pfad], self.dateiendungen_ignoriert)
         self.echtzeit_schutz_aktiv = self.konfig_manager.get_konfiguration().get("systempruefung").get("echtzeit_schutz", True)
         self.pruefungs_intervall_sekunden = self.konfig_manager.get_konfiguration().get("systempruefung").get("pruefungs_intervall_sekunden", 600)
-        self.geplante_pruefung_thread = None
+        self.scan_cache_aktiviert = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_cache_aktiviert", True)
+        self.scan_cache_datei = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_cache_datei", "scan_cache.db")
+        self.scan_cache = ScanCacheManager(self.scan_cache_datei) if self.scan_cache_aktiviert else None
+        self.ioc_index_datei = self.konfig_manager.get_konfiguration().get("systempruefung").get("ioc_index_datei", "ioc_index.bin")
+        self.ioc_index = IOCIndex(self.ioc_index_datei) # Lädt den letzten Snapshot (schneller Start ohne Neuaufbau)
+        self.ti_ip_baum = IPPraefixBaum([]) # IP-Adressen und -Netze aus der Threat Intelligence
+        self.ti_ip_version = ""
+        self.pipeline_aktiviert = self.konfig_manager.get_konfiguration().get("systempruefung").get("pipeline_aktiviert", True)
+        self.hash_worker_anzahl = self.konfig_manager.get_konfiguration().get("systempruefung").get("hash_worker_anzahl", 4)
+        self.hash_worker_modus = self.konfig_manager.get_konfiguration().get("systempruefung").get("hash_worker_modus", "threads")
+        self.pipeline_queue_groesse = self.konfig_manager.get_konfiguration().get("systempruefung").get("pipeline_queue_groesse", 1024)
+        # Scan-Berichte: Zeit pro Stufe, langsamste Dateien, Kosten pro Regel, Gründe für übersprungene Einträge
+        self.scan_bericht_archiv = ScanBerichtArchiv(self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_berichte_verzeichnis", "scan_berichte"),
+                                                     self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_berichte_max_anzahl", 50))
+        self.scan_bericht_langsamste_dateien = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_bericht_langsamste_dateien", 20)
+        self.letzter_scan_bericht = None
+        self.scan_checkpoint_aktiviert = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_checkpoint_aktiviert", True)
+        self.scan_checkpoint_verzeichnis = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_checkpoint_verzeichnis", "scan_checkpoints")
+        self.scan_checkpoint_intervall_sekunden = self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_checkpoint_intervall_sekunden", 5)
+        self.scan_drosselung = ScanDrosselung(self.konfig_manager) # Gemeinsam für alle laufenden Prüfaufträge
+        self._scan_lokal = threading.local() # Zustand der Systemprüfung im aktuellen Thread (parallele Prüfaufträge)
+        self.echtzeit_dateischutz_aktiviert = self.konfig_manager.get_konfiguration().get("systempruefung").get("echtzeit_dateischutz_aktiviert", True)
+        self.echtzeit_dateischutz = None
+        self.prozess_tracker = ProzessTracker() # Inkrementelle Prozesstabelle mit Urteilen lebender Prozesse
+        self.prozess_regelsatz_version = None
+        self.scan_scheduler = ScanScheduler(self._fuehre_scan_job_aus, self.scan_verzeichnis,
+                                            max_parallel=self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_max_parallel", 2),
+                                            max_pro_volume=self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_max_pro_volume", 1),
+                                            verlauf_groesse=self.konfig_manager.get_konfiguration().get("systempruefung").get("scan_job_verlauf", 100))
+        self.scan_scheduler.starte()
         self.echtzeit_schutz_thread = None
         self.letzte_pruefung_zeit = "Nie" # Letzte Prüfungszeit als String
+        self.anzahl_bedrohungen_letzte_pruefung = 0 # Für die Web-UI
+        self.letzter_fortschritt = 0.0 # Zeitpunkt des letzten Scan-Fortschrittsereignisses (Stream der Web-UI)
 
         if self.echtzeit_schutz_aktiv:
             self.starte_echtzeit_schutz()
@@ -52,107 +124,349 @@ class SystemÜberprüfungsManager:
         """Gibt die letzte Prüfungszeit als String zurück."""
         return self.letzte_pruefung_zeit
 
-    def starte_systempruefung(self, verzeichnis=None):
-        """Startet eine vollständige Systemprüfung (manuell oder geplant)."""
+    @property
+    def zurueckgestellte_dateien(self):
+        """Auf ihre Reputation wartende Dateien (datei_pfad, datei_stat, datei_hash, signatur_treffer, reputation_future) der Prüfung in diesem Thread."""
+        try:
+            return self._scan_lokal.zurueckgestellte_dateien
+        except AttributeError:
+            self._scan_lokal.zurueckgestellte_dateien = deque()
+            return self._scan_lokal.zurueckgestellte_dateien
+
+    def _fuehre_scan_job_aus(self, job):
+        """Führt einen Prüfauftrag des Schedulers aus und gibt sein Ergebnis zurück."""
+        anzahl_dateien_geprueft, anzahl_bedrohungen_gefunden, dauer = self.starte_systempruefung(job=job)
+        return {"dateien_geprueft": anzahl_dateien_geprueft, "bedrohungen_gefunden": anzahl_bedrohungen_gefunden,
+                "dauer_sekunden": round(dauer.total_seconds(), 1), "bericht_id": job.bericht_id}
+
+    def starte_systempruefung(self, verzeichnis=None, job=None):
+        """
+        Führt eine Systemprüfung im aufrufenden Thread aus (vollständig oder für verzeichnis bzw. die Verzeichnisse von job).
+        Mit job prüft die Schleife pro Datei, ob der Scheduler den Auftrag pausiert oder abgebrochen hat.
+        Das Ressourcenbudget (scan_drosselung) begrenzt gelesene Bytes und Dateien pro Sekunde; der Thread eines
+        Prüfauftrags gehört dem Scheduler und läuft zusätzlich mit gesenkter Priorität.
+        """
         start_zeit = datetime.now()
         protokolliere_ereignis_global("info", "Systemprüfung gestartet.")
-        if verzeichnis:
+        if job is not None and job.verzeichnisse:
+            protokolliere_ereignis_global("info", f"Systemprüfung gestartet, Prüfauftrag {job.job_id} ({job.art})")
+            scan_verzeichnisse = job.verzeichnisse
+        elif verzeichnis:
             protokolliere_ereignis_global("info", f"Systemprüfung gestartet, manuelles Verzeichnis: '{verzeichnis}'")
             scan_verzeichnisse = [verzeichnis]
         else:
             scan_verzeichnisse = self.scan_verzeichnis
         protokolliere_ereignis_global("info", f"Scan-Verzeichnisse: {scan_verzeichnisse}") # Debugging Scan-Verzeichnisse
-        anzahl_dateien_geprueft = 0
-        anzahl_bedrohungen_gefunden = 0
+        threat_intelligence_version = ""
 
         # Threat Intelligence von Blockchain abrufen (vor der Prüfung, falls aktiviert)
         if self.blockchain_manager.blockchain_aktiviert and self.konfig_manager.get_konfiguration().get("blockchain").get("threat_intelligence_aktiviert"):
             threat_intelligence_daten = self.blockchain_manager.hole_threat_intelligence_blockchain()
             if threat_intelligence_daten and threat_intelligence_daten.indikatoren:
                 protokolliere_ereignis_global("info", f"Threat Intelligence von Blockchain abgerufen. Anzahl Indikatoren: {len(threat_intelligence_daten.indikatoren)}")
-                # TODO: Threat Intelligence Indikatoren in Regeln integrieren (zukünftig)
+                threat_intelligence_version = threat_intelligence_daten.berechne_version()
+                # Indikatoren in den IOC-Index übernehmen; der Snapshot wird nur bei geänderter Threat Intelligence neu aufgebaut
+                if threat_intelligence_version != self.ioc_index.version:
+                    self.ioc_index.baue_neu(threat_intelligence_daten.indikatoren, threat_intelligence_version)
+                if threat_intelligence_version != self.ti_ip_version:
+                    self._baue_ti_ip_baum(threat_intelligence_daten.indikatoren, threat_intelligence_version)
             else:
                 protokolliere_ereignis_global("warnung", "Keine oder leere Threat Intelligence Daten von Blockchain erhalten.")
-
-        for basis_verzeichnis in scan_verzeichnisse:
-            protokolliere_ereignis_global("info", f"Prüfe Verzeichnis: '{basis_verzeichnis}'")
-            for wurzel, verzeichnisse, dateien in os.walk(basis_verzeichnis):
-                # Systemverzeichnisse ignorieren
-                ignorieren = False
-                for sys_dir in self.system_verzeichnisse_ignoriert:
-                    if wurzel.lower().startswith(sys_dir.lower()):  # Case-insensitive Vergleich
-                        protokolliere_ereignis_global("debug", f"Verzeichnis '{wurzel}' ignoriert (Systemverzeichnis).")
-                        ignorieren = True
-                        break
-                if ignorieren:
-                    verzeichnisse[:] = []  # Verhindert weiteren Abstieg in Unterverzeichnisse
-                    continue  # Springe zum nächsten Basisverzeichnis
-
-                for datei_name in dateien:
-                    datei_pfad = os.path.join(wurzel, datei_name)
-
-                    # Systemdateien ebenfalls ignorieren, falls sie direkt im Scan-Verzeichnis liegen und nicht schon durch Verzeichnis ausgeschlossen wurden
-                    ignorieren_datei = False
-                    for sys_dir in self.system_verzeichnisse_ignoriert:
-                        if datei_pfad.lower().startswith(sys_dir.lower()):  # Case-insensitive Vergleich
-                            protokolliere_ereignis_global("debug", f"Datei '{datei_pfad}' ignoriert (Systemdatei).")
-                            ignorieren_datei = True
-                            break
-                    if ignorieren_datei:
-                        continue
-
-                    # Systemdateien explizit ausschließen (über Dateiattribute)
-                    if os.stat(datei_pfad).st_file_attributes & stat.FILE_ATTRIBUTE_SYSTEM:
-                        protokolliere_ereignis_global("debug", f"Datei '{datei_pfad}' ignoriert (Systemdatei-Attribut).")
-                        continue
-
-                    if any(datei_name.lower().endswith(endung) for endung in self.dateiendungen_ignoriert):
-                        protokolliere_ereignis_global("debug", f"Datei '{datei_name}' ignoriert (Dateiendung).")
-                        continue
-
-                    # .sys Dateien explizit ausschließen
-                    if datei_name.lower().endswith(".sys"):
-                        protokolliere_ereignis_global("debug", f"Datei '{datei_name}' ignoriert (Dateiendung: .sys).")
+        if not threat_intelligence_version and self.ioc_index.anzahl:
+            threat_intelligence_version = self.ioc_index.version # Prüfung erfolgt gegen den zuletzt gespeicherten Snapshot
+
+        # Scan-Cache verwerfen, falls sich Regelsatz oder Threat Intelligence seit dem letzten Scan geändert haben
+        pruef_version = f"{self.regel_manager.get_regelsatz_version()}:{threat_intelligence_version}"
+        if self.scan_cache:
+            self.scan_cache.pruefe_version(pruef_version)
+
+        zaehler = {"dateien_geprueft": 0, "bedrohungen_gefunden": 0, "cache_treffer": 0, "cache_fehlschlaege": 0}
+        bericht = ScanBericht(scan_verzeichnisse, self.scan_bericht_langsamste_dateien)
+        # Nach einem Neustart an einem Checkpoint derselben Verzeichnisse fortsetzen
+        checkpoint = fortsetzung = None
+        if self.scan_checkpoint_aktiviert:
+            checkpoint = ScanCheckpoint(self.scan_checkpoint_verzeichnis, scan_verzeichnisse, pruef_version, self.scan_checkpoint_intervall_sekunden)
+            fortsetzung = checkpoint.lade()
+        if fortsetzung:
+            zaehler.update(fortsetzung["zaehler"])
+            bericht.fortgesetzt_von = fortsetzung["bericht_id"]
+            protokolliere_ereignis_global("info", f"Systemprüfung wird am Checkpoint vom {fortsetzung['zeit']} fortgesetzt ({zaehler['dateien_geprueft']} Dateien bereits geprüft).",
+                                          {"bericht_id": fortsetzung["bericht_id"], "dateien_geprueft": zaehler["dateien_geprueft"]})
+        job_id = job.job_id if job is not None else None
+        if job is not None:
+            job.bericht_id = bericht.bericht_id
+        self.letzter_fortschritt = time.monotonic()
+        veroeffentliche_ereignis_global("scan", {"status": "gestartet", "verzeichnisse": scan_verzeichnisse, "job_id": job_id,
+                                                 "fortgesetzt_von": bericht.fortgesetzt_von, **zaehler})
+        if fortsetzung and fortsetzung["ausstehend"]:
+            self._pruefe_ausstehende_dateien(fortsetzung["ausstehend"], zaehler, bericht)
+        walker_stand = fortsetzung["walker"] if fortsetzung else None
+        self.scan_drosselung.beginne() # Vor senke_prioritaet: der Mess-Thread soll die Priorität nicht erben
+        if job is not None:
+            self.scan_drosselung.senke_prioritaet()
+        try:
+            if self.pipeline_aktiviert:
+                ScanPipeline(self, self.hash_worker_anzahl, self.hash_worker_modus, self.pipeline_queue_groesse).fuehre_aus(scan_verzeichnisse, zaehler, bericht, job,
+                                                                                                                          checkpoint, walker_stand)
+            else:
+                for datei_pfad, datei_stat in self._iteriere_scan_dateien(scan_verzeichnisse, bericht, job, checkpoint, walker_stand):
+                    if datei_pfad is None: # Checkpoint fällig; alle vorher gelieferten Dateien sind beurteilt
+                        self._schreibe_checkpoint(checkpoint, datei_stat, zaehler, bericht)
                         continue
-
-                    anzahl_dateien_geprueft += 1
-                    protokolliere_ereignis_global("debug", f"Prüfe Datei: '{datei_pfad}'")
-                    datei_hash = self._berechne_datei_hash(datei_pfad)
-                    if datei_hash:  # Nur analysieren, wenn Hash erfolgreich berechnet wurde
-                        ergebnis, regel_name = self._analysiere_datei(datei_pfad, datei_hash)
-
-                        if ergebnis != "normal": # Debugging erkannte Ergebnisse
-                            protokolliere_ereignis_global("debug", f"Datei '{datei_pfad}' - Ergebnis: {ergebnis}, Regel: {regel_name}")
-
-                        if ergebnis == "bedrohung":
-                            anzahl_bedrohungen_gefunden += 1
-                            protokolliere_ereignis_global("warnung", f"Bedrohung erkannt in Datei '{datei_pfad}' durch Regel '{regel_name}'. Aktion: Quarantäne.", {"datei_pfad": datei_pfad, "regel_name": regel_name})
-                            self.quarantaene_manager.quarantäne_datei(datei_pfad)  # Korrekter Methodenaufruf
+                    datei_hash, signatur_treffer, cache_eintrag = self._hash_stufe(datei_pfad, datei_stat, bericht=bericht, drosselung=self.scan_drosselung)
+                    self._urteils_stufe(datei_pfad, datei_stat, datei_hash, signatur_treffer, cache_eintrag, zaehler, bericht)
+        finally:
+            self.scan_drosselung.beende()
+        self._verarbeite_zurueckgestellte_dateien(zaehler, alle=True, bericht=bericht) # Auf ausstehende Reputationsabfragen warten
+        with bericht.stufe("quarantaene"):
+            self.quarantaene_manager.warte_auf_transfers()
+        anzahl_dateien_geprueft = zaehler["dateien_geprueft"]
+        anzahl_bedrohungen_gefunden = zaehler["bedrohungen_gefunden"]
+        cache_treffer = zaehler["cache_treffer"]
+        cache_fehlschlaege = zaehler["cache_fehlschlaege"]
+
+        if self.scan_cache:
+            with bericht.stufe("scan_cache"):
+                self.scan_cache.schreibe_aenderungen()
 
         end_zeit = datetime.now()
         dauer = end_zeit - start_zeit
+        abgebrochen = job is not None and job.abbruch_angefordert
+        if checkpoint:
+            bericht.checkpoints = {"geschrieben": checkpoint.geschrieben, "sekunden": round(checkpoint.sekunden, 6)}
+            if not abgebrochen:
+                checkpoint.entferne() # Abgebrochene Prüfungen setzen beim nächsten Mal am letzten Checkpoint fort
         self.letzte_pruefung_zeit = end_zeit.strftime("%Y-%m-%d %H:%M:%S")  # Zeit als String speichern
-        protokolliere_ereignis_global("info", f"Systemprüfung abgeschlossen. Geprüfte Dateien: {anzahl_dateien_geprueft}, Bedrohungen gefunden: {anzahl_bedrohungen_gefunden}, Dauer: {dauer}.")
-        from main import web_ui_manager # Import hier, um Zirkelbezug zu vermeiden, Zugriff auf globale Instanz
-        web_ui_manager.anzahl_bedrohungen_session = anzahl_bedrohungen_gefunden # Für Web-UI aktualisieren
+        cache_anfragen = cache_treffer + cache_fehlschlaege
+        cache_trefferquote = (cache_treffer / cache_anfragen * 100) if cache_anfragen else 0.0
+        protokolliere_ereignis_global("info", f"Systemprüfung {'abgebrochen' if abgebrochen else 'abgeschlossen'}. Geprüfte Dateien: {anzahl_dateien_geprueft}, Bedrohungen gefunden: {anzahl_bedrohungen_gefunden}, Dauer: {dauer}. "
+                                              f"Scan-Cache: {cache_treffer} Treffer, {cache_fehlschlaege} Fehlschläge (Trefferquote {cache_trefferquote:.1f}%).",
+                                      {"cache_treffer": cache_treffer, "cache_fehlschlaege": cache_fehlschlaege, "cache_trefferquote": round(cache_trefferquote, 1)})
+        SYSTEMPRUEFUNG_DAUER.beobachte(dauer.total_seconds())
+        bericht.abschliessen(zaehler, abgebrochen)
+        self.letzter_scan_bericht = bericht
+        self.scan_bericht_archiv.speichere(bericht)
+        veroeffentliche_ereignis_global("scan", {"status": "abgebrochen" if abgebrochen else "abgeschlossen", "dauer_sekunden": round(dauer.total_seconds(), 1),
+                                                 "letzte_pruefung_zeit": self.letzte_pruefung_zeit, "bericht_id": bericht.bericht_id, "job_id": job_id, **zaehler})
+        self.anzahl_bedrohungen_letzte_pruefung = anzahl_bedrohungen_gefunden
         return anzahl_dateien_geprueft, anzahl_bedrohungen_gefunden, dauer
 
+    def _baue_ti_ip_baum(self, indikatoren, version):
+        """Übernimmt IP-Adressen und CIDR-Netze aus den Threat-Intelligence-Indikatoren in den Präfixbaum für die Netzwerküberwachung."""
+        netze = []
+        for indikator in indikatoren:
+            netz = parse_ip_netz(indikator)
+            if netz is not None:
+                netze.append((netz, str(indikator).strip()))
+        self.ti_ip_baum = IPPraefixBaum(netze) # Austausch als Ganzes, die Echtzeitprüfung sieht nie einen halb aufgebauten Baum
+        self.ti_ip_version = version
+        protokolliere_ereignis_global("info", f"{len(netze)} IP-Indikator(en) der Threat Intelligence für die Netzwerküberwachung übernommen.")
+
+    def _iteriere_scan_dateien(self, scan_verzeichnisse, bericht=None, job=None, checkpoint=None, walker_stand=None):
+        """
+        Durchläuft die Scan-Verzeichnisse und liefert (datei_pfad, datei_eintrag) für jede zu prüfende Datei.
+        Die Zeit im Walker zählt als Stufe "verzeichnisse" (ohne die darin gemessenen stat-Aufrufe).
+        Ein pausierter Prüfauftrag blockiert hier bis zur Fortsetzung, ein abgebrochener beendet die Aufzählung.
+        Das Dateibudget der Scan-Drosselung wird hier pro Datei verbraucht.
+        Mit checkpoint wird alle checkpoint.intervall_sekunden (None, walker_stand) geliefert: Der Verbraucher schreibt den
+        Checkpoint, sobald alle vorher gelieferten Dateien beurteilt sind. Mit walker_stand beginnt der Durchlauf dort.
+        """
+        start_index = walker_stand["basis_index"] if walker_stand else 0
+        for basis_index in range(start_index, len(scan_verzeichnisse)):
+            basis_verzeichnis = scan_verzeichnisse[basis_index]
+            protokolliere_ereignis_global("info", f"Prüfe Verzeichnis: '{basis_verzeichnis}'")
+            position = None
+            if checkpoint is not None:
+                position = WalkPosition(walker_stand if basis_index == start_index else None)
+            datei_eintraege = self.datei_walker.durchlaufe(basis_verzeichnis, bericht, position)
+            while True:
+                if job is not None and job.unterbrechung and not job.warte_auf_fortsetzung():
+                    protokolliere_ereignis_global("info", f"Prüfauftrag {job.job_id} abgebrochen, Aufzählung beendet.", {"job_id": job.job_id})
+                    return
+                if position is not None and time.monotonic() >= checkpoint.faellig_ab:
+                    checkpoint.faellig_ab = float("inf") # Bis der Verbraucher geschrieben hat
+                    yield None, dict(position.stand(), basis_index=basis_index)
+                self.scan_drosselung.hole_datei(bericht)
+                with miss_stufe(bericht, "verzeichnisse"):
+                    datei_eintrag = next(datei_eintraege, None)
+                if datei_eintrag is None:
+                    break
+                yield datei_eintrag.pfad, datei_eintrag
+
+    def _hash_stufe(self, datei_pfad, datei_stat, hash_executor=None, bericht=None, drosselung=None):
+        """
+        Hash-Stufe einer Dateiprüfung: Scan-Cache abfragen und nur bei einem Fehlschlag Hash und Signaturen berechnen.
+        Mit drosselung (Systemprüfung, nicht der Echtzeitschutz) wird vor dem Lesen das Bytebudget verbraucht.
+        Gibt (datei_hash, signatur_treffer, cache_eintrag) zurück; thread-sicher, damit mehrere Hash-Worker sie parallel nutzen können.
+        """
+        protokolliere_ereignis_global("debug", "Prüfe Datei: '{datei_pfad}'", art="datei_geprueft", datei_pfad=datei_pfad)
+        # Unveränderte Dateien (gleiche Datei-Identität) nicht erneut hashen und analysieren
+        if self.scan_cache:
+            with miss_stufe(bericht, "scan_cache"):
+                cache_eintrag = self.scan_cache.hole_eintrag(datei_pfad, datei_stat)
+            if cache_eintrag:
+                SCAN_CACHE_TREFFER.erhoehe()
+                return cache_eintrag[0], (), cache_eintrag
+            SCAN_CACHE_FEHLSCHLAEGE.erhoehe()
+        if drosselung is not None:
+            drosselung.hole_bytes(datei_stat.st_size, bericht)
+        start = time.perf_counter()
+        with miss_stufe(bericht, "hash"):
+            datei_hash, signatur_treffer = self._pruefe_datei_inhalt(datei_pfad, hash_executor=hash_executor, bericht=bericht)
+        if datei_hash:
+            dauer = time.perf_counter() - start
+            HASH_DAUER.beobachte(dauer)
+            BYTES_GEHASHT.erhoehe(datei_stat.st_size)
+            if bericht:
+                bericht.datei_gehasht(datei_pfad, datei_stat.st_size, dauer)
+        return datei_hash, signatur_treffer, None
+
+    def _urteils_stufe(self, datei_pfad, datei_stat, datei_hash, signatur_treffer, cache_eintrag, zaehler, bericht=None):
+        """
+        Urteils-Stufe einer Dateiprüfung: Regeln auswerten, Ergebnis im Scan-Cache ablegen und Bedrohungen
+        in Quarantäne verschieben. Läuft immer nur in einem Thread, damit die Zähler exakt bleiben.
+        """
+        zaehler["dateien_geprueft"] += 1
+        DATEIEN_GEPRUEFT.erhoehe(1, ("systempruefung",))
+        if not zaehler["dateien_geprueft"] % 256 and time.monotonic() - self.letzter_fortschritt >= SCAN_FORTSCHRITT_INTERVALL_SEKUNDEN:
+            self.letzter_fortschritt = time.monotonic()
+            veroeffentliche_ereignis_global("scan", {"status": "laeuft", "datei_pfad": datei_pfad, **zaehler})
+        if cache_eintrag:
+            zaehler["cache_treffer"] += 1
+            datei_hash, ergebnis, regel_name = cache_eintrag
+            protokolliere_ereignis_global("debug", "Datei '{datei_pfad}' unverändert (Scan-Cache). Letztes Ergebnis: {ergebnis}", art="datei_cache_treffer", datei_pfad=datei_pfad, ergebnis=ergebnis)
+            if ergebnis == "bedrohung":
+                # Datei existiert weiterhin: vorherige Quarantäne ist fehlgeschlagen, erneut versuchen
+                zaehler["bedrohungen_gefunden"] += 1
+                protokolliere_ereignis_global("warnung", f"Bedrohung (aus Scan-Cache) weiterhin vorhanden in Datei '{datei_pfad}' (Regel '{regel_name}'). Aktion: Quarantäne.", {"datei_pfad": datei_pfad, "regel_name": regel_name})
+                ERKENNUNGEN.erhoehe(1, ("datei", regel_name))
+                veroeffentliche_ereignis_global("erkennung", {"quelle": "datei", "datei_pfad": datei_pfad, "regel_name": regel_name, "zeit": time.time()})
+                if bericht:
+                    bericht.regel_treffer(regel_name)
+                with miss_stufe(bericht, "quarantaene"):
+                    self.quarantaene_manager.quarantäne_datei(datei_pfad, regel_name, datei_hash=datei_hash, datei_stat=datei_stat, asynchron=True)
+            return
+        if self.scan_cache:
+            zaehler["cache_fehlschlaege"] += 1
+
+        if datei_hash:  # Nur analysieren, wenn Hash erfolgreich berechnet wurde
+            # Dateien, deren Urteil von einer noch laufenden Reputationsabfrage abhängt, zurückstellen statt zu warten
+            reputation_future = self._fordere_reputation_an(datei_pfad, datei_hash)
+            if reputation_future is not None and not reputation_future.done():
+                self.zurueckgestellte_dateien.append((datei_pfad, datei_stat, datei_hash, signatur_treffer, reputation_future))
+            else:
+                self._werte_datei_aus(datei_pfad, datei_stat, datei_hash, signatur_treffer, zaehler, bericht)
+        if self.zurueckgestellte_dateien:
+            self._verarbeite_zurueckgestellte_dateien(zaehler, bericht=bericht)
+
+    def _schreibe_checkpoint(self, checkpoint, walker_stand, zaehler, bericht=None):
+        """
+        Schreibt einen Checkpoint (Urteils-Stufe, alle vorher gelieferten Dateien sind beurteilt). Dateien, die noch auf ihre
+        Reputation warten, sind gezählt, aber nicht beurteilt; sie werden beim Fortsetzen zuerst geprüft.
+        """
+        with miss_stufe(bericht, "checkpoint"):
+            self.quarantaene_manager.warte_auf_transfers() # Erkannte Dateien sind vor dem Checkpoint in Quarantäne
+            if self.scan_cache:
+                self.scan_cache.schreibe_aenderungen() # Urteile vor dem Checkpoint dauerhaft im Scan-Cache
+            checkpoint.schreibe(walker_stand, zaehler, [eintrag[0] for eintrag in self.zurueckgestellte_dateien], bericht.bericht_id if bericht else None)
+
+    def _pruefe_ausstehende_dateien(self, datei_pfade, zaehler, bericht=None):
+        """Beurteilt Dateien, deren Urteil beim Checkpoint noch ausstand (bereits in dateien_geprueft gezählt)."""
+        for datei_pfad in datei_pfade:
+            datei_eintrag = self.datei_walker.eintrag_fuer_datei(datei_pfad)
+            if datei_eintrag is None:
+                continue # Inzwischen gelöscht oder ausgeschlossen
+            with miss_stufe(bericht, "hash"):
+                datei_hash, signatur_treffer = self._pruefe_datei_inhalt(datei_pfad, bericht=bericht)
+            if datei_hash:
+                self._werte_datei_aus(datei_pfad, datei_eintrag, datei_hash, signatur_treffer, zaehler, bericht)
+
+    def _fordere_reputation_an(self, datei_pfad, datei_hash):
+        """Fordert die Reputation an (ohne zu blockieren), falls eine passende Regel sie benötigt. Gibt ein Future oder None zurück."""
+        kompilierte_regeln = self.regel_manager.get_kompilierte_regeln()
+        if not kompilierte_regeln.hat_reputationsregeln or not self.blockchain_manager.blockchain_aktiviert:
+            return None
+        if not any(regel.blockchain_reputation_aktiviert for regel in kompilierte_regeln.finde_dateiregeln(datei_pfad)):
+            return None
+        return self.blockchain_manager.fordere_datei_reputation_an(datei_hash)
+
+    def _verarbeite_zurueckgestellte_dateien(self, zaehler, alle=False, bericht=None):
+        """Wertet zurückgestellte Dateien in Reihenfolge aus, sobald ihre Reputation vorliegt (mit alle=True: wartet auf alle)."""
+        while self.zurueckgestellte_dateien:
+            datei_pfad, datei_stat, datei_hash, signatur_treffer, reputation_future = self.zurueckgestellte_dateien[0]
+            # Nur fertige Einträge auswerten; bei zu vielen zurückgestellten Dateien auf die älteste warten (Backpressure)
+            if not (alle or reputation_future.done() or len(self.zurueckgestellte_dateien) > MAX_ZURUECKGESTELLTE_DATEIEN):
+                return
+            with miss_stufe(bericht, "reputation"):
+                reputation_future.result() # Danach liegt die Reputation im Reputations-Cache
+            self.zurueckgestellte_dateien.popleft()
+            self._werte_datei_aus(datei_pfad, datei_stat, datei_hash, signatur_treffer, zaehler, bericht)
+
+    def _werte_datei_aus(self, datei_pfad, datei_stat, datei_hash, signatur_treffer, zaehler, bericht=None, asynchron=True):
+        """
+        Analysiert eine Datei, legt das Ergebnis im Scan-Cache ab und verschiebt Bedrohungen in Quarantäne
+        (mit asynchron=True im Hintergrund; die Systemprüfung wartet an Checkpoints und am Ende darauf).
+        """
+        start = time.perf_counter()
+        with miss_stufe(bericht, "regeln"):
+            ergebnis, regel_name = self._analysiere_datei(datei_pfad, datei_hash, signatur_treffer, bericht)
+        REGEL_AUSWERTUNG_DAUER.beobachte(time.perf_counter() - start, ("datei",))
+
+        if ergebnis != "normal": # Debugging erkannte Ergebnisse
+            protokolliere_ereignis_global("debug", "Datei '{datei_pfad}' - Ergebnis: {ergebnis}, Regel: {regel_name}", art="datei_ergebnis", datei_pfad=datei_pfad, ergebnis=ergebnis, regel_name=regel_name)
+
+        if self.scan_cache:
+            with miss_stufe(bericht, "scan_cache"):
+                self.scan_cache.speichere_eintrag(datei_pfad, datei_stat, datei_hash, ergebnis, regel_name)
+
+        if ergebnis == "bedrohung":
+            zaehler["bedrohungen_gefunden"] += 1
+            protokolliere_ereignis_global("warnung", f"Bedrohung erkannt in Datei '{datei_pfad}' durch Regel '{regel_name}'. Aktion: Quarantäne.", {"datei_pfad": datei_pfad, "regel_name": regel_name})
+            ERKENNUNGEN.erhoehe(1, ("datei", regel_name))
+            veroeffentliche_ereignis_global("erkennung", {"quelle": "datei", "datei_pfad": datei_pfad, "regel_name": regel_name, "zeit": time.time()})
+            with miss_stufe(bericht, "quarantaene"):
+                self.quarantaene_manager.quarantäne_datei(datei_pfad, regel_name, datei_hash=datei_hash, datei_stat=datei_stat, asynchron=asynchron)
+        if bericht:
+            bericht.datei_beurteilt(datei_pfad, datei_stat.st_size, time.perf_counter() - start)
+        return ergebnis
+
+    def pruefe_datei_echtzeit(self, datei_pfad):
+        """
+        Prüft eine einzelne neu geschriebene Datei für den Echtzeit-Dateischutz (Scan-Cache, Hash, Signaturen, Regeln, Quarantäne).
+        Gibt das Ergebnis zurück oder None, falls die Datei ausgeschlossen ist oder nicht mehr existiert.
+        """
+        if os.path.abspath(datei_pfad).startswith(os.path.join(os.path.abspath(self.quarantaene_manager.quarantaene_pfad), "")):
+            return None # In Quarantäne verschobene Dateien nicht erneut prüfen
+        datei_eintrag = self.datei_walker.eintrag_fuer_datei(datei_pfad)
+        if datei_eintrag is None:
+            return None
+        datei_hash, signatur_treffer, cache_eintrag = self._hash_stufe(datei_pfad, datei_eintrag)
+        DATEIEN_GEPRUEFT.erhoehe(1, ("echtzeit",))
+        if cache_eintrag:
+            return cache_eintrag[1] # Inhalt unverändert (z.B. nur erneut geschlossen)
+        if not datei_hash:
+            return None
+        return self._werte_datei_aus(datei_pfad, datei_eintrag, datei_hash, signatur_treffer, {"bedrohungen_gefunden": 0}, asynchron=False)
+
     def plane_systempruefung(self):
-        """Plant regelmäßige Systemprüfungen."""
-        if self.geplante_pruefung_thread is None or not self.geplante_pruefung_thread.is_alive():
+        """Plant regelmäßige vollständige Systemprüfungen über den Scan-Scheduler (die erste sofort)."""
+        if self.scan_scheduler.intervall_sekunden is None:
             protokolliere_ereignis_global("info", f"Geplante Systemprüfung wird gestartet. Intervall: {self.pruefungs_intervall_sekunden} Sekunden.")
-            self.geplante_pruefung_thread = threading.Thread(target=self._geplante_pruefung_schleife, daemon=True)
-            self.geplante_pruefung_thread.start()
+            self.scan_scheduler.plane(self.pruefungs_intervall_sekunden)
         else:
             protokolliere_ereignis_global("warnung", "Geplante Systemprüfung läuft bereits.")
 
     def stoppe_geplante_pruefung(self):
-        """Stoppt die geplante Systemprüfung."""
-        if self.geplante_pruefung_thread and self.geplante_pruefung_thread.is_alive():
-            protokolliere_ereignis_global("info", "Geplante Systemprüfung wird gestoppt.")
-            self.geplante_pruefung_thread = None
+        """Stoppt die geplante Systemprüfung und bricht eine wartende oder laufende geplante Prüfung ab."""
+        if self.scan_scheduler.intervall_sekunden is not None:
+            abgebrochen = self.scan_scheduler.beende_planung()
+            protokolliere_ereignis_global("info", f"Geplante Systemprüfung gestoppt ({abgebrochen} Prüfauftrag/-aufträge abgebrochen).")
         else:
-            protokolliere_ereignis_global("warnung", "Keine geplante Systemprüfung läuft oder Thread-Objekt nicht vorhanden.")
+            protokolliere_ereignis_global("warnung", "Keine geplante Systemprüfung aktiv.")
+
+    def pruefe_verzeichnis_manuell(self, verzeichnis):
+        """Reiht die manuelle Prüfung eines Verzeichnisses ein (verdrängt eine laufende vollständige Prüfung auf demselben Volume)."""
+        return self.scan_scheduler.reiche_ein("manuell", [verzeichnis])
 
     def starte_echtzeit_schutz(self):
         """Startet den Echtzeitschutz."""
@@ -161,6 +475,7 @@ class SystemÜberprüfungsManager:
             self.echtzeit_schutz_aktiv = True
             self.echtzeit_schutz_thread = threading.Thread(target=self._echtzeit_schutz_schleife, daemon=True)
             self.echtzeit_schutz_thread.start()
+            self._starte_echtzeit_dateischutz()
         else:
             protokolliere_ereignis_global("warnung", "Echtzeitschutz läuft bereits.")
 
@@ -170,67 +485,136 @@ class SystemÜberprüfungsManager:
             protokolliere_ereignis_global("info", "Echtzeitschutz wird gestoppt.")
             self.echtzeit_schutz_aktiv = False
             self.echtzeit_schutz_thread = None
+            if self.echtzeit_dateischutz:
+                self.echtzeit_dateischutz.stoppe()
+                self.echtzeit_dateischutz = None
         else:
             protokolliere_ereignis_global("warnung", "Kein Echtzeitschutz läuft oder Thread-Objekt nicht vorhanden.")
 
-    def _geplante_pruefung_schleife(self):
-        """Schleife für die geplante Systemprüfung."""
-        while True:
-            protokolliere_ereignis_global("info", "Geplante Systemprüfung startet...")
-            self.starte_systempruefung()
-            protokolliere_ereignis_global("info", f"Geplante Systemprüfung abgeschlossen. Nächste Prüfung in {self.pruefungs_intervall_sekunden} Sekunden.")
-            time.sleep(self.pruefungs_intervall_sekunden)
+    def _starte_echtzeit_dateischutz(self):
+        """Startet den ereignisgesteuerten Echtzeit-Dateischutz (nur Linux), falls aktiviert."""
+        if not self.echtzeit_dateischutz_aktiviert or not EchtzeitDateiSchutz.ist_verfuegbar():
+            return
+        systempruefung_konfig = self.konfig_manager.get_konfiguration().get("systempruefung")
+        self.echtzeit_dateischutz = EchtzeitDateiSchutz(
+            self,
+            systempruefung_konfig.get("echtzeit_verzeichnisse") or self.scan_verzeichnis,
+            entprell_ms=systempruefung_konfig.get("echtzeit_entprellung_ms", 100),
+            queue_groesse=systempruefung_konfig.get("echtzeit_queue_groesse", 4096),
+            worker_anzahl=systempruefung_konfig.get("echtzeit_worker_anzahl", 2),
+            fanotify_bevorzugt=systempruefung_konfig.get("echtzeit_fanotify_bevorzugt", True)
+        )
+        if not self.echtzeit_dateischutz.starte():
+            self.echtzeit_dateischutz = None
 
     def _echtzeit_schutz_schleife(self):
         """Echtzeitschutz-Schleife."""
         protokolliere_ereignis_global("info", "Echtzeitschutz-Schleife gestartet.")
         while self.echtzeit_schutz_aktiv:
+            tick_start = time.perf_counter()
             self._ueberpruefe_system_ereignisse_echtzeit()
+            netzwerk_start = time.perf_counter()
+            self._ueberpruefe_netzwerk_aktivitaeten_echtzeit() # Vor den Prozessen: liefert den Verbindungs-Schnappschuss für beide
+            prozesse_start = time.perf_counter()
             self._ueberpruefe_prozesse_echtzeit()
-            self._ueberpruefe_netzwerk_aktivitaeten_echtzeit()
+            tick_ende = time.perf_counter()
+            ECHTZEIT_TICK_DAUER.beobachte(netzwerk_start - tick_start, ("system",))
+            ECHTZEIT_TICK_DAUER.beobachte(prozesse_start - netzwerk_start, ("netzwerk",))
+            ECHTZEIT_TICK_DAUER.beobachte(tick_ende - prozesse_start, ("prozesse",))
+            ECHTZEIT_TICK_DAUER.beobachte(tick_ende - tick_start, ("gesamt",))
             time.sleep(5)
         protokolliere_ereignis_global("info", "Echtzeitschutz-Schleife beendet.")
 
     def _ueberpruefe_system_ereignisse_echtzeit(self):
-        """Überprüft Systemereignisse im Echtzeit-Modus (aktuell Platzhalter)."""
-        protokolliere_ereignis_global("debug", "Echtzeit-Systemereignisüberprüfung (Platzhalter).")
-        # TODO: Implementierung für Echtzeit-Systemereignisüberwachung (z.B. Dateioperationen, Registry-Änderungen)
-        # Für jetzt: Placeholder message reicht.
-        pass # Zukünftige Implementierung für Systemereignisse
+        """Überwacht den ereignisgesteuerten Echtzeit-Dateischutz (Dateien werden in dessen eigenen Threads geprüft)."""
+        if self.echtzeit_dateischutz is None:
+            protokolliere_ereignis_global("debug", "Echtzeit-Dateischutz nicht aktiv (deaktiviert oder kein Linux).")
+            return
+        if not self.echtzeit_dateischutz.laeuft():
+            protokolliere_ereignis_global("warnung", "Echtzeit-Dateischutz ist ausgefallen und wird neu gestartet.")
+            self.echtzeit_dateischutz.stoppe()
+            self._starte_echtzeit_dateischutz()
+            return
+        if ist_stufe_aktiv("debug"): # Statistik (Latenz-Median) nur berechnen, wenn sie protokolliert wird
+            protokolliere_ereignis_global("debug", "Echtzeit-Dateischutz aktiv.", self.echtzeit_dateischutz.get_statistik())
 
     def _ueberpruefe_prozesse_echtzeit(self):
-        """Überprüft laufende Prozesse im Echtzeit-Modus."""
+        """Überprüft neue und geänderte Prozesse im Echtzeit-Modus (Urteile lebender Prozesse bleiben zwischengespeichert)."""
         protokolliere_ereignis_global("debug", "Echtzeit-Prozessüberprüfung gestartet.")
-        for prozess in psutil.process_iter(['pid', 'name', 'exe', 'cmdline']): # 'connections' entfernt
+        # Nach einer Regeländerung alle lebenden Prozesse neu bewerten
+        regelsatz_version = self.regel_manager.get_regelsatz_version()
+        alle = regelsatz_version != self.prozess_regelsatz_version
+        self.prozess_regelsatz_version = regelsatz_version
+        try:
+            prozesse = self.prozess_tracker.aktualisiere(alle=alle)
+        except Exception as e:
+            protokolliere_ereignis_global("fehler", f"Unerwarteter Fehler bei der Echtzeit-Prozessüberprüfung: {e}", {"fehler": str(e)})
+            return
+
+        # Verbindungen aus dem Schnappschuss dieses Ticks zuordnen (kein net_connections()-Aufruf pro Prozess)
+        for _, prozess_info in prozesse:
+            prozess_info['connections'] = self.netzwerk_manager.verbindungen_fuer_pid(prozess_info['pid'])
+
+        # KI-Urteile für alle Prozesse mit passender Regel vorab in einem Batch anfragen und an die
+        # Einzelanalyse unten weitergeben (keine zweite Anfrage pro Prozess, auch nicht für unbeantwortete)
+        kompilierte_regeln = self.regel_manager.get_kompilierte_regeln()
+        ki_kandidaten = [prozess_info for _, prozess_info in prozesse if kompilierte_regeln.finde_prozessregeln((prozess_info.get('name') or '').lower())]
+        ki_urteile = {}
+        if ki_kandidaten and self.ki_analyse_manager.ki_aktiviert:
+            urteile = self.ki_analyse_manager.analysiere_prozesse_verhalten_batch(ki_kandidaten)
+            ki_urteile = {id(prozess_info): urteil for prozess_info, urteil in zip(ki_kandidaten, urteile)}
+            if ist_stufe_aktiv("debug"):
+                protokolliere_ereignis_global("debug", "KI-Statistik nach Echtzeit-Prozessüberprüfung.", self.ki_analyse_manager.get_statistik())
+
+        for schluessel, prozess_info in prozesse:
             try:
-                prozess_info = prozess.info
-                prozess_obj = psutil.Process(prozess_info['pid']) # Prozess Objekt holen
-                verbindungen = prozess_obj.net_connections() # Verbindungen separat abrufen
-                prozess_info['connections'] = verbindungen # Verbindungen zur Prozessinfo hinzufügen (optional, falls später benötigt)
-
-                ergebnis, regel_name = self._analysiere_prozess(prozess_info)
+                start = time.perf_counter()
+                ergebnis, regel_name = self._analysiere_prozess(prozess_info, ki_urteile.get(id(prozess_info)))
+                REGEL_AUSWERTUNG_DAUER.beobachte(time.perf_counter() - start, ("prozess",))
+                self.prozess_tracker.setze_urteil(schluessel, ergebnis, regel_name)
                 if ergebnis == "bedrohung":
                     protokolliere_ereignis_global("warnung", f"Verdächtiger Prozess erkannt: '{prozess_info.get('name', 'Unbekannt')}' (PID: {prozess_info.get('pid', 'Unbekannt')}) durch Regel '{regel_name}'. Aktion: Prozess beenden.",
                                                 {"prozess_name": prozess_info.get('name', 'Unbekannt'), "pid": prozess_info.get('pid', 'Unbekannt'), "regel_name": regel_name})
+                    ERKENNUNGEN.erhoehe(1, ("prozess", regel_name))
+                    veroeffentliche_ereignis_global("erkennung", {"quelle": "prozess", "prozess_name": prozess_info.get('name'), "pid": prozess_info.get('pid'), "regel_name": regel_name, "zeit": time.time()})
                     self.warnungs_manager.zeige_warnung(f"Verdächtiger Prozess erkannt: '{prozess_info.get('name', 'Unbekannt')}' (PID: {prozess_info.get('pid', 'Unbekannt')}). Aktion: Prozess beendet.",
                                                       aktion="prozess_beenden", pid=prozess_info.get('pid'))
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess) as e:
-                protokolliere_ereignis_global("warnung", f"Fehler beim Zugriff auf Prozessinformationen (Echtzeit-Prozessüberprüfung): {e}", {"prozess_pid": prozess.pid, "fehler": str(e)})
+                protokolliere_ereignis_global("warnung", f"Fehler beim Zugriff auf Prozessinformationen (Echtzeit-Prozessüberprüfung): {e}", {"prozess_pid": prozess_info.get('pid'), "fehler": str(e)})
             except Exception as e:
                 protokolliere_ereignis_global("fehler", f"Unerwarteter Fehler bei der Echtzeit-Prozessüberprüfung: {e}", {"fehler": str(e)})
+        protokolliere_ereignis_global("debug", f"Echtzeit-Prozessüberprüfung abgeschlossen. {len(prozesse)} neue/geänderte Prozess(e) analysiert.", self.prozess_tracker.get_statistik())
 
     def _ueberpruefe_netzwerk_aktivitaeten_echtzeit(self):
-        """Überprüft Netzwerkaktivitäten im Echtzeit-Modus (zukünftig)."""
-        protokolliere_ereignis_global("debug", "Echtzeit-Netzwerkaktivitätsüberprüfung (gestartet, rudimentär).")
-        # TODO: Implementierung für detailliertere Echtzeit-Netzwerkaktivitätsüberwachung
-        # Für jetzt: rudimentäre Überwachung der Verbindungen reicht.
-        self.netzwerk_manager.überwache_netzwerk_verbindungen()
-        pass # Zukünftige Implementierung für Netzwerkaktivitäten
+        """Überprüft im Echtzeit-Modus die seit dem letzten Tick geöffneten Netzwerkverbindungen."""
+        protokolliere_ereignis_global("debug", "Echtzeit-Netzwerkaktivitätsüberprüfung gestartet.")
+        try:
+            geoeffnet, geschlossen = self.netzwerk_manager.überwache_netzwerk_verbindungen()
+        except Exception as e:
+            protokolliere_ereignis_global("fehler", f"Unerwarteter Fehler bei der Netzwerküberwachung: {e}", {"fehler": str(e)})
+            return
+        for verbindung_info in geoeffnet:
+            if verbindung_info["rip"] is None:
+                continue # Lauschende Sockets ohne Gegenstelle
+            try:
+                start = time.perf_counter()
+                ergebnis, regel_name = self._analysiere_netzwerk_verbindung(verbindung_info)
+                REGEL_AUSWERTUNG_DAUER.beobachte(time.perf_counter() - start, ("netzwerk",))
+                if ergebnis != "normal":
+                    protokolliere_ereignis_global("warnung", f"Verdächtige Netzwerkverbindung: PID {verbindung_info['pid']} -> {verbindung_info['rip']}:{verbindung_info['rport']} (Regel '{regel_name}').",
+                                                  dict(verbindung_info, regel_name=regel_name))
+                if ergebnis == "bedrohung":
+                    ERKENNUNGEN.erhoehe(1, ("netzwerk", regel_name))
+                    veroeffentliche_ereignis_global("erkennung", dict(verbindung_info, quelle="netzwerk", regel_name=regel_name, zeit=time.time()))
+                    self.warnungs_manager.zeige_warnung(f"Bedrohliche Netzwerkverbindung: PID {verbindung_info['pid']} -> {verbindung_info['rip']}:{verbindung_info['rport']} (Regel: '{regel_name}').")
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Unerwarteter Fehler bei der Analyse einer Netzwerkverbindung: {e}", {"fehler": str(e)})
+        protokolliere_ereignis_global("debug", f"Echtzeit-Netzwerkaktivitätsüberprüfung abgeschlossen. {len(geoeffnet)} geöffnet, {len(geschlossen)} geschlossen.", self.netzwerk_manager.get_statistik())
 
     def manuelle_systempruefung_starten_gui(self):
         """Startet eine manuelle Systemprüfung über die GUI."""
         protokolliere_ereignis_global("info", "Manuelle Systemprüfung über GUI angefordert.")
-        threading.Thread(target=self.starte_systempruefung).start()
+        self.scan_scheduler.reiche_ein("manuell")
 
     def zeige_letzte_pruefung_zeit_gui(self):
         """Zeigt die Zeit der letzten Systemprüfung in der GUI an."""
@@ -242,137 +626,148 @@ class SystemÜberprüfungsManager:
         regeln = self.regel_manager.get_regeln()
         return regeln
 
-    def _analysiere_prozess(self, prozess_info):
-        """Analysiert einen Prozess anhand der Regeln."""
-        regeln = self.regel_manager.get_regeln()
-        prozess_regeln = regeln.get("prozesse", {}).get("regeln", [])
-
-        for regel in prozess_regeln:
-            if regel.get("aktiviert"):
-                muster_liste = regel.get("muster", [])
-                aktion = regel.get("aktion")
-                quanten_analyse_aktiviert = regel.get("quanten_analyse_aktiviert", False)
-
-                prozess_name_lower = prozess_info.get('name', '').lower()
-
-                if any(muster.lower() in prozess_name_lower for muster in muster_liste):
-                    protokolliere_ereignis_global("debug", f"Prozess '{prozess_name_lower}' matched Regel '{regel.get('name')}' (Muster: {muster_liste}). Aktion: {aktion}")
-
-                    if quanten_analyse_aktiviert:
-                        protokolliere_ereignis_global("debug", f"Quantenanalyse für Prozess '{prozess_name_lower}' (Regel: '{regel.get('name')}') aktiviert.")
-                        quanten_ergebnis = self.quanten_analyse_manager.quanten_anomalie_erkennung(prozess_info)
-                        if quanten_ergebnis == "verdächtig":
-                            protokolliere_ereignis_global("warnung", f"Quantenanalyse meldet verdächtiges Prozessverhalten für '{prozess_name_lower}' (Regel: '{regel.get('name')}').")
-                            return "bedrohung", regel.get("name")
-
-                    ki_ergebnis = self.ki_analyse_manager.analysiere_prozess_verhalten(prozess_info)
-                    if ki_ergebnis == "verdächtig":
-                        protokolliere_ereignis_global("warnung", f"KI-Analyse meldet verdächtiges Prozessverhalten für '{prozess_name_lower}' (Regel: '{regel.get('name')}'). KI-Antwort: {ki_ergebnis}")
-                        return "bedrohung", regel.get("name")
-
-                    if aktion == "prozess_beenden":
-                        return "bedrohung", regel.get("name")
-                    elif aktion == "warnung":
-                        self.warnungs_manager.zeige_warnung(f"Verdächtiger Prozess '{prozess_name_lower}' gefunden (Regel: '{regel.get('name')}').")
-                        return "verdacht", regel.get("name")
+    def _analysiere_prozess(self, prozess_info, ki_urteil=None):
+        """Analysiert einen Prozess anhand der (kompilierten) Regeln. ki_urteil: bereits im Batch ermitteltes KI-Urteil."""
+        prozess_name_lower = prozess_info.get('name', '').lower()
+
+        for regel in self.regel_manager.get_kompilierte_regeln().finde_prozessregeln(prozess_name_lower):
+            protokolliere_ereignis_global("debug", "Prozess '{prozess_name}' matched Regel '{regel_name}' (Muster: {muster}). Aktion: {regel_aktion}", art="prozess_regel_treffer",
+                                          prozess_name=prozess_name_lower, regel_name=regel.name, muster=regel.muster, regel_aktion=regel.aktion)
+
+            if regel.quanten_analyse_aktiviert:
+                protokolliere_ereignis_global("debug", f"Quantenanalyse für Prozess '{prozess_name_lower}' (Regel: '{regel.name}') aktiviert.")
+                quanten_ergebnis = self.quanten_analyse_manager.quanten_anomalie_erkennung(prozess_info)
+                if quanten_ergebnis == "verdächtig":
+                    protokolliere_ereignis_global("warnung", f"Quantenanalyse meldet verdächtiges Prozessverhalten für '{prozess_name_lower}' (Regel: '{regel.name}').")
+                    return "bedrohung", regel.name
+
+            if ki_urteil is None:
+                ki_urteil = self.ki_analyse_manager.analysiere_prozess_verhalten(prozess_info)
+            ki_ergebnis = ki_urteil
+            if ki_ergebnis == "verdächtig":
+                protokolliere_ereignis_global("warnung", f"KI-Analyse meldet verdächtiges Prozessverhalten für '{prozess_name_lower}' (Regel: '{regel.name}'). KI-Antwort: {ki_ergebnis}")
+                return "bedrohung", regel.name
+
+            if regel.aktion == "prozess_beenden":
+                return "bedrohung", regel.name
+            elif regel.aktion == "warnung":
+                self.warnungs_manager.zeige_warnung(f"Verdächtiger Prozess '{prozess_name_lower}' gefunden (Regel: '{regel.name}').")
+                return "verdacht", regel.name
         return "normal", None
 
-    def _analysiere_datei(self, datei_pfad, datei_hash):
-        """Analysiert eine Datei anhand der Regeln."""
-        regeln = self.regel_manager.get_regeln()
-        datei_regeln = regeln.get("dateien", {}).get("regeln", [])
-
-        for regel in datei_regeln:
-            if regel.get("aktiviert"):
-                muster_liste = regel.get("muster", [])
-                pfad_liste = regel.get("pfade", [])
-                aktion = regel.get("aktion")
-                quanten_analyse_aktiviert = regel.get("quanten_analyse_aktiviert", False)
-                blockchain_reputation_aktiviert = regel.get("blockchain_reputation_aktiviert", False)
-
-                datei_name_lower = os.path.basename(datei_pfad).lower()
-                datei_pfad_lower = datei_pfad.lower()
-
-                if pfad_liste:
-                    erfüllt_pfad_bedingung = False
-                    for pfad_muster in pfad_liste:
-                        erweiterter_pfad = os.path.expandvars(pfad_muster).lower()
-                        if erweiterter_pfad in datei_pfad_lower:
-                            erfüllt_pfad_bedingung = True
-                            break
-                    if not erfüllt_pfad_bedingung:
-                        protokolliere_ereignis_global("debug", f"Datei '{datei_pfad}' ignoriert (Pfadbedingung der Regel '{regel.get('name')}' nicht erfüllt). Erwartete Pfade: {pfad_liste}")
-                        continue
-
-                if any(datei_name_lower.endswith(muster.lower()) for muster in muster_liste):
-                    protokolliere_ereignis_global("debug", f"Datei '{datei_pfad}' matched Regel '{regel.get('name')}' (Muster: {muster_liste}, Pfade: {pfad_liste}). Aktion: {aktion}")
-
-                    if blockchain_reputation_aktiviert:
-                        protokolliere_ereignis_global("debug", f"Blockchain-Reputationsprüfung für Datei '{datei_pfad}' (Regel: '{regel.get('name')}') aktiviert.")
-                        datei_reputation = self.blockchain_manager.pruefe_datei_reputation_blockchain(datei_hash)
-                        if datei_reputation == "bösartig" or datei_reputation == "verdächtig":
-                            protokolliere_ereignis_global("warnung", f"Blockchain-Reputationsprüfung meldet erhöhte Reputation für Datei '{datei_pfad}' (Regel: '{regel.get('name')}'). Reputation: {datei_reputation}")
-                            return "bedrohung", regel.get("name")
-
-                    if quanten_analyse_aktiviert:
-                        protokolliere_ereignis_global("debug", f"Quantenanalyse für Datei '{datei_pfad}' (Regel '{regel.get('name')}') aktiviert.")
-                        quanten_ergebnis = self.quanten_analyse_manager.quanten_malware_signatur_analyse(datei_pfad)
-                        if quanten_ergebnis == "verdächtig":
-                            protokolliere_ereignis_global("warnung", f"Quantenanalyse meldet verdächtige Datei-Signatur/Anomalie für '{datei_pfad}' (Regel: '{regel.get('name')}').")
-                            return "bedrohung", regel.get("name")
-
-                    if aktion == "datei_quarantaene":
-                        return "bedrohung", regel.get("name")
-                    elif aktion == "warnung":
-                        self.warnungs_manager.zeige_warnung(f"Verdächtige Datei '{datei_pfad}' gefunden (Regel: '{regel.get('name')}').")
-                        return "verdacht", regel.get("name")
+    def _analysiere_datei(self, datei_pfad, datei_hash, signatur_treffer=(), bericht=None):
+        """Analysiert eine Datei anhand der (kompilierten) Regeln und der gefundenen Byte-Signaturen."""
+        if datei_hash and self.ioc_index.enthaelt(datei_hash):
+            protokolliere_ereignis_global("warnung", f"Hash der Datei '{datei_pfad}' ist als Threat-Intelligence-Indikator bekannt.", {"datei_pfad": datei_pfad, "datei_hash": datei_hash})
+            if bericht:
+                bericht.regel_treffer(IOC_REGEL_NAME)
+            return "bedrohung", IOC_REGEL_NAME
+
+        gefundene_signaturen = {signatur_id for signatur_id, _ in signatur_treffer}
+        # Nur Regeln, deren Endungs- und Pfadbedingung zutrifft (Index-Lookup statt Schleife über alle Regeln)
+        for regel in self.regel_manager.get_kompilierte_regeln().finde_dateiregeln(datei_pfad):
+            start = time.perf_counter()
+            urteil = self._werte_dateiregel_aus(regel, datei_pfad, datei_hash, signatur_treffer, gefundene_signaturen, bericht)
+            if bericht:
+                bericht.regel_ausgewertet(regel.name, time.perf_counter() - start, urteil is not None)
+            if urteil:
+                return urteil
         return "normal", None
 
-    def _analysiere_netzwerk_verbindung(self, verbindung_info):
-        """Analysiert eine Netzwerkverbindung anhand der Regeln (zukünftig)."""
-        regeln = self.regel_manager.get_regeln()
-        netzwerk_regeln = regeln.get("netzwerk", {}).get("regeln", [])
-
-        for regel in netzwerk_regeln:
-            if regel.get("aktiviert"):
-                muster_ports = regel.get("muster", [])
-                aktion = regel.get("aktion")
-                quanten_analyse_aktiviert = regel.get("quanten_analyse_aktiviert", False)
-
-                remote_port = verbindung_info.get("rport")
-
-                if remote_port in muster_ports:
-                    protokolliere_ereignis_global("debug", f"Netzwerkverbindung zu Remote-Port '{remote_port}' matched Regel '{regel.get('name')}' (Muster: {muster_ports}). Aktion: {aktion}")
+    def _werte_dateiregel_aus(self, regel, datei_pfad, datei_hash, signatur_treffer, gefundene_signaturen, bericht=None):
+        """Wertet eine passende Dateiregel aus. Gibt (ergebnis, regel_name) zurück, oder None, falls die Regel nicht greift."""
+        # Regeln mit Signaturen greifen nur, wenn mindestens eine ihrer Signaturen im Dateiinhalt gefunden wurde
+        if regel.signaturen:
+            if not gefundene_signaturen & regel.signaturen:
+                return None
+            regel_treffer = [(signatur_id, offset) for signatur_id, offset in signatur_treffer if signatur_id in regel.signaturen]
+            protokolliere_ereignis_global("warnung", f"Signatur(en) in Datei '{datei_pfad}' gefunden (Regel: '{regel.name}'): "
+                                                     + ", ".join(f"{signatur_id} @ {offset}" for signatur_id, offset in regel_treffer),
+                                          {"datei_pfad": datei_pfad, "regel_name": regel.name, "signaturen": [{"id": signatur_id, "offset": offset} for signatur_id, offset in regel_treffer]})
+        protokolliere_ereignis_global("debug", "Datei '{datei_pfad}' matched Regel '{regel_name}' (Muster: {muster}, Pfade: {pfade}). Aktion: {regel_aktion}", art="datei_regel_treffer",
+                                      datei_pfad=datei_pfad, regel_name=regel.name, muster=regel.muster, pfade=regel.pfad_praefixe, regel_aktion=regel.aktion)
+
+        if regel.blockchain_reputation_aktiviert:
+            protokolliere_ereignis_global("debug", f"Blockchain-Reputationsprüfung für Datei '{datei_pfad}' (Regel: '{regel.name}') aktiviert.")
+            with miss_stufe(bericht, "reputation"):
+                datei_reputation = self.blockchain_manager.pruefe_datei_reputation_blockchain(datei_hash)
+            if datei_reputation == "bösartig" or datei_reputation == "verdächtig":
+                protokolliere_ereignis_global("warnung", f"Blockchain-Reputationsprüfung meldet erhöhte Reputation für Datei '{datei_pfad}' (Regel: '{regel.name}'). Reputation: {datei_reputation}")
+                return "bedrohung", regel.name
+
+        if regel.quanten_analyse_aktiviert:
+            protokolliere_ereignis_global("debug", f"Quantenanalyse für Datei '{datei_pfad}' (Regel '{regel.name}') aktiviert.")
+            with miss_stufe(bericht, "quantenanalyse"):
+                quanten_ergebnis = self.quanten_analyse_manager.quanten_malware_signatur_analyse(datei_pfad)
+            if quanten_ergebnis == "verdächtig":
+                protokolliere_ereignis_global("warnung", f"Quantenanalyse meldet verdächtige Datei-Signatur/Anomalie für '{datei_pfad}' (Regel: '{regel.name}').")
+                return "bedrohung", regel.name
+
+        if regel.aktion == "datei_quarantaene":
+            return "bedrohung", regel.name
+        elif regel.aktion == "warnung":
+            self.warnungs_manager.zeige_warnung(f"Verdächtige Datei '{datei_pfad}' gefunden (Regel: '{regel.name}').")
+            return "verdacht", regel.name
+        return None
 
-                    if quanten_analyse_aktiviert:
-                        protokolliere_ereignis_global("debug", f"Quantenanalyse für Netzwerkverbindung zu Port '{remote_port}' (Regel: '{regel.get('name')}') aktiviert.")
-                        quanten_ergebnis = self.quanten_analyse_manager.quanten_anomalie_erkennung(verbindung_info)
-                        if quanten_ergebnis == "verdächtig":
-                            protokolliere_ereignis_global("warnung", f"Quantenanalyse meldet verdächtigen Netzwerkverkehr zu Port '{remote_port}' (Regel: '{regel.get('name')}').")
-                            return "bedrohung", regel.get("name")
-
-                    if aktion == "warnung":
-                        self.warnungs_manager.zeige_warnung(f"Verdächtige Netzwerkverbindung zu Port '{remote_port}' (Regel: '{regel.get('name')}').")
-                        return "verdacht", regel.get("name")
+    def _analysiere_netzwerk_verbindung(self, verbindung_info):
+        """Analysiert eine Netzwerkverbindung anhand der IP-Indikatoren der Threat Intelligence und der (kompilierten) Regeln."""
+        remote_port = verbindung_info.get("rport")
+        remote_ip = verbindung_info.get("rip")
+
+        ti_treffer = self.ti_ip_baum.finde(remote_ip) if remote_ip and self.ti_ip_baum.anzahl else ()
+        if ti_treffer:
+            protokolliere_ereignis_global("warnung", f"Remote-Adresse '{remote_ip}' ist als Threat-Intelligence-Indikator bekannt (Netz: {ti_treffer[-1]}).",
+                                          {"remote_ip": remote_ip, "indikator": ti_treffer[-1]})
+            return "bedrohung", IOC_REGEL_NAME
+
+        # Port-Bitset und Präfixbaum als Index: unabhängig von der Anzahl der Regeln und Netze
+        for regel in self.regel_manager.get_kompilierte_regeln().finde_netzwerkregeln(remote_port, remote_ip):
+            protokolliere_ereignis_global("debug", "Netzwerkverbindung zu '{remote_ip}:{remote_port}' matched Regel '{regel_name}' (Ports: {ports}, Adressen: {adressen}). Aktion: {regel_aktion}", art="netzwerk_regel_treffer",
+                                          remote_ip=remote_ip, remote_port=remote_port, regel_name=regel.name, ports=regel.muster, adressen=len(regel.adressen), regel_aktion=regel.aktion)
+
+            if regel.quanten_analyse_aktiviert:
+                protokolliere_ereignis_global("debug", f"Quantenanalyse für Netzwerkverbindung zu Port '{remote_port}' (Regel: '{regel.name}') aktiviert.")
+                quanten_ergebnis = self.quanten_analyse_manager.quanten_anomalie_erkennung(verbindung_info)
+                if quanten_ergebnis == "verdächtig":
+                    protokolliere_ereignis_global("warnung", f"Quantenanalyse meldet verdächtigen Netzwerkverkehr zu Port '{remote_port}' (Regel: '{regel.name}').")
+                    return "bedrohung", regel.name
+
+            if regel.aktion == "warnung":
+                self.warnungs_manager.zeige_warnung(f"Verdächtige Netzwerkverbindung zu '{remote_ip}:{remote_port}' (Regel: '{regel.name}').")
+                return "verdacht", regel.name
         return "normal", None
 
-    def _berechne_datei_hash(self, datei_pfad, algorithmus="sha256") -> Union[str, None]:
+    def _pruefe_datei_inhalt(self, datei_pfad, algorithmus="sha256", hash_executor=None, bericht=None) -> Tuple[Union[str, None], tuple]:
+        """
+        Liest eine Datei genau einmal und gibt (datei_hash, signatur_treffer) zurück.
+        Sind keine Byte-Signaturen definiert, wird nur der Hash berechnet.
+        """
         # Überspringe Systemdateien, die mit '.sys' enden
         if datei_pfad.lower().endswith(".sys"):
-            protokolliere_ereignis_global("debug", f"Datei '{datei_pfad}' wird übersprungen, da es sich um eine Systemdatei handelt.")
-            return None
-        hasher = hashlib.new(algorithmus)
+            protokolliere_ereignis_global("debug", "Datei '{datei_pfad}' wird übersprungen, da es sich um eine Systemdatei handelt.", datei_pfad=datei_pfad)
+            if bericht:
+                bericht.uebersprungen_wegen("systemdatei")
+            return None, ()
         try:
-            with open(datei_pfad, 'rb') as datei:
-                while block := datei.read(4096):
-                    hasher.update(block)
-            return hasher.hexdigest()
+            if hash_executor:
+                # Lesen, Hashen und Signatursuche in einem Worker-Prozess mit dem beim Start übertragenen Signatursatz
+                # (siehe ScanPipeline); nur der Pfad wird serialisiert, Ausnahmen werden über result() weitergereicht
+                return hash_executor.submit(hashe_und_scanne_im_worker, datei_pfad, algorithmus).result()
+            signatur_satz = self.regel_manager.get_kompilierte_regeln().signatur_satz
+            if signatur_satz:
+                return hashe_und_scanne_datei(datei_pfad, signatur_satz, algorithmus)
+            return berechne_datei_hash_roh(datei_pfad, algorithmus), ()
         except PermissionError as e:
             protokolliere_ereignis_global("warnung", f"Zugriff verweigert beim Berechnen des Datei-Hashes für '{datei_pfad}': {e}. Datei wird übersprungen.", {"datei_pfad": datei_pfad, "fehler": str(e)})
-            return None
+            if bericht:
+                bericht.uebersprungen_wegen("zugriff_verweigert")
+            return None, ()
         except Exception as e:
             protokolliere_ereignis_global("fehler", f"Fehler beim Berechnen des Datei-Hashes für '{datei_pfad}': {e}", {"datei_pfad": datei_pfad, "fehler": str(e)})
-            return None
+            if bericht:
+                bericht.uebersprungen_wegen("lesefehler")
+            return None, ()
 
     def protokolliere_ereignis(self, typ, meldung, daten=None):
         """Protokolliert ein Ereignis über das Logging-Modul."""
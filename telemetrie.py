@@ -0,0 +1,214 @@
+import bisect
+import math
+import threading
+# Importiere die globale Protokollierungsfunktion aus logging_utils.py
+from logging_utils import protokolliere_ereignis_global
+
+# Standard-Bucketgrenzen für Latenzen in Sekunden (100 µs bis 10 s)
+LATENZ_GRENZEN = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape_label(wert):
+    return str(wert).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _zahl(wert):
+    if wert == math.inf:
+        return "+Inf"
+    return repr(float(wert)) if isinstance(wert, float) and not wert.is_integer() else str(int(wert))
+
+class _Metrik:
+    """
+    Gemeinsame Basis für Zähler und Histogramme: Werte werden pro Thread in einem eigenen Shard
+    (Dictionary label_werte -> Wert) geschrieben, damit der Hot Path ohne Sperre auskommt.
+    Nur der erste Aufruf eines Threads registriert seinen Shard unter der Sperre. Beim Auslesen werden
+    die Shards summiert. Shards beendeter Threads werden in einen Basis-Shard übernommen, beim Auslesen und
+    bei jeder Registrierung (sonst wüchse die Liste ohne Abruf von /metrics mit jedem Scan-Thread).
+    """
+    typ = None
+
+    def __init__(self, name, hilfe, label_namen=()):
+        self.name = name
+        self.hilfe = hilfe
+        self.label_namen = tuple(label_namen)
+        self._lokal = threading.local()
+        self._sperre = threading.Lock()
+        self._shards = [] # (thread, shard)
+        self._basis = {}
+
+    def _shard(self):
+        shard = {}
+        with self._sperre:
+            self._fasse_beendete_zusammen()
+            self._shards.append((threading.current_thread(), shard))
+        self._lokal.shard = shard
+        return shard
+
+    def _fasse_beendete_zusammen(self):
+        """Übernimmt Shards beendeter Threads in den Basis-Shard (unter self._sperre aufrufen)."""
+        lebend = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                lebend.append((thread, shard))
+            else:
+                self._fuehre_zusammen(self._basis, shard)
+        self._shards = lebend
+
+    def _werte(self):
+        """Summiert alle Shards (label_werte -> Wert); Shards beendeter Threads werden zusammengefasst."""
+        with self._sperre:
+            self._fasse_beendete_zusammen()
+            summe = {}
+            self._fuehre_zusammen(summe, self._basis)
+            for _, shard in self._shards:
+                self._fuehre_zusammen(summe, dict(shard)) # Kopie: der Thread kann währenddessen neue Label-Werte eintragen
+        return summe
+
+    def _labels(self, label_werte, zusatz=""):
+        teile = [f'{name}="{_escape_label(wert)}"' for name, wert in zip(self.label_namen, label_werte)]
+        if zusatz:
+            teile.append(zusatz)
+        return "{" + ",".join(teile) + "}" if teile else ""
+
+    def als_text(self):
+        zeilen = [f"# HELP {self.name} {self.hilfe}", f"# TYPE {self.name} {self.typ}"]
+        for label_werte, wert in sorted(self._werte().items(), key=lambda eintrag: tuple(map(str, eintrag[0]))):
+            zeilen.extend(self._zeilen(label_werte, wert))
+        return "\n".join(zeilen)
+
+class Zaehler(_Metrik):
+    """Monoton steigender Zähler (Prometheus-Typ counter), optional mit Labels."""
+    typ = "counter"
+
+    def erhoehe(self, wert=1, label_werte=()):
+        """Erhöht den Zähler um wert. label_werte ist ein Tupel in der Reihenfolge von label_namen."""
+        try:
+            shard = self._lokal.shard
+        except AttributeError:
+            shard = self._shard()
+        shard[label_werte] = shard.get(label_werte, 0) + wert
+
+    @staticmethod
+    def _fuehre_zusammen(ziel, quelle):
+        for label_werte, wert in quelle.items():
+            ziel[label_werte] = ziel.get(label_werte, 0) + wert
+
+    def wert(self, label_werte=()):
+        return self._werte().get(label_werte, 0)
+
+    def _zeilen(self, label_werte, wert):
+        return [f"{self.name}{self._labels(label_werte)} {_zahl(wert)}"]
+
+class Histogramm(_Metrik):
+    """
+    Verteilung von Messwerten (Prometheus-Typ histogram) mit festen Bucketgrenzen.
+    Pro Label-Kombination: eine Liste mit einem Zähler pro Bucket (nicht kumuliert), der Summe und der Anzahl.
+    """
+    typ = "histogram"
+
+    def __init__(self, name, hilfe, label_namen=(), grenzen=LATENZ_GRENZEN):
+        super().__init__(name, hilfe, label_namen)
+        self.grenzen = tuple(sorted(grenzen))
+
+    def beobachte(self, wert, label_werte=()):
+        """Trägt einen Messwert ein (z.B. eine Dauer in Sekunden)."""
+        try:
+            shard = self._lokal.shard
+        except AttributeError:
+            shard = self._shard()
+        verteilung = shard.get(label_werte)
+        if verteilung is None:
+            verteilung = shard[label_werte] = [0] * (len(self.grenzen) + 1) + [0.0, 0]
+        verteilung[bisect.bisect_left(self.grenzen, wert)] += 1 # Bucket "le": wert <= grenze
+        verteilung[-2] += wert
+        verteilung[-1] += 1
+
+    @staticmethod
+    def _fuehre_zusammen(ziel, quelle):
+        for label_werte, verteilung in quelle.items():
+            vorhanden = ziel.get(label_werte)
+            if vorhanden is None:
+                ziel[label_werte] = list(verteilung)
+            else:
+                for i, wert in enumerate(verteilung):
+                    vorhanden[i] += wert
+
+    def zusammenfassung(self, label_werte=()):
+        """Gibt {"anzahl", "summe"} für eine Label-Kombination zurück."""
+        verteilung = self._werte().get(label_werte)
+        return {"anzahl": verteilung[-1], "summe": verteilung[-2]} if verteilung else {"anzahl": 0, "summe": 0.0}
+
+    def _zeilen(self, label_werte, verteilung):
+        zeilen = []
+        kumuliert = 0
+        for grenze, anzahl in zip((*self.grenzen, math.inf), verteilung):
+            kumuliert += anzahl
+            le = f'le="{_zahl(grenze)}"'
+            zeilen.append(f"{self.name}_bucket{self._labels(label_werte, le)} {kumuliert}")
+        zeilen.append(f"{self.name}_sum{self._labels(label_werte)} {_zahl(verteilung[-2])}")
+        zeilen.append(f"{self.name}_count{self._labels(label_werte)} {verteilung[-1]}")
+        return zeilen
+
+class TelemetrieRegister:
+    """
+    Sammelt Zähler, Histogramme und Messwerte des Virenschutzes und gibt sie im
+    Prometheus-Textformat aus (Web-UI: /metrics).
+    Modul für Durchsatz- und Latenzmetriken, die ohne Auswertung der Logs überwacht werden können.
+
+    - Zähler und Histogramme werden lock-arm pro Thread erfasst (siehe _Metrik) und können im Hot Path
+      (pro Datei, pro Regelauswertung) aufgerufen werden.
+    - Messwerte (z.B. Ressourcen des Metrik-Samplers) werden erst beim Auslesen über eine Funktion ermittelt.
+    - Mehrfaches Registrieren desselben Namens liefert die vorhandene Metrik (Module können ihre
+      Metriken beim Import anlegen).
+    """
+    def __init__(self):
+        self._metriken = {}
+        self._messwerte = {} # name -> (hilfe, funktion, typ)
+        self._sperre = threading.Lock()
+
+    def _registriere(self, klasse, name, *args, **kwargs):
+        with self._sperre:
+            metrik = self._metriken.get(name)
+            if metrik is None:
+                metrik = self._metriken[name] = klasse(name, *args, **kwargs)
+            elif not isinstance(metrik, klasse):
+                raise ValueError(f"Metrik '{name}' ist bereits als {metrik.typ} registriert.")
+            return metrik
+
+    def zaehler(self, name, hilfe, label_namen=()):
+        return self._registriere(Zaehler, name, hilfe, label_namen)
+
+    def histogramm(self, name, hilfe, label_namen=(), grenzen=LATENZ_GRENZEN):
+        return self._registriere(Histogramm, name, hilfe, label_namen, grenzen)
+
+    def messwert(self, name, hilfe, funktion, typ="gauge"):
+        """
+        Registriert (oder ersetzt) einen Messwert, dessen aktueller Wert beim Auslesen von funktion() geliefert wird
+        (None = kein Wert). typ "counter" für Zähler, die an anderer Stelle geführt werden.
+        """
+        with self._sperre:
+            self._messwerte[name] = (hilfe, funktion, typ)
+
+    def als_text(self):
+        """Gibt alle Metriken im Prometheus-Textformat (Version 0.0.4) zurück."""
+        with self._sperre:
+            metriken = list(self._metriken.values())
+            messwerte = list(self._messwerte.items())
+        bloecke = [metrik.als_text() for metrik in metriken]
+        for name, (hilfe, funktion, typ) in messwerte:
+            try:
+                wert = funktion()
+            except Exception as e:
+                protokolliere_ereignis_global("warnung", f"Messwert '{name}' konnte nicht ermittelt werden: {e}", {"metrik": name, "fehler": str(e)})
+                continue
+            if wert is not None:
+                bloecke.append(f"# HELP {name} {hilfe}\n# TYPE {name} {typ}\n{name} {_zahl(wert)}")
+        return "\n".join(bloecke) + "\n"
+
+    def protokolliere_ereignis(self, typ, meldung, daten=None):
+        """Protokolliert ein Ereignis über das Logging-Modul."""
+        protokolliere_ereignis_global(typ, meldung, daten)
+
+_register = TelemetrieRegister()
+
+def hole_telemetrie():
+    """Gibt das globale Telemetrie-Register zurück."""
+    return _register
@@ -1,10 +1,12 @@
-from flask import Flask, render_template, jsonify
-import psutil
+from flask import Flask, Response, render_template, jsonify, request
 import threading
 import time
-import os
 from config_rules_quarantine import KonfigurationManager
-from logging_utils import protokolliere_ereignis_global
+from logging_utils import get_logging_statistik, protokolliere_ereignis_global
+from log_index import LogIndex
+from metrik_sampler import METRIKEN, MetrikSampler
+from ereignis_bus import hole_ereignis_bus
+from telemetrie import hole_telemetrie
 from system_pruefung_manager import SystemÜberprüfungsManager # Import SystemÜberprüfungsManager
 from prozess_manager import ProzessManager # Import ProzessManager
 from warnungs_manager import WarnungsManager # Import WarnungsManager
@@ -27,10 +29,25 @@ class WebUIManager:
         self.web_ui_port = self.konfig_manager.get_konfiguration().get("web_ui").get("port", 5000)
         self.aktualisierungs_intervall = self.konfig_manager.get_konfiguration().get("web_ui").get("aktualisierungs_intervall", 5)
         self.app = Flask(__name__)
-        self.letzte_log_eintraege = []
-        self.log_aktualisierungs_intervall = 2
-        self.letzte_log_aktualisierung_zeit = 0
-        self.anzahl_bedrohungen_session = 0 # Anzahl Bedrohungen in der aktuellen Session
+        # Log-Anzeige über einen Index (Tail ab gemerktem Versatz, Seiten per Cursor) statt readlines() der ganzen Datei
+        self.log_index = LogIndex(self.konfig_manager.get_konfiguration().get("logging").get("log_datei"))
+        self.log_seiten_groesse = 100
+        # Ressourcenmetriken aus einem Hintergrund-Sampler (Ringpuffer) statt psutil.cpu_percent(interval=1) pro Anfrage
+        web_ui_konfig = self.konfig_manager.get_konfiguration().get("web_ui")
+        self.metrik_sampler = MetrikSampler(
+            intervall_sekunden=web_ui_konfig.get("metriken_intervall_sekunden", 1),
+            verlauf_punkte=web_ui_konfig.get("metriken_verlauf_punkte", 3600),
+            grob_intervall_sekunden=web_ui_konfig.get("metriken_grob_intervall_sekunden", 60),
+            grob_verlauf_punkte=web_ui_konfig.get("metriken_grob_verlauf_punkte", 1440)
+        )
+        # Server-Sent-Events: ein Erzeuger-Thread liest Log und Metriken, der Ereignisbus verteilt an alle Clients
+        self.ereignis_bus = hole_ereignis_bus()
+        self.stream_intervall_sekunden = web_ui_konfig.get("stream_intervall_sekunden", 1)
+        self.stream_heartbeat_sekunden = web_ui_konfig.get("stream_heartbeat_sekunden", 15)
+        self.stream_log_max_eintraege = web_ui_konfig.get("stream_log_max_eintraege", 200)
+        # Prometheus-Export (/metrics): Zähler und Histogramme der Manager plus Messwerte, die erst beim Abruf gelesen werden
+        self.telemetrie = hole_telemetrie()
+        self._registriere_messwerte()
 
         # Flask Routen definieren
         self.app.add_url_rule('/', 'index', self.index)
@@ -39,6 +56,16 @@ class WebUIManager:
         self.app.add_url_rule('/api/dashboard_daten', 'api_dashboard_daten', self.api_dashboard_daten)
         self.app.add_url_rule('/api/log_daten', 'api_log_daten', self.api_log_daten)
         self.app.add_url_rule('/api/config_daten', 'api_config_daten', self.api_config_daten)
+        self.app.add_url_rule('/api/metrics/history', 'api_metrik_verlauf', self.api_metrik_verlauf)
+        self.app.add_url_rule('/api/scan_berichte', 'api_scan_berichte', self.api_scan_berichte)
+        self.app.add_url_rule('/api/scan_berichte/<bericht_id>', 'api_scan_bericht', self.api_scan_bericht)
+        self.app.add_url_rule('/api/scan_jobs', 'api_scan_jobs', self.api_scan_jobs)
+        self.app.add_url_rule('/api/scan_jobs/<job_id>', 'api_scan_job', self.api_scan_job)
+        self.app.add_url_rule('/api/quarantaene', 'api_quarantaene', self.api_quarantaene)
+        self.app.add_url_rule('/api/quarantaene/statistik', 'api_quarantaene_statistik', self.api_quarantaene_statistik)
+        self.app.add_url_rule('/api/quarantaene/<int:eintrag_id>', 'api_quarantaene_eintrag', self.api_quarantaene_eintrag)
+        self.app.add_url_rule('/api/stream', 'api_stream', self.api_stream)
+        self.app.add_url_rule('/metrics', 'metrics', self.metrics)
 
     def starte_web_ui(self):
         """Startet die Flask Web-UI in einem Thread."""
@@ -47,6 +74,8 @@ class WebUIManager:
             return
 
         protokolliere_ereignis_global("info", f"Web-UI wird gestartet auf Port {self.web_ui_port}...")
+        self.metrik_sampler.starte()
+        threading.Thread(target=self._stream_quelle_schleife, name="StreamQuelle", daemon=True).start()
         web_ui_thread = threading.Thread(target=self.run_flask_app)
         web_ui_thread.daemon = True
         web_ui_thread.start()
@@ -58,11 +87,11 @@ class WebUIManager:
     # --- Flask Routen und zugehörige Funktionen ---
     def index(self):
         """Route für das Haupt-Dashboard."""
-        cpu_auslastung_virenschutz = psutil.cpu_percent(interval=1)
-        speicher_auslastung_virenschutz = psutil.virtual_memory().percent
+        metriken = self._aktuelle_metriken()
+        cpu_auslastung_virenschutz = metriken.get("system_cpu_prozent")
+        speicher_auslastung_virenschutz = metriken.get("system_speicher_prozent")
 
-        # TODO: Hier oder im SystemÜberprüfungsManager echte Bedrohungszählung implementieren
-        anzahl_bedrohungen = self.anzahl_bedrohungen_session # Platzhalter
+        anzahl_bedrohungen = self.system_ueberpruefungs_manager.anzahl_bedrohungen_letzte_pruefung
 
         return render_template(
             'index.html', # **Template-Dateien (HTML) müssten noch erstellt werden!**
@@ -78,11 +107,17 @@ class WebUIManager:
         )
 
     def logs(self):
-        """Route für die Anzeige der Log-Einträge."""
-        self._aktualisiere_log_cache()
+        """Route für die Anzeige der Log-Einträge (optional mit Stufe und Cursor wie /api/log_daten)."""
+        try:
+            seite = self._hole_log_seite()
+        except ValueError as e:
+            seite = {"eintraege": [f"Ungültige Anfrage: {e}"], "cursor_aelter": None, "cursor_neuer": None}
         return render_template(
             'logs.html', # **Template-Dateien (HTML) müssten noch erstellt werden!**
-            log_eintraege=self.letzte_log_eintraege,
+            log_eintraege=seite["eintraege"],
+            cursor_aelter=seite["cursor_aelter"],
+            stufe=request.args.get("level", ""),
+            erste_seite=not request.args.get("cursor"),
             aktualisierungs_intervall=self.aktualisierungs_intervall
         )
 
@@ -98,11 +133,11 @@ class WebUIManager:
     # --- API Endpunkte (für JSON Daten) ---
     def api_dashboard_daten(self):
         """API-Endpunkt für Dashboard-Daten (JSON)."""
-        cpu_auslastung_virenschutz = psutil.cpu_percent(interval=1)
-        speicher_auslastung_virenschutz = psutil.virtual_memory().percent
+        metriken = self._aktuelle_metriken()
+        cpu_auslastung_virenschutz = metriken.get("system_cpu_prozent")
+        speicher_auslastung_virenschutz = metriken.get("system_speicher_prozent")
 
-        # TODO: Hier echte Bedrohungszählung implementieren
-        anzahl_bedrohungen = self.anzahl_bedrohungen_session # Platzhalter
+        anzahl_bedrohungen = self.system_ueberpruefungs_manager.anzahl_bedrohungen_letzte_pruefung
 
         daten = {
             "cpu_auslastung": cpu_auslastung_virenschutz,
@@ -112,20 +147,143 @@ class WebUIManager:
             "anzahl_bedrohungen": anzahl_bedrohungen,
             "blockchain_aktiviert": self.blockchain_manager.blockchain_aktiviert,
             "ki_aktiviert": self.ki_analyse_manager.ki_aktiviert, # ki_aktiviert hinzugefügt
+            "ki_statistik": self.ki_analyse_manager.get_statistik(), # Cache-Trefferquote und Wartezeiten der KI-Analyse
+            "metriken": metriken, # Letzter Messwert des Metrik-Samplers (System und eigener Prozess)
             "virenschutz_version": self.konfig_manager.get_konfiguration().get("virenschutz").get("version"),
             "aktualisierungs_intervall": self.aktualisierungs_intervall
         }
         return jsonify(daten)
 
     def api_log_daten(self):
-        """API-Endpunkt für Log-Daten (JSON)."""
-        self._aktualisiere_log_cache()
+        """
+        API-Endpunkt für Log-Daten (JSON).
+        Parameter: limit (Standard 100), cursor (aus cursor_aelter/cursor_neuer einer vorherigen Antwort),
+        richtung ("aelter" oder "neuer"), level (Mindeststufe, z.B. WARNING) und since (Epoch oder "YYYY-MM-DD HH:MM:SS").
+        """
+        try:
+            seite = self._hole_log_seite()
+        except ValueError as e:
+            return jsonify({"fehler": str(e)}), 400
         daten = {
-            "log_eintraege": self.letzte_log_eintraege,
+            "log_eintraege": seite["eintraege"],
+            "cursor_aelter": seite["cursor_aelter"],
+            "cursor_neuer": seite["cursor_neuer"],
             "aktualisierungs_intervall": self.aktualisierungs_intervall
         }
         return jsonify(daten)
 
+    def api_metrik_verlauf(self):
+        """
+        API-Endpunkt für Metrik-Zeitreihen (JSON) aus den Ringpuffern des Metrik-Samplers.
+        Parameter: metrics (kommagetrennt, Standard: alle), since (Epoch-Sekunden), max_points, resolution ("fein" oder "grob").
+        """
+        metriken = [name for name in request.args.get("metrics", "").split(",") if name] or None
+        aufloesung = request.args.get("resolution")
+        if aufloesung not in (None, "fein", "grob"):
+            return jsonify({"fehler": "resolution muss 'fein' oder 'grob' sein."}), 400
+        try:
+            verlauf = self.metrik_sampler.verlauf(metriken=metriken, seit=request.args.get("since", type=float),
+                                                  max_punkte=request.args.get("max_points", type=int), aufloesung=aufloesung)
+        except ValueError as e:
+            return jsonify({"fehler": str(e)}), 400
+        return jsonify(verlauf)
+
+    def api_scan_berichte(self):
+        """API-Endpunkt: Kurzfassungen der gespeicherten Scan-Berichte, neueste zuerst (Parameter: limit, Standard 20)."""
+        limit = request.args.get("limit", 20, type=int)
+        return jsonify({"berichte": self.system_ueberpruefungs_manager.scan_bericht_archiv.liste(limit)})
+
+    def api_scan_bericht(self, bericht_id):
+        """API-Endpunkt: vollständiger Scan-Bericht (Stufen, langsamste Dateien, Regeln, übersprungene Einträge); "letzter" für den neuesten."""
+        bericht = self.system_ueberpruefungs_manager.scan_bericht_archiv.lade(bericht_id)
+        if bericht is None:
+            return jsonify({"fehler": f"Scan-Bericht '{bericht_id}' nicht gefunden."}), 404
+        return jsonify(bericht)
+
+    def api_scan_jobs(self):
+        """API-Endpunkt: offene Prüfaufträge nach Priorität, zuletzt beendete, Zustand der geplanten Prüfung und des Ressourcenbudgets."""
+        return jsonify(dict(self.system_ueberpruefungs_manager.scan_scheduler.jobs(),
+                            drosselung=self.system_ueberpruefungs_manager.scan_drosselung.get_statistik()))
+
+    def api_scan_job(self, job_id):
+        """API-Endpunkt: Zustand eines Prüfauftrags (mit Ergebnis und Bericht-ID, sobald vorhanden)."""
+        job = self.system_ueberpruefungs_manager.scan_scheduler.hole_job(job_id)
+        if job is None:
+            return jsonify({"fehler": f"Prüfauftrag '{job_id}' nicht gefunden."}), 404
+        return jsonify(job)
+
+    def api_quarantaene(self):
+        """
+        API-Endpunkt: Quarantäne-Einträge seitenweise, neueste zuerst (Parameter: limit, cursor, pfad, pfad_praefix, regel, hash, seit, bis).
+        Nur lesend; Wiederherstellen und Löschen laufen über den QuarantäneManager.
+        """
+        limit = request.args.get("limit", 100, type=int)
+        if not 1 <= limit <= 1000:
+            return jsonify({"fehler": "limit muss zwischen 1 und 1000 liegen."}), 400
+        seite = self.system_ueberpruefungs_manager.quarantaene_manager.liste_eintraege(
+            limit, request.args.get("cursor", type=int), pfad=request.args.get("pfad"), pfad_praefix=request.args.get("pfad_praefix"),
+            regel_name=request.args.get("regel"), datei_hash=request.args.get("hash"),
+            seit=request.args.get("seit", type=float), bis=request.args.get("bis", type=float))
+        return jsonify(seite)
+
+    def api_quarantaene_statistik(self):
+        """API-Endpunkt: Anzahl Quarantäne-Einträge und -Objekte sowie Original- und belegte Größe."""
+        return jsonify(self.system_ueberpruefungs_manager.quarantaene_manager.get_statistik())
+
+    def api_quarantaene_eintrag(self, eintrag_id):
+        """API-Endpunkt: ein Quarantäne-Eintrag (ursprünglicher Pfad, Regel, Zeit, Besitzer, Modus, Hash)."""
+        eintrag = self.system_ueberpruefungs_manager.quarantaene_manager.hole_eintrag(eintrag_id)
+        if eintrag is None:
+            return jsonify({"fehler": f"Quarantäne-Eintrag {eintrag_id} nicht gefunden."}), 404
+        return jsonify(eintrag)
+
+    def api_stream(self):
+        """
+        Server-Sent-Events-Stream (text/event-stream) mit den Ereignissen "log", "erkennung", "scan", "scan_job", "metrik",
+        "konfiguration" und "reset". Setzt nach einem Verbindungsabbruch über den Header Last-Event-ID fort
+        (alternativ Parameter last_event_id); ohne Angabe beginnt der Stream bei neuen Ereignissen.
+        """
+        bus = self.ereignis_bus
+        letzte_id_text = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+        letzte_id = int(letzte_id_text) if letzte_id_text and letzte_id_text.isdigit() else bus.letzte_id
+
+        def erzeuge_frames(letzte_id):
+            bus.melde_an()
+            try:
+                yield b"retry: 3000\n: verbunden\n\n"
+                while True:
+                    frames, letzte_id_neu = bus.hole_seit(letzte_id, self.stream_heartbeat_sekunden)
+                    if frames is None:
+                        yield f"id: {letzte_id_neu}\nevent: reset\ndata: {{}}\n\n".encode() # Client lädt den Zustand neu
+                    elif frames:
+                        yield b"".join(frames)
+                        # Höchstens ein Schreibvorgang pro Intervall und Client: folgende Ereignisse werden gebündelt
+                        time.sleep(self.stream_intervall_sekunden)
+                    else:
+                        yield b": heartbeat\n\n" # Hält die Verbindung offen und erkennt getrennte Clients
+                    letzte_id = letzte_id_neu
+            finally:
+                bus.melde_ab()
+
+        return Response(erzeuge_frames(letzte_id), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+    def metrics(self):
+        """Metriken im Prometheus-Textformat (Zähler, Latenz-Histogramme, Ressourcen, Log-Schreiber, Stream)."""
+        return Response(self.telemetrie.als_text(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    def _registriere_messwerte(self):
+        """Registriert die Messwerte, die beim Abruf von /metrics aus Metrik-Sampler, Log-Schreiber und Ereignisbus gelesen werden."""
+        for name in METRIKEN:
+            self.telemetrie.messwert(f"virenschutz_{name}", f"Letzter Messwert des Metrik-Samplers ({name}).",
+                                     lambda name=name: self.metrik_sampler.aktuell().get(name))
+        for schluessel, typ, hilfe in (("geschrieben", "counter", "Geschriebene Log-Datensätze."),
+                                       ("verworfen", "counter", "Wegen voller Warteschlange verworfene Log-Datensätze."),
+                                       ("gedrosselt", "counter", "Durch Sampling oder Ratenbegrenzung unterdrückte Log-Datensätze."),
+                                       ("warteschlange", "gauge", "Log-Datensätze in der Warteschlange des Log-Schreibers.")):
+            self.telemetrie.messwert(f"virenschutz_log_{schluessel}" + ("_total" if typ == "counter" else ""), hilfe,
+                                     lambda schluessel=schluessel: (get_logging_statistik() or {}).get(schluessel), typ)
+        self.telemetrie.messwert("virenschutz_stream_clients", "Verbundene Clients von /api/stream.", lambda: self.ereignis_bus.abonnenten)
+
     def api_config_daten(self):
         """API-Endpunkt für Konfigurationsdaten (JSON)."""
         konfiguration = self.konfig_manager.get_konfiguration()
@@ -135,30 +293,55 @@ class WebUIManager:
         }
         return jsonify(daten)
 
-    def _aktualisiere_log_cache(self):
-        """Aktualisiert den Log-Cache in regelmäßigen Abständen."""
-        jetzt = time.time()
-
-        # Initialisieren, falls nicht vorhanden
-        if not hasattr(self, 'letzte_log_aktualisierung_zeit'):
-            self.letzte_log_aktualisierung_zeit = 0
-
-        if jetzt - self.letzte_log_aktualisierung_zeit >= self.log_aktualisierungs_intervall:
-            log_datei_pfad = self.konfig_manager.get_konfiguration().get("logging").get("log_datei")
-            log_datei_pfad = os.path.abspath(log_datei_pfad)  # Sicherstellen, dass es ein absoluter Pfad ist
-
+    def _stream_quelle_schleife(self):
+        """
+        Einziger Erzeuger der Log- und Metrikereignisse für den Stream: Log-Datei und Metrik-Sampler werden pro
+        Intervall genau einmal gelesen, unabhängig von der Anzahl der Clients (ohne Clients gar nicht).
+        """
+        log_cursor = None
+        letzte_metrik_zeit = None
+        while True:
+            time.sleep(self.stream_intervall_sekunden)
+            if not self.ereignis_bus.abonnenten:
+                log_cursor = None # Ohne Clients nichts lesen; beim nächsten Client am Dateiende fortsetzen
+                continue
             try:
-                if not os.path.exists(log_datei_pfad):  # Prüfen, ob Datei existiert
-                    self.letzte_log_eintraege = ["Log-Datei nicht gefunden! Pfad: " + log_datei_pfad]
-                    return
+                metriken = self.metrik_sampler.aktuell()
+                if metriken and metriken.get("zeit") != letzte_metrik_zeit:
+                    letzte_metrik_zeit = metriken.get("zeit")
+                    self.ereignis_bus.veroeffentliche("metrik", metriken)
+                log_cursor = self._veroeffentliche_neue_log_eintraege(log_cursor)
+            except Exception as e:
+                protokolliere_ereignis_global("fehler", f"Fehler im Erzeuger des Web-UI-Streams: {e}", {"fehler": str(e)})
 
-                with open(log_datei_pfad, 'r', encoding='utf-8', errors='ignore') as f:  # Fehlerfreies Encoding setzen
-                    alle_log_eintraege = f.readlines()
-                    self.letzte_log_eintraege = alle_log_eintraege[-100:]  # Letzte 100 Einträge speichern
+    def _veroeffentliche_neue_log_eintraege(self, log_cursor):
+        """Veröffentlicht die seit log_cursor angehängten Log-Zeilen (bei sehr vielen nur die neuesten). Gibt den neuen Cursor zurück."""
+        if log_cursor is None:
+            return self.log_index.hole_eintraege(anzahl=1)["cursor_neuer"] # Start am Dateiende
+        seite = self.log_index.hole_eintraege(anzahl=self.stream_log_max_eintraege, cursor=log_cursor, richtung="neuer")
+        ausgelassen = False
+        if len(seite["eintraege"]) >= self.stream_log_max_eintraege:
+            neueste = self.log_index.hole_eintraege(anzahl=self.stream_log_max_eintraege)
+            if neueste["cursor_neuer"] != seite["cursor_neuer"]:
+                seite, ausgelassen = neueste, True
+        if seite["eintraege"]:
+            self.ereignis_bus.veroeffentliche("log", {"eintraege": seite["eintraege"], "ausgelassen": ausgelassen})
+        return seite["cursor_neuer"] or log_cursor
 
-            except FileNotFoundError:
-                self.letzte_log_eintraege = ["Log-Datei nicht gefunden!"]
-            except Exception as e:
-                self.letzte_log_eintraege = [f"Fehler beim Lesen der Log-Datei: {e}"]
+    def _aktuelle_metriken(self):
+        """Letzter Messwert des Metrik-Samplers; läuft der Sampler (noch) nicht, wird einmal ohne Wartezeit gemessen."""
+        return self.metrik_sampler.aktuell() or self.metrik_sampler.messe()
 
-            self.letzte_log_aktualisierung_zeit = jetzt  # Zeitpunkt der letzten Aktualisierung setzen
+    def _hole_log_seite(self):
+        """Liest eine Seite aus dem Log-Index anhand der Anfrageparameter (ValueError bei ungültigen Parametern)."""
+        anzahl = request.args.get("limit", self.log_seiten_groesse, type=int)
+        richtung = request.args.get("richtung", "aelter")
+        if not 1 <= anzahl <= 1000:
+            raise ValueError("limit muss zwischen 1 und 1000 liegen.")
+        if richtung not in ("aelter", "neuer"):
+            raise ValueError("richtung muss 'aelter' oder 'neuer' sein.")
+        seite = self.log_index.hole_eintraege(anzahl=anzahl, cursor=request.args.get("cursor"), richtung=richtung,
+                                              stufe=request.args.get("level"), seit=request.args.get("since"))
+        if not seite["eintraege"] and seite["cursor_neuer"] is None:
+            seite["eintraege"] = ["Log-Datei nicht gefunden! Pfad: " + self.log_index.log_datei_pfad]
+        return seite